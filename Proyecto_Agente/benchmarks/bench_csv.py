@@ -0,0 +1,103 @@
+"""
+Benchmark de lectura de CSV: motor de pandas por bloques frente al lector de Arrow.
+
+Mide el tiempo de ``io_utils.read_local_dataset`` (la lectura del dataset de
+ejemplo en la app, mismo proceso que ``read_any``; mejor de ``--repeat``
+ejecuciones) y el rendimiento en MB/s con cada valor de
+``CSV_READER_CONFIG['engine']``, y comprueba que ambos motores producen el mismo
+DataFrame.
+
+Usa el archivo de ejemplo PISCES (``2018-06-06-pdb-intersect-pisces.csv``) si está
+en el proyecto; si no, genera uno sintético con el mismo esquema y ``--rows`` filas.
+
+Uso:
+    python benchmarks/bench_csv.py --rows 20000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from config import CSV_READER_CONFIG, EXAMPLE_FILE_PATH  # noqa: E402
+from io_utils import read_local_dataset  # noqa: E402
+
+
+def synthetic_pisces(rows: int, seed: int = 0) -> bytes:
+    """CSV con el esquema del dataset PISCES/PDB y secuencias aleatorias."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(20, 800, rows)
+    amino_acids = np.frombuffer(b"ACDEFGHIKLMNPQRSTVWYX", dtype="S1")
+    states = np.frombuffer(b"HGIEBTSC", dtype="S1")
+    reduce_q3 = str.maketrans("GIBTS", "HHECC")
+
+    seqs, sst8 = [], []
+    for length in lengths:
+        seqs.append(rng.choice(amino_acids, length).tobytes().decode())
+        sst8.append(rng.choice(states, length).tobytes().decode())
+    df = pd.DataFrame({
+        "pdb_id": [f"{rng.integers(1, 9)}{''.join(rng.choice(list('ABCDEFGH'), 3))}" for _ in range(rows)],
+        "chain_code": rng.choice(list("ABCD"), rows),
+        "seq": seqs,
+        "sst8": sst8,
+        "sst3": [s.translate(reduce_q3) for s in sst8],
+        "len": lengths,
+        "has_nonstd_aa": ["X" in s for s in seqs],
+        "Exptl.": rng.choice(["XRAY", "NMR", "EM"], rows),
+        "resolution": np.round(rng.uniform(0.8, 3.5, rows), 2),
+        "R-factor": np.round(rng.uniform(0.1, 0.3, rows), 3),
+        "FreeRvalue": np.round(rng.uniform(0.15, 0.35, rows), 3),
+    })
+    df.loc[rng.choice(rows, rows // 50), "resolution"] = np.nan
+    return df.to_csv(index=False).encode()
+
+
+def measure(engine: str, path: Path, repeat: int):
+    """Lee ``path`` con el motor indicado y devuelve (mejor tiempo, DataFrame)."""
+    CSV_READER_CONFIG["engine"] = engine
+    best, df = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = read_local_dataset(path)
+        best = min(best, time.perf_counter() - start)
+    megabytes = path.stat().st_size / 1024 ** 2
+    print(f"  {engine:<10} {best * 1000:>10.1f} ms   {megabytes / best:>8.1f} MB/s   {df.shape}")
+    return best, df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000, help="Filas del CSV sintético (sin archivo de ejemplo)")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(EXAMPLE_FILE_PATH)
+        if path.exists():
+            label = path.name
+        else:
+            path = Path(tmp) / "pisces_sintetico.csv"
+            path.write_bytes(synthetic_pisces(args.rows))
+            label = f"sintético PISCES, {args.rows:,} filas"
+        print(f"{label} ({path.stat().st_size / 1024 ** 2:.1f} MB), {os.cpu_count()} CPU\n")
+
+        original = CSV_READER_CONFIG["engine"]
+        try:
+            baseline, expected = measure("pandas", path, args.repeat)
+            arrow, df = measure("pyarrow", path, args.repeat)
+        finally:
+            CSV_READER_CONFIG["engine"] = original
+    pd.testing.assert_frame_equal(df, expected)
+    print(f"\nAceleración: {baseline / arrow:.2f}x (resultados idénticos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark de los histogramas con KDE: ``sns.histplot(kde=True)`` frente a ``density.histogram_kde``.
+
+Para longitud, resolución y R-factor de un dataset sintético con el esquema PISCES
+mide el tiempo de dibujar el histograma con KDE (mejor de ``--repeat``
+ejecuciones, sin renderizar a PNG) con seaborn y con el motor por bins + FFT de
+``eda.histogram_with_kde``, y compara las barras y la curva (error máximo de la
+curva relativo a su pico, interpolando en la rejilla de seaborn).
+
+Uso:
+    python benchmarks/bench_density.py --rows 500000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from eda import histogram_with_kde  # noqa: E402
+
+
+def synthetic_columns(rows: int, seed: int = 0):
+    """Columnas numéricas con distribuciones parecidas a las del dataset PISCES."""
+    rng = np.random.default_rng(seed)
+    return {
+        "len": rng.gamma(2.0, 130.0, rows).astype(np.int64) + 20,
+        "resolution": np.round(rng.gamma(6.0, 0.35, rows), 2),
+        "R-factor": np.round(rng.normal(0.2, 0.03, rows), 3),
+    }
+
+
+def measure(draw, repeat: int):
+    """Mejor tiempo de ``draw(ax)`` y los datos dibujados (alturas de barras, curva)."""
+    best = float("inf")
+    for _ in range(repeat):
+        fig, ax = plt.subplots()
+        start = time.perf_counter()
+        draw(ax)
+        best = min(best, time.perf_counter() - start)
+        heights = np.array([patch.get_height() for patch in ax.patches])
+        line = ax.lines[0].get_xydata()
+        plt.close(fig)
+    return best, heights, line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="Filas del dataset sintético")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} filas\n")
+    print(f"  {'columna':<12} {'seaborn':>10} {'bins+FFT':>10} {'acel.':>7}   {'error curva':>11}")
+    for name, values in synthetic_columns(args.rows).items():
+        baseline, bars, line = measure(lambda ax: sns.histplot(values, kde=True, bins=30, ax=ax), args.repeat)
+        fast, fast_bars, fast_line = measure(lambda ax: histogram_with_kde(ax, values), args.repeat)
+
+        np.testing.assert_allclose(fast_bars, bars)
+        curve = np.interp(line[:, 0], fast_line[:, 0], fast_line[:, 1])
+        error = np.max(np.abs(curve - line[:, 1])) / line[:, 1].max()
+        print(f"  {name:<12} {baseline * 1000:>8.0f} ms {fast * 1000:>8.0f} ms {baseline / fast:>6.1f}x   {error:>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de lectura de Excel: ``pd.read_excel`` frente a ``io_utils.read_any``.
+
+Mide tiempo y pico de memoria (tracemalloc) sobre:
+1. ``Book1.xlsx`` del repositorio.
+2. Un libro sintético con el mismo esquema, replicando las filas de Book1 hasta
+   ``--rows`` filas por hoja en ``--sheets`` hojas (todas las hojas leídas).
+
+Uso:
+    python benchmarks/bench_excel.py --rows 50000 --sheets 4
+"""
+
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from io_utils import EXCEL_ENGINE, read_any  # noqa: E402
+
+
+def measure(label: str, fn, repeat: int = 3):
+    """Ejecuta ``fn`` varias veces y muestra el mejor tiempo y el pico de memoria."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<34} {best * 1000:>10.1f} ms   pico {peak / 1024 ** 2:>8.1f} MB   {result.shape}")
+    return best
+
+
+def uploaded(data: bytes, name: str):
+    """Simula el objeto de Streamlit (file-like con 'name')."""
+    file = io.BytesIO(data)
+    file.name = name
+    return file
+
+
+def synthetic_workbook(source: pd.DataFrame, rows: int, sheets: int) -> bytes:
+    """Libro con ``sheets`` hojas de ``rows`` filas replicando ``source``."""
+    import openpyxl
+
+    repeated = pd.concat([source] * (rows // len(source) + 1), ignore_index=True).head(rows)
+    workbook = openpyxl.Workbook(write_only=True)
+    for index in range(sheets):
+        worksheet = workbook.create_sheet(f"Hoja{index + 1}")
+        worksheet.append(list(repeated.columns))
+        for row in repeated.itertuples(index=False):
+            worksheet.append([value.item() if hasattr(value, "item") else value for value in row])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000, help="Filas por hoja del libro sintético")
+    parser.add_argument("--sheets", type=int, default=4, help="Hojas del libro sintético")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    book = (PROJECT_ROOT / "Book1.xlsx").read_bytes()
+    print(f"Motor de read_any: {EXCEL_ENGINE}\n")
+
+    print(f"Book1.xlsx ({len(book) / 1024:.0f} KB)")
+    measure("pd.read_excel", lambda: pd.read_excel(io.BytesIO(book)), args.repeat)
+    measure("read_any", lambda: read_any(uploaded(book, "Book1.xlsx")), args.repeat)
+
+    source = pd.read_excel(io.BytesIO(book))
+    data = synthetic_workbook(source, args.rows, args.sheets)
+    sheet_names = [f"Hoja{index + 1}" for index in range(args.sheets)]
+    print(f"\nSintético: {args.sheets} hojas x {args.rows:,} filas ({len(data) / 1024 ** 2:.1f} MB)")
+    baseline = measure(
+        "pd.read_excel (todas las hojas)",
+        lambda: pd.concat(pd.read_excel(io.BytesIO(data), sheet_name=None).values(), ignore_index=True),
+        args.repeat,
+    )
+    streaming = measure(
+        "read_any (todas las hojas)",
+        lambda: read_any(uploaded(data, "sintetico.xlsx"), sheets=sheet_names),
+        args.repeat,
+    )
+    print(f"\nAceleración: {baseline / streaming:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ para responder preguntas sobre datasets de proteínas. El agente puede:
 - Realizar búsquedas BLAST para encontrar secuencias similares
 - Consultar información de estructuras cristalográficas en PDB
 - Mantener el contexto de conversaciones
+- Separar el razonamiento de DeepSeek-R1 de la respuesta final
 
 Author: Juan Felipe Cardona
 Date: 2024
@@ -18,10 +19,13 @@ from typing import List, Dict, Optional
 from litellm import completion
 
 # Importaciones locales
-from tools import run_blast_search, fetch_pdb_data
+from tools import search_blast, fetch_pdb_metadata
+from tool_compactor import compact_tool_result, estimate_tokens
 from context_builder import build_messages
+from reasoning import split_reasoning, generation_max_tokens
 from logger import app_logger, log_agent_response, log_error
 from config import MODEL_CONFIG
+from resilience import resilient_call, CircuitOpenError
 
 
 class ProteinAnalysisAgent:
@@ -35,6 +39,8 @@ class ProteinAnalysisAgent:
     Attributes:
         api_key (str): Clave de API para autenticación con el servicio LLM
         model_name (str): Nombre del modelo de lenguaje a utilizar
+        last_reasoning (str): Razonamiento del modelo en la última respuesta
+                              (no se guarda en el historial)
     """
 
     def __init__(self, api_key: Optional[str] = None):
@@ -51,6 +57,7 @@ class ProteinAnalysisAgent:
         # Obtener la API key de los parámetros o variables de entorno
         self.api_key = api_key or os.getenv(MODEL_CONFIG["api_key_env"])
         self.model_name = MODEL_CONFIG["model_name"]
+        self.last_reasoning = ""
 
         # Validar que la API key esté disponible
         if not self.api_key:
@@ -69,18 +76,24 @@ class ProteinAnalysisAgent:
         1. Primera llamada: El LLM decide si necesita usar herramientas
         2. Segunda llamada (si aplica): Procesa los resultados de las herramientas
 
+        El razonamiento del modelo se separa de la respuesta: solo la respuesta se
+        devuelve (y por tanto se guarda en el historial), mientras que el
+        razonamiento queda disponible en ``self.last_reasoning``.
+
         Args:
             context (str): Contexto del análisis exploratorio de datos (EDA)
             user_question (str): Pregunta actual del usuario
             chat_history (List[Dict], optional): Historial de mensajes anteriores
 
         Returns:
-            str: Respuesta generada por el agente
+            str: Respuesta generada por el agente, sin el razonamiento
 
         Raises:
             Exception: Si ocurre un error durante la generación de la respuesta
         """
         chat_history = chat_history or []
+        self.last_reasoning = ""
+        max_tokens = generation_max_tokens(MODEL_CONFIG)
 
         # ============================================================
         # PASO 1: Definir herramientas bioinformáticas disponibles
@@ -145,17 +158,23 @@ class ProteinAnalysisAgent:
             # ============================================================
             # PASO 3: Primera llamada al LLM - Decisión de uso de herramientas
             # ============================================================
-            response = completion(
+            response = resilient_call(
+                "llm",
+                completion,
                 model=self.model_name,
                 messages=messages,
                 tools=tools,
                 tool_choice="auto",
                 api_key=self.api_key,
-                max_tokens=MODEL_CONFIG.get("max_tokens", 4000),
-                temperature=MODEL_CONFIG.get("temperature", 0.1)
+                max_tokens=max_tokens,
+                temperature=MODEL_CONFIG.get("temperature", 0.1),
+                timeout=MODEL_CONFIG.get("request_timeout")
             )
 
             response_message = response.choices[0].message
+            answer, reasoning = split_reasoning(
+                response_message.content, getattr(response_message, "reasoning_content", None)
+            )
 
             # ============================================================
             # PASO 4: Ejecutar herramientas si el LLM las solicita
@@ -170,36 +189,25 @@ class ProteinAnalysisAgent:
                 app_logger.info(f"Agent using tool: {function_name} with args: {function_args}")
                 tools_used.append(function_name)
 
+                # El razonamiento de la primera llamada no se reenvía al modelo
+                response_message.content = answer or None
+                if isinstance(getattr(response_message, "reasoning_content", None), str):
+                    response_message.reasoning_content = None
+
                 try:
                     # Ejecutar la herramienta apropiada según el tipo
                     if function_name == "run_blast_search":
                         # Búsqueda de secuencias similares en NCBI
-                        tool_result = run_blast_search(
+                        tool_result = search_blast(
                             sequence=function_args.get("sequence"),
                             top_n=function_args.get("top_n", 3)
                         )
-                        # Añadir el mensaje de la herramienta al contexto
-                        messages.append(response_message)
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": function_name,
-                            "content": tool_result
-                        })
 
                     elif function_name == "fetch_pdb_data":
                         # Obtener metadatos de estructura cristalográfica
-                        tool_result = fetch_pdb_data(
+                        tool_result = fetch_pdb_metadata(
                             pdb_id=function_args.get("pdb_id")
                         )
-                        # Añadir el mensaje de la herramienta al contexto
-                        messages.append(response_message)
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": function_name,
-                            "content": tool_result
-                        })
 
                     else:
                         # Herramienta desconocida - registrar error
@@ -207,21 +215,47 @@ class ProteinAnalysisAgent:
                         app_logger.error(error_msg)
                         return error_msg
 
+                    # Compactar el resultado a su presupuesto de tokens antes de reenviarlo
+                    tool_content = compact_tool_result(function_name, tool_result)
+                    app_logger.debug(
+                        f"Tool result for {function_name} compacted to ~{estimate_tokens(tool_content)} tokens"
+                    )
+
+                    # Añadir el mensaje de la herramienta al contexto
+                    messages.append(response_message)
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "name": function_name,
+                        "content": tool_content
+                    })
+
                     # ============================================================
                     # PASO 5: Segunda llamada al LLM - Procesar resultado de herramienta
                     # ============================================================
-                    final_response = completion(
+                    final_response = resilient_call(
+                        "llm",
+                        completion,
                         model=self.model_name,
                         messages=messages,
                         api_key=self.api_key,
-                        max_tokens=MODEL_CONFIG.get("max_tokens", 4000),
-                        temperature=MODEL_CONFIG.get("temperature", 0.1)
+                        max_tokens=max_tokens,
+                        temperature=MODEL_CONFIG.get("temperature", 0.1),
+                        timeout=MODEL_CONFIG.get("request_timeout")
+                    )
+                    final_message = final_response.choices[0].message
+                    final_content, final_reasoning = split_reasoning(
+                        final_message.content, getattr(final_message, "reasoning_content", None)
                     )
-                    final_content = final_response.choices[0].message.content
+                    self.last_reasoning = "\n\n".join(r for r in (reasoning, final_reasoning) if r)
 
                     # Registrar la respuesta para analytics
                     log_agent_response(user_question, len(final_content), tools_used)
-                    return final_content
+                    return final_content or self._empty_answer_message()
+
+                except CircuitOpenError as open_error:
+                    log_error(open_error, "agent_chat_llm_circuit_open")
+                    return self._unavailable_message(open_error)
 
                 except Exception as tool_error:
                     # Manejo de errores en la ejecución de herramientas
@@ -232,11 +266,87 @@ class ProteinAnalysisAgent:
             # PASO 6: Respuesta directa (sin herramientas)
             # ============================================================
             # Si el LLM no solicitó herramientas, devolver su respuesta directa
-            final_content = response_message.content
-            log_agent_response(user_question, len(final_content), tools_used)
-            return final_content
+            self.last_reasoning = reasoning
+            log_agent_response(user_question, len(answer), tools_used)
+            return answer or self._empty_answer_message()
+
+        except CircuitOpenError as open_error:
+            # El proveedor del LLM está marcado como caído: fallar rápido sin esperar
+            log_error(open_error, "agent_chat_llm_circuit_open")
+            return self._unavailable_message(open_error)
 
         except Exception as e:
             # Manejo de errores generales en el chat
             log_error(e, "agent_chat")
             return "Ocurrió un error al procesar la solicitud con el agente. Por favor, intente nuevamente."
+
+    def _empty_answer_message(self) -> str:
+        """
+        Mensaje para respuestas vacías.
+
+        Ocurre cuando el modelo agota el presupuesto de tokens razonando y no llega a
+        emitir la respuesta final.
+        """
+        app_logger.warning(
+            f"Empty answer after reasoning ({len(self.last_reasoning)} chars); "
+            f"reasoning budget: {MODEL_CONFIG.get('reasoning_budget_tokens')} tokens"
+        )
+        return (
+            "El modelo agotó su presupuesto de razonamiento antes de responder. "
+            "Intenta reformular la pregunta de forma más concreta."
+        )
+
+    @staticmethod
+    def _unavailable_message(error: CircuitOpenError) -> str:
+        """Mensaje para cuando el circuit breaker del LLM está abierto."""
+        return (
+            "El servicio del modelo de lenguaje no está disponible temporalmente. "
+            f"Intenta nuevamente en unos {max(error.retry_in, 1):.0f} segundos."
+        )
+
+    def phrase_facts(self, user_question: str, facts: str) -> str:
+        """
+        Redacta con el LLM una respuesta a partir de cifras ya calculadas.
+
+        Se usa con las respuestas deterministas del fast path: el modelo solo da
+        forma al texto, sin calcular ni añadir datos. Si la llamada falla se
+        devuelven las cifras tal cual.
+
+        Args:
+            user_question (str): Pregunta original del usuario
+            facts (str): Respuesta calculada a partir del dataset
+
+        Returns:
+            str: Respuesta redactada, o ``facts`` si no fue posible redactarla
+        """
+        self.last_reasoning = ""
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "Eres un experto en análisis de datos de proteínas. Redacta una respuesta clara "
+                    "a la pregunta del usuario usando EXCLUSIVAMENTE los datos proporcionados. "
+                    "No cambies, redondees de otra forma ni inventes cifras."
+                ),
+            },
+            {"role": "user", "content": f"Pregunta: {user_question}\n\nDatos calculados:\n{facts}"},
+        ]
+        try:
+            response = resilient_call(
+                "llm",
+                completion,
+                model=self.model_name,
+                messages=messages,
+                api_key=self.api_key,
+                max_tokens=generation_max_tokens(MODEL_CONFIG),
+                temperature=MODEL_CONFIG.get("temperature", 0.1),
+                timeout=MODEL_CONFIG.get("request_timeout")
+            )
+            message = response.choices[0].message
+            answer, self.last_reasoning = split_reasoning(
+                message.content, getattr(message, "reasoning_content", None)
+            )
+            return answer or facts
+        except Exception as e:
+            log_error(e, "agent_phrase_facts")
+            return facts
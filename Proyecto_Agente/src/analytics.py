@@ -9,6 +9,9 @@ from datetime import datetime, timedelta
 import json
 from pathlib import Path
 
+from dataset_profile import get_profile
+from resilience import get_resilience_metrics
+
 class AnalyticsTracker:
     """Rastrea y analiza el uso de la aplicación"""
     
@@ -79,10 +82,33 @@ class AnalyticsTracker:
         
         return stats
 
+def display_service_health():
+    """Muestra el estado de los circuit breakers y reintentos de los servicios externos"""
+    metrics = get_resilience_metrics()
+    state_labels = {"closed": "🟢 Operativo", "half_open": "🟡 En prueba", "open": "🔴 Caído"}
+    rows = [
+        {
+            "Servicio": name,
+            "Estado": state_labels.get(m["state"], m["state"]),
+            "Llamadas": m["calls"],
+            "Reintentos": m["retries"],
+            "Fallos": m["failures"],
+            "Cortocircuitos": m["short_circuits"],
+            "Rechazos (ocupado)": m["busy_rejections"],
+            "Hedges": m["hedges"],
+            "p95 (s)": round(m["p95_latency_s"], 2) if m["p95_latency_s"] is not None else None,
+        }
+        for name, m in metrics.items()
+    ]
+    st.markdown("#### 🩺 Salud de Servicios Externos")
+    st.dataframe(pd.DataFrame(rows), hide_index=True, width="stretch")
+
 def create_usage_dashboard():
     """Crea un dashboard de uso de la aplicación"""
     tracker = AnalyticsTracker()
     stats = tracker.get_usage_stats()
+
+    display_service_health()
     
     if not stats:
         st.info("No hay datos de uso disponibles aún.")
@@ -104,7 +130,7 @@ def create_usage_dashboard():
             names=list(stats["event_types"].keys()),
             title="Distribución de Tipos de Eventos"
         )
-        st.plotly_chart(fig_events, use_container_width=True)
+        st.plotly_chart(fig_events, width="stretch")
     
     # Gráfico de uso diario
     if stats["daily_usage"]:
@@ -121,7 +147,7 @@ def create_usage_dashboard():
             title="Uso Diario de la Aplicación",
             markers=True
         )
-        st.plotly_chart(fig_daily, use_container_width=True)
+        st.plotly_chart(fig_daily, width="stretch")
 
 def get_dataset_insights(df: pd.DataFrame) -> dict:
     """
@@ -137,21 +163,23 @@ def get_dataset_insights(df: pd.DataFrame) -> dict:
         return {}
     
     insights = {}
+    # Todos los agregados salen del perfil compartido (una pasada, memoizado por huella)
+    profile = get_profile(df)
+    length = profile.length
     
     # Insights básicos
     insights["basic"] = {
-        "total_sequences": len(df),
-        "avg_length": df['len'].mean() if 'len' in df.columns else None,
+        "total_sequences": profile.rows,
+        "avg_length": length.get("mean"),
         "length_range": {
-            "min": df['len'].min() if 'len' in df.columns else None,
-            "max": df['len'].max() if 'len' in df.columns else None
+            "min": length.get("min"),
+            "max": length.get("max")
         }
     }
     
     # Insights de estructura secundaria
     if 'sst3' in df.columns:
-        all_structures = ''.join(df['sst3'])
-        structure_counts = pd.Series(list(all_structures)).value_counts()
+        structure_counts = profile.q3_counts()
         insights["secondary_structure"] = {
             "most_common": structure_counts.index[0] if len(structure_counts) > 0 else None,
             "distribution": structure_counts.to_dict()
@@ -159,17 +187,15 @@ def get_dataset_insights(df: pd.DataFrame) -> dict:
     
     # Insights de calidad
     if 'has_nonstd_aa' in df.columns:
-        nonstd_pct = (df['has_nonstd_aa'].sum() / len(df)) * 100
+        aggregates = profile.aggregates
         insights["quality"] = {
-            "nonstd_aa_percentage": nonstd_pct,
-            "high_quality_sequences": len(df[~df['has_nonstd_aa']]) if 'has_nonstd_aa' in df.columns else None
+            "nonstd_aa_percentage": aggregates.nonstd_true / profile.rows * 100,
+            "high_quality_sequences": aggregates.nonstd_valid - aggregates.nonstd_true
         }
     
     # Insights de longitud
     if 'len' in df.columns:
-        length_categories = pd.cut(df['len'], bins=[0, 100, 300, 500, float('inf')], 
-                                 labels=['Corta (<100)', 'Media (100-300)', 'Larga (300-500)', 'Muy Larga (>500)'])
-        insights["length_categories"] = length_categories.value_counts().to_dict()
+        insights["length_categories"] = profile.length_categories()
     
     return insights
 
@@ -1,19 +1,23 @@
 import streamlit as st
 import pandas as pd
+import copy
 import os
 import time
-from io import StringIO
 import sys
-from io_utils import read_any
-from eda import (
-    validate_eda, plot_length_distribution, plot_q3_distribution, plot_nonstd_aa_pie,
-    plot_resolution_distribution, plot_rfactor_distribution, plot_experimental_methods, plot_length_vs_resolution
-)
+from io_utils import read_any, read_many, read_local_dataset, list_excel_sheets, format_bytes
+from dataset_cache import dataset_fingerprint, read_any_cached, read_many_cached, read_path_cached
+from out_of_core import needs_out_of_core, open_out_of_core, open_out_of_core_path
+from eda import validate_eda
+from eda_executor import FigureTask, render_figures
 from report import generate_report, generate_pdf_report
 from mail import send_email
 from agent import ProteinAnalysisAgent
 from analytics import analytics_tracker, display_insights_panel, create_usage_dashboard
-from config import APP_CONFIG, MESSAGES, REQUIRED_COLUMNS
+from config import APP_CONFIG, MESSAGES, REQUIRED_COLUMNS, MODEL_CONFIG, SUGGESTED_QUESTIONS, FAST_PATH_CONFIG
+from fast_answers import fast_path_answer
+from incremental import append_rows
+from dataset_profile import LENGTH_CATEGORIES, get_profile
+from prefetch import start_pdb_prefetch, extract_pdb_ids
 from logger import app_logger, log_user_interaction
 from dotenv import load_dotenv
 import uuid
@@ -41,6 +45,9 @@ def initialize_state():
         "agent": None, 
         "eda_context": "", 
         "report_pdf": None,
+        "fast_stats": None,
+        "ooc": None,
+        "appended": None,
         "session_id": str(uuid.uuid4())
     }
     for key, value in defaults.items():
@@ -48,7 +55,14 @@ def initialize_state():
             st.session_state[key] = value
 
 initialize_state()
-            
+
+
+def dataset_rows() -> int:
+    """Filas del dataset completo (en modo fuera de memoria, no solo las de la muestra)."""
+    if st.session_state.ooc is not None:
+        return st.session_state.ooc.rows
+    return st.session_state.df.shape[0]
+
 # ---- Sidebar: Panel de proyecto ----
 st.sidebar.markdown("# 🔬 Agente de Análisis")
 st.sidebar.markdown("### 👨‍💻 Información del Proyecto")
@@ -70,6 +84,11 @@ with st.sidebar.expander("📚 Más información"):
         - **Modelo LLM:** `deepseek-ai/DeepSeek-R1` (vía Hugging Face).
     """)
 email_to = st.sidebar.text_input("Enviar resultados a (opcional)", max_chars=254)
+show_reasoning = st.sidebar.checkbox(
+    "🧠 Mostrar razonamiento del modelo",
+    value=MODEL_CONFIG.get("show_reasoning", False),
+    help="Muestra, en un panel colapsado, el razonamiento de DeepSeek-R1. No se reenvía al modelo."
+)
 
 st.sidebar.markdown("---")
 
@@ -109,6 +128,11 @@ with st.expander("Ver requisitos del formato y descargar plantilla"):
     - `len`: La longitud de la secuencia (numérico).
     - `has_nonstd_aa`: Un valor booleano (`True`/`False`) que indica si la secuencia contiene aminoácidos no estándar.
 
+    También se aceptan archivos FASTA, sin conversión previa: con un FASTA de estructura secundaria de RCSB
+    (`ss.txt`, registros `>ID:CADENA:sequence` y `>ID:CADENA:secstr`) se generan todas las columnas; con un
+    FASTA de secuencias solo `seq`, `len` y `has_nonstd_aa`. Los CSV y FASTA pueden subirse comprimidos
+    (`.gz`, `.bz2`, `.zst`).
+
     **La forma más fácil de empezar es usar nuestro archivo de ejemplo como plantilla.**
     """)
     if os.path.exists(EXAMPLE_FILE_PATH):
@@ -120,18 +144,74 @@ data_options = ["Subir un archivo", "Usar datos de ejemplo"]
 data_choice = st.radio("Selecciona la fuente de datos:", data_options)
 
 if data_choice == "Subir un archivo":
-    file = st.file_uploader(
-        "Sube un .csv, .xls o .xlsx",
-        type=["csv", "xls", "xlsx"],
-        accept_multiple_files=False
+    files = st.file_uploader(
+        "Sube un .csv, .xls, .xlsx o FASTA (.fasta, .fa, .faa; CSV y FASTA también en .gz, .bz2 o .zst)",
+        type=["csv", "xls", "xlsx", "fasta", "fa", "faa", "gz", "bz2", "zst"],
+        accept_multiple_files=True,
+        help="Puedes subir varios archivos de un mismo dataset (ej. fragmentos de un CSV): se leen en paralelo "
+             "y se combinan, unificando los nombres de columnas sin distinguir mayúsculas/minúsculas. "
+             f"Las subidas están limitadas a {st.get_option('server.maxUploadSize')} MB por archivo "
+             "(server.maxUploadSize) y se reciben enteras en memoria; los CSV de varios GB se procesan "
+             "fuera de memoria desde una ruta local."
     )
-    if file:
+    file_names = ", ".join(f.name for f in files or [])
+    if files:
+        file = files[0]
         try:
-            st.session_state.df = read_any(file)
+            if len(files) > 1:
+                # Varios fragmentos: lectura en paralelo y combinación en memoria
+                if any(needs_out_of_core(f.name, f.size) for f in files):
+                    raise ValueError(
+                        "Los archivos de más de 25 MB deben subirse de uno en uno (se procesan fuera de memoria)."
+                    )
+                st.session_state.ooc = None
+                with st.spinner(f"Leyendo {len(files)} archivos en paralelo..."):
+                    st.session_state.df = read_many_cached(files, loader=read_many)
+            elif needs_out_of_core(file.name, file.size):
+                # Archivo grande: agregados incrementales + volcado a disco + muestra en memoria
+                with st.spinner("Procesando el archivo por bloques (modo fuera de memoria)..."):
+                    st.session_state.ooc = open_out_of_core(file)
+                st.session_state.df = st.session_state.ooc.sample
+            else:
+                st.session_state.ooc = None
+                selected_sheets = None
+                if file.name.lower().endswith((".xls", ".xlsx")):
+                    sheet_names = list_excel_sheets(file)
+                    if len(sheet_names) > 1:
+                        selected_sheets = st.multiselect(
+                            "Hojas a cargar (se combinan si tienen las mismas columnas):",
+                            sheet_names,
+                            default=sheet_names[:1]
+                        ) or sheet_names[:1]
+                st.session_state.df = read_any_cached(file, loader=read_any, sheets=selected_sheets)
             if st.session_state.df is not None:
-                st.success(f"Dataset cargado: {st.session_state.df.shape[0]} filas x {st.session_state.df.shape[1]} columnas")
+                st.success(f"Dataset cargado: {dataset_rows():,} filas x {st.session_state.df.shape[1]} columnas")
+                if st.session_state.ooc is not None:
+                    st.caption(
+                        f"🗄️ Modo fuera de memoria: estadísticas exactas sobre {st.session_state.ooc.rows:,} filas; "
+                        f"los gráficos usan una muestra aleatoria de {len(st.session_state.df):,} filas"
+                    )
+                ingest_report = st.session_state.df.attrs.get("ingest_report")
+                if ingest_report:
+                    st.caption(
+                        f"💾 Memoria: {format_bytes(ingest_report['memory_before'])} con tipos por defecto → "
+                        f"{format_bytes(ingest_report['memory_after'])} con tipos compactos "
+                        f"({ingest_report['chunks']} bloque(s))"
+                    )
+                if st.session_state.df.attrs.get("dataset_cache") in ("memory", "disk"):
+                    st.caption("⚡ Dataset recuperado de la caché columnar (sin volver a parsear el archivo)")
+                elif st.session_state.df.attrs.get("file_timings"):
+                    timings = st.session_state.df.attrs["file_timings"]
+                    with st.expander(
+                        f"⏱️ {len(timings)} archivos combinados en {st.session_state.df.attrs['ingest_seconds']:.2f} s"
+                    ):
+                        st.dataframe(pd.DataFrame([
+                            {"Archivo": t["name"], "Tamaño": format_bytes(t["bytes"]), "Filas": t["rows"],
+                             "Lectura (s)": round(t["seconds"], 3)}
+                            for t in timings
+                        ]), hide_index=True)
                 analytics_tracker.track_event("dataset_loaded", {
-                    "filename": file.name,
+                    "filename": file_names,
                     "rows": st.session_state.df.shape[0],
                     "columns": st.session_state.df.shape[1]
                 })
@@ -142,20 +222,27 @@ if data_choice == "Subir un archivo":
         except Exception as e:
             st.session_state.df = None
             st.error("Ocurrió un error inesperado al procesar el archivo. Por favor, verifique el formato y vuelva a intentarlo.")
-            app_logger.error(f"Error inesperado al cargar archivo {file.name}: {str(e)}")
+            app_logger.error(f"Error inesperado al cargar archivo(s) {file_names}: {str(e)}")
     else:
         # Clear dataframe if no file is uploaded in this mode
         st.session_state.df = None
+        st.session_state.ooc = None
 else:  # "Usar datos de ejemplo"
     if os.path.exists(EXAMPLE_FILE_PATH):
         st.info(
             f"Se cargará el dataset de ejemplo '{EXAMPLE_FILENAME}'. Puedes encontrar este archivo en el repositorio del proyecto."
         )
         try:
-            st.session_state.df = pd.read_csv(EXAMPLE_FILE_PATH)
+            if needs_out_of_core(EXAMPLE_FILE_PATH, os.path.getsize(EXAMPLE_FILE_PATH)):
+                with st.spinner("Procesando el dataset de ejemplo por bloques (modo fuera de memoria)..."):
+                    st.session_state.ooc = open_out_of_core_path(EXAMPLE_FILE_PATH)
+                st.session_state.df = st.session_state.ooc.sample
+            else:
+                st.session_state.ooc = None
+                st.session_state.df = read_path_cached(EXAMPLE_FILE_PATH, loader=read_local_dataset)
             if st.session_state.df is not None:
                 st.success(
-                    f"Dataset de ejemplo cargado: {st.session_state.df.shape[0]} filas x {st.session_state.df.shape[1]} columnas"
+                    f"Dataset de ejemplo cargado: {dataset_rows():,} filas x {st.session_state.df.shape[1]} columnas"
                 )
         except pd.errors.ParserError:
             st.error("Error al procesar el archivo de ejemplo: El formato no es válido o está corrupto.")
@@ -167,6 +254,24 @@ else:  # "Usar datos de ejemplo"
         st.error(f"No se encontró el archivo de ejemplo. Se esperaba en: {EXAMPLE_FILE_PATH}")
         st.session_state.df = None
 
+# ---- Cadenas añadidas al dataset (se conservan entre reruns) ----
+if st.session_state.appended is not None:
+    if st.session_state.df is not None and dataset_fingerprint(st.session_state.df) == st.session_state.appended["base"]:
+        st.session_state.df = st.session_state.appended["df"]
+    else:
+        # Se cargó otro dataset: las filas añadidas pertenecían al anterior
+        st.session_state.appended = None
+
+# ---- Precarga de metadatos PDB en segundo plano ----
+if st.session_state.df is not None:
+    # IDs mencionados en el chat, del más reciente al más antiguo
+    recent_pdb_ids = [
+        pdb_id
+        for m in reversed(st.session_state.messages)
+        for pdb_id in extract_pdb_ids(m.get("content", ""))
+    ]
+    start_pdb_prefetch(st.session_state.df, recent_ids=recent_pdb_ids)
+
 # ---- Reglas de habilitación ----
 agent_ready = st.session_state.agent is not None
 ready = st.session_state.df is not None and agent_ready
@@ -178,7 +283,7 @@ with st.container(border=True):
     # Estado del Dataset
     if st.session_state.df is not None:
         col1.success("✅ Dataset Cargado", icon="📁")
-        col1.caption(f"{st.session_state.df.shape[0]:,} filas × {st.session_state.df.shape[1]} columnas")
+        col1.caption(f"{dataset_rows():,} filas × {st.session_state.df.shape[1]} columnas")
     else:
         col1.warning("⏳ Dataset Pendiente", icon="📁")
         col1.caption("Esperando archivo...")
@@ -202,6 +307,376 @@ with st.container(border=True):
 if not agent_ready:
     st.warning("La API Key de Hugging Face no está configurada. Para habilitar el agente, define la variable de entorno `HUGGING_FACE_API_KEY` en tu sistema o en un archivo `.env`.")
 
+# ---- Paneles de resultados ----
+# Cada panel es un fragmento: sus widgets (mensaje del chat, filtro del dashboard...) solo
+# vuelven a ejecutar el panel, no el resto de la app. Además, solo se ejecuta el panel
+# seleccionado en la navegación (las pestañas de st.tabs ejecutaban todos en cada rerun).
+
+@st.fragment
+def chat_panel(show_reasoning: bool):
+    """Chat con el agente; un mensaje solo vuelve a ejecutar este panel."""
+    st.subheader("💬 Conversa con el Agente")
+    for m in st.session_state.messages:
+        with st.chat_message(m['role']):
+            st.markdown(m['content'])
+            if show_reasoning and m.get('reasoning'):
+                with st.expander("🧠 Razonamiento del modelo", expanded=False):
+                    st.markdown(m['reasoning'])
+
+    prompt = None
+    chat_disabled = not st.session_state.ran or not st.session_state.agent
+
+    if not chat_disabled:
+        with st.expander("💡 Sugerencias de preguntas", expanded=True):
+            st.markdown("**📊 Análisis de Datos:**")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("📈 Resumen del dataset", width="stretch"):
+                    prompt = SUGGESTED_QUESTIONS["dataset_summary"]
+                if st.button("🔍 Secuencias más largas", width="stretch"):
+                    prompt = SUGGESTED_QUESTIONS["longest_sequences"]
+            with col2:
+                if st.button("📏 Análisis de longitudes", width="stretch"):
+                    prompt = SUGGESTED_QUESTIONS["length_distribution"]
+                if st.button("🧬 Estructuras secundarias", width="stretch"):
+                    prompt = SUGGESTED_QUESTIONS["secondary_structure"]
+            
+            st.markdown("**🔬 Herramientas Bioinformáticas:**")
+            col3, col4 = st.columns(2)
+            with col3:
+                if st.button("🧪 BLAST de primera secuencia", width="stretch"):
+                    prompt = "Toma la primera secuencia del dataset y búscala en BLAST para encontrar proteínas similares."
+                if st.button("📚 Información PDB 2HHB", width="stretch"):
+                    prompt = "Busca información detallada del PDB ID '2HHB' (hemoglobina humana)."
+            with col4:
+                if st.button("🔬 BLAST secuencia más larga", width="stretch"):
+                    prompt = "Identifica la secuencia más larga del dataset y búscala en BLAST."
+                if st.button("📊 Comparar con PDB 1A3N", width="stretch"):
+                    prompt = "Busca información del PDB ID '1A3N' y compárala con nuestro dataset."
+
+    if chat_input := st.chat_input("O escribe tu propia pregunta...", max_chars=1000, disabled=chat_disabled):
+        prompt = chat_input
+
+    if prompt:
+        st.session_state.messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        with st.chat_message("assistant"):
+            with st.spinner("Pensando..."):
+                chat_history = st.session_state.messages[:-1]
+                if st.session_state.fast_stats is None and st.session_state.eda_ok:
+                    st.session_state.fast_stats = (
+                        st.session_state.ooc.fast_stats() if st.session_state.ooc is not None
+                        else get_profile(st.session_state.df).fast_stats(st.session_state.df)
+                    )
+                # Fast path: preguntas con respuesta exacta en el dataset no requieren al LLM
+                fast_reply = fast_path_answer(prompt, st.session_state.fast_stats)
+                if fast_reply is not None:
+                    log_user_interaction("fast_path_answer", {"question": prompt[:100]})
+                    if FAST_PATH_CONFIG.get("llm_wording", False):
+                        assistant_reply = st.session_state.agent.phrase_facts(prompt, fast_reply)
+                        reasoning = st.session_state.agent.last_reasoning
+                    else:
+                        assistant_reply, reasoning = fast_reply, ""
+                else:
+                    assistant_reply = st.session_state.agent.chat(
+                        context=st.session_state.eda_context, user_question=prompt, chat_history=chat_history
+                    )
+                    reasoning = st.session_state.agent.last_reasoning
+                st.markdown(assistant_reply)
+                if show_reasoning and reasoning:
+                    with st.expander("🧠 Razonamiento del modelo", expanded=False):
+                        st.markdown(reasoning)
+                # Solo 'content' se reenvía al modelo; 'reasoning' es únicamente para la UI
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": assistant_reply, "reasoning": reasoning}
+                )
+
+
+@st.fragment
+def dashboard_panel():
+    """Dashboard filtrable; mover el filtro solo vuelve a ejecutar este panel."""
+    if st.session_state.eda_ok:
+        df = st.session_state.df
+        st.subheader("📊 Dashboard Interactivo de Insights")
+        st.markdown("Utiliza los filtros para explorar subconjuntos de datos. Los gráficos y métricas se actualizarán automáticamente.")
+
+        # Índice por longitud (se construye una vez por dataset): el filtro no copia filas
+        profile = get_profile(df)
+        length_index = profile.length_index(df)
+        # En modo fuera de memoria df es la muestra: las métricas salen de los agregados exactos
+        ooc = st.session_state.ooc
+        length = ooc.length_summary() if ooc is not None else profile.length
+
+        with st.container(border=True):
+            st.markdown("#### ⚙️ Filtros Interactivos")
+            min_len, max_len = int(length['min']), int(length['max'])
+            # El estado de un widget se pierde cuando su panel no se dibuja: el rango se
+            # guarda aparte para conservar el filtro al volver al dashboard
+            low, high = st.session_state.get("len_range", (min_len, max_len))
+            low, high = max(min_len, min(low, max_len)), min(max_len, max(high, min_len))
+            selected_len_range = st.slider("Filtrar por longitud de secuencia:", min_value=min_len, max_value=max_len, value=(low, high))
+            st.session_state.len_range = selected_len_range
+
+        low, high = selected_len_range
+        summary = length_index.summary(low, high)
+        if ooc is not None:
+            totals = ooc.length_range_summary(low, high)
+            total_rows, nonstd_ratio = ooc.rows, ooc.nonstd_ratio
+        else:
+            totals = summary
+            total_rows, nonstd_ratio = profile.rows, profile.aggregates.nonstd_true / profile.rows
+        st.info(f"Mostrando **{totals['rows']:,}** de **{total_rows:,}** secuencias según los filtros aplicados.")
+        if ooc is not None:
+            st.caption(
+                f"🗄️ Modo fuera de memoria: las métricas son exactas sobre el dataset completo; los gráficos y "
+                f"tablas usan la muestra aleatoria ({summary['rows']:,} de sus {profile.rows:,} filas en el rango)."
+            )
+
+        if totals["rows"]:
+            filtered = totals["rows"] != total_rows
+            nonstd_ratio_filtered = (totals["nonstd"] or 0) / totals["rows"]
+            # Métricas principales
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric(
+                "📊 Secuencias", 
+                f"{totals['rows']:,}",
+                delta=f"{totals['rows'] - total_rows:,}" if filtered else None
+            )
+            col2.metric(
+                "📏 Longitud Promedio", 
+                f"{totals['mean']:.0f} AA",
+                delta=f"{totals['mean'] - length['mean']:.0f}" if filtered else None
+            )
+            col3.metric(
+                "🧪 AA No Estándar", 
+                f"{nonstd_ratio_filtered:.1%}",
+                delta=f"{nonstd_ratio_filtered - nonstd_ratio:.1%}" if filtered else None
+            )
+            col4.metric(
+                "🔬 Rango Longitud", 
+                f"{totals['min']}-{totals['max']}"
+            )
+
+        if summary["rows"]:
+            filtered = summary["rows"] != profile.rows
+
+            # Figuras del dashboard: se consultan en la caché por (gráfico, dataset, rango, estilo)
+            # y las que faltan se calculan y dibujan en paralelo (eda_executor). Las que ya
+            # tienen sus datos agregados solo reciben los conteos; el resto, las columnas que
+            # usan de las filas del rango.
+            fingerprint = profile.fingerprint
+            params = {"len": [low, high]} if filtered else None
+            rows = length_index.positions(low, high) if filtered else None
+
+            def task(name, plot, args=None, columns=None, **kwargs):
+                return FigureTask(name, plot, args=args, rows=rows if args is None else None,
+                                  params=params, kwargs=kwargs, columns=columns)
+
+            tasks = [
+                task("length_distribution", "plot_length_counts", length_index.length_counts(low, high)),
+                task("q3_distribution", "plot_q3_counts",
+                     (summary["q3_counts"] if filtered else profile.q3_counts(),)),
+                task("nonstd_aa_pie", "plot_nonstd_counts",
+                     (length_index.nonstd_counts(low, high) if filtered else profile.nonstd_counts(),)),
+            ]
+            if profile.has_q8:
+                # Comparación Q8/Q3 por bytes (una vez por dataset); se muestra sobre el dataset completo
+                consistency = profile.consistency(df)
+                tasks += [
+                    FigureTask("q8_distribution", "plot_q8_counts", args=(profile.q8_counts(),)),
+                    FigureTask("q8_q3_consistency", "plot_consistency_matrix",
+                               args=(consistency.matrix(normalize=True),)),
+                ]
+            if profile.has_column("sst3"):
+                # Segmentos run-length de toda la columna (una vez por dataset): el filtro solo los selecciona
+                segments = profile.segments(df, "sst3")
+                if filtered:
+                    segments = segments.subset(rows)
+                tasks += [task("segment_lengths", "plot_segment_length_counts", (segments,)),
+                          task("segments_per_chain", "plot_segment_chain_counts", (segments,))]
+            if 'resolution' in df.columns:
+                tasks.append(task("resolution_distribution", "plot_resolution_distribution", columns=["resolution"]))
+            if 'R-factor' in df.columns:
+                tasks.append(task("rfactor_distribution", "plot_rfactor_distribution", columns=["R-factor"]))
+            if 'Exptl.' in df.columns:
+                tasks.append(
+                    task("experimental_methods", "plot_experimental_methods", columns=["Exptl."]) if filtered
+                    else task("experimental_methods", "plot_method_counts", (profile.method_counts,))
+                )
+            if 'len' in df.columns and 'resolution' in df.columns:
+                tasks.append(task("length_vs_resolution", "plot_length_vs_resolution", columns=["len", "resolution"]))
+            if profile.has_sequences:
+                # Matriz de composición por cadena (una vez por dataset): el filtro solo suma sus filas
+                composition = profile.composition(df)
+                tasks += [task("aa_composition", "plot_composition_frequencies", (composition.frequencies(rows),)),
+                          task("composition_by_length", "plot_composition_table",
+                               (composition.by_length_bucket(LENGTH_CATEGORIES, rows),))]
+
+            figures = {result.name: result for result in render_figures(df, tasks, fingerprint)}
+
+            def show(name):
+                result = figures[name]
+                if result.ok:
+                    st.image(result.image, width="stretch")
+                else:
+                    st.error(f"No se pudo generar el gráfico: {result.error}")
+
+            st.markdown("#### Distribución de la Longitud de las Secuencias")
+            show("length_distribution")
+
+            col_viz1, col_viz2 = st.columns(2)
+            with col_viz1:
+                st.markdown("#### Frecuencia de Estructuras (Q3)")
+                show("q3_distribution")
+            with col_viz2:
+                st.markdown("#### Proporción de Aminoácidos No Estándar")
+                show("nonstd_aa_pie")
+
+            if profile.has_q8:
+                scope = "dataset completo" if ooc is None else "muestra aleatoria"
+                st.markdown(f"#### Estructura Q8 y Consistencia con Q3 ({scope})")
+                col_q8a, col_q8b, col_q8c = st.columns(3)
+                col_q8a.metric("✅ Residuos consistentes", f"{consistency.agreement:.2%}")
+                col_q8b.metric("⚠️ Cadenas con discrepancias", f"{int((consistency.mismatches > 0).sum()):,}")
+                col_q8c.metric("📐 Longitudes distintas", f"{int(consistency.length_mismatch.sum()):,}")
+                col_q8_1, col_q8_2 = st.columns(2)
+                with col_q8_1:
+                    show("q8_distribution")
+                with col_q8_2:
+                    show("q8_q3_consistency")
+                if consistency.flagged().any():
+                    with st.expander("Ver cadenas inconsistentes"):
+                        st.dataframe(consistency.flagged_chains(df, limit=500), hide_index=True)
+
+            if profile.has_column("sst3"):
+                st.markdown("#### Segmentos de Estructura Secundaria")
+                st.dataframe(segments.length_stats().round(2), width="stretch")
+                col_seg1, col_seg2 = st.columns(2)
+                with col_seg1:
+                    show("segment_lengths")
+                with col_seg2:
+                    show("segments_per_chain")
+
+            st.markdown("---")
+            st.markdown("### Análisis de Calidad Estructural")
+            if 'resolution' in df.columns:
+                st.markdown("#### Distribución de Resoluciones")
+                show("resolution_distribution")
+            if 'R-factor' in df.columns:
+                st.markdown("#### Distribución del R-factor")
+                show("rfactor_distribution")
+            if 'Exptl.' in df.columns:
+                st.markdown("#### Métodos Experimentales")
+                show("experimental_methods")
+            if 'len' in df.columns and 'resolution' in df.columns:
+                st.markdown("#### Longitud vs. Resolución")
+                show("length_vs_resolution")
+
+            if profile.has_sequences:
+                st.markdown("---")
+                st.markdown("### Composición de Aminoácidos")
+                show("aa_composition")
+                st.markdown("#### Composición por Categoría de Longitud")
+                show("composition_by_length")
+        elif totals["rows"]:
+            st.warning("La muestra aleatoria no tiene filas en este rango: no hay gráficos que mostrar.")
+        else:
+            st.warning("No hay datos que mostrar con los filtros seleccionados.")
+    else:
+        st.warning("Dashboard no disponible: faltan columnas mínimas para el análisis.")
+
+
+@st.fragment
+def eda_panel():
+    """Vista previa, detalles estadísticos y carga de cadenas nuevas del dataset."""
+    if st.session_state.eda_ok:
+        df = st.session_state.df
+        st.subheader("📄 Exploración Detallada de Datos (EDA)")
+        st.markdown("Aquí puedes inspeccionar la estructura y los valores del dataset. Por defecto se muestra una vista previa de las primeras 20 filas.")
+        
+        st.dataframe(df.head(20))
+
+        # El dataset completo solo se envía al navegador si se pide (un expander lo enviaría siempre)
+        if st.toggle("Ver dataset completo", key="show_full_dataset"):
+            st.dataframe(df)
+
+        with st.expander("Ver detalles estadísticos"):
+            profile = get_profile(df)
+            st.markdown(f"**Dimensiones:** {profile.rows} filas x {profile.columns} columnas")
+            st.markdown("**Resumen de valores nulos por columna**")
+            st.write(profile.null_counts.to_frame("nulos"))
+            st.markdown("**Estadísticas descriptivas de columnas numéricas**")
+            st.write(profile.describe.T)
+
+        if st.session_state.ooc is None:
+            with st.expander("➕ Añadir cadenas al dataset"):
+                st.markdown(
+                    "Sube un archivo con cadenas nuevas (mismas columnas que el dataset). Las estadísticas y el "
+                    "contexto del agente se actualizan solo con las filas añadidas; los gráficos y el reporte "
+                    "se vuelven a generar."
+                )
+                appended = st.session_state.appended
+                if appended is not None:
+                    st.success(
+                        f"Se añadieron {appended['added']:,} cadenas en total. Último lote: "
+                        f"{appended['last_rows']:,} filas; gráficos con datos nuevos: "
+                        f"{', '.join(sorted(appended['affected'])) or 'ninguno'}"
+                    )
+                new_file = st.file_uploader(
+                    "Archivo con las cadenas nuevas",
+                    type=["csv", "xls", "xlsx", "fasta", "fa", "faa", "gz", "bz2", "zst"],
+                    key="append_file"
+                )
+                if new_file is not None and st.button("Añadir al dataset", key="append_button"):
+                    try:
+                        new_rows = read_any(new_file)
+                        # Copia de los agregados del perfil actual: append_rows los actualiza en el sitio
+                        aggregates = copy.deepcopy(get_profile(df).aggregates)
+                        combined, affected = append_rows(df, new_rows, aggregates)
+                        profile = get_profile(combined, aggregates)
+                        st.session_state.appended = {
+                            "base": appended["base"] if appended is not None else dataset_fingerprint(df),
+                            "df": combined,
+                            "added": (appended["added"] if appended is not None else 0) + len(new_rows),
+                            "last_rows": len(new_rows),
+                            "affected": affected,
+                        }
+                        st.session_state.df = combined
+                        st.session_state.eda_ok = validate_eda(combined)
+                        st.session_state.fast_stats = profile.fast_stats(combined)
+                        st.session_state.eda_context = profile.eda_context(combined)
+                        # El reporte incluye el resumen, los nulos y las estadísticas del dataset
+                        st.session_state.report_pdf = None
+                        analytics_tracker.track_event("dataset_appended", {
+                            "filename": new_file.name,
+                            "rows": len(new_rows),
+                            "affected": sorted(affected)
+                        })
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(str(e))
+                        app_logger.warning(f"Error al añadir cadenas al dataset: {e}")
+                    except Exception as e:
+                        st.error("Ocurrió un error inesperado al añadir las cadenas. Por favor, verifique el formato y vuelva a intentarlo.")
+                        app_logger.error(f"Error inesperado al añadir cadenas desde {new_file.name}: {e}")
+    else:
+        st.warning("Exploración no disponible: faltan columnas mínimas {'seq','sst3','sst8','len','has_nonstd_aa'}")
+
+
+@st.fragment
+def insights_panel():
+    """Insights automáticos y, bajo demanda, las analíticas de uso."""
+    if st.session_state.eda_ok:
+        display_insights_panel(st.session_state.df)
+        
+        if st.toggle("📈 Ver analytics de uso", key="show_usage_dashboard"):
+            create_usage_dashboard()
+    else:
+        st.warning("Insights no disponibles: faltan columnas mínimas para el análisis.")
+
+
 # ---- Flujo Principal de la App ----
 
 # 1. Vista de Configuración (si el análisis no se ha ejecutado)
@@ -219,7 +694,7 @@ if not st.session_state.ran:
         disabled=not ready, 
         type="primary", 
         help="Procesa el dataset, genera estadísticas y activa el agente de IA",
-        use_container_width=True
+        width="stretch"
     )
     if start and ready:
         with st.spinner("Procesando dataset y preparando el agente..."):
@@ -227,12 +702,16 @@ if not st.session_state.ran:
             st.session_state.eda_ok = validate_eda(df)
             
             # Generar contexto de EDA para el agente
-            if st.session_state.eda_ok:
-                buffer = StringIO()
-                df.info(buf=buffer)
-                info_str = buffer.getvalue()
-                desc_str = df.describe().to_string()
-                st.session_state.eda_context = f"Resumen del Dataset:\n{info_str}\n\nEstadísticas Descriptivas:\n{desc_str}"
+            if st.session_state.eda_ok and st.session_state.ooc is not None:
+                # Modo fuera de memoria: contexto y estadísticas exactas a partir de los agregados
+                st.session_state.eda_context = st.session_state.ooc.eda_context()
+                st.session_state.fast_stats = st.session_state.ooc.fast_stats()
+            elif st.session_state.eda_ok:
+                # Perfil del dataset (una pasada): lo reutilizan el EDA, los insights, el reporte y el dashboard
+                profile = get_profile(df)
+                st.session_state.eda_context = profile.eda_context(df)
+                # Estadísticas para responder las preguntas sugeridas sin llamar al LLM
+                st.session_state.fast_stats = profile.fast_stats(df)
 
             # --- Mensaje de bienvenida del agente ---
             if st.session_state.agent and st.session_state.eda_ok:
@@ -254,163 +733,17 @@ if not st.session_state.ran:
 
 # 2. Vista de Resultados (si el análisis ya se ejecutó)
 else:
-    # ---- Tabs: Chat, Dashboard y EDA ----
-    tab_chat, tab_dashboard, tab_eda, tab_insights = st.tabs([
-        "💬 Chat con Agente", 
-        "📊 Dashboard de Insights", 
-        "📄 Exploración de Datos (EDA)",
-        "🔍 Insights Automáticos"
-    ])
-
-    with tab_chat:
-        st.subheader("💬 Conversa con el Agente")
-        for m in st.session_state.messages:
-            with st.chat_message(m['role']):
-                st.markdown(m['content'])
-
-        prompt = None
-        chat_disabled = not st.session_state.ran or not st.session_state.agent
-
-        if not chat_disabled:
-            with st.expander("💡 Sugerencias de preguntas", expanded=True):
-                st.markdown("**📊 Análisis de Datos:**")
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("📈 Resumen del dataset", use_container_width=True):
-                        prompt = "Resume las características principales del dataset incluyendo estadísticas clave."
-                    if st.button("🔍 Secuencias más largas", use_container_width=True):
-                        prompt = "¿Cuáles son las 5 secuencias más largas del dataset y qué características tienen?"
-                with col2:
-                    if st.button("📏 Análisis de longitudes", use_container_width=True):
-                        prompt = "Analiza la distribución de longitudes: promedio, mediana, y valores atípicos."
-                    if st.button("🧬 Estructuras secundarias", use_container_width=True):
-                        prompt = "¿Qué tipo de estructura secundaria es más común en el dataset?"
-                
-                st.markdown("**🔬 Herramientas Bioinformáticas:**")
-                col3, col4 = st.columns(2)
-                with col3:
-                    if st.button("🧪 BLAST de primera secuencia", use_container_width=True):
-                        prompt = "Toma la primera secuencia del dataset y búscala en BLAST para encontrar proteínas similares."
-                    if st.button("📚 Información PDB 2HHB", use_container_width=True):
-                        prompt = "Busca información detallada del PDB ID '2HHB' (hemoglobina humana)."
-                with col4:
-                    if st.button("🔬 BLAST secuencia más larga", use_container_width=True):
-                        prompt = "Identifica la secuencia más larga del dataset y búscala en BLAST."
-                    if st.button("📊 Comparar con PDB 1A3N", use_container_width=True):
-                        prompt = "Busca información del PDB ID '1A3N' y compárala con nuestro dataset."
-
-        if chat_input := st.chat_input("O escribe tu propia pregunta...", max_chars=1000, disabled=chat_disabled):
-            prompt = chat_input
-
-        if prompt:
-            st.session_state.messages.append({"role": "user", "content": prompt})
-            with st.chat_message("user"):
-                st.markdown(prompt)
-
-            with st.chat_message("assistant"):
-                with st.spinner("Pensando..."):
-                    chat_history = st.session_state.messages[:-1]
-                    assistant_reply = st.session_state.agent.chat(
-                        context=st.session_state.eda_context, user_question=prompt, chat_history=chat_history
-                    )
-                    st.markdown(assistant_reply)
-                    st.session_state.messages.append({"role": "assistant", "content": assistant_reply})
-
-    with tab_dashboard:
-        if st.session_state.eda_ok:
-            df = st.session_state.df
-            st.subheader("📊 Dashboard Interactivo de Insights")
-            st.markdown("Utiliza los filtros para explorar subconjuntos de datos. Los gráficos y métricas se actualizarán automáticamente.")
-
-            with st.container(border=True):
-                st.markdown("#### ⚙️ Filtros Interactivos")
-                min_len, max_len = int(df['len'].min()), int(df['len'].max())
-                selected_len_range = st.slider("Filtrar por longitud de secuencia:", min_value=min_len, max_value=max_len, value=(min_len, max_len))
-
-            df_filtered = df[(df['len'] >= selected_len_range[0]) & (df['len'] <= selected_len_range[1])]
-            st.info(f"Mostrando **{len(df_filtered):,}** de **{len(df):,}** secuencias según los filtros aplicados.")
-
-            if not df_filtered.empty:
-                # Métricas principales
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric(
-                    "📊 Secuencias", 
-                    f"{df_filtered.shape[0]:,}",
-                    delta=f"{df_filtered.shape[0] - len(df):,}" if df_filtered.shape[0] != len(df) else None
-                )
-                col2.metric(
-                    "📏 Longitud Promedio", 
-                    f"{df_filtered['len'].mean():.0f} AA",
-                    delta=f"{df_filtered['len'].mean() - df['len'].mean():.0f}" if df_filtered.shape[0] != len(df) else None
-                )
-                col3.metric(
-                    "🧪 AA No Estándar", 
-                    f"{df_filtered['has_nonstd_aa'].sum() / len(df_filtered):.1%}",
-                    delta=f"{(df_filtered['has_nonstd_aa'].sum() / len(df_filtered)) - (df['has_nonstd_aa'].sum() / len(df)):.1%}" if df_filtered.shape[0] != len(df) else None
-                )
-                col4.metric(
-                    "🔬 Rango Longitud", 
-                    f"{df_filtered['len'].min()}-{df_filtered['len'].max()}"
-                )
-
-                st.markdown("#### Distribución de la Longitud de las Secuencias")
-                st.pyplot(plot_length_distribution(df_filtered))
-
-                col_viz1, col_viz2 = st.columns(2)
-                with col_viz1:
-                    st.markdown("#### Frecuencia de Estructuras (Q3)")
-                    st.pyplot(plot_q3_distribution(df_filtered))
-                with col_viz2:
-                    st.markdown("#### Proporción de Aminoácidos No Estándar")
-                    st.pyplot(plot_nonstd_aa_pie(df_filtered))
-                
-                st.markdown("---")
-                st.markdown("### Análisis de Calidad Estructural")
-                if 'resolution' in df_filtered.columns:
-                    st.markdown("#### Distribución de Resoluciones")
-                    st.pyplot(plot_resolution_distribution(df_filtered))
-                if 'R-factor' in df_filtered.columns:
-                    st.markdown("#### Distribución del R-factor")
-                    st.pyplot(plot_rfactor_distribution(df_filtered))
-                if 'Exptl.' in df_filtered.columns:
-                    st.markdown("#### Métodos Experimentales")
-                    st.pyplot(plot_experimental_methods(df_filtered))
-                if 'len' in df_filtered.columns and 'resolution' in df_filtered.columns:
-                    st.markdown("#### Longitud vs. Resolución")
-                    st.pyplot(plot_length_vs_resolution(df_filtered))
-            else:
-                st.warning("No hay datos que mostrar con los filtros seleccionados.")
-        else:
-            st.warning("Dashboard no disponible: faltan columnas mínimas para el análisis.")
-
-    with tab_eda:
-        if st.session_state.eda_ok:
-            df = st.session_state.df
-            st.subheader("📄 Exploración Detallada de Datos (EDA)")
-            st.markdown("Aquí puedes inspeccionar la estructura y los valores del dataset. Por defecto se muestra una vista previa de las primeras 20 filas.")
-            
-            st.dataframe(df.head(20))
-
-            with st.expander("Ver dataset completo"):
-                st.dataframe(df)
-
-            with st.expander("Ver detalles estadísticos"):
-                st.markdown(f"**Dimensiones:** {df.shape[0]} filas x {df.shape[1]} columnas")
-                st.markdown("**Resumen de valores nulos por columna**")
-                st.write(df.isna().sum().to_frame("nulos"))
-                st.markdown("**Estadísticas descriptivas de columnas numéricas**")
-                st.write(df.select_dtypes("number").describe().T)
-        else:
-            st.warning("Exploración no disponible: faltan columnas mínimas {'seq','sst3','sst8','len','has_nonstd_aa'}")
-    
-    with tab_insights:
-        if st.session_state.eda_ok:
-            display_insights_panel(st.session_state.df)
-            
-            with st.expander("📈 Analytics de Uso", expanded=False):
-                create_usage_dashboard()
-        else:
-            st.warning("Insights no disponibles: faltan columnas mínimas para el análisis.")
+    # ---- Navegación: Chat, Dashboard, EDA e Insights (solo se calcula el panel visible) ----
+    panels = {
+        "💬 Chat con Agente": lambda: chat_panel(show_reasoning),
+        "📊 Dashboard de Insights": dashboard_panel,
+        "📄 Exploración de Datos (EDA)": eda_panel,
+        "🔍 Insights Automáticos": insights_panel,
+    }
+    active_panel = st.radio(
+        "Panel", list(panels), horizontal=True, key="active_panel", label_visibility="collapsed"
+    )
+    panels[active_panel]()
 
     st.markdown("## 📋 3. Obtén tus Resultados")
     st.markdown("Descarga o comparte un reporte completo con todos los análisis realizados.")
@@ -418,7 +751,9 @@ else:
     # Generar el PDF solo una vez y guardarlo en caché en el estado de la sesión para mejorar el rendimiento
     if st.session_state.report_pdf is None:
         with st.spinner("Generando reporte PDF por primera vez..."):
-            st.session_state.report_pdf = generate_pdf_report(st.session_state.eda_ok, st.session_state.df)
+            st.session_state.report_pdf = generate_pdf_report(
+                st.session_state.eda_ok, st.session_state.df, st.session_state.ooc
+            )
     report_content_pdf = st.session_state.report_pdf
 
     col1, col2, col3 = st.columns([2, 2, 1])
@@ -429,10 +764,10 @@ else:
             file_name=f"reporte_proteinas_{pd.Timestamp.now().strftime('%Y%m%d_%H%M')}.pdf", 
             mime="application/pdf", 
             help="Descarga un informe completo en formato PDF con todos los análisis y gráficos.",
-            use_container_width=True
+            width="stretch"
         )
     with col2:
-        if st.button("📧 Enviar por Email", use_container_width=True):
+        if st.button("📧 Enviar por Email", width="stretch"):
             if not email_to:
                 st.warning("Por favor, introduce una dirección de correo en el panel de la izquierda.")
             else:
@@ -443,7 +778,7 @@ else:
                     Adjunto encontrarás el reporte de análisis de proteínas generado por el Agente de Análisis Inteligente.
                     
                     📊 Resumen del análisis:
-                    - Dataset: {st.session_state.df.shape[0]:,} secuencias
+                    - Dataset: {dataset_rows():,} secuencias
                     - Fecha: {pd.Timestamp.now().strftime('%d/%m/%Y %H:%M')}
                     - Herramientas: EDA + IA Conversacional
                     
@@ -463,6 +798,6 @@ else:
                     else:
                         st.error(message)
     with col3:
-        if st.button("🔄", help="Regenerar reporte", use_container_width=True):
+        if st.button("🔄", help="Regenerar reporte", width="stretch"):
             st.session_state.report_pdf = None
             st.rerun()
@@ -0,0 +1,178 @@
+"""
+Composición de aminoácidos por cadena y en todo el dataset.
+
+``utils.validate_protein_sequence`` calcula la composición de una sola secuencia
+con 20 llamadas a ``str.count``; no había nada equivalente para el dataset.
+``AminoAcidComposition`` guarda la matriz ``N x 21`` de conteos por cadena (los 20
+aminoácidos estándar y una columna 'Otros' con el resto de residuos), calculada en
+una pasada sobre los bytes empaquetados de 'seq' (``packed.PackedSequences``).
+
+A partir de la matriz, sin volver a recorrer las secuencias:
+
+- composición global del dataset (porcentaje de residuos) y media por cadena
+- composición de cualquier subconjunto de filas (ej. un rango de longitudes)
+- comparación por categorías de longitud
+- resumen en texto para el contexto del agente
+
+La matriz se memoiza con el perfil del dataset (``DatasetProfile.composition``).
+
+Example:
+    >>> composition = AminoAcidComposition.from_frame(df)
+    >>> composition.frequencies().head(3)
+    >>> composition.by_length_bucket(LENGTH_CATEGORIES)
+"""
+
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from packed import packed_column
+from residue_counts import STANDARD_AMINO_ACIDS
+
+
+# Columnas de la matriz: aminoácidos estándar y el resto de residuos
+OTHER_RESIDUES = "Otros"
+COMPOSITION_COLUMNS = list(STANDARD_AMINO_ACIDS) + [OTHER_RESIDUES]
+
+
+class AminoAcidComposition:
+    """
+    Conteos de aminoácidos por cadena.
+
+    Attributes:
+        counts (np.ndarray): Matriz (n, 21) int32: una fila por cadena, una columna por
+            aminoácido estándar y 'Otros' (no estándar u otros caracteres)
+        lengths (np.ndarray): Residuos de cada cadena (0 para secuencias nulas)
+    """
+
+    def __init__(self, counts: np.ndarray, lengths: np.ndarray):
+        self.counts = counts
+        self.lengths = lengths
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "AminoAcidComposition":
+        """
+        Calcula la matriz de composición de la columna 'seq' (sin distinguir mayúsculas en el nombre).
+
+        Args:
+            df (pd.DataFrame): Dataset con columna 'seq'
+
+        Returns:
+            AminoAcidComposition: Composición por cadena
+
+        Raises:
+            KeyError: Si el dataset no tiene columna 'seq'
+        """
+        column = next((col for col in df.columns if str(col).lower() == "seq"), None)
+        if column is None:
+            raise KeyError("El dataset no tiene columna 'seq'")
+        packed = packed_column(df, column)
+        lengths = packed.lengths()
+        standard = packed.composition_matrix(STANDARD_AMINO_ACIDS)
+        counts = np.empty((len(lengths), len(COMPOSITION_COLUMNS)), dtype=np.int32)
+        counts[:, :-1] = standard
+        counts[:, -1] = lengths - standard.sum(axis=1)
+        return cls(counts, lengths)
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    # ---- Composición global ----
+
+    def totals(self, rows: Optional[np.ndarray] = None) -> pd.Series:
+        """
+        Residuos de cada aminoácido en el dataset o en un subconjunto de filas.
+
+        Args:
+            rows (np.ndarray, opcional): Posiciones de las filas (ej. ``LengthIndex.positions``)
+
+        Returns:
+            pd.Series: Conteo por aminoácido, en el orden de ``COMPOSITION_COLUMNS``
+        """
+        counts = self.counts if rows is None else self.counts[rows]
+        return pd.Series(counts.sum(axis=0, dtype=np.int64), index=COMPOSITION_COLUMNS)
+
+    def frequencies(self, rows: Optional[np.ndarray] = None) -> pd.Series:
+        """Porcentaje de residuos de cada aminoácido, de mayor a menor."""
+        totals = self.totals(rows)
+        total = totals.sum()
+        percentages = totals * 100.0 / total if total else totals.astype(np.float64)
+        return percentages.sort_values(ascending=False, kind="stable")
+
+    def mean_chain_fractions(self) -> pd.Series:
+        """Porcentaje medio de cada aminoácido por cadena (cada cadena pesa lo mismo)."""
+        valid = self.lengths > 0
+        if not valid.any():
+            return pd.Series(0.0, index=COMPOSITION_COLUMNS)
+        fractions = self.counts[valid] / self.lengths[valid, None]
+        return pd.Series(fractions.mean(axis=0) * 100.0, index=COMPOSITION_COLUMNS)
+
+    # ---- Comparaciones ----
+
+    def by_length_bucket(self, categories: Sequence[Tuple[str, int, Optional[int]]],
+                         rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Composición (porcentaje de residuos) por categoría de longitud.
+
+        Args:
+            categories (Sequence[Tuple[str, int, Optional[int]]]): (etiqueta, mínimo
+                exclusivo, máximo inclusivo o None), como ``dataset_profile.LENGTH_CATEGORIES``
+            rows (np.ndarray, opcional): Posiciones de las filas a incluir
+
+        Returns:
+            pd.DataFrame: Una fila por categoría con cadenas (columna 'cadenas') y una
+            columna por aminoácido; las categorías sin cadenas se omiten
+        """
+        labels = [label for label, _, _ in categories]
+        # Bordes derechos cerrados: longitud L pertenece a la primera categoría con L <= máximo
+        uppers = np.array([high if high is not None else np.inf for _, _, high in categories], dtype=np.float64)
+        lengths = self.lengths if rows is None else self.lengths[rows]
+        counts = self.counts if rows is None else self.counts[rows]
+        buckets = np.searchsorted(uppers, lengths, side="left")
+        valid = (lengths > 0) & (buckets < len(labels))
+        buckets = buckets[valid]
+        counts = counts[valid]
+
+        chains = np.bincount(buckets, minlength=len(labels))
+        sums = np.stack(
+            [np.bincount(buckets, weights=counts[:, k], minlength=len(labels)) for k in range(counts.shape[1])],
+            axis=1,
+        )
+        residues = sums.sum(axis=1, keepdims=True)
+        table = pd.DataFrame(
+            np.divide(sums * 100.0, residues, out=np.zeros_like(sums), where=residues > 0),
+            index=labels, columns=COMPOSITION_COLUMNS,
+        )
+        table.insert(0, "cadenas", chains)
+        return table[table["cadenas"] > 0]
+
+    def summary_text(self, categories: Optional[Iterable[Tuple[str, int, Optional[int]]]] = None,
+                     top: int = 5) -> str:
+        """
+        Resumen de la composición para el contexto del agente.
+
+        Args:
+            categories (Iterable, opcional): Categorías de longitud a comparar
+            top (int): Aminoácidos más y menos frecuentes a listar
+
+        Returns:
+            str: Texto con la composición global, extremos y diferencias por longitud
+        """
+        frequencies = self.frequencies()
+        standard = frequencies.drop(OTHER_RESIDUES)
+        lines = [
+            f"Composición de Aminoácidos ({int(self.lengths.sum()):,} residuos en {len(self):,} cadenas):",
+            "  " + ", ".join(f"{aa} {pct:.2f}%" for aa, pct in frequencies.items()),
+            f"  Más frecuentes: {', '.join(standard.index[:top])}; "
+            f"menos frecuentes: {', '.join(standard.index[::-1][:top])}",
+        ]
+        if categories is not None:
+            table = self.by_length_bucket(list(categories))
+            if len(table) > 1:
+                spread = table[list(STANDARD_AMINO_ACIDS)].max() - table[list(STANDARD_AMINO_ACIDS)].min()
+                lines.append("  Por categoría de longitud (% de residuos, aminoácidos con mayor variación):")
+                for label, row in table.iterrows():
+                    values = ", ".join(f"{aa} {row[aa]:.2f}%" for aa in spread.nlargest(top).index)
+                    lines.append(f"    {label} ({int(row['cadenas']):,} cadenas): {values}")
+        return "\n".join(lines)
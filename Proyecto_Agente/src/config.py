@@ -14,6 +14,42 @@ REPORTS_DIR = PROJECT_ROOT / "reports"
 EXAMPLE_FILENAME = "2018-06-06-pdb-intersect-pisces.csv"
 EXAMPLE_FILE_PATH = PROJECT_ROOT / EXAMPLE_FILENAME
 
+# Caché columnar de datasets (ver dataset_cache.py)
+# Los archivos se identifican por el hash de su contenido y se guardan en formato
+# Arrow IPC, que se lee con memory-map en cargas posteriores.
+DATASET_CACHE_CONFIG = {
+    "enabled": True,
+    "dir": DATA_DIR / "cache",
+    "max_disk_bytes": 2 * 1024 ** 3,
+    "max_memory_entries": 4
+}
+
+# Lector de CSV (ver io_utils.read_any). "pyarrow" usa el lector columnar multihilo
+# de Arrow y vuelve a pandas si no está instalado o si Arrow no puede leer el
+# archivo; "pandas" usa siempre el motor C de pandas por bloques.
+CSV_READER_CONFIG = {
+    "engine": "pyarrow",
+    "block_bytes": 4 * 1024 * 1024  # Bloque de texto procesado por cada hilo de Arrow
+}
+
+# Modo fuera de memoria (ver out_of_core.py) para CSV mayores que el límite en memoria.
+# El archivo se procesa por bloques: los agregados del EDA se calculan de forma
+# incremental, las filas se vuelcan a Parquet en disco y en memoria solo queda una
+# muestra aleatoria de tamaño fijo. Las subidas desde el navegador siguen limitadas por
+# server.maxUploadSize de Streamlit (200 MB por defecto) y se reciben enteras en memoria:
+# el límite de max_file_bytes solo se alcanza con archivos leídos desde una ruta local.
+OUT_OF_CORE_CONFIG = {
+    "enabled": True,
+    "max_file_bytes": 8 * 1024 ** 3,  # Límite duro (protección DoS)
+    "block_bytes": 16 * 1024 * 1024,  # Tamaño de bloque de lectura (acota también el tamaño de una fila)
+    "sample_rows": 50_000,
+    "max_columns": 256,
+    "max_tracked_length": 100_000,  # Longitudes mayores se agrupan en el último bin del histograma
+    "max_categories": 50,
+    "spill_dir": DATA_DIR / "spill",
+    "spill_ttl_seconds": 24 * 3600  # Volcados sin dataset vivo más antiguos que esto se borran
+}
+
 # Configuración de la aplicación
 APP_CONFIG = {
     "page_title": "🔬 Agente de Análisis de Proteínas",
@@ -27,7 +63,82 @@ MODEL_CONFIG = {
     "model_name": "huggingface/together/deepseek-ai/DeepSeek-R1",
     "api_key_env": "HUGGING_FACE_API_KEY",
     "max_tokens": 4000,
-    "temperature": 0.1
+    "temperature": 0.1,
+    # DeepSeek-R1 emite su razonamiento (<think>...</think>) antes de la respuesta.
+    # Ambos comparten el límite de generación, por lo que se acotan por separado:
+    # max_tokens efectivo = min(max_tokens, reasoning_budget_tokens + answer_max_tokens)
+    "reasoning_budget_tokens": 1024,
+    "answer_max_tokens": 1024,
+    # Mostrar el razonamiento en un panel colapsado de la interfaz
+    "show_reasoning": False,
+    # Tiempo máximo (segundos) de cada petición al proveedor del LLM
+    "request_timeout": 120
+}
+
+# Política de resiliencia por servicio externo (ver resilience.py)
+# - max_attempts/base_delay/max_delay: reintentos con backoff exponencial y jitter
+# - failure_threshold/reset_timeout: circuit breaker por endpoint
+# - hedge: petición duplicada tras el p95 de latencia (solo llamadas idempotentes)
+# - attempt_timeout: espera máxima por intento (None = sin límite adicional)
+# - retry_on_timeout: reintentar un intento que agotó attempt_timeout (su hilo sigue ocupado)
+# - max_workers: hilos propios del endpoint (None = pool compartido); con todos ocupados
+#   la llamada falla de inmediato en lugar de esperar
+RESILIENCE_CONFIG = {
+    "llm": {
+        "max_attempts": 3, "base_delay": 1.0, "max_delay": 8.0,
+        "failure_threshold": 3, "reset_timeout": 60.0, "hedge": False
+    },
+    "ncbi_blast": {
+        "max_attempts": 2, "base_delay": 5.0, "max_delay": 30.0,
+        "failure_threshold": 2, "reset_timeout": 300.0, "hedge": False,
+        "attempt_timeout": 300.0, "retry_on_timeout": False, "max_workers": 2
+    },
+    "rcsb_pdb": {
+        "max_attempts": 3, "base_delay": 0.5, "max_delay": 4.0,
+        "failure_threshold": 5, "reset_timeout": 30.0, "hedge": True,
+        "hedge_min_samples": 20
+    }
+}
+
+# Presupuesto de tokens (aprox.) de cada resultado de herramienta reenviado al LLM
+# (ver tool_compactor.py)
+TOOL_RESULT_BUDGETS = {
+    "run_blast_search": 400,
+    "fetch_pdb_data": 200,
+    "default": 300
+}
+
+# Caché en memoria de metadatos de RCSB PDB (compartida por todas las sesiones)
+PDB_CACHE_CONFIG = {
+    "max_entries": 2048,
+    "ttl_seconds": 6 * 3600
+}
+
+# Precarga en segundo plano de metadatos PDB al cargar un dataset con 'pdb_id'
+# (ver prefetch.py). Usa pocos hilos y cede el paso a las consultas interactivas.
+# - max_datasets: datasets con precarga activa a la vez (uno por huella, compartido entre sesiones)
+PREFETCH_CONFIG = {
+    "enabled": True,
+    "max_ids": 50,
+    "max_workers": 2,
+    "max_datasets": 4
+}
+
+# Preguntas sugeridas en la interfaz del chat (intención -> texto de la pregunta)
+SUGGESTED_QUESTIONS = {
+    "dataset_summary": "Resume las características principales del dataset incluyendo estadísticas clave.",
+    "longest_sequences": "¿Cuáles son las 5 secuencias más largas del dataset y qué características tienen?",
+    "length_distribution": "Analiza la distribución de longitudes: promedio, mediana, y valores atípicos.",
+    "secondary_structure": "¿Qué tipo de estructura secundaria es más común en el dataset?",
+}
+
+# Respuestas deterministas para preguntas calculables directamente del DataFrame
+# - enabled: responder sin LLM cuando se reconoce la intención
+# - llm_wording: usar el LLM solo para redactar las cifras ya calculadas
+FAST_PATH_CONFIG = {
+    "enabled": True,
+    "llm_wording": False,
+    "max_top_n": 20
 }
 
 # Columnas requeridas para el análisis
@@ -36,11 +147,39 @@ REQUIRED_COLUMNS = {
 }
 
 # Configuración de visualizaciones
+# - scatter_max_points: por encima, los diagramas de dispersión se dibujan como
+#   histograma 2D (densidad con escala logarítmica) en lugar de un punto por fila
+# - density_bins: bins por eje del histograma 2D
 VIZ_CONFIG = {
     "color_palette": "viridis",
     "figure_size": (10, 6),
     "dpi": 100,
-    "style": "whitegrid"
+    "style": "whitegrid",
+    "scatter_max_points": 20_000,
+    "density_bins": 80
+}
+
+# Caché de figuras renderizadas (ver figure_cache.py), compartida por el dashboard
+# y el reporte PDF de todas las sesiones. Expulsión LRU por tamaño total en bytes.
+FIGURE_CACHE_CONFIG = {
+    "enabled": True,
+    "max_bytes": 64 * 1024 ** 2,
+    "format": "png",
+    "dpi": 200
+}
+
+# Cálculo y renderizado de figuras del EDA en paralelo (ver eda_executor.py).
+# matplotlib no es thread-safe: se usan procesos. Los procesos no guardan el dataset:
+# cada figura pendiente envía sus datos ya calculados (conteos, segmentos...) o una
+# copia de solo las columnas y filas que usa, así que la memoria extra es la de esas
+# columnas por figura en curso, más el intérprete de cada proceso (pandas y matplotlib).
+# Con un solo núcleo o pocas figuras pendientes se dibuja en serie.
+EDA_EXECUTOR_CONFIG = {
+    "enabled": True,
+    "max_workers": 4,          # se limita al número de núcleos disponibles
+    "min_tasks": 2,            # figuras pendientes mínimas para usar el pool
+    "start_method": "spawn",   # 'fork' no es seguro con los hilos de Streamlit
+    "task_timeout": 300        # segundos por figura
 }
 
 # Configuración de email
@@ -11,6 +11,8 @@ Date: 2024
 
 from typing import List, Dict, Optional
 
+from reasoning import strip_reasoning
+
 
 def build_messages(
     eda_context: str,
@@ -22,7 +24,7 @@ def build_messages(
 
     Este protocolo asegura que el agente siempre reciba:
     1. Un rol del sistema claro (system prompt)
-    2. El historial completo de la conversación
+    2. El historial de la conversación (solo respuestas, sin razonamiento)
     3. El contexto del EDA actual
     4. La pregunta del usuario
 
@@ -65,7 +67,8 @@ def build_messages(
         "ESTILO DE RESPUESTA:\n"
         "- Responde de manera clara, concisa y fundamentada en los datos o en los resultados de las herramientas.\n"
         "- Mantén la memoria de la conversación para responder preguntas de seguimiento.\n"
-        "- Usa terminología científica apropiada pero accesible."
+        "- Usa terminología científica apropiada pero accesible.\n"
+        "- Razona de forma breve y directa antes de responder; no repitas el contexto en tu razonamiento."
     )
 
     # ============================================================
@@ -76,8 +79,13 @@ def build_messages(
     # ============================================================
     # PASO 2: Añadir historial de conversación
     # ============================================================
-    # Esto permite al agente mantener contexto de intercambios anteriores
-    messages.extend(chat_history)
+    # Esto permite al agente mantener contexto de intercambios anteriores.
+    # Solo se reenvían rol y respuesta final: el razonamiento de turnos previos
+    # (y cualquier campo auxiliar de la UI) no vuelve a entrar en el prompt.
+    messages.extend(
+        {"role": message["role"], "content": strip_reasoning(message.get("content"))}
+        for message in chat_history
+    )
 
     # ============================================================
     # PASO 3: Construir el mensaje del usuario con contexto EDA
@@ -0,0 +1,279 @@
+"""
+Caché columnar de datasets identificada por el hash del contenido.
+
+Cada rerun de Streamlit volvía a parsear el CSV/Excel (o el archivo de ejemplo)
+desde cero. Este módulo calcula el SHA-256 del contenido del archivo y:
+1. Si el dataset ya está en memoria en este proceso, lo reutiliza (compartido
+   entre sesiones).
+2. Si existe una copia columnar en disco (Arrow IPC), la abre con memory-map, sin
+   volver a parsear el texto. Las columnas numéricas y de texto Arrow del DataFrame
+   apuntan a las páginas mapeadas (sin copia); solo se materializan las que pandas
+   no puede representar sobre el buffer de Arrow (ej. booleanos o categorías).
+3. Si no, lo lee con el lector indicado y guarda la copia columnar para las
+   siguientes cargas.
+
+Los límites de la carga (``io_utils.validate_uploads``) se comprueban antes de
+calcular el hash, para no leer archivos que luego se rechazarían.
+
+El hash también sirve como huella (fingerprint) del dataset y se guarda en
+``df.attrs['fingerprint']``. Los DataFrames devueltos se comparten entre sesiones y
+deben tratarse como de solo lectura.
+
+Requiere ``pyarrow`` para la caché en disco; sin él solo se usa la caché en memoria.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from config import DATASET_CACHE_CONFIG
+from logger import app_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pa_ipc = None
+
+
+# Cambiar la versión invalida las copias en disco (ej. si cambia la optimización de tipos)
+CACHE_FORMAT_VERSION = "1"
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+_MEMORY_CACHE: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_PATH_HASHES: Dict[Tuple[str, int, int], str] = {}
+_LOCK = threading.Lock()
+
+
+def content_hash(file) -> str:
+    """
+    Calcula el SHA-256 del contenido de un archivo sin cargarlo entero en memoria.
+
+    Args:
+        file: Objeto file-like binario; su posición se restaura al terminar
+
+    Returns:
+        str: Hash hexadecimal (incluye la versión del formato de caché)
+    """
+    digest = hashlib.sha256(CACHE_FORMAT_VERSION.encode())
+    position = file.tell()
+    file.seek(0)
+    for block in iter(lambda: file.read(_HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    file.seek(position)
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Huella estable de un DataFrame.
+
+    Usa el hash de contenido asignado al cargarlo; si no existe (DataFrames
+    construidos en memoria), lo calcula a partir de los valores y lo guarda.
+    """
+    fingerprint = df.attrs.get("fingerprint")
+    if fingerprint is None:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        digest = hashlib.sha256(row_hashes.tobytes())
+        digest.update(",".join(map(str, df.columns)).encode())
+        fingerprint = digest.hexdigest()
+        df.attrs["fingerprint"] = fingerprint
+    return fingerprint
+
+
+def _cache_dir() -> Path:
+    cache_dir = Path(DATASET_CACHE_CONFIG["dir"])
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def _remember(key: str, df: pd.DataFrame) -> None:
+    with _LOCK:
+        _MEMORY_CACHE[key] = df
+        _MEMORY_CACHE.move_to_end(key)
+        while len(_MEMORY_CACHE) > DATASET_CACHE_CONFIG.get("max_memory_entries", 4):
+            _MEMORY_CACHE.popitem(last=False)
+
+
+def _share(df: pd.DataFrame, key: str, source: str) -> pd.DataFrame:
+    """Copia superficial (comparte los datos) con los metadatos de la carga."""
+    shared = df.copy(deep=False)
+    shared.attrs = {**df.attrs, "fingerprint": key, "dataset_cache": source}
+    return shared
+
+
+def _write_columnar(df: pd.DataFrame, path: Path) -> None:
+    """Guarda el DataFrame en Arrow IPC sin comprimir (apto para memory-map)."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = path.with_suffix(".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    _evict_disk_cache()
+
+
+def _read_columnar(path: Path) -> pd.DataFrame:
+    """
+    Abre una copia Arrow IPC con memory-map y la convierte a pandas sin copiar los datos.
+
+    ``split_blocks`` deja cada columna en su propio bloque: las numéricas sin nulos
+    quedan como vistas (de solo lectura) del buffer mapeado en lugar de copiarse a un
+    bloque consolidado, y el texto Arrow ('string[pyarrow]') conserva sus buffers.
+    """
+    with pa.memory_map(str(path), "r") as source:
+        table = pa_ipc.open_file(source).read_all()
+    # La tabla sigue referenciada por las columnas: no se libera mientras se convierte
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def _evict_disk_cache() -> None:
+    """Elimina las copias más antiguas si la caché en disco supera su tamaño máximo."""
+    files = sorted(_cache_dir().glob("*.arrow"), key=lambda f: f.stat().st_mtime)
+    total = sum(f.stat().st_size for f in files)
+    while files and total > DATASET_CACHE_CONFIG.get("max_disk_bytes", 2 * 1024 ** 3):
+        oldest = files.pop(0)
+        total -= oldest.stat().st_size
+        oldest.unlink(missing_ok=True)
+
+
+def load_with_cache(
+    file, loader: Callable, key: Optional[str] = None, variant: str = ""
+) -> Optional[pd.DataFrame]:
+    """
+    Carga un dataset usando la caché en memoria/disco y, si falla, el lector indicado.
+
+    Args:
+        file: Objeto file-like binario con el contenido del dataset
+        loader (Callable): Función que lee ``file`` y devuelve un DataFrame (ej. read_any)
+        key (str, optional): Hash del contenido si ya se conoce
+        variant (str): Opciones de lectura que cambian el resultado (ej. hojas de Excel)
+
+    Returns:
+        pd.DataFrame: Dataset (solo lectura), o None si el lector devuelve None
+    """
+    if file is None:
+        return None
+    if not DATASET_CACHE_CONFIG.get("enabled", True):
+        return loader(file)
+
+    key = key or content_hash(file)
+    if variant:
+        key = hashlib.sha256(f"{key}:{variant}".encode()).hexdigest()
+    with _LOCK:
+        cached = _MEMORY_CACHE.get(key)
+        if cached is not None:
+            _MEMORY_CACHE.move_to_end(key)
+    if cached is not None:
+        return _share(cached, key, "memory")
+
+    path = _cache_dir() / f"{key}.arrow" if pa is not None else None
+    if path is not None and path.exists():
+        try:
+            df = _read_columnar(path)
+            os.utime(path)
+            _remember(key, df)
+            return _share(df, key, "disk")
+        except Exception as e:
+            app_logger.warning(f"Copia columnar inválida en caché ({path.name}): {e}")
+            path.unlink(missing_ok=True)
+
+    df = loader(file)
+    if df is None:
+        return None
+    df.attrs["fingerprint"] = key
+    if path is not None:
+        try:
+            _write_columnar(df, path)
+        except Exception as e:
+            # La caché es una optimización: un fallo al escribir no impide la carga
+            app_logger.warning(f"No se pudo guardar la copia columnar del dataset: {e}")
+    _remember(key, df)
+    return _share(df, key, "miss")
+
+
+def read_any_cached(
+    file, loader: Optional[Callable] = None, sheets: Optional[Sequence[str]] = None
+) -> Optional[pd.DataFrame]:
+    """
+    ``read_any`` con caché columnar por hash de contenido.
+
+    Args:
+        file: Archivo subido (Streamlit UploadedFile u objeto file-like con 'name')
+        loader (Callable, optional): Lector a usar en caso de fallo de caché
+        sheets (Sequence[str], optional): Hojas de Excel a leer (forman parte de la clave)
+
+    Returns:
+        pd.DataFrame: Dataset cargado
+
+    Raises:
+        ValueError: Si el archivo no pasa las validaciones de la carga (antes de leerlo)
+    """
+    from io_utils import validate_uploads
+
+    if loader is None:
+        from io_utils import read_any as loader
+    if file is not None:
+        validate_uploads([file])
+    if not sheets:
+        return load_with_cache(file, loader)
+    return load_with_cache(
+        file, lambda f: loader(f, sheets=sheets), variant="sheets=" + "\x1f".join(sheets)
+    )
+
+
+def read_many_cached(files: Sequence, loader: Optional[Callable] = None) -> Optional[pd.DataFrame]:
+    """
+    ``read_many`` con caché columnar: la clave combina los hashes de los archivos en orden.
+
+    Args:
+        files (Sequence): Archivos subidos
+        loader (Callable, optional): Lector de la lista de archivos en caso de fallo de caché
+
+    Returns:
+        pd.DataFrame: Dataset combinado
+
+    Raises:
+        ValueError: Si la carga supera los límites de ``read_many`` (antes de leer los archivos)
+    """
+    from io_utils import validate_uploads
+
+    if loader is None:
+        from io_utils import read_many as loader
+    files = [file for file in files or [] if file is not None]
+    if not files:
+        return None
+    validate_uploads(files)
+    digest = hashlib.sha256(b"many")
+    for file in files:
+        digest.update(content_hash(file).encode())
+        digest.update(file.name.encode())
+    return load_with_cache(files, loader, key=digest.hexdigest())
+
+
+def read_path_cached(path, loader: Callable) -> pd.DataFrame:
+    """
+    Carga un archivo local con caché; el hash se memoriza por (ruta, tamaño, mtime)
+    para no releer el archivo en cada rerun.
+
+    Args:
+        path: Ruta del archivo
+        loader (Callable): Función que recibe la ruta y devuelve un DataFrame
+
+    Returns:
+        pd.DataFrame: Dataset cargado
+    """
+    stat = os.stat(path)
+    stat_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with open(path, "rb") as file:
+        key = _PATH_HASHES.get(stat_key)
+        if key is None:
+            key = content_hash(file)
+            _PATH_HASHES[stat_key] = key
+        return load_with_cache(file, lambda _file: loader(path), key=key)
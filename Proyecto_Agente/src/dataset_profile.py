@@ -0,0 +1,261 @@
+"""
+Perfil compartido del dataset: una pasada, memoizada por huella.
+
+Los gráficos del EDA, ``analytics.get_dataset_insights``,
+``utils.DataFrameValidator.get_data_quality_report``, los reportes de texto y PDF y
+las métricas del dashboard recalculaban cada uno los mismos agregados (longitudes,
+conteos Q3/Q8, aminoácidos no estándar, nulos, ``describe()``, métodos
+experimentales). ``DatasetProfile`` los calcula una sola vez a partir de
+``incremental.DatasetAggregates`` y todos los consumidores leen de él.
+
+``get_profile`` memoiza los perfiles por huella del dataset
+(``df.attrs['fingerprint']``) y número de filas, de modo que "Iniciar Análisis" y
+cada rerun reutilizan el mismo perfil. Los subconjuntos filtrados pueden llevar su
+propia huella (ver ``derived_fingerprint``) para memoizarse también.
+
+Example:
+    >>> profile = get_profile(df)
+    >>> profile.length["median"], profile.nonstd_ratio
+    >>> profile.null_counts.to_frame("nulos")
+"""
+
+import copy
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from composition import AminoAcidComposition
+from dataset_cache import dataset_fingerprint
+from incremental import DatasetAggregates, LengthHistogram, summarize_lengths
+from length_index import LengthIndex
+from segments import StructureSegments, find_segments
+from structure_consistency import StructureConsistency
+
+
+# Perfiles recientes, por (huella del dataset, filas)
+_PROFILE_CACHE: "OrderedDict[Tuple[str, int], DatasetProfile]" = OrderedDict()
+_PROFILE_CACHE_SIZE = 8
+_LOCK = threading.Lock()
+
+# Categorías de longitud del panel de insights (intervalos cerrados por la derecha)
+LENGTH_CATEGORIES = [
+    ("Corta (<100)", 0, 100),
+    ("Media (100-300)", 100, 300),
+    ("Larga (300-500)", 300, 500),
+    ("Muy Larga (>500)", 500, None),
+]
+
+
+class DatasetProfile:
+    """
+    Agregados del dataset compartidos por el EDA, los insights, los reportes y el dashboard.
+
+    Attributes:
+        rows (int): Número de filas
+        columns (int): Número de columnas
+        fingerprint (str): Huella del dataset descrito
+        aggregates (DatasetAggregates): Estadísticas por columna, histograma de 'len',
+            conteos Q3/Q8, aminoácidos no estándar y candidatas a secuencias más largas
+        null_counts (pd.Series): Valores nulos por columna
+        describe (pd.DataFrame): Equivalente a ``df.select_dtypes("number").describe()``
+        method_counts (pd.Series): Estructuras por método experimental ('Exptl.'), de mayor a menor
+        dtypes (pd.Series): Tipo de cada columna
+    """
+
+    def __init__(self, df: pd.DataFrame, aggregates: DatasetAggregates):
+        self.rows = len(df)
+        self.columns = df.shape[1]
+        self.fingerprint = aggregates.fingerprint
+        self.aggregates = aggregates
+        self.null_counts = df.isna().sum()
+        self.describe = aggregates.describe(df)
+        self.dtypes = df.dtypes
+        method_column = _find_column(df, "exptl.")
+        self.method_counts = (
+            df[method_column].value_counts() if method_column is not None else pd.Series(dtype="int64")
+        )
+        self._duplicate_rows: Optional[int] = None
+        self._memory_bytes: Optional[int] = None
+        self._length_index: Optional[LengthIndex] = None
+        self._composition: Optional[AminoAcidComposition] = None
+        self._segments: Dict[str, StructureSegments] = {}
+        self._consistency: Optional[StructureConsistency] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, aggregates: Optional[DatasetAggregates] = None) -> "DatasetProfile":
+        """
+        Construye el perfil de un dataset.
+
+        Args:
+            df (pd.DataFrame): Dataset
+            aggregates (DatasetAggregates, opcional): Agregados ya calculados de ``df``
+                (ej. tras añadir filas); si no se indican se calculan en una pasada
+
+        Returns:
+            DatasetProfile: Perfil del dataset
+        """
+        if aggregates is None:
+            aggregates = DatasetAggregates.from_frame(df)
+        return cls(df, aggregates)
+
+    # ---- Longitudes ----
+
+    @property
+    def has_lengths(self) -> bool:
+        return self.aggregates.length_histogram.total > 0
+
+    @property
+    def length_histogram(self) -> LengthHistogram:
+        return self.aggregates.length_histogram
+
+    @property
+    def length(self) -> Dict[str, float]:
+        """Media, mediana, desviación, extremos, cuartiles y valores atípicos de 'len'."""
+        stats = next((s for name, s in self.aggregates.numeric_stats.items() if str(name).lower() == "len"), None)
+        if stats is None or not stats.count:
+            return {}
+        return summarize_lengths(stats, self.length_histogram)
+
+    def length_index(self, df: pd.DataFrame) -> LengthIndex:
+        """Índice por longitud de ``df`` para filtros por rango (se construye solo la primera vez)."""
+        if self._length_index is None:
+            self._length_index = LengthIndex.from_frame(df)
+        return self._length_index
+
+    def length_categories(self) -> Dict[str, int]:
+        """Secuencias por categoría de longitud (``LENGTH_CATEGORIES``)."""
+        histogram = self.length_histogram
+        return {
+            label: histogram.count_between(low + 1, high) if high is not None else histogram.count_above(low)
+            for label, low, high in LENGTH_CATEGORIES
+        }
+
+    # ---- Residuos y calidad ----
+
+    def q3_counts(self) -> pd.Series:
+        return self.aggregates.q3_counts()
+
+    def q8_counts(self) -> pd.Series:
+        return self.aggregates.q8_counts()
+
+    @property
+    def nonstd_ratio(self) -> float:
+        return self.aggregates.nonstd_ratio
+
+    def nonstd_counts(self) -> pd.Series:
+        """Filas con (True) y sin (False) aminoácidos no estándar, como ``value_counts``."""
+        true = self.aggregates.nonstd_true
+        counts = pd.Series({False: self.aggregates.nonstd_valid - true, True: true}, dtype="int64")
+        return counts[counts > 0].sort_values(ascending=False)
+
+    def duplicate_rows(self, df: pd.DataFrame) -> int:
+        """Filas duplicadas de ``df`` (se calcula solo la primera vez)."""
+        if self._duplicate_rows is None:
+            self._duplicate_rows = int(df.duplicated().sum())
+        return self._duplicate_rows
+
+    def memory_bytes(self, df: pd.DataFrame) -> int:
+        """Memoria ocupada por ``df`` (se calcula solo la primera vez)."""
+        if self._memory_bytes is None:
+            self._memory_bytes = int(df.memory_usage(deep=True).sum())
+        return self._memory_bytes
+
+    # ---- Columnas de secuencia por cadena ----
+
+    def has_column(self, name: str) -> bool:
+        """Indica si el dataset tiene la columna ``name`` (sin distinguir mayúsculas)."""
+        return any(str(col).lower() == name for col in self.dtypes.index)
+
+    @property
+    def has_sequences(self) -> bool:
+        return self.has_column("seq")
+
+    def composition(self, df: pd.DataFrame) -> AminoAcidComposition:
+        """Matriz de composición de aminoácidos por cadena de ``df`` (se calcula solo la primera vez)."""
+        if self._composition is None:
+            self._composition = AminoAcidComposition.from_frame(df)
+        return self._composition
+
+    def segments(self, df: pd.DataFrame, column: str = "sst3") -> StructureSegments:
+        """Segmentos de estructura secundaria de ``column`` en ``df`` (se calculan solo la primera vez)."""
+        if column not in self._segments:
+            self._segments[column] = find_segments(df, column)
+        return self._segments[column]
+
+    @property
+    def has_q8(self) -> bool:
+        return self.has_column("sst8") and self.has_column("sst3")
+
+    def consistency(self, df: pd.DataFrame) -> StructureConsistency:
+        """Comparación Q8/Q3 posición a posición de ``df`` (se calcula solo la primera vez)."""
+        if self._consistency is None:
+            self._consistency = StructureConsistency.from_frame(df)
+        return self._consistency
+
+    # ---- Artefactos derivados ----
+
+    def fast_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Estadísticas del fast path del chat (``fast_answers.precompute_dataset_stats``)."""
+        return self.aggregates.fast_stats(df)
+
+    def eda_context(self, df: pd.DataFrame) -> str:
+        """Contexto del EDA para el agente (con composición de aminoácidos y consistencia Q8/Q3 si hay columnas)."""
+        context = self.aggregates.eda_context(df)
+        if self.has_sequences:
+            context += "\n\n" + self.composition(df).summary_text(LENGTH_CATEGORIES)
+        if self.has_q8:
+            context += "\n\n" + self.consistency(df).summary_text()
+        return context
+
+
+def _find_column(df: pd.DataFrame, key: str) -> Optional[str]:
+    """Nombre real de una columna a partir de su nombre en minúsculas."""
+    return next((col for col in df.columns if str(col).lower() == key), None)
+
+
+def derived_fingerprint(df: pd.DataFrame, label: str) -> str:
+    """
+    Huella de un subconjunto de ``df`` identificado por ``label`` (ej. un filtro).
+
+    Los subconjuntos heredan ``attrs`` del dataset original; asignarles esta huella
+    evita confundirlos con él y permite memoizar su perfil.
+    """
+    return hashlib.sha256(f"{dataset_fingerprint(df)}:{label}".encode()).hexdigest()
+
+
+def get_profile(df: pd.DataFrame, aggregates: Optional[DatasetAggregates] = None) -> DatasetProfile:
+    """
+    Perfil del dataset, memoizado por huella y número de filas.
+
+    Args:
+        df (pd.DataFrame): Dataset
+        aggregates (DatasetAggregates, opcional): Agregados ya calculados de ``df``;
+            el perfil guarda una copia, así que actualizarlos después no lo altera
+
+    Returns:
+        DatasetProfile: Perfil del dataset
+    """
+    key = (dataset_fingerprint(df), len(df))
+    with _LOCK:
+        profile = _PROFILE_CACHE.get(key)
+        if profile is not None:
+            _PROFILE_CACHE.move_to_end(key)
+            return profile
+
+    if aggregates is not None:
+        aggregates = copy.deepcopy(aggregates)
+    profile = DatasetProfile.from_frame(df, aggregates)
+    with _LOCK:
+        _PROFILE_CACHE[key] = profile
+        while len(_PROFILE_CACHE) > _PROFILE_CACHE_SIZE:
+            _PROFILE_CACHE.popitem(last=False)
+    return profile
+
+
+def clear_profile_cache() -> None:
+    """Vacía la memoización de perfiles."""
+    with _LOCK:
+        _PROFILE_CACHE.clear()
@@ -10,11 +10,20 @@ Date: 2024
 """
 
 import matplotlib.pyplot as plt
+import numpy as np
 import seaborn as sns
 import pandas as pd
 from typing import Optional
+from matplotlib.colors import LogNorm
 from matplotlib.figure import Figure
 
+from config import VIZ_CONFIG
+
+from dataset_profile import LENGTH_CATEGORIES, get_profile
+from density import histogram_kde
+from residue_counts import Q3_ALPHABET
+from segments import STATE_NAMES, StructureSegments
+
 
 def validate_eda(df: Optional[pd.DataFrame]) -> bool:
     """
@@ -44,6 +53,30 @@ def validate_eda(df: Optional[pd.DataFrame]) -> bool:
 # ANÁLISIS DE SECUENCIAS
 # ============================================================
 
+def histogram_with_kde(ax, values: np.ndarray, weights: Optional[np.ndarray] = None,
+                       color: str = "steelblue", bins: int = 30) -> None:
+    """
+    Histograma con curva KDE, equivalente a ``sns.histplot(..., kde=True)``.
+
+    Las barras y la curva salen de ``density.histogram_kde``: la KDE se calcula por
+    convolución FFT sobre los datos agrupados en lugar de evaluar el núcleo en cada fila.
+
+    Args:
+        ax: Ejes de matplotlib
+        values (np.ndarray): Valores (sin NaN)
+        weights (np.ndarray, opcional): Frecuencia de cada valor
+        color (str): Color de las barras y de la curva
+        bins (int): Número de barras
+    """
+    counts, edges, grid, curve = histogram_kde(values, weights, bins=bins)
+    # seaborn dibuja las barras a partir de los conteos ya calculados (un punto por barra)
+    centers = (edges[:-1] + edges[1:]) / 2
+    sns.histplot(x=centers, weights=counts, bins=len(counts), binrange=(edges[0], edges[-1]),
+                 ax=ax, color=color)
+    if curve is not None:
+        ax.plot(grid, curve, color=color)
+
+
 def plot_length_distribution(df: pd.DataFrame) -> Figure:
     """
     Genera un histograma de la distribución de longitudes de secuencias.
@@ -54,11 +87,30 @@ def plot_length_distribution(df: pd.DataFrame) -> Figure:
     Args:
         df (pd.DataFrame): DataFrame con columna 'len' (longitud de secuencias)
 
+    Returns:
+        Figure: Objeto matplotlib Figure con el histograma generado
+    """
+    # Histograma exacto por longitud del perfil compartido (sin recorrer las filas)
+    return plot_length_counts(*get_profile(df).length_histogram.nonzero())
+
+
+def plot_length_counts(lengths: np.ndarray, counts: np.ndarray) -> Figure:
+    """
+    Histograma de longitudes a partir de la frecuencia de cada longitud.
+
+    Produce el mismo gráfico que ``plot_length_distribution`` sin necesitar las filas:
+    las longitudes distintas se ponderan con su frecuencia (la KDE usa el número
+    real de secuencias para el ancho de banda).
+
+    Args:
+        lengths (np.ndarray): Longitudes presentes
+        counts (np.ndarray): Número de secuencias con cada longitud
+
     Returns:
         Figure: Objeto matplotlib Figure con el histograma generado
     """
     fig, ax = plt.subplots()
-    sns.histplot(df['len'], kde=True, ax=ax, bins=30, color="steelblue")
+    histogram_with_kde(ax, lengths, counts, color="steelblue")
     ax.set_title('Distribución de la Longitud de las Secuencias')
     ax.set_xlabel('Longitud (aminoácidos)')
     ax.set_ylabel('Frecuencia')
@@ -78,9 +130,20 @@ def plot_q3_distribution(df: pd.DataFrame) -> Figure:
     Returns:
         Figure: Objeto matplotlib Figure con el gráfico de barras
     """
-    # Concatenar todas las secuencias de estructura secundaria y contar
-    q3_counts = pd.Series(list("".join(df['sst3']))).value_counts()
+    # Conteos del perfil compartido (una pasada de bytes, memoizada por huella)
+    return plot_q3_counts(get_profile(df).q3_counts())
+
+
+def plot_q3_counts(q3_counts: pd.Series) -> Figure:
+    """
+    Gráfico de barras Q3 a partir de conteos ya calculados.
 
+    Args:
+        q3_counts (pd.Series): Estado (H/E/C) -> número de residuos
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
     fig, ax = plt.subplots()
     sns.barplot(x=q3_counts.index, y=q3_counts.values, ax=ax, palette="viridis")
     ax.set_title('Frecuencia de Estructuras Secundarias (Q3)')
@@ -89,6 +152,72 @@ def plot_q3_distribution(df: pd.DataFrame) -> Figure:
     return fig
 
 
+def plot_q8_distribution(df: pd.DataFrame) -> Figure:
+    """
+    Gráfico de barras de la frecuencia de los 8 estados de estructura secundaria (Q8).
+
+    Args:
+        df (pd.DataFrame): DataFrame con columna 'sst8'
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
+    return plot_q8_counts(get_profile(df).q8_counts())
+
+
+def plot_q8_counts(q8_counts: pd.Series) -> Figure:
+    """
+    Gráfico de barras Q8 a partir de conteos ya calculados.
+
+    Args:
+        q8_counts (pd.Series): Estado DSSP -> número de residuos
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
+    fig, ax = plt.subplots()
+    sns.barplot(x=q8_counts.index, y=q8_counts.values, ax=ax, color="slateblue")
+    ax.set_title('Frecuencia de Estructuras Secundarias (Q8)')
+    ax.set_xlabel('Estado DSSP (H, G, I: hélices; E, B: hebras/puentes; T, S, C: giros y coil)')
+    ax.set_ylabel('Conteo Total')
+    return fig
+
+
+def plot_q8_q3_consistency(df: pd.DataFrame) -> Figure:
+    """
+    Mapa de calor de la correspondencia entre estados Q8 y Q3, posición a posición.
+
+    Args:
+        df (pd.DataFrame): DataFrame con columnas 'sst8' y 'sst3'
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el mapa de calor
+    """
+    return plot_consistency_matrix(get_profile(df).consistency(df).matrix(normalize=True))
+
+
+def plot_consistency_matrix(matrix: pd.DataFrame) -> Figure:
+    """
+    Mapa de calor de una matriz Q8 -> Q3 ya normalizada por fila.
+
+    Con la reducción estándar (H/G/I -> H, E/B -> E, resto -> C) cada fila tiene un
+    único 100%; cualquier otro valor señala residuos inconsistentes.
+
+    Args:
+        matrix (pd.DataFrame): Porcentaje de cada estado Q8 (filas) asignado a cada Q3 (columnas)
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el mapa de calor
+    """
+    fig, ax = plt.subplots(figsize=(6, 6))
+    sns.heatmap(matrix, ax=ax, cmap="Blues", vmin=0, vmax=100, annot=True, fmt=".1f",
+                cbar_kws={"label": '% de residuos del estado Q8'})
+    ax.set_title('Consistencia Q8 -> Q3')
+    ax.set_xlabel('Estado Q3 (sst3)')
+    ax.set_ylabel('Estado Q8 (sst8)')
+    return fig
+
+
 def plot_nonstd_aa_pie(df: pd.DataFrame) -> Figure:
     """
     Gráfico circular de proporción de secuencias con aminoácidos no estándar.
@@ -102,7 +231,19 @@ def plot_nonstd_aa_pie(df: pd.DataFrame) -> Figure:
     Returns:
         Figure: Objeto matplotlib Figure con el gráfico circular
     """
-    counts = df['has_nonstd_aa'].value_counts()
+    return plot_nonstd_counts(get_profile(df).nonstd_counts())
+
+
+def plot_nonstd_counts(counts: pd.Series) -> Figure:
+    """
+    Gráfico circular de aminoácidos no estándar a partir de conteos ya calculados.
+
+    Args:
+        counts (pd.Series): True/False -> número de secuencias (como ``value_counts``)
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico circular
+    """
     labels = {True: 'Con Aminoácidos No Estándar', False: 'Solo Estándar'}
 
     fig, ax = plt.subplots()
@@ -118,6 +259,186 @@ def plot_nonstd_aa_pie(df: pd.DataFrame) -> Figure:
     return fig
 
 
+# ============================================================
+# SEGMENTOS DE ESTRUCTURA SECUNDARIA
+# ============================================================
+
+def plot_segment_lengths(df: pd.DataFrame, column: str = "sst3") -> Figure:
+    """
+    Distribución de longitudes de los segmentos de cada estado de estructura secundaria.
+
+    Los segmentos (hélices, hebras, coil) salen de la codificación run-length de toda
+    la columna (``segments.find_segments``), memoizada en el perfil del dataset.
+
+    Args:
+        df (pd.DataFrame): DataFrame con columna 'sst3' o 'sst8'
+        column (str): Columna de estructura secundaria
+
+    Returns:
+        Figure: Objeto matplotlib Figure con las distribuciones
+    """
+    return plot_segment_length_counts(get_profile(df).segments(df, column))
+
+
+def plot_segment_length_counts(segments: StructureSegments) -> Figure:
+    """
+    Distribución de longitudes de segmento a partir de segmentos ya calculados.
+
+    En Q3 se dibujan hélices, hebras y los huecos de coil entre elementos de
+    estructura; en Q8, todos los estados. El eje x se corta en el percentil 99.
+
+    Args:
+        segments (StructureSegments): Segmentos de una columna
+
+    Returns:
+        Figure: Objeto matplotlib Figure con las distribuciones
+    """
+    series = {}
+    for symbol in segments.alphabet:
+        if segments.alphabet == Q3_ALPHABET and symbol == "C":
+            gaps = np.bincount(segments.coil_gaps())
+            series["Hueco de coil"] = (np.flatnonzero(gaps), gaps[np.flatnonzero(gaps)])
+        else:
+            series[STATE_NAMES.get(symbol, symbol)] = segments.length_counts(symbol)
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    x_max = 1
+    for (label, (lengths, counts)), color in zip(series.items(), sns.color_palette("tab10")):
+        if not len(lengths):
+            continue
+        ax.plot(lengths, counts, drawstyle="steps-mid", color=color, label=f"{label} ({int(counts.sum()):,})")
+        x_max = max(x_max, int(lengths[np.searchsorted(np.cumsum(counts), 0.99 * counts.sum())]))
+    ax.set_xlim(0, x_max + 1)
+    ax.set_yscale("log")
+    ax.set_title(f"Longitud de los Segmentos de Estructura Secundaria ({'Q3' if segments.alphabet == Q3_ALPHABET else 'Q8'})")
+    ax.set_xlabel('Longitud del segmento (residuos)')
+    ax.set_ylabel('Segmentos')
+    if ax.lines:
+        ax.legend()
+    return fig
+
+
+def plot_segments_per_chain(df: pd.DataFrame) -> Figure:
+    """
+    Número de hélices y hebras por cadena (Q3).
+
+    Args:
+        df (pd.DataFrame): DataFrame con columna 'sst3'
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
+    return plot_segment_chain_counts(get_profile(df).segments(df, "sst3"))
+
+
+def plot_segment_chain_counts(segments: StructureSegments) -> Figure:
+    """
+    Cadenas según su número de hélices y de hebras, a partir de segmentos ya calculados.
+
+    Args:
+        segments (StructureSegments): Segmentos de 'sst3'
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
+    per_chain = segments.per_chain_counts()
+    chains = np.unique(segments.chain)
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for offset, (symbol, color) in zip((-0.2, 0.2), (("H", "royalblue"), ("E", "darkorange"))):
+        if symbol not in segments.alphabet:
+            continue
+        counts = np.bincount(per_chain[chains, segments.alphabet.index(symbol)])
+        # Cola larga: se muestran las cantidades hasta cubrir el 99% de las cadenas
+        shown = int(np.searchsorted(np.cumsum(counts), 0.99 * counts.sum())) + 1
+        ax.bar(np.arange(shown) + offset, counts[:shown], width=0.4, color=color, label=STATE_NAMES[symbol])
+    ax.set_title('Segmentos de Estructura Secundaria por Cadena')
+    ax.set_xlabel('Segmentos en la cadena')
+    ax.set_ylabel('Cadenas')
+    if ax.patches:
+        ax.legend()
+    return fig
+
+
+# ============================================================
+# COMPOSICIÓN DE AMINOÁCIDOS
+# ============================================================
+
+def plot_aa_composition(df: pd.DataFrame) -> Figure:
+    """
+    Gráfico de barras de la composición de aminoácidos del dataset.
+
+    Usa la matriz de composición por cadena del perfil (una pasada sobre 'seq',
+    memoizada con el dataset).
+
+    Args:
+        df (pd.DataFrame): DataFrame con columna 'seq'
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
+    profile = get_profile(df)
+    return plot_composition_frequencies(profile.composition(df).frequencies())
+
+
+def plot_composition_frequencies(frequencies: pd.Series) -> Figure:
+    """
+    Gráfico de barras de la composición a partir de porcentajes ya calculados.
+
+    Args:
+        frequencies (pd.Series): Aminoácido -> porcentaje de residuos
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
+    fig, ax = plt.subplots(figsize=(10, 5))
+    sns.barplot(x=frequencies.index, y=frequencies.values, ax=ax, color="seagreen")
+    ax.set_title('Composición de Aminoácidos del Dataset')
+    ax.set_xlabel('Aminoácido')
+    ax.set_ylabel('% de Residuos')
+    return fig
+
+
+def plot_composition_by_length(df: pd.DataFrame) -> Figure:
+    """
+    Mapa de calor de la composición de aminoácidos por categoría de longitud.
+
+    Args:
+        df (pd.DataFrame): DataFrame con columna 'seq'
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el mapa de calor
+    """
+    profile = get_profile(df)
+    return plot_composition_table(profile.composition(df).by_length_bucket(LENGTH_CATEGORIES))
+
+
+def plot_composition_table(table: pd.DataFrame) -> Figure:
+    """
+    Mapa de calor de una tabla de composición (``AminoAcidComposition.by_length_bucket``).
+
+    Cada celda muestra la diferencia, en puntos porcentuales, respecto a la media de
+    las categorías, para que resalten los aminoácidos que cambian con la longitud.
+
+    Args:
+        table (pd.DataFrame): Una fila por categoría; columna 'cadenas' y una por aminoácido
+
+    Returns:
+        Figure: Objeto matplotlib Figure con el mapa de calor
+    """
+    percentages = table.drop(columns="cadenas")
+    labels = [f"{label}\n({int(n):,} cadenas)" for label, n in table["cadenas"].items()]
+    fig, ax = plt.subplots(figsize=(12, 1.2 + 0.8 * len(table)))
+    sns.heatmap(
+        percentages - percentages.mean(), ax=ax, cmap="RdBu_r", center=0,
+        annot=percentages.round(1), fmt="", annot_kws={"fontsize": 7},
+        yticklabels=labels, cbar_kws={"label": 'Diferencia con la media (p.p.)'}
+    )
+    ax.set_title('Composición de Aminoácidos por Longitud (% de residuos)')
+    ax.set_xlabel('Aminoácido')
+    ax.set_ylabel('')
+    return fig
+
+
 # ============================================================
 # ANÁLISIS DE CALIDAD ESTRUCTURAL
 # ============================================================
@@ -136,7 +457,7 @@ def plot_resolution_distribution(df: pd.DataFrame) -> Figure:
         Figure: Objeto matplotlib Figure con el histograma
     """
     fig, ax = plt.subplots()
-    sns.histplot(df['resolution'], kde=True, bins=30, ax=ax, color="darkorange")
+    histogram_with_kde(ax, df['resolution'].dropna().to_numpy(dtype=float), color="darkorange")
     ax.set_title('Distribución de Resoluciones de las Estructuras')
     ax.set_xlabel('Resolución (Å)')
     ax.set_ylabel('Frecuencia')
@@ -157,7 +478,7 @@ def plot_rfactor_distribution(df: pd.DataFrame) -> Figure:
         Figure: Objeto matplotlib Figure con el histograma
     """
     fig, ax = plt.subplots()
-    sns.histplot(df['R-factor'], kde=True, bins=30, ax=ax, color="teal")
+    histogram_with_kde(ax, df['R-factor'].dropna().to_numpy(dtype=float), color="teal")
     ax.set_title('Distribución del R-factor')
     ax.set_xlabel('R-factor')
     ax.set_ylabel('Frecuencia')
@@ -174,11 +495,24 @@ def plot_experimental_methods(df: pd.DataFrame) -> Figure:
     Args:
         df (pd.DataFrame): DataFrame con columna 'Exptl.' (método experimental)
 
+    Returns:
+        Figure: Objeto matplotlib Figure con el gráfico de barras
+    """
+    return plot_method_counts(get_profile(df).method_counts)
+
+
+def plot_method_counts(method_counts: pd.Series) -> Figure:
+    """
+    Gráfico de barras de métodos experimentales a partir de conteos ya calculados.
+
+    Args:
+        method_counts (pd.Series): Método -> número de estructuras
+
     Returns:
         Figure: Objeto matplotlib Figure con el gráfico de barras
     """
     fig, ax = plt.subplots()
-    sns.countplot(x='Exptl.', data=df, ax=ax, palette="Set2")
+    sns.barplot(x=method_counts.index.astype(str), y=method_counts.values, ax=ax, palette="Set2")
     ax.set_title('Métodos Experimentales en el Dataset')
     ax.set_xlabel('Método Experimental')
     ax.set_ylabel('Número de Estructuras')
@@ -190,18 +524,51 @@ def plot_length_vs_resolution(df: pd.DataFrame) -> Figure:
     Scatter plot de la relación entre longitud de secuencia y resolución.
 
     Explora si existe una correlación entre el tamaño de la proteína
-    y la resolución cristalográfica obtenida.
+    y la resolución cristalográfica obtenida. Con más de
+    ``VIZ_CONFIG['scatter_max_points']`` pares válidos se dibuja un histograma 2D con
+    escala de color logarítmica (ver ``plot_density_2d``): el coste de dibujo depende
+    del número de bins y no del de filas, y se evita la sobreimpresión de puntos.
 
     Args:
         df (pd.DataFrame): DataFrame con columnas 'len' y 'resolution'
 
     Returns:
-        Figure: Objeto matplotlib Figure con el scatter plot
+        Figure: Objeto matplotlib Figure con el scatter plot (o el histograma 2D)
     """
+    x = df['len'].to_numpy(dtype=float, na_value=np.nan)
+    y = df['resolution'].to_numpy(dtype=float, na_value=np.nan)
+    valid = ~(np.isnan(x) | np.isnan(y))
+
     fig, ax = plt.subplots()
-    sns.scatterplot(x='len', y='resolution', data=df, alpha=0.5, ax=ax, color="purple")
+    if valid.sum() > VIZ_CONFIG.get("scatter_max_points", 20_000):
+        plot_density_2d(ax, x[valid], y[valid], label='Número de estructuras')
+    else:
+        sns.scatterplot(x=x[valid], y=y[valid], alpha=0.5, ax=ax, color="purple")
     ax.set_title('Longitud de Secuencia vs Resolución Experimental')
     ax.set_xlabel('Longitud de Secuencia (aminoácidos)')
     ax.set_ylabel('Resolución (Å)')
     return fig
 
+
+def plot_density_2d(ax, x: np.ndarray, y: np.ndarray, bins: Optional[int] = None, label: str = 'Conteo') -> None:
+    """
+    Dibuja la densidad de pares (x, y) como histograma 2D con escala de color logarítmica.
+
+    El conteo por bin se calcula con ``np.histogram2d`` (vectorizado) y se dibuja
+    una sola malla con ``pcolormesh``; los bins vacíos quedan en blanco.
+
+    Args:
+        ax: Ejes de matplotlib
+        x (np.ndarray): Valores del eje X (sin NaN)
+        y (np.ndarray): Valores del eje Y (sin NaN)
+        bins (int, opcional): Bins por eje (por defecto ``VIZ_CONFIG['density_bins']``)
+        label (str): Etiqueta de la barra de color
+    """
+    bins = bins or VIZ_CONFIG.get("density_bins", 80)
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    counts = np.ma.masked_equal(counts, 0)
+    mesh = ax.pcolormesh(
+        x_edges, y_edges, counts.T, cmap=VIZ_CONFIG.get("color_palette", "viridis"),
+        norm=LogNorm(vmin=1, vmax=max(float(counts.max()), 1.0))
+    )
+    ax.figure.colorbar(mesh, ax=ax, label=f'{label} (escala log)')
@@ -0,0 +1,263 @@
+"""
+Cálculo y renderizado de las figuras del EDA en paralelo, en un pool de procesos.
+
+El dashboard y ``generate_pdf_report`` calculaban y dibujaban cada figura una tras
+otra. Las figuras son independientes, así que aquí se reparten entre procesos
+(matplotlib no es thread-safe) y el tiempo total se acerca al de la figura más lenta:
+
+- Un solo pool compartido por todas las sesiones, sin dataset: los procesos no
+  guardan copias. Cada tarea envía el nombre de la función de ``eda.py`` y sus
+  datos: los argumentos ya calculados (conteos, segmentos, composición) o, si la
+  función necesita filas, solo sus ``columns`` de las filas de la tarea. Cambiar
+  de dataset no reinicia el pool ni cancela figuras de otra llamada.
+- Cada proceso dibuja la figura y devuelve la imagen renderizada en bytes.
+- Antes de enviar nada se consulta la caché de figuras (``figure_cache``); solo se
+  calculan las que faltan, y sus imágenes se guardan en la caché.
+- Los resultados se devuelven en el orden de las tareas y un error en una figura
+  no afecta a las demás.
+
+Con un solo núcleo, pocas figuras pendientes o si el pool no puede arrancar (o se
+rompe), las figuras se dibujan en serie en el proceso actual con el mismo código.
+
+Example:
+    >>> tasks = [FigureTask("q3_distribution", "plot_q3_distribution"),
+    ...          FigureTask("length_vs_resolution", "plot_length_vs_resolution")]
+    >>> for result in render_figures(df, tasks):
+    ...     st.image(result.image) if result.ok else st.error(result.error)
+"""
+
+import atexit
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import EDA_EXECUTOR_CONFIG
+from dataset_cache import dataset_fingerprint
+from figure_cache import lookup_figure, render_figure, store_figure
+from logger import app_logger
+
+
+class FigureTask:
+    """
+    Figura a producir con una función ``plot_*`` de ``eda.py``.
+
+    Attributes:
+        name (str): Nombre del gráfico en la caché de figuras (ej. 'q3_distribution')
+        plot (str): Nombre de la función de ``eda.py``
+        args (tuple | None): Argumentos ya calculados (ej. conteos); si es None la
+            función recibe el dataset (o las filas de ``rows``)
+        kwargs (Dict[str, Any]): Argumentos con nombre adicionales
+        rows (np.ndarray | None): Posiciones de las filas del subconjunto (ej. un filtro)
+        columns (List[str] | None): Columnas que usa la función cuando recibe filas;
+            solo esas se envían al proceso (None: todas)
+        params (Dict[str, Any] | None): Parámetros de la figura en la caché (ej. el rango)
+        fmt (str | None): Formato de la imagen ('png' o 'svg')
+    """
+
+    def __init__(self, name: str, plot: str, args: Optional[tuple] = None, kwargs: Optional[Dict[str, Any]] = None,
+                 rows: Optional[np.ndarray] = None, params: Optional[Dict[str, Any]] = None,
+                 fmt: Optional[str] = None, columns: Optional[List[str]] = None):
+        self.name = name
+        self.plot = plot
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.rows = rows
+        self.columns = columns
+        self.params = params
+        self.fmt = fmt
+
+
+class FigureResult:
+    """
+    Resultado de una figura.
+
+    Attributes:
+        name (str): Nombre del gráfico
+        image (bytes | None): Imagen renderizada (None si hubo un error)
+        error (str | None): Mensaje del error de esta figura
+        cached (bool): La imagen salió de la caché de figuras
+    """
+
+    def __init__(self, name: str, image: Optional[bytes] = None, error: Optional[str] = None, cached: bool = False):
+        self.name = name
+        self.image = image
+        self.error = error
+        self.cached = cached
+
+    @property
+    def ok(self) -> bool:
+        return self.image is not None
+
+
+# ============================================================
+# EJECUCIÓN DE UNA TAREA (en el proceso de trabajo o en serie)
+# ============================================================
+
+def _init_worker() -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _task_frame(df: pd.DataFrame, task: FigureTask) -> Optional[pd.DataFrame]:
+    """
+    Filas y columnas que recibe la función de la tarea, con su propia huella para las
+    memoizaciones (None si la tarea trae sus argumentos).
+    """
+    if task.args is not None:
+        return None
+    if task.rows is None and task.columns is None:
+        return df
+    from dataset_profile import derived_fingerprint
+
+    label = ""
+    frame = df
+    if task.rows is not None:
+        rows = np.sort(np.asarray(task.rows, dtype=np.int64))
+        frame = frame.iloc[rows]
+        label += "rows:" + hashlib.sha256(rows.tobytes()).hexdigest()
+    if task.columns is not None:
+        frame = frame[list(task.columns)]
+        label += "columns:" + ",".join(map(str, task.columns))
+    frame.attrs = {**df.attrs, "fingerprint": derived_fingerprint(df, label)}
+    return frame
+
+
+def _run_task(task: FigureTask, frame: Optional[pd.DataFrame]) -> bytes:
+    """Calcula los datos de la figura, la dibuja y la renderiza."""
+    import eda
+
+    plot = getattr(eda, task.plot)
+    fig = plot(*task.args, **task.kwargs) if task.args is not None else plot(frame, **task.kwargs)
+    return render_figure(fig, task.fmt)
+
+
+# ============================================================
+# POOL DE PROCESOS
+# ============================================================
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_LOCK = threading.Lock()
+
+
+def worker_count() -> int:
+    """Procesos del pool: ``max_workers`` limitado a los núcleos disponibles."""
+    return max(1, min(EDA_EXECUTOR_CONFIG.get("max_workers", 4), os.cpu_count() or 1))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Pool de procesos compartido (sin dataset), creado en la primera llamada."""
+    global _POOL
+    with _LOCK:
+        if _POOL is None:
+            context = multiprocessing.get_context(EDA_EXECUTOR_CONFIG.get("start_method", "spawn"))
+            _POOL = ProcessPoolExecutor(max_workers=worker_count(), mp_context=context, initializer=_init_worker)
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Retira un pool roto (si sigue siendo el actual); la siguiente llamada crea otro."""
+    global _POOL
+    with _LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False)
+
+
+def shutdown_executor() -> None:
+    """Detiene el pool de procesos (se vuelve a crear en la siguiente llamada)."""
+    global _POOL
+    with _LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(shutdown_executor)
+
+
+def _render_serial(df: pd.DataFrame, tasks: Sequence[FigureTask]) -> List[FigureResult]:
+    results = []
+    for task in tasks:
+        try:
+            results.append(FigureResult(task.name, image=_run_task(task, _task_frame(df, task))))
+        except Exception as e:
+            app_logger.warning(f"No se pudo generar la figura '{task.name}': {e}")
+            results.append(FigureResult(task.name, error=str(e)))
+    return results
+
+
+def _render_parallel(df: pd.DataFrame, tasks: Sequence[FigureTask]) -> List[FigureResult]:
+    pool = None
+    try:
+        pool = _get_pool()
+        # Cada tarea lleva sus datos: argumentos ya calculados o sus filas y columnas
+        futures = [pool.submit(_run_task, task, _task_frame(df, task)) for task in tasks]
+    except Exception as e:
+        # Ej. el pool se rompió entre obtenerlo y enviar las tareas
+        app_logger.warning(f"Pool de figuras no disponible, se dibuja en serie: {e}")
+        if pool is not None:
+            _discard_pool(pool)
+        return _render_serial(df, tasks)
+
+    results: List[FigureResult] = []
+    timeout = EDA_EXECUTOR_CONFIG.get("task_timeout", 300)
+    for i, (task, future) in enumerate(zip(tasks, futures)):
+        try:
+            results.append(FigureResult(task.name, image=future.result(timeout=timeout)))
+        except BrokenProcessPool as e:
+            # Un proceso murió: el pool ya no sirve y las figuras restantes se dibujan en serie
+            app_logger.warning(f"Pool de figuras roto, se continúa en serie: {e}")
+            _discard_pool(pool)
+            return results + _render_serial(df, tasks[i:])
+        except Exception as e:
+            app_logger.warning(f"No se pudo generar la figura '{task.name}': {e}")
+            results.append(FigureResult(task.name, error=str(e) or type(e).__name__))
+    return results
+
+
+def render_figures(df: pd.DataFrame, tasks: Sequence[FigureTask], fingerprint: Optional[str] = None,
+                   parallel: Optional[bool] = None) -> List[FigureResult]:
+    """
+    Figuras de las tareas, en el mismo orden, desde la caché o calculadas en paralelo.
+
+    Args:
+        df (pd.DataFrame): Dataset completo (las tareas con ``rows`` usan un subconjunto)
+        tasks (Sequence[FigureTask]): Figuras a producir
+        fingerprint (str, opcional): Huella del dataset (por defecto ``dataset_fingerprint(df)``)
+        parallel (bool, opcional): Forzar (True) o evitar (False) el pool; por defecto
+            se usa si está habilitado, hay más de un núcleo y al menos ``min_tasks`` pendientes
+
+    Returns:
+        List[FigureResult]: Un resultado por tarea, con la imagen o el error
+    """
+    fingerprint = fingerprint or dataset_fingerprint(df)
+    results: List[Optional[FigureResult]] = [None] * len(tasks)
+    pending = []
+    for i, task in enumerate(tasks):
+        image = lookup_figure(task.name, fingerprint, task.params, task.fmt)
+        if image is not None:
+            results[i] = FigureResult(task.name, image=image, cached=True)
+        else:
+            pending.append(i)
+
+    if parallel is None:
+        parallel = (
+            EDA_EXECUTOR_CONFIG.get("enabled", True)
+            and worker_count() > 1
+            and len(pending) >= EDA_EXECUTOR_CONFIG.get("min_tasks", 2)
+        )
+    todo = [tasks[i] for i in pending]
+    computed = _render_parallel(df, todo) if parallel and todo else _render_serial(df, todo)
+
+    for i, result in zip(pending, computed):
+        if result.ok:
+            store_figure(tasks[i].name, fingerprint, result.image, tasks[i].params, tasks[i].fmt)
+        results[i] = result
+    return results
@@ -0,0 +1,260 @@
+"""
+Respuestas deterministas (fast path) para preguntas calculables desde el dataset.
+
+Las preguntas sugeridas del chat (resumen, secuencias más largas, distribución de
+longitudes y estructura secundaria dominante) tienen una respuesta exacta que se
+obtiene del DataFrame. Este módulo precalcula esas estadísticas de forma vectorizada
+una sola vez por dataset, reconoce la intención de la pregunta y responde en
+milisegundos sin una llamada a DeepSeek-R1.
+
+Example:
+    >>> stats = precompute_dataset_stats(df)
+    >>> fast_path_answer("¿Qué tipo de estructura secundaria es más común?", stats)
+    '**Estructura secundaria más común:** Hélice α (H) ...'
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import SUGGESTED_QUESTIONS, FAST_PATH_CONFIG
+from residue_counts import Q3_ALPHABET, count_residues
+
+
+STRUCTURE_NAMES = {"H": "Hélice α", "E": "Hoja β", "C": "Coil/Loop"}
+
+# Palabras que indican que la pregunta necesita herramientas externas
+_TOOL_KEYWORDS = re.compile(r"\b(blast|pdb|ncbi|busca(la)?|buscala|similares?|homolog)")
+
+# Patrones de intención sobre texto normalizado (minúsculas, sin tildes)
+_INTENT_PATTERNS = [
+    ("longest_sequences", re.compile(r"(secuencias?|cadenas?|proteinas?) mas largas?")),
+    ("length_distribution", re.compile(
+        r"distribucion de (las )?longitud|longitudes?.*(mediana|atipic|outlier)|(mediana|atipic).*longitud"
+    )),
+    ("secondary_structure", re.compile(
+        r"estructura secundaria.*(mas comun|frecuente|predominante|dominante)|"
+        r"(mas comun|frecuente|predominante|dominante).*estructura secundaria"
+    )),
+    ("dataset_summary", re.compile(r"\b(resume|resumen|resumir)\b.*\b(dataset|datos)\b")),
+]
+
+
+# N de 'top N' o 'N (secuencias|cadenas|proteinas) mas largas'
+_TOP_N_PATTERN = re.compile(
+    r"\btop (\d{1,3})\b|\b(\d{1,3}) (?:(?:secuencias?|cadenas?|proteinas?) )?mas largas?"
+)
+
+
+def _normalize(text: str) -> str:
+    """Minúsculas, sin tildes y con espacios colapsados."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r"\s+", " ", text).strip()
+
+
+_SUGGESTED_INTENTS = {_normalize(question): intent for intent, question in SUGGESTED_QUESTIONS.items()}
+
+
+def longest_sequences_table(df: pd.DataFrame, top_n: int) -> pd.DataFrame:
+    """
+    Tabla con las ``top_n`` secuencias más largas y su composición Q3.
+
+    Args:
+        df (pd.DataFrame): Dataset (o subconjunto de candidatas) con columnas 'len' y 'has_nonstd_aa'
+        top_n (int): Número de secuencias
+
+    Returns:
+        pd.DataFrame: Identificadores, longitud y porcentajes H/E/C de las filas seleccionadas
+    """
+    longest_idx = df["len"].astype(float).nlargest(top_n).index
+    id_columns = [c for c in ("pdb_id", "chain_code", "Exptl.", "resolution") if c in df.columns]
+    longest = df.loc[longest_idx, id_columns + ["len", "has_nonstd_aa"]].copy()
+    if "sst3" in df.columns:
+        # Matriz por cadena del dataset completo (memoizada con su columna empaquetada) y
+        # se toman las filas seleccionadas: un subconjunto reordenado hereda la huella del
+        # dataset y no debe empaquetarse por separado
+        rows = df.index.get_indexer(longest_idx)
+        matrix = count_residues(df, columns=["sst3"], per_chain=True).matrix("sst3")[rows]
+        lengths = df["len"].to_numpy(dtype=float)[rows].clip(min=1)
+        has_sst3 = df["sst3"].notna().to_numpy()[rows]
+        for position, state in enumerate(Q3_ALPHABET):
+            longest[f"pct_{state}"] = np.where(has_sst3, matrix[:, position] / lengths * 100, np.nan)
+    return longest
+
+
+def precompute_dataset_stats(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Precalcula las estadísticas que responden las preguntas sugeridas.
+
+    Args:
+        df (pd.DataFrame): Dataset con columnas 'seq', 'sst3', 'len' y 'has_nonstd_aa'
+
+    Returns:
+        Dict[str, Any]: Estadísticas de tamaño, longitudes, valores atípicos (IQR),
+                        secuencias más largas y conteos Q3
+    """
+    lengths = df["len"].astype(float)
+    q1, median, q3 = lengths.quantile([0.25, 0.5, 0.75]).tolist()
+    iqr = q3 - q1
+    lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    longest = longest_sequences_table(df, FAST_PATH_CONFIG.get("max_top_n", 20))
+    q3_counts = count_residues(df, columns=["sst3"]).q3
+
+    return {
+        "rows": int(len(df)),
+        "columns": int(df.shape[1]),
+        "column_names": list(df.columns),
+        "length": {
+            "mean": float(lengths.mean()),
+            "median": float(median),
+            "std": float(lengths.std()),
+            "min": int(lengths.min()),
+            "max": int(lengths.max()),
+            "q1": float(q1),
+            "q3": float(q3),
+            "lower_fence": float(lower),
+            "upper_fence": float(upper),
+            "outliers_low": int((lengths < lower).sum()),
+            "outliers_high": int((lengths > upper).sum()),
+        },
+        "nonstd_ratio": float(df["has_nonstd_aa"].astype(bool).mean()),
+        "longest": longest,
+        "q3_counts": q3_counts,
+    }
+
+
+def detect_intent(question: str) -> Optional[str]:
+    """
+    Reconoce si la pregunta corresponde a una intención con respuesta determinista.
+
+    Args:
+        question (str): Pregunta del usuario
+
+    Returns:
+        Optional[str]: Nombre de la intención o None si debe responder el LLM
+    """
+    normalized = _normalize(question or "")
+    if normalized in _SUGGESTED_INTENTS:
+        return _SUGGESTED_INTENTS[normalized]
+    # Las preguntas que piden herramientas externas siempre van al agente
+    if _TOOL_KEYWORDS.search(normalized):
+        return None
+    for intent, pattern in _INTENT_PATTERNS:
+        if pattern.search(normalized):
+            return intent
+    return None
+
+
+def _requested_top_n(question: str, default: int = 5) -> int:
+    """Extrae el N de preguntas como 'las 10 secuencias más largas' o 'top 10'."""
+    # Solo números ligados al ranking: un PDB ID o 'más de 100 residuos' no son el N
+    match = _TOP_N_PATTERN.search(_normalize(question or ""))
+    n = int(match.group(1) or match.group(2)) if match else default
+    return max(1, min(n, FAST_PATH_CONFIG.get("max_top_n", 20)))
+
+
+def _answer_summary(stats: Dict[str, Any]) -> str:
+    length = stats["length"]
+    lines = [
+        "**📊 Resumen del dataset**",
+        f"- Secuencias: **{stats['rows']:,}** · Columnas: **{stats['columns']}** "
+        f"({', '.join(f'`{c}`' for c in stats['column_names'])})",
+        f"- Longitud: media **{length['mean']:.1f} AA**, mediana **{length['median']:.0f} AA**, "
+        f"rango **{length['min']}-{length['max']} AA** (desv. estándar {length['std']:.1f})",
+        f"- Secuencias con aminoácidos no estándar: **{stats['nonstd_ratio']:.1%}**",
+    ]
+    if not stats["q3_counts"].empty:
+        lines.append(f"- Estructura secundaria dominante: **{_q3_label(stats['q3_counts'].index[0])}**")
+    return "\n".join(lines)
+
+
+def _answer_longest(stats: Dict[str, Any], top_n: int) -> str:
+    longest = stats["longest"].head(top_n)
+    lines = [f"**🔍 Las {len(longest)} secuencias más largas**", ""]
+    for rank, (idx, row) in enumerate(longest.iterrows(), start=1):
+        label = " ".join(str(row[c]) for c in ("pdb_id", "chain_code") if c in row.index)
+        details = [f"{int(row['len'])} AA", "con AA no estándar" if row["has_nonstd_aa"] else "solo AA estándar"]
+        if "pct_H" in row.index:
+            details.append(f"H {row['pct_H']:.0f}% / E {row['pct_E']:.0f}% / C {row['pct_C']:.0f}%")
+        if "Exptl." in row.index and pd.notna(row["Exptl."]):
+            details.append(str(row["Exptl."]))
+        if "resolution" in row.index and pd.notna(row["resolution"]):
+            details.append(f"{row['resolution']:.2f} Å")
+        lines.append(f"{rank}. **{label or f'Fila {idx}'}**: " + " · ".join(details))
+    return "\n".join(lines)
+
+
+def _answer_length_distribution(stats: Dict[str, Any]) -> str:
+    length = stats["length"]
+    return "\n".join([
+        "**📏 Distribución de longitudes**",
+        f"- Promedio: **{length['mean']:.1f} AA** · Mediana: **{length['median']:.0f} AA** · "
+        f"Desv. estándar: **{length['std']:.1f}**",
+        f"- Cuartiles: Q1 = {length['q1']:.0f}, Q3 = {length['q3']:.0f} (IQR = {length['q3'] - length['q1']:.0f})",
+        f"- Rango: {length['min']}-{length['max']} AA",
+        f"- Valores atípicos (criterio 1.5·IQR, fuera de [{length['lower_fence']:.0f}, {length['upper_fence']:.0f}]): "
+        f"**{length['outliers_low']:,}** por debajo y **{length['outliers_high']:,}** por encima",
+        "- La distribución está sesgada a la derecha" if length["mean"] > length["median"]
+        else "- La distribución no presenta sesgo a la derecha",
+    ])
+
+
+def _q3_label(state: str) -> str:
+    return f"{STRUCTURE_NAMES[state]} ({state})" if state in STRUCTURE_NAMES else state
+
+
+def _answer_secondary_structure(stats: Dict[str, Any]) -> str:
+    counts = stats["q3_counts"]
+    if counts.empty:
+        return "El dataset no contiene información de estructura secundaria (`sst3`)."
+    total = counts.sum()
+    lines = [f"**🧬 Estructura secundaria más común:** {_q3_label(counts.index[0])}", ""]
+    lines.extend(f"- {_q3_label(state)}: {count:,} residuos ({count / total:.1%})" for state, count in counts.items())
+    return "\n".join(lines)
+
+
+def answer_intent(intent: str, stats: Dict[str, Any], question: str = "") -> str:
+    """
+    Genera la respuesta en Markdown para una intención a partir de las estadísticas.
+
+    Args:
+        intent (str): Intención reconocida por detect_intent
+        stats (Dict[str, Any]): Resultado de precompute_dataset_stats
+        question (str): Pregunta original (para parámetros como el top N)
+
+    Returns:
+        str: Respuesta formateada
+    """
+    if intent == "dataset_summary":
+        return _answer_summary(stats)
+    if intent == "longest_sequences":
+        return _answer_longest(stats, _requested_top_n(question))
+    if intent == "length_distribution":
+        return _answer_length_distribution(stats)
+    if intent == "secondary_structure":
+        return _answer_secondary_structure(stats)
+    raise ValueError(f"Intención desconocida: {intent}")
+
+
+def fast_path_answer(question: str, stats: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Responde la pregunta sin LLM si corresponde a una intención conocida.
+
+    Args:
+        question (str): Pregunta del usuario
+        stats (Dict[str, Any], optional): Estadísticas precalculadas del dataset
+
+    Returns:
+        Optional[str]: Respuesta determinista, o None si debe responder el agente
+    """
+    if not FAST_PATH_CONFIG.get("enabled", True) or not stats:
+        return None
+    intent = detect_intent(question)
+    if intent is None:
+        return None
+    return answer_intent(intent, stats, question)
@@ -0,0 +1,158 @@
+"""
+Lector en streaming de archivos FASTA de proteínas.
+
+Admite dos variantes:
+- FASTA de secuencias (ej. ``pdb_seqres.txt``: ``>101m_A mol:protein ...``,
+  ``>pdb|101M|A`` o cualquier identificador en la primera palabra).
+- FASTA de estructura secundaria de RCSB (``ss.txt``), con dos registros por
+  cadena: ``>101M:A:sequence`` y ``>101M:A:secstr``. La estructura usa los 8
+  estados de DSSP con espacio para coil; se normaliza a 'C' (``sst8``) y se reduce
+  a 3 estados (``sst3``: H/G/I -> H, E/B -> E, resto -> C).
+
+El archivo se lee por bloques y los registros se convierten en DataFrames de
+``FASTA_CHUNK_RECORDS`` filas. ``len`` y ``has_nonstd_aa`` se derivan con
+operaciones vectorizadas sobre los bytes concatenados del bloque (tabla de
+búsqueda de 256 posiciones y sumas acumuladas), sin recorrer cada residuo en Python.
+"""
+
+import re
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Registros por bloque de conversión
+FASTA_CHUNK_RECORDS = 50_000
+
+# Bytes leídos por bloque del archivo
+_READ_BLOCK = 1024 * 1024
+
+STANDARD_AMINO_ACIDS = b"ACDEFGHIKLMNPQRSTVWY"
+
+# Reducción estándar de DSSP (8 estados) a 3 estados
+SST8_TO_SST3 = bytes.maketrans(b"HGIEBTSC", b"HHHEECCC")
+
+# Tabla de búsqueda: True para bytes que no son aminoácidos estándar
+_NONSTANDARD_LUT = np.ones(256, dtype=bool)
+_NONSTANDARD_LUT[np.frombuffer(STANDARD_AMINO_ACIDS, dtype=np.uint8)] = False
+
+_SS_HEADER = re.compile(r"^(\w{4}):(\w+):(sequence|secstr)$")
+_SEQRES_HEADER = re.compile(r"^(\w{4})_(\w+)\b")
+_PIPE_HEADER = re.compile(r"^pdb\|(\w{4})\|(\w+)", re.IGNORECASE)
+
+
+def derive_sequence_columns(sequences: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula longitud y presencia de aminoácidos no estándar de un bloque de secuencias.
+
+    Args:
+        sequences (List[str]): Secuencias de aminoácidos (una letra)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Longitudes (int32) y banderas has_nonstd_aa (bool)
+    """
+    lengths = np.fromiter((len(seq) for seq in sequences), dtype=np.int64, count=len(sequences))
+    buffer = np.frombuffer("".join(sequences).upper().encode("ascii", errors="replace"), dtype=np.uint8)
+    # Número de residuos no estándar por secuencia: diferencia de la suma acumulada en sus límites
+    cumulative = np.concatenate([[0], np.cumsum(_NONSTANDARD_LUT[buffer], dtype=np.int64)])
+    ends = np.cumsum(lengths)
+    nonstandard = cumulative[ends] - cumulative[ends - lengths]
+    return lengths.astype(np.int32), nonstandard > 0
+
+
+def parse_header(header: str) -> Tuple[str, str, Optional[str]]:
+    """
+    Extrae (pdb_id, chain_code, tipo) de un encabezado FASTA.
+
+    El tipo es 'sequence' o 'secstr' en archivos ss.txt y None en FASTA de secuencias.
+    """
+    match = _SS_HEADER.match(header)
+    if match:
+        return match.group(1).upper(), match.group(2), match.group(3)
+    match = _SEQRES_HEADER.match(header) or _PIPE_HEADER.match(header)
+    if match:
+        return match.group(1).upper(), match.group(2), None
+    return header.split(maxsplit=1)[0] if header.strip() else "", "", None
+
+
+def iter_records(stream) -> Iterator[Tuple[str, str]]:
+    """
+    Itera los registros (encabezado, cuerpo) de un FASTA leído por bloques.
+
+    Se eliminan los saltos de línea del cuerpo pero no los espacios, que en ss.txt
+    representan coil.
+    """
+    pending = b""
+    while True:
+        block = stream.read(_READ_BLOCK)
+        records = (pending + block).split(b"\n>")
+        # El último registro puede continuar en el siguiente bloque
+        pending = records.pop() if block else b""
+        for raw in records:
+            header, _, body = raw.lstrip(b">").partition(b"\n")
+            if not header.strip() and not body.strip():
+                continue
+            yield (
+                header.decode(errors="replace").strip(),
+                body.replace(b"\r", b"").replace(b"\n", b"").decode(errors="replace"),
+            )
+        if not block:
+            return
+
+
+def _records_to_frame(records: List[dict], with_structure: bool) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(records, columns=["pdb_id", "chain_code", "seq", "sst8"])
+    if with_structure:
+        df["sst8"] = df["sst8"].fillna("")
+        df["sst3"] = [sst8.encode().translate(SST8_TO_SST3).decode() for sst8 in df["sst8"]]
+    else:
+        df = df.drop(columns="sst8")
+    df["len"], df["has_nonstd_aa"] = derive_sequence_columns(df["seq"].tolist())
+    return df
+
+
+def read_fasta_frames(stream, chunk_records: int = FASTA_CHUNK_RECORDS) -> Iterator[pd.DataFrame]:
+    """
+    Lee un FASTA como bloques de DataFrame con columnas derivadas.
+
+    Args:
+        stream: Objeto file-like binario (puede ser un flujo descomprimido, no posicionable)
+        chunk_records (int): Cadenas por bloque
+
+    Yields:
+        pd.DataFrame: Columnas pdb_id, chain_code, seq, [sst8, sst3], len, has_nonstd_aa
+    """
+    rows: List[dict] = []
+    with_structure = False
+    current = None  # Cadena de ss.txt a la que se asocian sequence/secstr consecutivos
+
+    for header, body in iter_records(stream):
+        pdb_id, chain, kind = parse_header(header)
+        if kind is None:
+            rows.append({"pdb_id": pdb_id, "chain_code": chain, "sequence": body})
+            current = None
+        else:
+            with_structure = True
+            if current is None or (current["pdb_id"], current["chain_code"]) != (pdb_id, chain) or kind in current:
+                current = {"pdb_id": pdb_id, "chain_code": chain}
+                rows.append(current)
+            current[kind] = body
+
+        if len(rows) > chunk_records:
+            # Se conserva la última cadena: su par sequence/secstr puede venir a continuación
+            yield _records_to_frame(_finalize(rows[:-1]), with_structure)
+            rows = rows[-1:]
+
+    if rows:
+        yield _records_to_frame(_finalize(rows), with_structure)
+
+
+def _finalize(rows: List[dict]) -> List[dict]:
+    """Normaliza la secuencia y ajusta la estructura (espacio -> 'C', misma longitud que la secuencia)."""
+    for row in rows:
+        row["seq"] = row.pop("sequence", "").replace(" ", "").upper()
+        secstr = row.pop("secstr", None)
+        if secstr is not None:
+            row["sst8"] = secstr.replace(" ", "C")[:len(row["seq"])].ljust(len(row["seq"]), "C")
+    return rows
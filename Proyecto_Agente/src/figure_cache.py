@@ -0,0 +1,151 @@
+"""
+Caché de figuras del EDA ya renderizadas (PNG/SVG), compartida entre reruns y sesiones.
+
+Cada rerun de Streamlit volvía a llamar a las funciones ``plot_*`` de ``eda.py`` y
+seaborn/matplotlib rehacían las siete figuras aunque nada hubiera cambiado; el
+reporte PDF las rehacía otra vez. Aquí cada figura se guarda como bytes
+renderizados con la clave:
+
+    (gráfico, huella del dataset, parámetros del filtro, estilo)
+
+donde el estilo resume ``VIZ_CONFIG`` y el formato/dpi de ``FIGURE_CACHE_CONFIG``.
+La función de dibujo solo se llama si la figura no está en caché, así que un
+gráfico sin cambios cuesta una búsqueda en un diccionario. La memoria se acota por
+bytes totales (``max_bytes``) con expulsión LRU.
+
+Example:
+    >>> png = cached_figure("q3_distribution", dataset_fingerprint(df), lambda: plot_q3_distribution(df))
+    >>> st.image(png)
+"""
+
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from config import FIGURE_CACHE_CONFIG, VIZ_CONFIG
+
+
+# Clave -> bytes renderizados
+_FIGURE_CACHE: "OrderedDict[Tuple[str, str, str, str], bytes]" = OrderedDict()
+_cache_bytes = 0
+_stats = {"hits": 0, "misses": 0}
+_LOCK = threading.Lock()
+
+
+def style_key(fmt: Optional[str] = None) -> str:
+    """Resumen del estilo de las figuras: un cambio de configuración invalida las entradas."""
+    style = {
+        "viz": VIZ_CONFIG,
+        "format": fmt or FIGURE_CACHE_CONFIG.get("format", "png"),
+        "dpi": FIGURE_CACHE_CONFIG.get("dpi", 200),
+    }
+    return hashlib.sha256(json.dumps(style, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _params_key(params: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def render_figure(fig: Figure, fmt: Optional[str] = None) -> bytes:
+    """
+    Renderiza una figura a bytes y la cierra para liberar memoria.
+
+    Args:
+        fig (Figure): Figura de matplotlib
+        fmt (str, opcional): 'png' o 'svg' (por defecto ``FIGURE_CACHE_CONFIG['format']``)
+
+    Returns:
+        bytes: Imagen renderizada
+    """
+    fmt = fmt or FIGURE_CACHE_CONFIG.get("format", "png")
+    try:
+        with io.BytesIO() as buffer:
+            fig.savefig(buffer, format=fmt, bbox_inches="tight", dpi=FIGURE_CACHE_CONFIG.get("dpi", 200))
+            return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def cached_figure(
+    name: str,
+    fingerprint: str,
+    draw: Callable[[], Figure],
+    params: Optional[Dict[str, Any]] = None,
+    fmt: Optional[str] = None,
+) -> bytes:
+    """
+    Figura renderizada desde la caché, o dibujada y guardada si no está.
+
+    Args:
+        name (str): Nombre del gráfico (ej. 'length_distribution'); la misma figura
+            debe usar el mismo nombre en el dashboard y en el reporte
+        fingerprint (str): Huella del dataset completo
+        draw (Callable[[], Figure]): Dibuja la figura; solo se llama si no está en caché
+        params (Dict[str, Any], opcional): Parámetros que cambian la figura (ej. el
+            rango del filtro); None para el dataset sin filtrar
+        fmt (str, opcional): 'png' o 'svg'
+
+    Returns:
+        bytes: Imagen renderizada
+    """
+    image = lookup_figure(name, fingerprint, params, fmt)
+    if image is None:
+        image = render_figure(draw(), fmt)
+        store_figure(name, fingerprint, image, params, fmt)
+    return image
+
+
+def lookup_figure(name: str, fingerprint: str, params: Optional[Dict[str, Any]] = None,
+                  fmt: Optional[str] = None) -> Optional[bytes]:
+    """Figura renderizada en caché, o None (cuenta un acierto o un fallo)."""
+    if not FIGURE_CACHE_CONFIG.get("enabled", True):
+        return None
+    key = (name, fingerprint, _params_key(params), style_key(fmt))
+    with _LOCK:
+        image = _FIGURE_CACHE.get(key)
+        if image is not None:
+            _FIGURE_CACHE.move_to_end(key)
+            _stats["hits"] += 1
+            return image
+        _stats["misses"] += 1
+        return None
+
+
+def store_figure(name: str, fingerprint: str, image: bytes, params: Optional[Dict[str, Any]] = None,
+                 fmt: Optional[str] = None) -> None:
+    """Guarda una figura ya renderizada (ej. por un proceso del ``eda_executor``), con expulsión LRU."""
+    global _cache_bytes
+    max_bytes = FIGURE_CACHE_CONFIG.get("max_bytes", 64 * 1024 ** 2)
+    if not FIGURE_CACHE_CONFIG.get("enabled", True) or len(image) > max_bytes:
+        return
+    key = (name, fingerprint, _params_key(params), style_key(fmt))
+    with _LOCK:
+        previous = _FIGURE_CACHE.pop(key, None)
+        if previous is not None:
+            _cache_bytes -= len(previous)
+        _FIGURE_CACHE[key] = image
+        _cache_bytes += len(image)
+        while _cache_bytes > max_bytes:
+            _, evicted = _FIGURE_CACHE.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+def figure_cache_stats() -> Dict[str, int]:
+    """Entradas, bytes, aciertos y fallos de la caché de figuras."""
+    with _LOCK:
+        return {"entries": len(_FIGURE_CACHE), "bytes": _cache_bytes, **_stats}
+
+
+def clear_figure_cache() -> None:
+    """Vacía la caché de figuras."""
+    global _cache_bytes
+    with _LOCK:
+        _FIGURE_CACHE.clear()
+        _cache_bytes = 0
+        _stats.update(hits=0, misses=0)
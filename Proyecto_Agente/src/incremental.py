@@ -0,0 +1,409 @@
+"""
+Agregados incrementales y ampliación del dataset de la sesión.
+
+Añadir unas cientos de cadenas a un dataset cargado obligaba a volver a subirlo
+todo, repetir "Iniciar Análisis Completo" y recalcular cada estadística. Este
+módulo mantiene los agregados del EDA de forma incremental:
+
+- ``RunningStats``: conteo, media, varianza (Welford / Chan et al.), mínimo y máximo.
+- ``LengthHistogram``: histograma exacto de 'len' (cuantiles y valores atípicos).
+- ``DatasetAggregates``: los anteriores por columna, más conteos de residuos Q3/Q8,
+  proporción de aminoácidos no estándar y candidatas a secuencias más largas. Con
+  ellos se generan ``fast_stats`` y el contexto del EDA sin recorrer el dataset.
+
+``append_rows`` añade filas al dataset, actualiza los agregados con solo las filas
+nuevas e indica qué gráficos del EDA reciben datos nuevos (los que dependen de
+columnas con valores en las filas añadidas, ver ``ARTIFACT_COLUMNS``). Es solo
+informativo: el dataset ampliado tiene otra huella, así que sus figuras y artefactos
+perezosos del perfil (índice de longitudes, segmentos, composición...) se calculan de
+nuevo al pedirse.
+
+Example:
+    >>> aggregates = DatasetAggregates.from_frame(df)
+    >>> df, affected = append_rows(df, nuevas_cadenas, aggregates)
+    >>> aggregates.fast_stats(df)["rows"]
+"""
+
+import hashlib
+import math
+from io import StringIO
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import FAST_PATH_CONFIG, OUT_OF_CORE_CONFIG
+from dataset_cache import dataset_fingerprint
+from fast_answers import longest_sequences_table
+from fasta_reader import derive_sequence_columns
+from io_utils import optimize_dtypes, reconcile_columns, reconcile_dtypes
+from packed import PackedSequences
+from residue_counts import Q3_ALPHABET, Q8_ALPHABET, symbol_counts
+
+
+# Artefactos del EDA y columnas (en minúsculas) que necesita cada fila para aportar
+# datos al artefacto; un conjunto vacío indica que depende de todas las filas
+ARTIFACT_COLUMNS = {
+    "length_distribution": {"len"},
+    "q3_distribution": {"sst3"},
+    "nonstd_aa_pie": {"has_nonstd_aa"},
+    "resolution_distribution": {"resolution"},
+    "rfactor_distribution": {"r-factor"},
+    "experimental_methods": {"exptl."},
+    "length_vs_resolution": {"len", "resolution"},
+    "q8_distribution": {"sst8"},
+    "q8_q3_consistency": {"sst8", "sst3"},
+    "segment_lengths": {"sst3"},
+    "segments_per_chain": {"sst3"},
+    "q8_segment_lengths": {"sst8"},
+    "aa_composition": {"seq"},
+    "composition_by_length": {"seq"},
+    "insights": set(),
+}
+
+# ============================================================
+# AGREGADOS INCREMENTALES
+# ============================================================
+
+class RunningStats:
+    """
+    Media, varianza, mínimo y máximo en una pasada (Welford / Chan et al.).
+
+    Cada bloque se resume con numpy y se combina con el acumulado, de modo que el
+    resultado es exacto y numéricamente estable independientemente del número de
+    bloques.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """Incorpora un bloque de valores (los NaN se ignoran)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n_block = len(values)
+        if n_block == 0:
+            return
+        block_mean = float(values.mean())
+        block_m2 = float(((values - block_mean) ** 2).sum())
+        total = self.count + n_block
+        delta = block_mean - self.mean
+        self.mean += delta * n_block / total
+        self.m2 += block_m2 + delta ** 2 * self.count * n_block / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self) -> float:
+        """Desviación estándar muestral (como pandas)."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else float("nan")
+
+
+class LengthHistogram:
+    """
+    Histograma exacto de longitudes enteras (un bin por longitud).
+
+    Permite cuantiles exactos (con la misma interpolación lineal que pandas) sin
+    guardar los valores. Las longitudes mayores que ``max_length`` se acumulan en el
+    último bin para que la memoria no dependa de los datos.
+    """
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length
+        self.counts = np.zeros(max_length + 1, dtype=np.int64)
+
+    def update(self, lengths: np.ndarray) -> None:
+        lengths = np.asarray(lengths, dtype=np.float64)
+        lengths = lengths[~np.isnan(lengths)]
+        clipped = np.clip(lengths, 0, self.max_length).astype(np.int64)
+        self.counts += np.bincount(clipped, minlength=self.max_length + 1)
+
+    @property
+    def total(self) -> int:
+        return int(self.counts.sum())
+
+    def quantile(self, q: float) -> float:
+        """Cuantil exacto con interpolación lineal entre estadísticos de orden."""
+        cumulative = np.cumsum(self.counts)
+        position = (cumulative[-1] - 1) * q
+        lower, upper = math.floor(position), math.ceil(position)
+        lower_value = int(np.searchsorted(cumulative, lower, side="right"))
+        upper_value = int(np.searchsorted(cumulative, upper, side="right"))
+        return float(lower_value + (upper_value - lower_value) * (position - lower))
+
+    def count_below(self, value: float) -> int:
+        """Número de longitudes estrictamente menores que ``value``."""
+        return int(self.counts[:max(math.ceil(value), 0)].sum())
+
+    def count_above(self, value: float) -> int:
+        """Número de longitudes estrictamente mayores que ``value``."""
+        return int(self.counts[max(math.floor(value) + 1, 0):].sum())
+
+    def count_between(self, low: int, high: int) -> int:
+        """Número de longitudes en el rango cerrado [low, high]."""
+        return int(self.counts[max(low, 0):max(high + 1, 0)].sum())
+
+    def range_summary(self, low: int, high: int) -> Dict[str, Any]:
+        """
+        Filas, media y extremos de las longitudes en el rango cerrado [low, high].
+
+        Returns:
+            Dict[str, Any]: rows, mean, min y max (None si el rango no tiene filas)
+        """
+        low, high = max(low, 0), min(high, self.max_length)
+        counts = self.counts[low:high + 1] if high >= low else self.counts[:0]
+        rows = int(counts.sum())
+        if not rows:
+            return {"rows": 0, "mean": None, "min": None, "max": None}
+        present = np.flatnonzero(counts)
+        lengths = np.arange(low, low + len(counts), dtype=np.float64)
+        return {"rows": rows, "mean": float(lengths @ counts) / rows,
+                "min": int(low + present[0]), "max": int(low + present[-1])}
+
+    def nonzero(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Longitudes presentes y su frecuencia."""
+        present = np.flatnonzero(self.counts)
+        return present, self.counts[present]
+
+
+def summarize_lengths(stats: RunningStats, histogram: LengthHistogram) -> Dict[str, float]:
+    """
+    Estadísticas de longitud con la estructura de ``precompute_dataset_stats``.
+
+    Args:
+        stats (RunningStats): Agregados de la columna 'len'
+        histogram (LengthHistogram): Histograma de la columna 'len'
+
+    Returns:
+        Dict[str, float]: Media, mediana, desviación, extremos, cuartiles y valores atípicos (IQR)
+    """
+    q1, median, q3 = (histogram.quantile(q) for q in (0.25, 0.5, 0.75))
+    iqr = q3 - q1
+    lower, upper = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    return {
+        "mean": stats.mean,
+        "median": median,
+        "std": stats.std,
+        "min": int(stats.min),
+        "max": int(stats.max),
+        "q1": q1,
+        "q3": q3,
+        "lower_fence": lower,
+        "upper_fence": upper,
+        "outliers_low": histogram.count_below(lower),
+        "outliers_high": histogram.count_above(upper),
+    }
+
+
+# ============================================================
+# AGREGADOS DEL DATASET EN MEMORIA
+# ============================================================
+
+class DatasetAggregates:
+    """
+    Agregados del EDA de un dataset en memoria, actualizables con filas nuevas.
+
+    Attributes:
+        rows (int): Filas incorporadas
+        numeric_stats (Dict[str, RunningStats]): Agregados por columna numérica
+        length_histogram (LengthHistogram): Histograma de 'len'
+        q3_byte_counts, q8_byte_counts (np.ndarray): Conteo de residuos por byte
+        nonstd_true, nonstd_valid (int): Filas con aminoácidos no estándar / con valor
+        longest (pd.Series): Longitud de las candidatas a secuencias más largas (por índice)
+        fingerprint (str): Huella del dataset que describen los agregados
+    """
+
+    def __init__(self, max_length: Optional[int] = None):
+        self.rows = 0
+        self.numeric_stats: Dict[str, RunningStats] = {}
+        self.length_histogram = LengthHistogram(max_length or OUT_OF_CORE_CONFIG.get("max_tracked_length", 100_000))
+        self.q3_byte_counts = np.zeros(256, dtype=np.int64)
+        self.q8_byte_counts = np.zeros(256, dtype=np.int64)
+        self.nonstd_true = 0
+        self.nonstd_valid = 0
+        self.longest = pd.Series(dtype="float64")
+        self.fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "DatasetAggregates":
+        """Construye los agregados de un dataset completo (una pasada)."""
+        aggregates = cls()
+        aggregates.update(df)
+        aggregates.fingerprint = dataset_fingerprint(df)
+        return aggregates
+
+    def update(self, rows: pd.DataFrame) -> None:
+        """
+        Incorpora filas nuevas a los agregados.
+
+        Args:
+            rows (pd.DataFrame): Filas añadidas, con el índice que tienen en el dataset
+        """
+        self.rows += len(rows)
+        columns = {str(col).lower(): col for col in rows.columns}
+        for col in rows.columns:
+            series = rows[col]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                self.numeric_stats.setdefault(col, RunningStats()).update(values)
+
+        if "len" in columns:
+            lengths = rows[columns["len"]].astype(float)
+            self.length_histogram.update(lengths.to_numpy())
+            top_n = FAST_PATH_CONFIG.get("max_top_n", 20)
+            # Las candidatas anteriores van primero: en empates, gana la fila más antigua (como nlargest)
+            self.longest = pd.concat([self.longest, lengths.nlargest(top_n)]).nlargest(top_n)
+        if "has_nonstd_aa" in columns:
+            flags = rows[columns["has_nonstd_aa"]]
+            valid = flags.notna()
+            self.nonstd_true += int(flags[valid].astype(bool).sum())
+            self.nonstd_valid += int(valid.sum())
+        if "sst3" in columns:
+            self.q3_byte_counts += PackedSequences.from_series(rows[columns["sst3"]]).byte_counts()
+        if "sst8" in columns:
+            self.q8_byte_counts += PackedSequences.from_series(rows[columns["sst8"]]).byte_counts()
+
+    # ---- Métricas ----
+
+    @property
+    def nonstd_ratio(self) -> float:
+        return self.nonstd_true / self.nonstd_valid if self.nonstd_valid else 0.0
+
+    def q3_counts(self) -> pd.Series:
+        return symbol_counts(self.q3_byte_counts, Q3_ALPHABET)
+
+    def q8_counts(self) -> pd.Series:
+        return symbol_counts(self.q8_byte_counts, Q8_ALPHABET)
+
+    def _len_stats(self, df: pd.DataFrame) -> Optional[RunningStats]:
+        column = next((col for col in df.columns if str(col).lower() == "len"), None)
+        return self.numeric_stats.get(column)
+
+    def describe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Equivalente a ``df.describe()``.
+
+        count, mean, std, min y max salen de los agregados; los cuartiles de 'len'
+        del histograma y los del resto de columnas numéricas de ``df``.
+        """
+        summary = {}
+        for name, stats in self.numeric_stats.items():
+            if str(name).lower() == "len":
+                quartiles = [self.length_histogram.quantile(q) for q in (0.25, 0.5, 0.75)]
+            else:
+                quartiles = df[name].astype(float).quantile([0.25, 0.5, 0.75]).tolist()
+            summary[name] = [float(stats.count), stats.mean, stats.std, stats.min, *quartiles, stats.max]
+        return pd.DataFrame(summary, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"])
+
+    def fast_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Estadísticas con la estructura de ``fast_answers.precompute_dataset_stats``."""
+        candidates = df.loc[self.longest.index]
+        return {
+            "rows": int(len(df)),
+            "columns": int(df.shape[1]),
+            "column_names": list(df.columns),
+            "length": summarize_lengths(self._len_stats(df), self.length_histogram),
+            "nonstd_ratio": self.nonstd_ratio,
+            "longest": longest_sequences_table(candidates, FAST_PATH_CONFIG.get("max_top_n", 20)),
+            "q3_counts": self.q3_counts(),
+        }
+
+    def eda_context(self, df: pd.DataFrame) -> str:
+        """Contexto del EDA para el agente (``df.info()`` + estadísticas descriptivas)."""
+        buffer = StringIO()
+        df.info(buf=buffer)
+        return f"Resumen del Dataset:\n{buffer.getvalue()}\n\nEstadísticas Descriptivas:\n{self.describe(df).to_string()}"
+
+
+# ============================================================
+# AMPLIACIÓN DEL DATASET
+# ============================================================
+
+def affected_artifacts(new_rows: pd.DataFrame) -> Set[str]:
+    """
+    Artefactos del EDA que reciben datos nuevos al añadir ``new_rows``.
+
+    Un artefacto recibe datos solo si alguna fila nueva tiene valor en todas sus
+    columnas; por ejemplo, cadenas sin 'resolution' no aportan al histograma de
+    resoluciones ni al gráfico de longitud vs. resolución.
+    """
+    if new_rows.empty:
+        return set()
+    columns = {str(col).lower(): col for col in new_rows.columns}
+    present = new_rows.notna()
+    affected = set()
+    for name, required in ARTIFACT_COLUMNS.items():
+        if not required:
+            affected.add(name)
+        elif required <= columns.keys() and present[[columns[col] for col in required]].all(axis=1).any():
+            affected.add(name)
+    return affected
+
+
+def _derive_missing_columns(df: pd.DataFrame, new_rows: pd.DataFrame) -> pd.DataFrame:
+    """Completa 'len' y 'has_nonstd_aa' de las filas nuevas a partir de 'seq' (donde falten)."""
+    seq = next((col for col in new_rows.columns if str(col).lower() == "seq"), None)
+    if seq is None:
+        return new_rows
+    sequences = new_rows[seq]
+    valid = sequences.notna().to_numpy()
+    lengths, nonstd = derive_sequence_columns(sequences[valid].astype(str).tolist())
+    for key, values in (("len", lengths), ("has_nonstd_aa", nonstd)):
+        target = next((col for col in df.columns if str(col).lower() == key), None)
+        if target is None:
+            continue
+        derived = pd.Series(values, index=new_rows.index[valid]).reindex(new_rows.index)
+        existing = next((col for col in new_rows.columns if str(col).lower() == key), None)
+        if existing is None:
+            new_rows[target] = derived
+        else:
+            new_rows[existing] = new_rows[existing].astype(object).where(new_rows[existing].notna(), derived)
+    return new_rows
+
+
+def append_rows(
+    df: pd.DataFrame, new_rows: pd.DataFrame, aggregates: DatasetAggregates
+) -> Tuple[pd.DataFrame, Set[str]]:
+    """
+    Añade filas al dataset y actualiza los agregados solo con ellas.
+
+    Las columnas se alinean sin distinguir mayúsculas/minúsculas (las que faltan en
+    las filas nuevas quedan vacías, salvo 'len' y 'has_nonstd_aa', que se derivan de
+    'seq') y los tipos se unifican como en la carga de varios archivos. El dataset original no se modifica (puede estar compartido por
+    la caché de datasets).
+
+    Args:
+        df (pd.DataFrame): Dataset actual
+        new_rows (pd.DataFrame): Filas a añadir
+        aggregates (DatasetAggregates): Agregados de ``df``; se actualizan en el sitio
+
+    Returns:
+        Tuple[pd.DataFrame, Set[str]]: Dataset ampliado y artefactos del EDA que reciben datos nuevos
+
+    Raises:
+        ValueError: Si las filas nuevas tienen columnas que no existen en el dataset
+    """
+    known = {str(col).lower() for col in df.columns}
+    unknown = [col for col in new_rows.columns if str(col).lower() not in known]
+    if unknown:
+        raise ValueError(f"Las filas nuevas tienen columnas que no existen en el dataset: {', '.join(map(str, unknown))}")
+    if aggregates.fingerprint != dataset_fingerprint(df):
+        raise ValueError("Los agregados no corresponden al dataset actual.")
+
+    new_rows = optimize_dtypes(_derive_missing_columns(df, new_rows.copy()))
+    base, addition = reconcile_dtypes(reconcile_columns([df.copy(deep=False), new_rows]))
+    combined = pd.concat([base, addition], ignore_index=True)
+
+    # Huella del dataset ampliado: la anterior más el contenido de las filas nuevas
+    digest = hashlib.sha256(aggregates.fingerprint.encode())
+    digest.update(pd.util.hash_pandas_object(addition, index=False).to_numpy().tobytes())
+    combined.attrs = {"fingerprint": digest.hexdigest()}
+
+    aggregates.update(combined.iloc[len(df):])
+    aggregates.fingerprint = combined.attrs["fingerprint"]
+    return combined, affected_artifacts(new_rows)
@@ -2,20 +2,110 @@
 Utilidades de entrada/salida (I/O) para manejo de archivos.
 
 Este módulo proporciona funciones para leer archivos de diferentes formatos
-(CSV, Excel) de manera robusta, con detección automática de delimitadores.
+(CSV, Excel, FASTA) de manera robusta, con detección automática de delimitadores.
+
+Los CSV se leen por bloques y cada bloque se convierte a tipos compactos
+(bool, int32, float32, categorías para códigos repetidos) antes de acumularse,
+de modo que el pico de memoria es una fracción del de ``pd.read_csv`` con tipos
+por defecto. Los .xlsx se leen fila a fila en streaming (xlsx_reader, o el motor
+calamine si está instalado), con las hojas seleccionadas en paralelo y la misma
+optimización de tipos. Los FASTA se leen en streaming con fasta_reader, que deriva
+'len' y 'has_nonstd_aa' al vuelo; los CSV y FASTA pueden venir comprimidos.
 
 Author: Juan Felipe Cardona
 Date: 2024
 """
 
 import pandas as pd
+import numpy as np
+import bz2
 import csv
-from typing import Optional
+import gzip
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import fasta_reader
+import xlsx_reader
+from config import CSV_READER_CONFIG
+from logger import app_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    HAS_PYARROW = True
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = pa_csv = None
+    HAS_PYARROW = False
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+    zstandard = None
+
+try:
+    # Motor nativo (Rust) para Excel; si no está instalado, los .xlsx se leen con xlsx_reader
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = "streaming"
 
 
 # Límite de tamaño de archivo (25 MB)
 MAX_FILE_SIZE = 25 * 1024 * 1024
 
+# Límite del contenido descomprimido de .gz/.bz2/.zst (protección frente a bombas de compresión)
+MAX_DECOMPRESSED_SIZE = 256 * 1024 * 1024
+
+COMPRESSED_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".zst": "zstd"}
+FASTA_EXTENSIONS = (".fasta", ".fa", ".faa")
+
+# Filas por bloque en la lectura de CSV
+CSV_CHUNK_ROWS = 100_000
+
+# Delimitadores candidatos de la detección rápida, en orden de preferencia
+_CANDIDATE_DELIMITERS = (",", ";", "\t", "|")
+
+# Lectura de Excel: procesos para leer hojas en paralelo, tamaño mínimo del libro para
+# usarlos y tamaño máximo del contenido descomprimido de un .xlsx
+EXCEL_MAX_WORKERS = 4
+EXCEL_PARALLEL_MIN_BYTES = 1024 * 1024
+EXCEL_MAX_UNCOMPRESSED = 512 * 1024 * 1024
+
+# Carga de varios archivos (fragmentos de un mismo dataset): número máximo de archivos,
+# tamaño total, procesos de lectura y tamaño total mínimo para leer en paralelo
+MAX_UPLOAD_FILES = 50
+MAX_TOTAL_UPLOAD_SIZE = 10 * MAX_FILE_SIZE
+INGEST_MAX_WORKERS = 4
+INGEST_PARALLEL_MIN_BYTES = 1024 * 1024
+
+# Tipos compactos de las columnas conocidas de los datasets PISCES/PDB
+# (la comparación de nombres no distingue mayúsculas/minúsculas)
+COLUMN_DTYPES = {
+    "pdb_id": "category",
+    "chain_code": "category",
+    "exptl.": "category",
+    "len": "int32",
+    "has_nonstd_aa": "bool",
+    "resolution": "float32",
+    "r-factor": "float32",
+    "freervalue": "float32",
+}
+
+# Columnas de texto libre que nunca se convierten a categoría
+SEQUENCE_COLUMNS = {"seq", "sst3", "sst8"}
+
+# Proporción máxima de valores únicos para inferir una categoría en columnas no declaradas
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+_BOOL_VALUES = {"true": True, "false": False, "1": True, "0": False, "t": True, "f": False}
+
 
 def get_file_size(file) -> int:
     """Obtiene el tamaño del archivo en bytes."""
@@ -31,16 +121,442 @@ def get_file_size(file) -> int:
     return size
 
 
-def read_any(file) -> Optional[pd.DataFrame]:
+def format_bytes(num_bytes: float) -> str:
+    """Formatea un tamaño en bytes de forma legible (KB, MB, GB)."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(num_bytes) < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{int(num_bytes)} B"
+        num_bytes /= 1024
+
+
+def _to_bool(series: pd.Series) -> pd.Series:
+    """Convierte una columna a bool (o 'boolean' si tiene nulos); sin cambios si no es booleana."""
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series):
+        if not series.dropna().isin([0, 1]).all():
+            return series
+        mapped = series.map({0: False, 1: True})
+    else:
+        mapped = series.astype("string").str.strip().str.lower().map(_BOOL_VALUES)
+        if mapped.isna().sum() != series.isna().sum():
+            return series
+    return mapped.astype("boolean") if mapped.isna().any() else mapped.astype(bool)
+
+
+def _to_numeric(series: pd.Series, dtype: str) -> pd.Series:
+    """Convierte a int32/float32 si no se pierden valores; enteros con nulos pasan a float32."""
+    numeric = series if pd.api.types.is_numeric_dtype(series) else pd.to_numeric(series, errors="coerce")
+    if numeric.isna().sum() != series.isna().sum():
+        return series
+    if dtype.startswith("int"):
+        info = np.iinfo(dtype)
+        if numeric.isna().any() or not (numeric.dropna() % 1 == 0).all():
+            return numeric.astype("float32")
+        if numeric.min() < info.min or numeric.max() > info.max:
+            return numeric.astype("int64")
+    return numeric.astype(dtype)
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte las columnas de un DataFrame a tipos compactos.
+
+    - Columnas conocidas (COLUMN_DTYPES): bool, int32, float32 o category.
+    - Otras columnas enteras: el entero más pequeño que contenga sus valores.
+    - Otras columnas de texto con pocos valores únicos: category.
+    - Columnas de secuencia (seq, sst3, sst8) de tipo object: texto respaldado por
+      Arrow (un buffer contiguo con offsets en lugar de un objeto str por fila).
+
+    Args:
+        df (pd.DataFrame): DataFrame con tipos por defecto de pandas
+
+    Returns:
+        pd.DataFrame: El mismo DataFrame con tipos compactos
+    """
+    for col in df.columns:
+        key = str(col).lower()
+        series = df[col]
+        target = COLUMN_DTYPES.get(key)
+        if target == "bool":
+            df[col] = _to_bool(series)
+        elif target in ("int32", "float32"):
+            df[col] = _to_numeric(series, target)
+        elif target == "category":
+            df[col] = series.astype("category")
+        elif key in SEQUENCE_COLUMNS:
+            if HAS_PYARROW and pd.api.types.is_object_dtype(series):
+                df[col] = series.astype("string[pyarrow]")
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)) and len(series) > 0:
+            if series.nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(series):
+                df[col] = series.astype("category")
+    return df
+
+
+def reconcile_dtypes(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """
+    Unifica los tipos de varios DataFrames con las mismas columnas para concatenarlos.
+
+    Las categorías se unifican (mismas categorías en todos los bloques) para que la
+    concatenación conserve el tipo 'category'; si un bloque tiene otro tipo, se usa
+    un tipo común (numérico más amplio, 'boolean' u 'object'). Los bloques en los que
+    la columna está vacía no influyen en el tipo común.
+
+    Args:
+        frames (List[pd.DataFrame]): Bloques con tipos ya optimizados
+
+    Returns:
+        List[pd.DataFrame]: Bloques con tipos idénticos columna a columna
+    """
+    if len(frames) <= 1:
+        return frames
+    for col in frames[0].columns:
+        # Las columnas sin valores (ej. ausentes en uno de los archivos) adoptan el tipo de las demás
+        typed = [frame for frame in frames if frame[col].notna().any()] or frames
+        dtypes = [frame[col].dtype for frame in typed]
+        if all(isinstance(dt, pd.CategoricalDtype) for dt in dtypes):
+            categories = pd.Index(
+                pd.unique(np.concatenate([np.asarray(dt.categories, dtype=object) for dt in dtypes]))
+            )
+            for frame in frames:
+                if isinstance(frame[col].dtype, pd.CategoricalDtype):
+                    frame[col] = frame[col].cat.set_categories(categories)
+                else:
+                    frame[col] = frame[col].astype(pd.CategoricalDtype(categories))
+            continue
+        if all(dt == dtypes[0] for dt in dtypes):
+            common = dtypes[0]
+        elif all(pd.api.types.is_bool_dtype(dt) for dt in dtypes):
+            common = "boolean"
+        elif all(isinstance(dt, np.dtype) and dt.kind in "iuf" for dt in dtypes):
+            common = np.result_type(*dtypes)
+        else:
+            common = object
+        if len(typed) < len(frames) and isinstance(common, np.dtype) and common.kind in "biu":
+            # Los tipos bool/entero de numpy no admiten nulos
+            common = "boolean" if common.kind == "b" else np.float64
+        for frame in frames:
+            if frame[col].dtype != common:
+                frame[col] = frame[col].astype(common)
+    return frames
+
+
+def memory_usage(df: pd.DataFrame) -> int:
+    """Memoria real (deep) ocupada por un DataFrame en bytes."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _combine_chunks(chunks, label: str) -> Optional[pd.DataFrame]:
+    """
+    Optimiza los tipos de cada bloque antes de acumularlo y los concatena.
+
+    Guarda en ``df.attrs['ingest_report']`` la memoria con tipos por defecto
+    (suma de los bloques sin optimizar) y con tipos compactos. Devuelve None si no
+    hay bloques.
+    """
+    frames = []
+    memory_before = 0
+    for chunk in chunks:
+        memory_before += memory_usage(chunk)
+        frames.append(optimize_dtypes(chunk))
+
+    if not frames:
+        return None
+
+    columns = list(dict.fromkeys(col for frame in frames for col in frame.columns))
+    if any(list(frame.columns) != columns for frame in frames):
+        frames = [frame.reindex(columns=columns) for frame in frames]
+    df = pd.concat(reconcile_dtypes(frames), ignore_index=True) if len(frames) > 1 else frames[0]
+    memory_after = memory_usage(df)
+    df.attrs["ingest_report"] = {
+        "rows": len(df),
+        "chunks": len(frames),
+        "memory_before": memory_before,
+        "memory_after": memory_after,
+    }
+    app_logger.info(
+        f"{label} ingerido en {len(frames)} bloque(s): {len(df):,} filas, "
+        f"memoria {format_bytes(memory_before)} -> {format_bytes(memory_after)}"
+    )
+    return df
+
+
+def _read_csv_chunked(file, delim: str) -> pd.DataFrame:
+    """Lee un CSV por bloques de CSV_CHUNK_ROWS filas con tipos compactos."""
+    df = _combine_chunks(pd.read_csv(file, delimiter=delim, chunksize=CSV_CHUNK_ROWS), "CSV")
+    if df is None:
+        return pd.read_csv(file, delimiter=delim)
+    return df
+
+
+def _read_csv_arrow(stream, delim: str, sample: bytes) -> pd.DataFrame:
+    """
+    Lee un CSV con el lector de Arrow por bloques y aplica los tipos compactos.
+
+    Los lotes de Arrow se agrupan en bloques de CSV_CHUNK_ROWS filas, los mismos que
+    usa el lector de pandas (mismos tipos y categorías por bloque), y cada bloque se
+    convierte a pandas y se compacta antes de leer el siguiente (``_combine_chunks``):
+    la memoria pico es la de un bloque más el resultado compacto.
+
+    Las columnas de texto conocidas (identificadores y secuencias) se declaran como
+    texto para que Arrow no las infiera como números en el primer bloque, y las
+    fechas inferidas se devuelven como texto, igual que con pandas.
+
+    Raises:
+        pa.ArrowInvalid: Si Arrow no puede leer el archivo (ej. filas con más campos
+            o un tipo inferido que no se cumple en bloques posteriores)
+        ValueError: Si hay nombres de columna repetidos (pandas los renombra)
+    """
+    header = next(csv.reader(io.StringIO(sample.decode(errors="ignore")), delimiter=delim), [])
+    text_columns = {
+        name: pa.string() for name in header
+        if name.lower() in SEQUENCE_COLUMNS or COLUMN_DTYPES.get(name.lower()) == "category"
+    }
+    reader = pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=CSV_READER_CONFIG.get("block_bytes", 4 * 1024 * 1024)),
+        parse_options=pa_csv.ParseOptions(delimiter=delim),
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True, column_types=text_columns),
+    )
+    schema = reader.schema
+    if len(set(schema.names)) != len(schema.names):
+        raise ValueError("Nombres de columna repetidos")
+    temporal = [index for index, field in enumerate(schema) if pa.types.is_temporal(field.type)]
+
+    def to_frame(table):
+        for index in temporal:
+            table = table.set_column(index, schema[index].name, table.column(index).cast(pa.string()))
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def frames():
+        pending, rows = [], 0
+        for batch in reader:
+            pending.append(batch)
+            rows += batch.num_rows
+            while rows >= CSV_CHUNK_ROWS:
+                table = pa.Table.from_batches(pending)
+                rest = table.slice(CSV_CHUNK_ROWS)
+                pending, rows = rest.to_batches(), rest.num_rows
+                yield to_frame(table.slice(0, CSV_CHUNK_ROWS))
+                del table, rest
+        if rows:
+            yield to_frame(pa.Table.from_batches(pending))
+
+    df = _combine_chunks(frames(), "CSV (Arrow)")
+    if df is None:
+        # Solo encabezado: DataFrame vacío con las columnas
+        return schema.empty_table().to_pandas()
+    return df
+
+
+def _read_csv(open_stream: Callable, delim: str, sample: bytes) -> pd.DataFrame:
+    """
+    Lee un CSV con el motor de CSV_READER_CONFIG.
+
+    Si Arrow no está disponible o no puede leer el archivo, se repite la lectura con
+    pandas por bloques, que produce el error descriptivo si el archivo es inválido.
+
+    Args:
+        open_stream (Callable): Devuelve el contenido como flujo binario desde el inicio
+            (se llama de nuevo si hay que repetir la lectura)
+        delim (str): Delimitador detectado
+        sample (bytes): Primeros bytes del contenido (para leer el encabezado)
+    """
+    if CSV_READER_CONFIG.get("engine", "pyarrow") == "pyarrow" and HAS_PYARROW:
+        try:
+            return _read_csv_arrow(open_stream(), delim, sample)
+        except (pa.ArrowException, ValueError) as e:
+            app_logger.info(f"Lector CSV de Arrow no aplicable, se usa pandas: {e}")
+    return _read_csv_chunked(open_stream(), delim)
+
+
+def _read_fasta(stream) -> pd.DataFrame:
+    """Lee un FASTA por bloques, derivando 'len' y 'has_nonstd_aa' (ver fasta_reader)."""
+    df = _combine_chunks(fasta_reader.read_fasta_frames(stream), "FASTA")
+    if df is None:
+        raise ValueError("El archivo FASTA no contiene secuencias.")
+    return df
+
+
+class _BoundedStream(io.RawIOBase):
+    """
+    Flujo de solo lectura que falla al superar un número máximo de bytes.
+
+    Protege la descompresión frente a bombas de compresión: el tamaño comprimido
+    se valida en ``read_any``, pero el descomprimido puede ser arbitrariamente mayor.
+    """
+
+    def __init__(self, stream, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self._read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        self._read += len(data)
+        if self._read > self._limit:
+            raise ValueError(
+                f"Error de seguridad: El contenido descomprimido excede el máximo de {format_bytes(self._limit)}."
+            )
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _decompress(file, codec: str):
+    """Abre un flujo descomprimido, acotado y con búfer (admite ``peek``)."""
+    if codec == "gzip":
+        raw = gzip.GzipFile(fileobj=file, mode="rb")
+    elif codec == "bz2":
+        raw = bz2.BZ2File(file, mode="rb")
+    else:
+        if zstandard is None:
+            raise ValueError("Los archivos .zst requieren la librería 'zstandard'.")
+        raw = zstandard.ZstdDecompressor().stream_reader(file)
+    return io.BufferedReader(_BoundedStream(raw, MAX_DECOMPRESSED_SIZE), buffer_size=256 * 1024)
+
+
+def split_compression(name: str) -> Tuple[str, Optional[str]]:
+    """
+    Separa la extensión de compresión de un nombre de archivo.
+
+    Example:
+        >>> split_compression("ss.txt.fasta.gz")
+        ('ss.txt.fasta', 'gzip')
+    """
+    for extension, codec in COMPRESSED_EXTENSIONS.items():
+        if name.endswith(extension):
+            return name[:-len(extension)], codec
+    return name, None
+
+
+def list_excel_sheets(file) -> List[str]:
+    """
+    Nombres de las hojas de un libro Excel, sin cargar su contenido.
+
+    Args:
+        file: Objeto file-like binario con 'name' (.xls o .xlsx)
+
+    Returns:
+        List[str]: Hojas en el orden del libro
+    """
+    try:
+        if file.name.lower().endswith(".xlsx"):
+            with zipfile.ZipFile(file) as archive:
+                return list(xlsx_reader.sheet_paths(archive))
+        return list(pd.ExcelFile(file).sheet_names)
+    finally:
+        file.seek(0)
+
+
+def _rows_to_frames(rows, header) -> List[pd.DataFrame]:
+    """Agrupa filas en bloques de CSV_CHUNK_ROWS con tipos compactos."""
+    columns = [
+        str(name) if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)
+    ]
+    width = len(columns)
+    frames = []
+    while True:
+        raw = list(islice(rows, CSV_CHUNK_ROWS))
+        # Las filas vacías (habituales al final de una hoja) se descartan; las cortas se completan
+        block = [
+            row[:width] + [None] * (width - len(row))
+            for row in raw if any(value is not None for value in row)
+        ]
+        if block or not frames:
+            frames.append(optimize_dtypes(pd.DataFrame(block, columns=columns).infer_objects()))
+        if len(raw) < CSV_CHUNK_ROWS:
+            return frames
+
+
+def _read_xlsx_sheet(data: bytes, sheet: Optional[str]) -> pd.DataFrame:
+    """Lee una hoja .xlsx en streaming (xlsx_reader) convirtiendo las filas por bloques."""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        # Validación de seguridad: Prevenir bombas ZIP (XML descomprimido desproporcionado)
+        if sum(info.file_size for info in archive.infolist()) > EXCEL_MAX_UNCOMPRESSED:
+            raise ValueError("Error de seguridad: El contenido descomprimido del archivo Excel es demasiado grande.")
+        rows = xlsx_reader.iter_rows(archive, sheet)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        frames = _rows_to_frames(rows, header)
+    return pd.concat(reconcile_dtypes(frames), ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def _read_excel_sheet(data: bytes, name: str, sheet: Optional[str]) -> pd.DataFrame:
+    """Lee una hoja con el motor disponible y aplica la optimización de tipos."""
+    if name.endswith(".xlsx") and EXCEL_ENGINE == "streaming":
+        return _read_xlsx_sheet(data, sheet)
+    engine = "calamine" if EXCEL_ENGINE == "calamine" else None
+    return optimize_dtypes(pd.read_excel(io.BytesIO(data), sheet_name=sheet or 0, engine=engine))
+
+
+def _read_sheets_parallel(data: bytes, name: str, sheets: List[str]) -> List[pd.DataFrame]:
+    """
+    Lee varias hojas en procesos separados (el parseo de XML no libera el GIL).
+
+    Los libros pequeños (o con un solo CPU disponible) se leen en serie: arrancar los
+    procesos cuesta más que leerlos.
+    """
+    workers = min(EXCEL_MAX_WORKERS, len(sheets), os.cpu_count() or 1)
+    if workers > 1 and len(data) >= EXCEL_PARALLEL_MIN_BYTES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                return list(executor.map(_read_excel_sheet, [data] * len(sheets), [name] * len(sheets), sheets))
+        except (BrokenProcessPool, OSError) as e:
+            app_logger.warning(f"Lectura paralela de hojas no disponible, se leen en serie: {e}")
+    return [_read_excel_sheet(data, name, sheet) for sheet in sheets]
+
+
+def read_excel(file, name: str, sheets: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Lee una o varias hojas de un libro Excel con tipos compactos.
+
+    Las hojas se leen en paralelo. Si se seleccionan varias, se concatenan (deben
+    compartir columnas) y se añade la columna 'sheet' con la hoja de origen.
+
+    Args:
+        file: Objeto file-like binario
+        name (str): Nombre del archivo en minúsculas (determina el formato)
+        sheets (Sequence[str], optional): Hojas a leer (por defecto, la primera)
+
+    Returns:
+        pd.DataFrame: Datos de las hojas seleccionadas
+    """
+    data = file.read()
+    sheets = list(sheets) if sheets else [None]
+    if len(sheets) == 1:
+        return _read_excel_sheet(data, name, sheets[0])
+
+    frames = _read_sheets_parallel(data, name, sheets)
+    if any(set(frame.columns) != set(frames[0].columns) for frame in frames if not frame.empty):
+        raise ValueError("Las hojas seleccionadas no tienen las mismas columnas y no se pueden combinar.")
+    for sheet, frame in zip(sheets, frames):
+        frame["sheet"] = sheet
+    frames = reconcile_dtypes([frame for frame in frames if not frame.empty] or frames[:1])
+    df = pd.concat(frames, ignore_index=True)
+    df["sheet"] = df["sheet"].astype("category")
+    app_logger.info(f"Excel ingerido ({EXCEL_ENGINE}): {len(sheets)} hojas, {len(df):,} filas")
+    return df
+
+
+def read_any(file, sheets: Optional[Sequence[str]] = None) -> Optional[pd.DataFrame]:
     """
-    Lee archivos de datos en múltiples formatos (CSV, XLS, XLSX) con detección automática.
+    Lee archivos de datos en múltiples formatos (CSV, XLS, XLSX, FASTA) con detección automática.
 
     Esta función detecta automáticamente el delimitador en archivos CSV y
-    maneja tanto archivos CSV como Excel de manera transparente.
+    maneja archivos CSV, Excel y FASTA de manera transparente. Los CSV y FASTA
+    comprimidos (.gz, .bz2, .zst) se descomprimen en streaming.
 
     Args:
         file: Objeto archivo subido (típicamente desde Streamlit file_uploader).
               Debe tener atributos 'name' para el nombre del archivo.
+        sheets (Sequence[str], optional): Hojas a leer en archivos Excel
+              (por defecto, la primera)
 
     Returns:
         pd.DataFrame: DataFrame con los datos cargados, o None si el archivo es inválido
@@ -56,49 +572,342 @@ def read_any(file) -> Optional[pd.DataFrame]:
     if file is None:
         return None
 
+    return _parse_dataset(file, _validate_upload(file), sheets)
+
+
+def _validate_upload(file) -> str:
+    """
+    Validaciones de seguridad de un archivo subido (extensión y tamaño).
+
+    Returns:
+        str: Nombre del archivo en minúsculas
+
+    Raises:
+        ValueError: Si la extensión no está permitida o el archivo excede MAX_FILE_SIZE
+    """
     # Validación de seguridad: Validar extensiones de archivo permitidas
+    # (los CSV y FASTA pueden venir comprimidos; los Excel ya son archivos ZIP)
     name = file.name.lower()
-    allowed_extensions = [".csv", ".xls", ".xlsx"]
-    if not any(name.endswith(ext) for ext in allowed_extensions):
-        raise ValueError("Error de seguridad: Extensión de archivo no permitida. Solo se aceptan .csv, .xls, .xlsx")
+    inner_name, codec = split_compression(name)
+    allowed_extensions = (".csv",) + FASTA_EXTENSIONS + (() if codec else (".xls", ".xlsx"))
+    if not inner_name.endswith(allowed_extensions):
+        raise ValueError(
+            "Error de seguridad: Extensión de archivo no permitida. Solo se aceptan .csv, .xls, .xlsx, "
+            ".fasta, .fa y .faa (CSV y FASTA también comprimidos con .gz, .bz2 o .zst)"
+        )
 
     # Validación de seguridad: Prevenir DoS por archivos enormes
     file_size = get_file_size(file)
     if file_size > MAX_FILE_SIZE:
         raise ValueError(f"Error de seguridad: El archivo excede el tamaño máximo permitido de 25MB.")
+    return name
+
+
+def validate_uploads(files: Sequence) -> List[str]:
+    """
+    Validaciones de una carga completa: número de archivos, tamaño total y cada archivo.
+
+    Solo usa los metadatos (nombre y tamaño), así que puede ejecutarse antes de leer
+    el contenido (ej. antes de calcular su hash en ``dataset_cache``).
+
+    Args:
+        files (Sequence): Archivos subidos
+
+    Returns:
+        List[str]: Nombres de los archivos en minúsculas
+
+    Raises:
+        ValueError: Si se supera algún límite o una extensión no está permitida
+    """
+    if len(files) > MAX_UPLOAD_FILES:
+        raise ValueError(f"Se pueden cargar como máximo {MAX_UPLOAD_FILES} archivos a la vez.")
+    if sum(get_file_size(file) for file in files) > MAX_TOTAL_UPLOAD_SIZE:
+        raise ValueError(
+            f"Error de seguridad: Los archivos suman más de {format_bytes(MAX_TOTAL_UPLOAD_SIZE)}, "
+            "el máximo permitido en una carga."
+        )
+    return [_validate_upload(file) for file in files]
+
+
+# ============================================================
+# CARGA DE VARIOS ARCHIVOS
+# ============================================================
+
+def _read_shard(data: bytes, name: str) -> Tuple[pd.DataFrame, float]:
+    """Lee un archivo ya validado (en un proceso de lectura) y mide el tiempo de parseo."""
+    start = time.perf_counter()
+    df = _parse_dataset(io.BytesIO(data), name)
+    return df, time.perf_counter() - start
+
+
+def _read_shards_parallel(payloads: List[Tuple[bytes, str]]) -> List[Tuple[pd.DataFrame, float]]:
+    """
+    Lee varios archivos en procesos separados (el parseo de CSV/FASTA/XML retiene el GIL).
+
+    Con poco volumen total (o un solo CPU) se leen en serie: arrancar los procesos
+    cuesta más que leerlos.
+    """
+    workers = min(INGEST_MAX_WORKERS, len(payloads), os.cpu_count() or 1)
+    total_bytes = sum(len(data) for data, _ in payloads)
+    if workers > 1 and total_bytes >= INGEST_PARALLEL_MIN_BYTES:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                return list(executor.map(_read_shard, *zip(*payloads)))
+        except (BrokenProcessPool, OSError) as e:
+            app_logger.warning(f"Lectura paralela de archivos no disponible, se leen en serie: {e}")
+    return [_read_shard(data, name) for data, name in payloads]
+
+
+def reconcile_columns(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """
+    Alinea las columnas de varios DataFrames sin distinguir mayúsculas/minúsculas.
+
+    Cada columna toma el nombre con el que aparece por primera vez (ej. 'Seq' y 'seq'
+    se unifican); las que faltan en un archivo se añaden vacías. Solo se reindexan los
+    DataFrames que lo necesitan.
+
+    Args:
+        frames (List[pd.DataFrame]): DataFrames leídos de cada archivo
+
+    Returns:
+        List[pd.DataFrame]: DataFrames con las mismas columnas en el mismo orden
+
+    Raises:
+        ValueError: Si un archivo tiene dos columnas que solo difieren en mayúsculas
+    """
+    canonical: Dict[str, str] = {}
+    for frame in frames:
+        keys = [str(col).lower() for col in frame.columns]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Un archivo tiene columnas repetidas (sin distinguir mayúsculas/minúsculas).")
+        for col, key in zip(frame.columns, keys):
+            canonical.setdefault(key, col)
+    columns = list(canonical.values())
+
+    aligned = []
+    for frame in frames:
+        renames = {col: canonical[str(col).lower()] for col in frame.columns if canonical[str(col).lower()] != col}
+        if renames:
+            frame = frame.rename(columns=renames)
+        if list(frame.columns) != columns:
+            frame = frame.reindex(columns=columns)
+        aligned.append(frame)
+    return aligned
+
+
+def read_many(files: Sequence) -> Optional[pd.DataFrame]:
+    """
+    Lee un dataset repartido en varios archivos y lo combina en un solo DataFrame.
+
+    Cada archivo pasa las mismas validaciones que ``read_any`` y se lee en un proceso
+    de un pool, de modo que el tiempo total se acerca al del archivo más grande.
+    Las columnas se unifican sin distinguir mayúsculas/minúsculas y los tipos con
+    ``reconcile_dtypes`` antes de una única concatenación. La columna 'source_file'
+    (categoría) indica el archivo de origen de cada fila.
+
+    Los tiempos por archivo se guardan en ``df.attrs['file_timings']`` (nombre,
+    bytes, filas y segundos de parseo) y el tiempo total en ``df.attrs['ingest_seconds']``.
+
+    Args:
+        files (Sequence): Archivos subidos (Streamlit UploadedFile u objetos file-like con 'name')
+
+    Returns:
+        pd.DataFrame: Dataset combinado, o None si no hay archivos
+
+    Raises:
+        ValueError: Si algún archivo no pasa las validaciones o se superan los límites de la carga
+
+    Example:
+        >>> shards = st.file_uploader("Sube los fragmentos", accept_multiple_files=True)
+        >>> df = read_many(shards)
+    """
+    files = [file for file in files or [] if file is not None]
+    if not files:
+        return None
+    names = validate_uploads(files)
+
+    start = time.perf_counter()
+    payloads = []
+    for file, name in zip(files, names):
+        file.seek(0)
+        payloads.append((file.read(), name))
+        file.seek(0)
+
+    results = _read_shards_parallel(payloads)
+    frames = [df for df, _ in results]
+    timings = [
+        {"name": file.name, "bytes": len(data), "rows": len(df), "seconds": seconds}
+        for file, (data, _), (df, seconds) in zip(files, payloads, results)
+    ]
+    memory_before = sum(
+        frame.attrs.get("ingest_report", {}).get("memory_before", memory_usage(frame)) for frame in frames
+    )
+
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        frames = reconcile_dtypes(reconcile_columns(frames))
+        df = pd.concat(frames, ignore_index=True)
+        if "source_file" not in {str(col).lower() for col in df.columns}:
+            names = [file.name for file in files]
+            categories = list(dict.fromkeys(names))
+            codes = np.repeat([categories.index(name) for name in names], [len(frame) for frame in frames])
+            df["source_file"] = pd.Categorical.from_codes(codes, categories=categories)
+    elapsed = time.perf_counter() - start
+
+    df.attrs["ingest_report"] = {
+        "rows": len(df),
+        "chunks": len(frames),
+        "memory_before": memory_before,
+        "memory_after": memory_usage(df),
+    }
+    df.attrs["file_timings"] = timings
+    df.attrs["ingest_seconds"] = elapsed
+    app_logger.info(
+        f"{len(files)} archivo(s) ingeridos en {elapsed:.2f} s: {len(df):,} filas "
+        f"(archivo más lento: {max(t['seconds'] for t in timings):.2f} s)"
+    )
+    return df
+
+
+def read_local_dataset(path) -> pd.DataFrame:
+    """
+    Lee un dataset local de confianza (ej. el archivo de ejemplo del proyecto).
+
+    Usa el mismo proceso de lectura que ``read_any`` (detección de delimitador,
+    bytes nulos y tipos compactos) pero sin el límite de tamaño de las subidas,
+    ya que la ruta la define la aplicación y no el usuario.
+
+    Args:
+        path: Ruta del archivo (mismos formatos que ``read_any``)
+
+    Returns:
+        pd.DataFrame: DataFrame con los datos cargados
+    """
+    with open(path, "rb") as file:
+        return _parse_dataset(file, str(path).lower())
+
+
+def _count_delimiter(raw: str) -> Optional[str]:
+    """
+    Detección rápida: el candidato que aparece el mismo número de veces (> 0) en
+    todas las líneas completas de la muestra. Devuelve None si no hay uno único.
+    """
+    lines = [line for line in raw.splitlines() if line.strip()]
+    if not raw.endswith(("\n", "\r")) and len(lines) > 1:
+        # La última línea puede estar cortada por el tamaño de la muestra
+        lines = lines[:-1]
+    if not lines:
+        return None
+    consistent = [
+        delim for delim in _CANDIDATE_DELIMITERS
+        if len({line.count(delim) for line in lines}) == 1 and lines[0].count(delim) > 0
+    ]
+    return consistent[0] if len(consistent) == 1 else None
+
+
+def sniff_delimiter(sample: bytes) -> str:
+    """
+    Detecta el delimitador de un CSV a partir de una muestra inicial.
+
+    Primero se busca un candidato (',', ';', tabulador, '|') con el mismo número de
+    apariciones en todas las líneas completas; es barato y funciona aunque la muestra
+    solo contenga unas pocas filas largas (secuencias de cientos de residuos), donde
+    ``csv.Sniffer`` falla. Si es ambiguo (ej. delimitadores dentro de campos entre
+    comillas), se usa ``csv.Sniffer``.
+
+    Args:
+        sample (bytes): Primeros bytes del archivo (ya descomprimidos)
+
+    Returns:
+        str: Delimitador detectado (',' si no se puede detectar)
+
+    Raises:
+        ValueError: Si la muestra contiene bytes nulos
+    """
+    check_null_bytes(sample)
+    raw = sample.decode(errors="ignore")
+    delim = _count_delimiter(raw)
+    if delim is not None:
+        return delim
+    try:
+        # Leer una muestra del archivo para detectar el delimitador
+        # Esto es útil para manejar tanto CSV separados por coma como por punto y coma
+        dialect = csv.Sniffer().sniff(raw)
+        return dialect.delimiter
+    except Exception:
+        # Si falla la detección, usar coma por defecto
+        return ","
+
+
+def check_null_bytes(sample: bytes) -> None:
+    """Validación de seguridad: bytes nulos (indicador de archivo binario camuflado)."""
+    if b'\x00' in sample:
+        raise ValueError("Error de seguridad: Se detectaron bytes nulos en el archivo. Posible archivo binario malicioso.")
+
+
+def detect_delimiter(file) -> str:
+    """
+    Detecta el delimitador de un CSV posicionable y deja el puntero al inicio.
+
+    Incluye la validación de seguridad de bytes nulos (ver ``sniff_delimiter``).
+    """
+    try:
+        return sniff_delimiter(file.read(4096))
+    finally:
+        # Resetear el puntero del archivo al inicio para la lectura completa
+        file.seek(0)
+
+
+def _parse_dataset(file, name: str, sheets: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Lee el contenido de un archivo ya validado según su extensión."""
+    name, codec = split_compression(name)
+
+    # ============================================================
+    # Archivos comprimidos (.gz, .bz2, .zst): CSV o FASTA en streaming
+    # ============================================================
+    if codec is not None:
+        stream = _decompress(file, codec)
+        # Las validaciones se aplican sobre el contenido descomprimido
+        sample = stream.peek(4096)[:4096]
+        if name.endswith(FASTA_EXTENSIONS):
+            check_null_bytes(sample)
+            return _read_fasta(stream)
+
+        def reopen():
+            nonlocal stream
+            if stream is None:
+                file.seek(0)
+                stream = _decompress(file, codec)
+            opened, stream = stream, None
+            return opened
+
+        return _read_csv(reopen, sniff_delimiter(sample), sample)
 
     # ============================================================
     # Procesamiento de archivos CSV
     # ============================================================
     if name.endswith(".csv"):
-        try:
-            # Validación de seguridad: Check por bytes nulos (indicador de archivo binario camuflado)
-            raw_bytes = file.read(4096)
-            if b'\x00' in raw_bytes:
-                 raise ValueError("Error de seguridad: Se detectaron bytes nulos en el archivo CSV. Posible archivo binario malicioso.")
-
-            # Leer una muestra del archivo para detectar el delimitador
-            # Esto es útil para manejar tanto CSV separados por coma como por punto y coma
-            raw = raw_bytes.decode(errors="ignore")
-            dialect = csv.Sniffer().sniff(raw)
-            delim = dialect.delimiter
-
-        except ValueError as ve:
-            # Re-lanzar excepciones de seguridad
-            raise ve
-        except Exception:
-            # Si falla la detección, usar coma por defecto
-            delim = ","
-
-        finally:
-            # Resetear el puntero del archivo al inicio para la lectura completa
+        delim = detect_delimiter(file)
+        sample = file.read(4096)
+
+        def rewind():
             file.seek(0)
+            return file
 
-        # Leer el CSV completo con el delimitador detectado
-        return pd.read_csv(file, delimiter=delim)
+        # Leer el CSV con el delimitador detectado y tipos compactos
+        return _read_csv(rewind, delim, sample)
+
+    # ============================================================
+    # Procesamiento de archivos FASTA (.fasta, .fa, .faa)
+    # ============================================================
+    if name.endswith(FASTA_EXTENSIONS):
+        check_null_bytes(file.read(4096))
+        file.seek(0)
+        return _read_fasta(file)
 
     # ============================================================
     # Procesamiento de archivos Excel (.xls, .xlsx)
     # ============================================================
     else:
-        return pd.read_excel(file)
+        return read_excel(file, name, sheets)
@@ -0,0 +1,171 @@
+"""
+Índice por longitud para filtrar el dashboard por rangos sin copiar filas.
+
+Cada movimiento del slider de longitud ejecutaba
+``df[(df['len'] >= a) & (df['len'] <= b)]`` y recalculaba media, proporción de
+aminoácidos no estándar, histograma y conteos Q3 sobre la copia filtrada.
+``LengthIndex`` ordena las filas por longitud una sola vez (ordenación por conteo:
+las longitudes son enteras) y guarda sumas acumuladas por longitud:
+
+- ``offsets``: filas con longitud menor que L (inicio del bloque de L en ``order``)
+- ``length_sums``: suma de longitudes
+- ``nonstd``: filas con aminoácidos no estándar
+- ``q3``: residuos H/E/C
+
+Cualquier consulta ``[lo, hi]`` se resuelve restando dos posiciones de las sumas
+acumuladas (O(1)); mínimo y máximo con ``searchsorted`` (O(log L)). Las filas del
+rango, cuando un gráfico las necesita, son el bloque contiguo
+``order[offsets[lo]:offsets[hi + 1]]``.
+
+Example:
+    >>> index = LengthIndex.from_frame(df)
+    >>> index.summary(100, 300)["mean"]
+    >>> index.length_counts(100, 300)
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import OUT_OF_CORE_CONFIG
+from residue_counts import Q3_ALPHABET, count_residues
+
+
+class LengthIndex:
+    """
+    Filas ordenadas por longitud con sumas acumuladas por longitud entera.
+
+    Attributes:
+        order (np.ndarray): Posiciones de las filas ordenadas por longitud (orden estable)
+        offsets (np.ndarray): ``offsets[L]`` = filas con longitud < L (``max_length + 2`` valores)
+        length_sums (np.ndarray): Suma acumulada de longitudes por longitud
+        nonstd (np.ndarray | None): Filas acumuladas con aminoácidos no estándar
+        q3 (np.ndarray | None): Residuos H/E/C acumulados, matriz (max_length + 2, 3)
+    """
+
+    def __init__(self, order: np.ndarray, offsets: np.ndarray, length_sums: np.ndarray,
+                 nonstd: Optional[np.ndarray] = None, q3: Optional[np.ndarray] = None):
+        self.order = order
+        self.offsets = offsets
+        self.length_sums = length_sums
+        self.nonstd = nonstd
+        self.q3 = q3
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, max_length: Optional[int] = None) -> "LengthIndex":
+        """
+        Construye el índice de un dataset con columna 'len' (una pasada por columna).
+
+        Las filas sin longitud quedan fuera del índice; las longitudes negativas se
+        tratan como 0 y las mayores que ``max_length`` se agrupan en esa longitud
+        (como en ``LengthHistogram``), para que la memoria no dependa de los datos.
+
+        Args:
+            df (pd.DataFrame): Dataset con 'len' y, opcionalmente, 'has_nonstd_aa' y 'sst3'
+            max_length (int, opcional): Longitud máxima indexada por separado
+
+        Returns:
+            LengthIndex: Índice del dataset
+        """
+        max_length = max_length or OUT_OF_CORE_CONFIG.get("max_tracked_length", 100_000)
+        columns = {str(col).lower(): col for col in df.columns}
+        lengths = df[columns["len"]].to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(lengths)
+        buckets = np.clip(lengths[valid], 0, max_length).astype(np.int64)
+        positions = np.flatnonzero(valid)
+        n_buckets = int(buckets.max()) + 1 if len(buckets) else 1
+
+        def prefix(weights=None, dtype=np.int64) -> np.ndarray:
+            per_length = np.bincount(buckets, weights=weights, minlength=n_buckets)
+            result = np.zeros(n_buckets + 1, dtype=dtype)
+            result[1:] = np.cumsum(per_length)
+            return result
+
+        order = positions[np.argsort(buckets, kind="stable")]
+        offsets = prefix()
+        length_sums = prefix(lengths[valid], dtype=np.float64)
+
+        nonstd = None
+        if "has_nonstd_aa" in columns:
+            flags = df[columns["has_nonstd_aa"]].to_numpy(dtype=np.float64, na_value=0.0)[valid]
+            nonstd = prefix(flags)
+
+        q3 = None
+        if "sst3" in columns:
+            matrix = count_residues(df, columns=["sst3"], per_chain=True).matrix("sst3")[valid]
+            q3 = np.stack([prefix(matrix[:, k]) for k in range(len(Q3_ALPHABET))], axis=1)
+        return cls(order, offsets, length_sums, nonstd, q3)
+
+    # ---- Consultas por rango ----
+
+    @property
+    def max_length(self) -> int:
+        return len(self.offsets) - 2
+
+    def _bucket_bounds(self, low: float, high: float) -> Tuple[int, int]:
+        """Posiciones en las sumas acumuladas del rango cerrado [low, high]."""
+        start = min(max(int(np.ceil(low)), 0), self.max_length + 1)
+        stop = min(max(int(np.floor(high)) + 1, start), self.max_length + 1)
+        return start, stop
+
+    def bounds(self, low: float, high: float) -> Tuple[int, int]:
+        """Bloque ``order[start:stop]`` con las filas de longitud en [low, high]."""
+        start, stop = self._bucket_bounds(low, high)
+        return int(self.offsets[start]), int(self.offsets[stop])
+
+    def count(self, low: float, high: float) -> int:
+        """Número de filas con longitud en [low, high]."""
+        start, stop = self.bounds(low, high)
+        return stop - start
+
+    def positions(self, low: float, high: float) -> np.ndarray:
+        """Posiciones (para ``df.iloc``/``df.take``) de las filas del rango, ordenadas por longitud."""
+        start, stop = self.bounds(low, high)
+        return self.order[start:stop]
+
+    def summary(self, low: float, high: float) -> Dict[str, Any]:
+        """
+        Métricas del rango de longitudes [low, high] sin recorrer filas.
+
+        Returns:
+            Dict[str, Any]: rows, mean, min, max, nonstd (filas con aminoácidos no
+            estándar, None si no hay columna) y q3_counts (Serie H/E/C, vacía si no hay 'sst3')
+        """
+        start, stop = self._bucket_bounds(low, high)
+        rows = int(self.offsets[stop] - self.offsets[start])
+        summary = {"rows": rows, "mean": None, "min": None, "max": None, "nonstd": None,
+                   "q3_counts": pd.Series(dtype="int64")}
+        if self.nonstd is not None:
+            summary["nonstd"] = int(self.nonstd[stop] - self.nonstd[start])
+        if not rows:
+            return summary
+
+        summary["mean"] = float(self.length_sums[stop] - self.length_sums[start]) / rows
+        # Primera y última longitud con filas: donde cambian las cuentas acumuladas
+        summary["min"] = int(np.searchsorted(self.offsets, self.offsets[start], side="right")) - 1
+        summary["max"] = int(np.searchsorted(self.offsets, self.offsets[stop] - 1, side="right")) - 1
+        if self.q3 is not None:
+            counts = pd.Series(self.q3[stop] - self.q3[start], index=list(Q3_ALPHABET), dtype="int64")
+            summary["q3_counts"] = counts[counts > 0].sort_values(ascending=False, kind="stable")
+        return summary
+
+    def nonstd_counts(self, low: float, high: float) -> pd.Series:
+        """Filas con (True) y sin (False) aminoácidos no estándar en el rango, como ``value_counts``."""
+        start, stop = self._bucket_bounds(low, high)
+        rows = int(self.offsets[stop] - self.offsets[start])
+        true = int(self.nonstd[stop] - self.nonstd[start]) if self.nonstd is not None else 0
+        counts = pd.Series({False: rows - true, True: true}, dtype="int64")
+        return counts[counts > 0].sort_values(ascending=False)
+
+    def length_counts(self, low: float, high: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Histograma exacto del rango: longitudes presentes y número de filas de cada una.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Longitudes y frecuencias (pesos para un histograma)
+        """
+        start, stop = self._bucket_bounds(low, high)
+        per_length = np.diff(self.offsets[start:stop + 1])
+        present = np.flatnonzero(per_length)
+        return present + start, per_length[present]
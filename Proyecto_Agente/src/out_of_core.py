@@ -0,0 +1,599 @@
+"""
+Modo fuera de memoria (out-of-core) para datasets CSV grandes.
+
+``io_utils.read_any`` rechaza archivos de más de 25 MB porque todo el análisis
+asume un DataFrame completo en memoria. El dataset PISCES/PDB completo es mucho
+mayor, así que este módulo lo procesa en una sola pasada por bloques con memoria
+acotada:
+
+1. Los agregados del EDA se calculan de forma incremental (``incremental.py``):
+   estadísticas tipo ``describe`` (Welford), histograma exacto de 'len', conteos
+   Q3/Q8, proporción de aminoácidos no estándar, conteos de categorías y las
+   secuencias más largas.
+2. Las filas se vuelcan a un archivo Parquet en disco, que atiende las consultas
+   a nivel de fila (``OutOfCoreDataset.query``).
+3. En memoria solo queda una muestra aleatoria uniforme de tamaño fijo, que se usa
+   como ``st.session_state.df`` para las vistas que necesitan filas.
+
+La memoria del análisis depende de OUT_OF_CORE_CONFIG (tamaño de bloque, filas de
+la muestra), no del tamaño del archivo. Esto solo vale para los archivos en disco
+(``open_out_of_core_path``): un archivo subido desde el navegador llega como
+``UploadedFile`` de Streamlit, que ya lo tiene entero en memoria y cuyo tamaño limita
+``server.maxUploadSize`` (200 MB por defecto). Los archivos de varios GB deben
+procesarse desde una ruta local. Para acotar el abuso se mantienen las validaciones de
+``read_any`` (extensión, bytes nulos) y se añaden un límite duro de tamaño, un
+máximo de columnas, un tamaño máximo de fila (el de un bloque) y la comprobación de
+espacio libre en disco para el volcado.
+
+El volcado vive mientras alguna sesión referencia su ``OutOfCoreDataset``: la
+memoización de los datasets abiertos solo suelta su referencia al descartarlos y
+un finalizador borra el archivo cuando nadie más lo usa. Los volcados huérfanos
+(ej. de un proceso anterior) se eliminan tras ``spill_ttl_seconds``.
+
+Requiere ``pyarrow``.
+
+Example:
+    >>> dataset = open_out_of_core_path("2018-06-06-pdb-intersect-pisces.csv")
+    >>> dataset.rows, dataset.nonstd_ratio
+    >>> dataset.query(columns=["pdb_id", "len"], length_range=(500, 600))
+"""
+
+import csv
+import io
+import os
+import shutil
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import OUT_OF_CORE_CONFIG, FAST_PATH_CONFIG
+from dataset_cache import content_hash
+from fast_answers import longest_sequences_table
+from incremental import LengthHistogram, RunningStats, summarize_lengths
+from io_utils import MAX_FILE_SIZE, SEQUENCE_COLUMNS, detect_delimiter, format_bytes, get_file_size, optimize_dtypes
+from logger import app_logger
+from packed import PackedSequences
+from residue_counts import Q3_ALPHABET, Q8_ALPHABET, symbol_counts
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.dataset as pa_ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+
+# Tipos Arrow fijos de las columnas conocidas (nombres en minúsculas)
+_ARROW_TYPES = {
+    "pdb_id": "string",
+    "chain_code": "string",
+    "exptl.": "string",
+    "seq": "string",
+    "sst3": "string",
+    "sst8": "string",
+    "len": "int64",
+    "has_nonstd_aa": "bool",
+    "resolution": "float32",
+    "r-factor": "float32",
+    "freervalue": "float32",
+}
+
+# Bytes iniciales usados para inferir los tipos de columnas no declaradas
+_TYPE_SAMPLE_BYTES = 1024 * 1024
+
+
+# Volcados de los OutOfCoreDataset vivos de este proceso
+_LIVE_SPILLS: Set[str] = set()
+
+
+def _remove_spill(path: str) -> None:
+    _LIVE_SPILLS.discard(path)
+    Path(path).unlink(missing_ok=True)
+
+
+def _remove_orphan_spills(spill_dir: Path) -> None:
+    """Borra los volcados que no pertenecen a ningún dataset vivo y superan el TTL."""
+    max_age = OUT_OF_CORE_CONFIG.get("spill_ttl_seconds", 24 * 3600)
+    now = time.time()
+    for path in spill_dir.glob("*.parquet"):
+        try:
+            if str(path) not in _LIVE_SPILLS and now - path.stat().st_mtime > max_age:
+                path.unlink(missing_ok=True)
+        except OSError:
+            continue
+
+
+# ============================================================
+# DATASET FUERA DE MEMORIA
+# ============================================================
+
+class OutOfCoreDataset:
+    """
+    Dataset procesado por bloques: agregados exactos, volcado Parquet y muestra en memoria.
+
+    Attributes:
+        source_name (str): Nombre del archivo de origen
+        source_bytes (int): Tamaño del archivo de origen
+        spill_path (Path): Archivo Parquet con todas las filas
+        rows (int): Número total de filas
+        columns (List[str]): Nombres de columnas
+        sample (pd.DataFrame): Muestra aleatoria uniforme (índice = número de fila original)
+        blocks (int): Bloques procesados
+    """
+
+    def __init__(self, source_name: str, source_bytes: int, spill_path: Path):
+        self.source_name = source_name
+        self.source_bytes = source_bytes
+        self.spill_path = spill_path
+        # El volcado se borra cuando el objeto deja de estar referenciado (o al salir)
+        _LIVE_SPILLS.add(str(spill_path))
+        self._finalizer = weakref.finalize(self, _remove_spill, str(spill_path))
+        self.rows = 0
+        self.columns: List[str] = []
+        self.schema = None
+        self.sample = pd.DataFrame()
+        self.blocks = 0
+        self.numeric_stats: Dict[str, RunningStats] = {}
+        self.length_histogram = LengthHistogram(OUT_OF_CORE_CONFIG.get("max_tracked_length", 100_000))
+        # Longitudes de las filas con aminoácidos no estándar (métricas del filtro por longitud)
+        self.nonstd_length_histogram = LengthHistogram(OUT_OF_CORE_CONFIG.get("max_tracked_length", 100_000))
+        self.null_counts: Dict[str, int] = {}
+        self.q3_byte_counts = np.zeros(256, dtype=np.int64)
+        self.q8_byte_counts = np.zeros(256, dtype=np.int64)
+        self.nonstd_true = 0
+        self.nonstd_valid = 0
+        self.category_counts: Dict[str, Optional[Dict[str, int]]] = {}
+        self.longest = pd.DataFrame()
+
+    def column(self, key: str) -> Optional[str]:
+        """Nombre real de una columna a partir de su nombre en minúsculas."""
+        return next((c for c in self.columns if c.lower() == key), None)
+
+    # ---- Métricas exactas ----
+
+    @property
+    def nonstd_ratio(self) -> float:
+        return self.nonstd_true / self.nonstd_valid if self.nonstd_valid else 0.0
+
+    def q3_counts(self) -> pd.Series:
+        return symbol_counts(self.q3_byte_counts, Q3_ALPHABET)
+
+    def q8_counts(self) -> pd.Series:
+        return symbol_counts(self.q8_byte_counts, Q8_ALPHABET)
+
+    def count_length_range(self, low: int, high: int) -> int:
+        """Número exacto de secuencias con longitud en [low, high]."""
+        return self.length_histogram.count_between(low, high)
+
+    def length_range_summary(self, low: int, high: int) -> Dict[str, Any]:
+        """
+        Métricas exactas del rango de longitudes [low, high], como ``LengthIndex.summary``.
+
+        Returns:
+            Dict[str, Any]: rows, mean, min, max y nonstd (filas con aminoácidos no
+            estándar, None si no hay columna)
+        """
+        summary = self.length_histogram.range_summary(low, high)
+        summary["nonstd"] = (
+            self.nonstd_length_histogram.count_between(low, high) if self.column("has_nonstd_aa") else None
+        )
+        return summary
+
+    def length_summary(self) -> Dict[str, float]:
+        """Estadísticas de longitud equivalentes a las de ``precompute_dataset_stats``."""
+        return summarize_lengths(self.numeric_stats[self.column("len")], self.length_histogram)
+
+    def null_count_series(self) -> pd.Series:
+        """Valores nulos por columna en todas las filas, como ``df.isna().sum()``."""
+        return pd.Series({name: self.null_counts.get(name, 0) for name in self.columns}, dtype="int64")
+
+    def describe(self) -> pd.DataFrame:
+        """
+        Equivalente a ``df.describe()`` para las columnas numéricas.
+
+        count, mean, std, min y max son exactos; los cuartiles de 'len' también
+        (histograma) y los del resto de columnas se estiman sobre la muestra.
+        """
+        len_column = self.column("len")
+        summary = {}
+        for name, stats in self.numeric_stats.items():
+            if name == len_column:
+                quartiles = [self.length_histogram.quantile(q) for q in (0.25, 0.5, 0.75)]
+            else:
+                quartiles = self.sample[name].astype(float).quantile([0.25, 0.5, 0.75]).tolist()
+            summary[name] = [stats.count, stats.mean, stats.std, stats.min, *quartiles, stats.max]
+        return pd.DataFrame(summary, index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"])
+
+    def fast_stats(self) -> Dict[str, Any]:
+        """Estadísticas con la estructura de ``fast_answers.precompute_dataset_stats``, exactas."""
+        return {
+            "rows": self.rows,
+            "columns": len(self.columns),
+            "column_names": list(self.columns),
+            "length": self.length_summary(),
+            "nonstd_ratio": self.nonstd_ratio,
+            "longest": longest_sequences_table(self.longest, FAST_PATH_CONFIG.get("max_top_n", 20)),
+            "q3_counts": self.q3_counts(),
+        }
+
+    def eda_context(self) -> str:
+        """Contexto del EDA para el agente, calculado con los agregados exactos."""
+        schema_lines = "\n".join(f"- {field.name}: {field.type}" for field in self.schema)
+        lines = [
+            f"Resumen del Dataset (modo fuera de memoria, {format_bytes(self.source_bytes)}):",
+            f"{self.rows:,} filas x {len(self.columns)} columnas",
+            f"Columnas y tipos:\n{schema_lines}",
+            "",
+            f"Estadísticas Descriptivas:\n{self.describe().to_string()}",
+            "",
+            f"Secuencias con aminoácidos no estándar: {self.nonstd_ratio:.2%}",
+        ]
+        q3, q8 = self.q3_counts(), self.q8_counts()
+        if not q3.empty:
+            lines.append("Conteo de residuos Q3: " + ", ".join(f"{k}={v:,}" for k, v in q3.items()))
+        if not q8.empty:
+            lines.append("Conteo de residuos Q8: " + ", ".join(f"{k}={v:,}" for k, v in q8.items()))
+        for name, counts in self.category_counts.items():
+            if counts:
+                top = sorted(counts.items(), key=lambda item: -item[1])[:10]
+                lines.append(f"Valores de '{name}': " + ", ".join(f"{k}={v:,}" for k, v in top))
+        lines.append(f"(Las filas individuales disponibles en memoria son una muestra aleatoria de {len(self.sample):,})")
+        return "\n".join(lines)
+
+    # ---- Consultas a nivel de fila ----
+
+    def query(
+        self,
+        columns: Optional[List[str]] = None,
+        length_range: Optional[Tuple[int, int]] = None,
+        limit: int = 1000
+    ) -> pd.DataFrame:
+        """
+        Consulta filas del volcado Parquet sin cargar el dataset completo.
+
+        Args:
+            columns (List[str], optional): Columnas a devolver (todas por defecto)
+            length_range (Tuple[int, int], optional): Rango cerrado de 'len'
+            limit (int): Número máximo de filas
+
+        Returns:
+            pd.DataFrame: Filas que cumplen el filtro, con tipos compactos
+        """
+        dataset = pa_ds.dataset(str(self.spill_path), format="parquet")
+        expression = None
+        if length_range is not None:
+            field = pa_ds.field(self.column("len"))
+            expression = (field >= length_range[0]) & (field <= length_range[1])
+        table = dataset.head(limit, columns=columns, filter=expression)
+        return optimize_dtypes(table.to_pandas())
+
+    def close(self) -> None:
+        """Elimina el volcado en disco (sin esperar a que se libere el objeto)."""
+        self._finalizer()
+
+
+class _OutOfCoreBuilder:
+    """Recorre los bloques de un CSV y construye el OutOfCoreDataset."""
+
+    def __init__(self, dataset: OutOfCoreDataset, schema, sample_rows: int, top_n: int, max_categories: int):
+        self.dataset = dataset
+        self.schema = schema
+        self.sample_rows = sample_rows
+        self.top_n = top_n
+        self.max_categories = max_categories
+        self.rng = np.random.default_rng()
+        self.sample_table = None
+        self.sample_keys = np.empty(0)
+        self.longest_table = None
+        self.longest_lengths = np.empty(0)
+
+        names = {field.name.lower(): field.name for field in schema}
+        self.len_column = names.get("len")
+        self.nonstd_column = names.get("has_nonstd_aa")
+        self.sst3_column = names.get("sst3")
+        self.sst8_column = names.get("sst8")
+        for field in schema:
+            if pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+                dataset.numeric_stats[field.name] = RunningStats()
+            elif pa.types.is_string(field.type) and field.name.lower() not in SEQUENCE_COLUMNS:
+                dataset.category_counts[field.name] = {}
+
+    def add(self, batch, first_row: int) -> None:
+        """Incorpora un bloque a los agregados, la muestra y las secuencias más largas."""
+        dataset = self.dataset
+        table = pa.Table.from_batches([batch]).append_column(
+            "__row__", pa.array(np.arange(first_row, first_row + batch.num_rows, dtype=np.int64))
+        )
+
+        for name, column in zip(batch.schema.names, batch.columns):
+            dataset.null_counts[name] = dataset.null_counts.get(name, 0) + column.null_count
+        lengths = None
+        for name, stats in dataset.numeric_stats.items():
+            values = batch.column(name).to_numpy(zero_copy_only=False)
+            stats.update(values)
+            if name == self.len_column:
+                dataset.length_histogram.update(values)
+                lengths = values
+        if self.nonstd_column:
+            flags = batch.column(self.nonstd_column)
+            dataset.nonstd_true += int(pc.sum(flags).as_py() or 0)
+            dataset.nonstd_valid += len(flags) - flags.null_count
+            if lengths is not None:
+                flagged = pc.fill_null(flags, False).to_numpy(zero_copy_only=False)
+                dataset.nonstd_length_histogram.update(lengths[flagged])
+        if self.sst3_column:
+            dataset.q3_byte_counts += PackedSequences.from_arrow(batch.column(self.sst3_column)).byte_counts()
+        if self.sst8_column:
+            dataset.q8_byte_counts += PackedSequences.from_arrow(batch.column(self.sst8_column)).byte_counts()
+        self._count_categories(batch)
+        self._update_sample(table)
+        if self.len_column:
+            self._update_longest(table)
+
+    def _count_categories(self, batch) -> None:
+        for name, counts in self.dataset.category_counts.items():
+            if counts is None:
+                continue
+            for item in pc.value_counts(batch.column(name).drop_null()).to_pylist():
+                counts[item["values"]] = counts.get(item["values"], 0) + item["counts"]
+            if len(counts) > self.max_categories:
+                # Columna de alta cardinalidad (ej. identificadores): se deja de contar
+                self.dataset.category_counts[name] = None
+
+    def _update_sample(self, table) -> None:
+        """
+        Muestreo uniforme sin reemplazo por claves aleatorias (bottom-k): cada fila
+        recibe una clave y se conservan las ``sample_rows`` claves más pequeñas.
+        """
+        keys = self.rng.random(table.num_rows)
+        if len(self.sample_keys) >= self.sample_rows:
+            candidates = np.flatnonzero(keys < self.sample_keys.max())
+            table, keys = table.take(candidates), keys[candidates]
+        self.sample_table = table if self.sample_table is None else pa.concat_tables([self.sample_table, table])
+        self.sample_keys = np.concatenate([self.sample_keys, keys])
+        if len(self.sample_keys) > self.sample_rows:
+            keep = np.argpartition(self.sample_keys, self.sample_rows)[:self.sample_rows]
+            self.sample_table, self.sample_keys = self.sample_table.take(keep), self.sample_keys[keep]
+
+    def _update_longest(self, table) -> None:
+        lengths = np.nan_to_num(table.column(self.len_column).to_numpy(zero_copy_only=False), nan=-1.0)
+        if len(self.longest_lengths) >= self.top_n:
+            candidates = np.flatnonzero(lengths > self.longest_lengths.min())
+            table, lengths = table.take(candidates), lengths[candidates]
+        self.longest_table = table if self.longest_table is None else pa.concat_tables([self.longest_table, table])
+        self.longest_lengths = np.concatenate([self.longest_lengths, lengths])
+        if len(self.longest_lengths) > self.top_n:
+            keep = np.argpartition(-self.longest_lengths, self.top_n)[:self.top_n]
+            self.longest_table, self.longest_lengths = self.longest_table.take(keep), self.longest_lengths[keep]
+
+    @staticmethod
+    def _to_pandas(table) -> pd.DataFrame:
+        df = table.to_pandas().set_index("__row__").sort_index()
+        df.index.name = None
+        return optimize_dtypes(df)
+
+    def finish(self) -> OutOfCoreDataset:
+        dataset = self.dataset
+        if self.sample_table is not None:
+            dataset.sample = self._to_pandas(self.sample_table)
+        if self.longest_table is not None:
+            dataset.longest = self._to_pandas(self.longest_table)
+        return dataset
+
+
+def _arrow_column_types(head: bytes, delim: str, columns: List[str]) -> Dict[str, Any]:
+    """
+    Tipos Arrow fijos para todas las columnas.
+
+    Las columnas conocidas usan _ARROW_TYPES; las demás se infieren con pandas sobre
+    las primeras filas (numéricas -> float64, que admite nulos; resto -> texto). Fijar
+    el esquema evita que un bloque posterior con otro tipo invalide el volcado.
+    """
+    head = head[:head.rfind(b"\n") + 1] or head
+    try:
+        preview = pd.read_csv(io.BytesIO(head), delimiter=delim, nrows=1000)
+    except Exception:
+        preview = pd.DataFrame(columns=columns)
+
+    types = {}
+    for name in columns:
+        known = _ARROW_TYPES.get(name.lower())
+        if known is not None:
+            types[name] = pa.type_for_alias(known)
+        elif name in preview.columns and pd.api.types.is_bool_dtype(preview[name]):
+            types[name] = pa.bool_()
+        elif name in preview.columns and pd.api.types.is_numeric_dtype(preview[name]):
+            types[name] = pa.float64()
+        else:
+            types[name] = pa.string()
+    return types
+
+
+def build_out_of_core(file, source_name: str, source_bytes: int) -> OutOfCoreDataset:
+    """
+    Procesa un CSV por bloques y devuelve el dataset fuera de memoria.
+
+    Args:
+        file: Objeto file-like binario (posicionado en cualquier punto)
+        source_name (str): Nombre del archivo de origen
+        source_bytes (int): Tamaño del archivo
+
+    Returns:
+        OutOfCoreDataset: Agregados exactos, volcado Parquet y muestra en memoria
+
+    Raises:
+        ValueError: Si el archivo no supera las validaciones de seguridad o no es un CSV válido
+    """
+    if pa is None:
+        raise ValueError("El modo fuera de memoria requiere la librería 'pyarrow'.")
+
+    delim = detect_delimiter(file)
+    head = file.read(_TYPE_SAMPLE_BYTES)
+    file.seek(0)
+    header_line = head.split(b"\n", 1)[0].decode(errors="replace").rstrip("\r")
+    columns = next(csv.reader([header_line], delimiter=delim), [])
+    if not columns or len(columns) > OUT_OF_CORE_CONFIG.get("max_columns", 256):
+        raise ValueError("Error de seguridad: El archivo CSV tiene un encabezado inválido o demasiadas columnas.")
+
+    spill_dir = Path(OUT_OF_CORE_CONFIG["spill_dir"])
+    spill_dir.mkdir(parents=True, exist_ok=True)
+    _remove_orphan_spills(spill_dir)
+    if shutil.disk_usage(spill_dir).free < source_bytes:
+        raise ValueError("No hay espacio suficiente en disco para procesar el archivo fuera de memoria.")
+    spill_path = spill_dir / f"{uuid.uuid4().hex}.parquet"
+
+    reader = pa_csv.open_csv(
+        file,
+        read_options=pa_csv.ReadOptions(block_size=OUT_OF_CORE_CONFIG.get("block_bytes", 16 * 1024 * 1024)),
+        parse_options=pa_csv.ParseOptions(delimiter=delim),
+        convert_options=pa_csv.ConvertOptions(column_types=_arrow_column_types(head, delim, columns)),
+    )
+    # Si la pasada falla, el finalizador del dataset borra el volcado parcial
+    dataset = OutOfCoreDataset(source_name, source_bytes, spill_path)
+    dataset.schema = reader.schema
+    dataset.columns = reader.schema.names
+    builder = _OutOfCoreBuilder(
+        dataset,
+        reader.schema,
+        sample_rows=OUT_OF_CORE_CONFIG.get("sample_rows", 50_000),
+        top_n=FAST_PATH_CONFIG.get("max_top_n", 20),
+        max_categories=OUT_OF_CORE_CONFIG.get("max_categories", 50),
+    )
+    try:
+        with pq.ParquetWriter(str(spill_path), reader.schema) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+                builder.add(batch, dataset.rows)
+                dataset.rows += batch.num_rows
+                dataset.blocks += 1
+    except pa.ArrowInvalid as e:
+        dataset.close()
+        raise ValueError(f"Error al procesar el CSV por bloques: {e}") from e
+    except BaseException:
+        dataset.close()
+        raise
+
+    builder.finish()
+    dataset.sample.attrs["out_of_core"] = True
+    app_logger.info(
+        f"Dataset fuera de memoria: {dataset.rows:,} filas en {dataset.blocks} bloque(s) desde "
+        f"{format_bytes(source_bytes)}; muestra en memoria de {len(dataset.sample):,} filas"
+    )
+    return dataset
+
+
+# ============================================================
+# PUNTOS DE ENTRADA
+# ============================================================
+
+_OPEN_DATASETS: "OrderedDict[Any, OutOfCoreDataset]" = OrderedDict()
+_MAX_OPEN_DATASETS = 2
+_LOCK = threading.Lock()
+# Un lock por clave: dos sesiones que abren el mismo archivo hacen una sola pasada
+_BUILD_LOCKS: Dict[Any, threading.Lock] = {}
+
+
+def needs_out_of_core(name: str, size: int) -> bool:
+    """Indica si un archivo debe procesarse fuera de memoria (CSV mayor que el límite en memoria)."""
+    return (
+        OUT_OF_CORE_CONFIG.get("enabled", True)
+        and pa is not None
+        and str(name).lower().endswith(".csv")
+        and size > MAX_FILE_SIZE
+    )
+
+
+def _validate_size(size: int) -> None:
+    max_bytes = OUT_OF_CORE_CONFIG.get("max_file_bytes", 8 * 1024 ** 3)
+    if size > max_bytes:
+        raise ValueError(
+            f"Error de seguridad: El archivo excede el tamaño máximo permitido de {format_bytes(max_bytes)}."
+        )
+
+
+def _cached_dataset(key) -> Optional[OutOfCoreDataset]:
+    with _LOCK:
+        dataset = _OPEN_DATASETS.get(key)
+        if dataset is not None:
+            _OPEN_DATASETS.move_to_end(key)
+        return dataset
+
+
+def _open_memoized(key, build) -> OutOfCoreDataset:
+    """
+    Reutiliza el dataset ya procesado (los reruns de Streamlit no repiten la pasada).
+
+    Descartar un dataset de la memoización no borra su volcado: otra sesión puede
+    seguir usándolo, y su finalizador lo borra cuando deja de estar referenciado.
+    """
+    dataset = _cached_dataset(key)
+    if dataset is not None:
+        return dataset
+    with _LOCK:
+        build_lock = _BUILD_LOCKS.setdefault(key, threading.Lock())
+    with build_lock:
+        # Otra llamada pudo construirlo mientras se esperaba el lock
+        dataset = _cached_dataset(key)
+        if dataset is not None:
+            return dataset
+        try:
+            dataset = build()
+            with _LOCK:
+                _OPEN_DATASETS[key] = dataset
+                while len(_OPEN_DATASETS) > _MAX_OPEN_DATASETS:
+                    _OPEN_DATASETS.popitem(last=False)
+        finally:
+            with _LOCK:
+                _BUILD_LOCKS.pop(key, None)
+    return dataset
+
+
+def open_out_of_core(file) -> OutOfCoreDataset:
+    """
+    Abre un archivo subido en modo fuera de memoria.
+
+    El archivo subido ya está entero en memoria (Streamlit lo recibe completo y
+    limita su tamaño con ``server.maxUploadSize``); este modo solo evita además
+    el DataFrame completo. Para archivos de varios GB usar ``open_out_of_core_path``.
+
+    Args:
+        file: Archivo subido (Streamlit UploadedFile u objeto file-like con 'name')
+
+    Returns:
+        OutOfCoreDataset: Dataset procesado
+    """
+    if not file.name.lower().endswith(".csv"):
+        raise ValueError("El modo fuera de memoria solo admite archivos .csv")
+    size = get_file_size(file)
+    _validate_size(size)
+    key = getattr(file, "file_id", None) or content_hash(file)
+    return _open_memoized(("upload", key), lambda: build_out_of_core(file, file.name, size))
+
+
+def open_out_of_core_path(path) -> OutOfCoreDataset:
+    """
+    Abre un CSV local en modo fuera de memoria.
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        OutOfCoreDataset: Dataset procesado
+    """
+    stat = os.stat(path)
+    _validate_size(stat.st_size)
+
+    def build():
+        with open(path, "rb") as file:
+            return build_out_of_core(file, os.path.basename(str(path)), stat.st_size)
+
+    return _open_memoized(("path", str(path), stat.st_size, stat.st_mtime_ns), build)
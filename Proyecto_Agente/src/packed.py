@@ -0,0 +1,338 @@
+"""
+Almacenamiento compacto de columnas de secuencia (seq, sst3, sst8).
+
+Guardar cada cadena como un ``str`` de Python cuesta unos 50 bytes de cabecera
+por objeto más los caracteres, y cualquier operación sobre la columna (conteos,
+longitudes, composición) tiene que recorrer millones de objetos. ``PackedSequences``
+guarda una columna completa como en Arrow:
+
+- ``data``: un único buffer ``uint8`` con todos los residuos concatenados.
+- ``offsets``: ``n + 1`` posiciones; la cadena ``i`` es ``data[offsets[i]:offsets[i+1]]``.
+- ``valid``: máscara opcional de valores no nulos (los nulos tienen longitud 0).
+
+Longitud, composición, cortes y vistas por cadena se resuelven con operaciones
+vectorizadas de numpy sobre el buffer. Con columnas de texto respaldadas por Arrow
+(el tipo ``str`` por defecto de pandas 3, o ``string[pyarrow]``) la conversión desde
+pandas no copia los datos; con columnas ``object`` se codifican una sola vez.
+``to_series`` vuelve a pandas solo cuando una vista necesita la columna como texto.
+
+Example:
+    >>> packed = packed_column(df, "sst3")
+    >>> packed.lengths()[:3]
+    array([141, 154, 153])
+    >>> packed.composition()
+    C    ...
+    H    ...
+    E    ...
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+
+
+# Residuos procesados por bloque en composition_matrix (acota la memoria temporal)
+_MATRIX_BLOCK_RESIDUES = 4 * 1024 * 1024
+
+# Columnas empaquetadas recientes, por (huella del dataset, columna)
+_PACKED_CACHE: "OrderedDict[Tuple[str, str, Tuple], PackedSequences]" = OrderedDict()
+_PACKED_CACHE_SIZE = 8
+_LOCK = threading.Lock()
+
+
+def counts_to_series(counts: np.ndarray) -> pd.Series:
+    """Convierte un conteo de bytes (256 posiciones) en una Serie carácter -> conteo ordenada."""
+    present = np.flatnonzero(counts)
+    return pd.Series(counts[present], index=[chr(code) for code in present], dtype="int64") \
+        .sort_values(ascending=False)
+
+
+class PackedSequences:
+    """
+    Columna de cadenas ASCII en un buffer contiguo con offsets (formato Arrow).
+
+    Attributes:
+        data (np.ndarray): Bytes de todas las cadenas (uint8); puede ser una vista
+            de un buffer Arrow compartido
+        offsets (np.ndarray): Posiciones de inicio/fin (int32 o int64, n + 1 valores)
+        valid (np.ndarray | None): Máscara de valores no nulos (None si no hay nulos)
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, valid: Optional[np.ndarray] = None):
+        self.data = data
+        self.offsets = offsets
+        self.valid = valid
+
+    # ------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------
+
+    @classmethod
+    def from_arrow(cls, array) -> "PackedSequences":
+        """
+        Empaqueta un array de texto Arrow sin copiar el buffer de datos.
+
+        Args:
+            array: ``pa.Array`` o ``pa.ChunkedArray`` de tipo string/large_string
+                (los diccionarios se decodifican)
+
+        Returns:
+            PackedSequences: Vista sobre los buffers de Arrow
+        """
+        if isinstance(array, pa.ChunkedArray):
+            # Un solo bloque (lo habitual) no se copia
+            array = array.chunk(0) if array.num_chunks == 1 else array.combine_chunks()
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+            array = array.cast(pa.large_string())
+
+        offset_type = np.int64 if pa.types.is_large_string(array.type) else np.int32
+        buffers = array.buffers()
+        offsets = np.frombuffer(buffers[1], dtype=offset_type, count=len(array) + 1 + array.offset)[array.offset:] \
+            if len(array) else np.zeros(1, dtype=offset_type)
+        data = np.frombuffer(buffers[2], dtype=np.uint8) if buffers[2] is not None else np.empty(0, dtype=np.uint8)
+        valid = None
+        if array.null_count:
+            valid = array.is_valid().to_numpy(zero_copy_only=False)
+        return cls(data, offsets, valid)
+
+    @classmethod
+    def from_strings(cls, values: Iterable[Optional[str]]) -> "PackedSequences":
+        """
+        Empaqueta una secuencia de cadenas de Python (None/NaN se tratan como nulos).
+
+        Los caracteres no ASCII se sustituyen por '?' para mantener un byte por residuo.
+        """
+        values = list(values)
+        valid = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+        strings = [v if ok else "" for v, ok in zip(values, valid)]
+        lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+        offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        data = np.frombuffer("".join(strings).encode("ascii", errors="replace"), dtype=np.uint8)
+        return cls(data, offsets, None if valid.all() else valid)
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "PackedSequences":
+        """
+        Empaqueta una columna de pandas.
+
+        Las columnas respaldadas por Arrow se convierten sin copiar los datos; las de
+        tipo ``object`` (o si no hay pyarrow) se codifican en una pasada.
+        """
+        if pa is not None:
+            try:
+                return cls.from_arrow(pa.array(series.array))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                # Valores que no son texto: se convierten con str() más abajo
+                pass
+        values = series.astype(object).where(series.notna(), None)
+        return cls.from_strings(v if v is None or isinstance(v, str) else str(v) for v in values)
+
+    @classmethod
+    def concat(cls, parts: Sequence["PackedSequences"]) -> "PackedSequences":
+        """Concatena varias columnas empaquetadas en una nueva (copia los datos)."""
+        if not parts:
+            return cls(np.empty(0, dtype=np.uint8), np.zeros(1, dtype=np.int64))
+        data = np.concatenate([part.residues() for part in parts])
+        lengths = np.concatenate([part.lengths() for part in parts])
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        valid = None
+        if any(part.valid is not None for part in parts):
+            valid = np.concatenate([part.is_valid() for part in parts])
+        return cls(data, offsets, valid)
+
+    # ------------------------------------------------------------
+    # Accesores vectorizados
+    # ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes referenciados por la columna (residuos + offsets + máscara)."""
+        valid_bytes = self.valid.nbytes if self.valid is not None else 0
+        return int(self.offsets[-1] - self.offsets[0]) + self.offsets.nbytes + valid_bytes
+
+    def lengths(self) -> np.ndarray:
+        """Longitud de cada cadena (int64); los nulos tienen longitud 0."""
+        return np.diff(self.offsets).astype(np.int64, copy=False)
+
+    def is_valid(self) -> np.ndarray:
+        """Máscara booleana de valores no nulos."""
+        return self.valid if self.valid is not None else np.ones(len(self), dtype=bool)
+
+    def residues(self) -> np.ndarray:
+        """Todos los residuos concatenados (vista uint8, sin copia)."""
+        return self.data[self.offsets[0]:self.offsets[-1]]
+
+    def byte_counts(self) -> np.ndarray:
+        """Conteo de cada valor de byte (256 posiciones) sobre toda la columna."""
+        return np.bincount(self.residues(), minlength=256)
+
+    def composition(self) -> pd.Series:
+        """
+        Frecuencia total de cada carácter de la columna.
+
+        Returns:
+            pd.Series: Carácter -> conteo, ordenada de mayor a menor
+        """
+        return counts_to_series(self.byte_counts())
+
+    def composition_matrix(self, alphabet: str) -> np.ndarray:
+        """
+        Conteos por cadena de cada símbolo del alfabeto.
+
+        Args:
+            alphabet (str): Símbolos de las columnas de la matriz (ej. "HEC");
+                los bytes fuera del alfabeto no se cuentan
+
+        Returns:
+            np.ndarray: Matriz (n, len(alphabet)) de conteos int64
+        """
+        k = len(alphabet)
+        lut = np.full(256, k, dtype=np.int64)  # k = columna de descarte
+        lut[np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)] = np.arange(k)
+        matrix = np.zeros((len(self), k + 1), dtype=np.int64)
+        lengths = self.lengths()
+        cumulative = np.cumsum(lengths)
+
+        # Bloques de filas con ~_MATRIX_BLOCK_RESIDUES residuos cada uno
+        start = 0
+        while start < len(self):
+            base = cumulative[start - 1] if start else 0
+            stop = max(int(np.searchsorted(cumulative, base + _MATRIX_BLOCK_RESIDUES, side="right")), start + 1)
+            block = self.data[self.offsets[start]:self.offsets[stop]]
+            rows = np.repeat(np.arange(stop - start), lengths[start:stop])
+            matrix[start:stop] = np.bincount(
+                rows * (k + 1) + lut[block], minlength=(stop - start) * (k + 1)
+            ).reshape(stop - start, k + 1)
+            start = stop
+        return matrix[:, :k]
+
+    # ------------------------------------------------------------
+    # Cortes y vistas por cadena
+    # ------------------------------------------------------------
+
+    def chain_view(self, i: int) -> np.ndarray:
+        """Residuos de la cadena ``i`` como vista uint8 (sin copia)."""
+        return self.data[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self.valid is not None and not self.valid[i]:
+            return None
+        return self.chain_view(i).tobytes().decode("ascii", errors="replace")
+
+    def slice(self, start: int, stop: int) -> "PackedSequences":
+        """Filas ``start:stop`` compartiendo el buffer de datos (sin copia)."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(stop, start)
+        valid = self.valid[start:stop] if self.valid is not None else None
+        return PackedSequences(self.data, self.offsets[start:stop + 1], valid)
+
+    def take(self, indices) -> "PackedSequences":
+        """
+        Selecciona filas por posición (o máscara booleana) en una columna nueva y compacta.
+
+        La copia de los residuos es vectorizada: cada posición de salida se calcula
+        como inicio de su cadena + desplazamiento dentro de ella.
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        starts = self.offsets[:-1][indices].astype(np.int64)
+        lengths = self.lengths()[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        within = np.arange(offsets[-1], dtype=np.int64) - np.repeat(offsets[:-1], lengths)
+        data = self.data[np.repeat(starts, lengths) + within]
+        valid = self.valid[indices] if self.valid is not None else None
+        return PackedSequences(data, offsets, valid)
+
+    # ------------------------------------------------------------
+    # Conversión a pandas
+    # ------------------------------------------------------------
+
+    def to_series(self, index=None, name: Optional[str] = None) -> pd.Series:
+        """
+        Convierte la columna a una Serie de texto de pandas.
+
+        Con pyarrow se construye un array Arrow sobre los mismos buffers (sin copiar
+        los residuos); sin él se decodifica cada cadena.
+        """
+        if pa is not None:
+            offsets = (self.offsets - self.offsets[0]).astype(np.int64, copy=False)
+            validity = pa.array(self.valid).buffers()[1] if self.valid is not None else None
+            array = pa.LargeStringArray.from_buffers(
+                len(self), pa.py_buffer(offsets), pa.py_buffer(self.residues()), validity,
+                null_count=-1 if self.valid is not None else 0,
+            )
+            return pd.Series(pd.arrays.ArrowStringArray(array), index=index, name=name)
+        return pd.Series([self[i] for i in range(len(self))], index=index, name=name, dtype="string")
+
+    def __repr__(self) -> str:
+        return f"PackedSequences(rows={len(self):,}, residues={int(self.offsets[-1] - self.offsets[0]):,})"
+
+
+def _row_identity(index: pd.Index) -> Tuple:
+    """Identidad de las filas de un DataFrame (su índice, en orden)."""
+    if isinstance(index, pd.RangeIndex):
+        return ("range", index.start, index.stop, index.step)
+    digest = hashlib.sha256(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    return ("hash", len(index), digest.hexdigest())
+
+
+def packed_column(df: pd.DataFrame, column: str) -> PackedSequences:
+    """
+    Columna de secuencias de un DataFrame en formato empaquetado.
+
+    Si el DataFrame tiene huella (``df.attrs['fingerprint']``, asignada al cargarlo),
+    el resultado se memoiza para no volver a codificar columnas ``object`` en cada
+    rerun. Los subconjuntos y reordenaciones heredan ``attrs`` del dataset original,
+    así que la clave incluye también la identidad de las filas (el índice).
+
+    Args:
+        df (pd.DataFrame): Dataset
+        column (str): Nombre de la columna (ej. 'seq', 'sst3', 'sst8')
+
+    Returns:
+        PackedSequences: Columna empaquetada
+    """
+    fingerprint = df.attrs.get("fingerprint")
+    if fingerprint is None:
+        return PackedSequences.from_series(df[column])
+
+    key = (fingerprint, column, _row_identity(df.index))
+    with _LOCK:
+        packed = _PACKED_CACHE.get(key)
+        if packed is not None:
+            _PACKED_CACHE.move_to_end(key)
+            return packed
+    packed = PackedSequences.from_series(df[column])
+    with _LOCK:
+        _PACKED_CACHE[key] = packed
+        while len(_PACKED_CACHE) > _PACKED_CACHE_SIZE:
+            _PACKED_CACHE.popitem(last=False)
+    return packed
+
+
+def clear_packed_cache() -> None:
+    """Vacía la memoización de columnas empaquetadas."""
+    with _LOCK:
+        _PACKED_CACHE.clear()
@@ -0,0 +1,211 @@
+"""
+Precarga en segundo plano de metadatos PDB para el dataset cargado.
+
+Cuando se carga un dataset con columna ``pdb_id`` ya se conoce, en buena medida,
+qué entradas va a consultar el usuario. Este módulo calienta la caché de
+``tools.fetch_pdb_metadata`` con los IDs referenciados más recientemente (en el
+chat) y los más frecuentes del dataset, de modo que la primera consulta interactiva
+sobre una entrada del dataset sea un acierto de caché.
+
+La precarga es de baja prioridad: usa un pool pequeño de hilos y las consultas
+esperan a que no haya peticiones interactivas en curso. Hay una precarga por
+dataset (por huella), compartida por las sesiones que lo usan: los IDs frecuentes
+se calculan una vez por dataset, los reruns solo programan IDs nuevos del chat y
+cargar otro dataset no cancela la precarga de los demás (solo la del dataset
+menos reciente cuando se supera ``max_datasets``).
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from config import PREFETCH_CONFIG
+from dataset_cache import dataset_fingerprint
+from logger import app_logger
+from tools import fetch_pdb_metadata, is_pdb_cached
+
+
+PDB_ID_PATTERN = re.compile(r"^[1-9][A-Za-z0-9]{3}$")
+
+
+def extract_pdb_ids(text: str) -> List[str]:
+    """Extrae IDs de PDB mencionados en un texto, en orden de aparición."""
+    candidates = re.findall(r"\b[1-9][A-Za-z0-9]{3}\b", text or "")
+    # Descartar números puros (ej. '2018'), que no son IDs habituales en el texto
+    return [c.upper() for c in candidates if not c.isdigit()]
+
+
+def frequent_pdb_ids(df: pd.DataFrame) -> List[str]:
+    """IDs de la columna 'pdb_id' (en mayúsculas), del más al menos frecuente."""
+    if df is None or "pdb_id" not in df.columns:
+        return []
+    return df["pdb_id"].dropna().astype(str).str.upper().value_counts().index.tolist()
+
+
+def select_prefetch_ids(
+    df: Optional[pd.DataFrame], limit: int, recent_ids: Optional[Iterable[str]] = None,
+    frequent: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Selecciona los IDs a precargar: primero los referenciados recientemente y
+    después los más frecuentes del dataset.
+
+    Args:
+        df (pd.DataFrame, optional): Dataset con columna 'pdb_id' (no se usa si se da ``frequent``)
+        limit (int): Número máximo de IDs
+        recent_ids (Iterable[str], optional): IDs mencionados recientemente (más reciente primero)
+        frequent (List[str], optional): IDs del dataset ya ordenados por frecuencia
+            (``frequent_pdb_ids``), para no recalcularlos
+
+    Returns:
+        List[str]: IDs válidos, sin duplicados, en orden de prioridad
+    """
+    if frequent is None:
+        frequent = frequent_pdb_ids(df)
+    known = set(frequent)
+
+    selected: List[str] = []
+    seen = set()
+    for pdb_id in list(recent_ids or []) + frequent:
+        pdb_id = pdb_id.upper()
+        if pdb_id in seen or not PDB_ID_PATTERN.match(pdb_id):
+            continue
+        # Los IDs recientes solo se precargan si pertenecen al dataset
+        if pdb_id not in known:
+            continue
+        seen.add(pdb_id)
+        selected.append(pdb_id)
+        if len(selected) >= limit:
+            break
+    return selected
+
+
+class _PrefetchJob:
+    """Precarga de un dataset: sus IDs por frecuencia y los trabajos programados."""
+
+    def __init__(self, frequent: List[str]):
+        self.frequent = frequent
+        self.scheduled = set()
+        self.futures = []
+
+
+class PDBPrefetcher:
+    """
+    Calienta la caché de metadatos PDB con concurrencia acotada y baja prioridad.
+
+    Attributes:
+        max_workers (int): Hilos dedicados a la precarga
+        max_ids (int): Número máximo de IDs precargados por dataset
+        max_datasets (int): Datasets con precarga activa (se cancela la del menos reciente)
+    """
+
+    def __init__(self, max_workers: int = 2, max_ids: int = 50, max_datasets: int = 4):
+        self.max_workers = max_workers
+        self.max_ids = max_ids
+        self.max_datasets = max_datasets
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdb-prefetch")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, _PrefetchJob]" = OrderedDict()
+        self._stats = {"scheduled": 0, "fetched": 0, "already_cached": 0, "errors": 0}
+
+    def _warm(self, pdb_id: str) -> None:
+        if is_pdb_cached(pdb_id):
+            self._count("already_cached")
+            return
+        result = fetch_pdb_metadata(pdb_id, background=True)
+        self._count("errors" if result.get("error") and not result.get("not_found") else "fetched")
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _job(self, df: pd.DataFrame, fingerprint: str) -> _PrefetchJob:
+        """Precarga del dataset; los IDs frecuentes se calculan solo la primera vez."""
+        with self._lock:
+            job = self._jobs.get(fingerprint)
+            if job is not None:
+                self._jobs.move_to_end(fingerprint)
+                return job
+        job = _PrefetchJob(frequent_pdb_ids(df))
+        with self._lock:
+            job = self._jobs.setdefault(fingerprint, job)
+            self._jobs.move_to_end(fingerprint)
+            while len(self._jobs) > self.max_datasets:
+                _, evicted = self._jobs.popitem(last=False)
+                for future in evicted.futures:
+                    future.cancel()
+        return job
+
+    def start(self, df: pd.DataFrame, recent_ids: Optional[Iterable[str]] = None,
+              fingerprint: Optional[str] = None) -> int:
+        """
+        Programa la precarga para un dataset.
+
+        Es idempotente: en un rerun de Streamlit solo se programan los IDs que aún no
+        se habían programado para ese dataset (ej. uno mencionado en el chat). La
+        precarga de otros datasets (otras sesiones) no se toca.
+
+        Args:
+            df (pd.DataFrame): Dataset cargado
+            recent_ids (Iterable[str], optional): IDs mencionados recientemente
+            fingerprint (str, optional): Huella del dataset (por defecto ``dataset_fingerprint(df)``)
+
+        Returns:
+            int: Número de IDs programados
+        """
+        if df is None or "pdb_id" not in df.columns:
+            return 0
+        job = self._job(df, fingerprint or dataset_fingerprint(df))
+        pdb_ids = select_prefetch_ids(None, self.max_ids, recent_ids, frequent=job.frequent)
+        with self._lock:
+            new_ids = [pdb_id for pdb_id in pdb_ids if pdb_id not in job.scheduled]
+            if not new_ids:
+                return 0
+            job.scheduled.update(new_ids)
+            job.futures = [future for future in job.futures if not future.done()]
+            futures = [self._executor.submit(self._warm, pdb_id) for pdb_id in new_ids if not is_pdb_cached(pdb_id)]
+            job.futures.extend(futures)
+            self._stats["scheduled"] += len(futures)
+        app_logger.info(f"PDB prefetch scheduled for {len(futures)} of {len(new_ids)} dataset IDs")
+        return len(futures)
+
+    def cancel(self, fingerprint: Optional[str] = None) -> None:
+        """Cancela la precarga pendiente de un dataset (o de todos si no se indica)."""
+        with self._lock:
+            fingerprints = [fingerprint] if fingerprint is not None else list(self._jobs)
+            for key in fingerprints:
+                job = self._jobs.pop(key, None)
+                if job is not None:
+                    for future in job.futures:
+                        future.cancel()
+
+    def status(self) -> Dict[str, int]:
+        """Contadores de la precarga y número de trabajos pendientes."""
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() for future in job.futures if not future.done())
+            return {**self._stats, "pending": pending, "datasets": len(self._jobs)}
+
+
+# Instancia global del prefetcher (compartida por las sesiones del proceso)
+pdb_prefetcher = PDBPrefetcher(
+    max_workers=PREFETCH_CONFIG.get("max_workers", 2),
+    max_ids=PREFETCH_CONFIG.get("max_ids", 50),
+    max_datasets=PREFETCH_CONFIG.get("max_datasets", 4)
+)
+
+
+def start_pdb_prefetch(df: pd.DataFrame, recent_ids: Optional[Iterable[str]] = None,
+                       fingerprint: Optional[str] = None) -> int:
+    """Inicia la precarga de metadatos PDB si está habilitada en PREFETCH_CONFIG."""
+    if not PREFETCH_CONFIG.get("enabled", True):
+        return 0
+    try:
+        return pdb_prefetcher.start(df, recent_ids, fingerprint)
+    except Exception as e:
+        # La precarga es una optimización: nunca debe romper la carga del dataset
+        app_logger.warning(f"No se pudo iniciar la precarga de PDB: {e}")
+        return 0
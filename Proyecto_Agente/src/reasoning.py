@@ -0,0 +1,92 @@
+"""
+Manejo del razonamiento (reasoning trace) de modelos tipo DeepSeek-R1.
+
+DeepSeek-R1 genera un bloque de razonamiento antes de la respuesta final, ya sea
+embebido en el contenido (``<think>...</think>``) o en el campo
+``reasoning_content`` que expone LiteLLM. Este módulo separa ambas partes para que
+solo la respuesta final se guarde en el historial y se reenvíe al modelo, y calcula
+el presupuesto de tokens de generación a partir de la configuración.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+from config import MODEL_CONFIG
+
+
+# Bloques de razonamiento completos
+THINK_BLOCK_PATTERN = re.compile(r"<think>(.*?)</think>", re.DOTALL | re.IGNORECASE)
+THINK_OPEN_TAG = "<think>"
+THINK_CLOSE_TAG = "</think>"
+
+
+def split_reasoning(content: Optional[str], reasoning_content: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Separa el razonamiento de la respuesta final de un mensaje del modelo.
+
+    Cubre los tres formatos habituales de DeepSeek-R1:
+    - Razonamiento en ``reasoning_content`` (proveedores compatibles con LiteLLM).
+    - Bloques ``<think>...</think>`` dentro del contenido.
+    - Contenido truncado: ``<think>`` sin cierre (se agotó el presupuesto) o solo
+      ``</think>`` (el proveedor omitió la etiqueta de apertura).
+
+    Args:
+        content (str): Contenido del mensaje devuelto por el modelo
+        reasoning_content (str, optional): Razonamiento entregado por separado
+
+    Returns:
+        Tuple[str, str]: (respuesta, razonamiento), ambos sin espacios sobrantes
+
+    Example:
+        >>> split_reasoning("<think>El usuario pide...</think>La media es 250.")
+        ('La media es 250.', 'El usuario pide...')
+    """
+    answer = content if isinstance(content, str) else ""
+    parts = []
+    if isinstance(reasoning_content, str) and reasoning_content.strip():
+        parts.append(reasoning_content.strip())
+
+    parts.extend(block.strip() for block in THINK_BLOCK_PATTERN.findall(answer))
+    answer = THINK_BLOCK_PATTERN.sub("", answer)
+
+    lowered = answer.lower()
+    open_idx = lowered.find(THINK_OPEN_TAG)
+    close_idx = lowered.rfind(THINK_CLOSE_TAG)
+    if open_idx != -1:
+        # Razonamiento sin cerrar: todo lo posterior a <think> es razonamiento
+        parts.append(answer[open_idx + len(THINK_OPEN_TAG):].strip())
+        answer = answer[:open_idx]
+    elif close_idx != -1:
+        # Solo etiqueta de cierre: lo anterior a </think> es razonamiento
+        parts.append(answer[:close_idx].strip())
+        answer = answer[close_idx + len(THINK_CLOSE_TAG):]
+
+    reasoning = "\n\n".join(part for part in parts if part)
+    return answer.strip(), reasoning
+
+
+def strip_reasoning(content: Optional[str]) -> str:
+    """Devuelve solo la respuesta final de un mensaje, descartando el razonamiento."""
+    return split_reasoning(content)[0]
+
+
+def generation_max_tokens(config: Optional[Dict] = None) -> int:
+    """
+    Calcula el límite de tokens de generación para una llamada al modelo.
+
+    El razonamiento y la respuesta comparten ``max_tokens``; el límite efectivo es
+    la suma de ambos presupuestos, acotada por ``max_tokens`` de la configuración.
+
+    Args:
+        config (Dict, optional): Configuración del modelo. Por defecto MODEL_CONFIG
+
+    Returns:
+        int: Número máximo de tokens a solicitar
+    """
+    config = config or MODEL_CONFIG
+    ceiling = config.get("max_tokens", 4000)
+    reasoning_budget = config.get("reasoning_budget_tokens")
+    answer_budget = config.get("answer_max_tokens")
+    if reasoning_budget is None or answer_budget is None:
+        return ceiling
+    return max(1, min(ceiling, reasoning_budget + answer_budget))
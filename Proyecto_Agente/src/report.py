@@ -4,11 +4,10 @@ from datetime import datetime
 from fpdf import FPDF
 import matplotlib.pyplot as plt
 
-# Importar las funciones de ploteo para usarlas en el reporte
-from eda import (
-    plot_length_distribution, plot_q3_distribution, plot_nonstd_aa_pie,
-    plot_resolution_distribution, plot_rfactor_distribution, plot_experimental_methods, plot_length_vs_resolution
-)
+from dataset_cache import dataset_fingerprint
+from dataset_profile import LENGTH_CATEGORIES, get_profile
+# Las funciones de ploteo de eda.py se ejecutan por nombre en el pool de figuras
+from eda_executor import FigureTask, render_figures
 
 def generate_report(eda_ok, df):
     """
@@ -24,6 +23,8 @@ def generate_report(eda_ok, df):
         report.write(f"Validación de EDA superada: {eda_ok}\n")
         return report.getvalue()
 
+    profile = get_profile(df)
+
     # 1. Resumen General
     report.write("### 1. Resumen General ###\n")
     report.write(f"- Filas: {df.shape[0]}\n")
@@ -37,12 +38,12 @@ def generate_report(eda_ok, df):
 
     # 3. Resumen de Valores Nulos
     report.write("### 3. Resumen de Valores Nulos por Columna ###\n")
-    report.write(df.isna().sum().to_frame("nulos").to_string())
+    report.write(profile.null_counts.to_frame("nulos").to_string())
     report.write("\n\n")
 
     # 4. Estadísticas Descriptivas para Columnas Numéricas
     report.write("### 4. Estadísticas Descriptivas (Columnas Numéricas) ###\n")
-    report.write(df.select_dtypes("number").describe().T.to_string())
+    report.write(profile.describe.T.to_string())
     report.write("\n")
 
     return report.getvalue()
@@ -79,8 +80,21 @@ class PDF(FPDF):
             self.image(buffer, w=190)
         plt.close(fig) # Cerramos la figura para liberar memoria
 
-def generate_pdf_report(eda_ok, df):
-    """Genera un reporte completo en formato PDF con textos y gráficos."""
+    def add_image(self, image, title):
+        """Añade una figura ya renderizada (bytes PNG de la caché de figuras)."""
+        self.add_page()
+        self.chapter_title(title)
+        with io.BytesIO(image) as buffer:
+            self.image(buffer, w=190)
+
+def generate_pdf_report(eda_ok, df, ooc=None):
+    """
+    Genera un reporte completo en formato PDF con textos y gráficos.
+
+    En modo fuera de memoria (``ooc``), ``df`` es la muestra aleatoria: el resumen,
+    los nulos y las estadísticas salen de los agregados exactos del dataset completo,
+    y la vista previa y las figuras se rotulan como calculadas sobre la muestra.
+    """
     if not eda_ok or df is None:
         pdf = FPDF()
         pdf.add_page()
@@ -88,6 +102,7 @@ def generate_pdf_report(eda_ok, df):
         pdf.cell(0, 10, 'Error: No se pudo generar el reporte.', 0, 1, 'C')
         return bytes(pdf.output())
 
+    profile = get_profile(df)
     pdf = PDF()
     pdf.add_page()
 
@@ -99,44 +114,98 @@ def generate_pdf_report(eda_ok, df):
 
     # Contenido del reporte
     pdf.chapter_title("1. Resumen General")
-    pdf.chapter_body(f"- Filas: {df.shape[0]}\n- Columnas: {df.shape[1]}")
-
-    pdf.chapter_title("2. Vista Previa de los Datos")
+    if ooc is not None:
+        pdf.chapter_body(
+            f"- Filas: {ooc.rows}\n- Columnas: {len(ooc.columns)}\n"
+            f"- Modo fuera de memoria: la vista previa y las figuras usan una muestra aleatoria de {df.shape[0]} filas"
+        )
+    else:
+        pdf.chapter_body(f"- Filas: {df.shape[0]}\n- Columnas: {df.shape[1]}")
+
+    pdf.chapter_title("2. Vista Previa de los Datos" + (" (muestra aleatoria)" if ooc is not None else ""))
     pdf.chapter_body(df.head(10).to_string())
 
     pdf.chapter_title("3. Resumen de Valores Nulos")
-    pdf.chapter_body(df.isna().sum().to_frame("nulos").to_string())
+    null_counts = ooc.null_count_series() if ooc is not None else profile.null_counts
+    pdf.chapter_body(null_counts.to_frame("nulos").to_string())
 
     pdf.chapter_title("4. Estadísticas Descriptivas")
-    pdf.chapter_body(df.select_dtypes("number").describe().T.to_string())
-
-    # Añadir gráficos de secuencia
-    fig_len = plot_length_distribution(df)
-    pdf.add_plot(fig_len, "5. Distribución de la Longitud de las Secuencias")
-
-    fig_q3 = plot_q3_distribution(df)
-    pdf.add_plot(fig_q3, "6. Frecuencia de Estructuras Secundarias (Q3)")
-
-    fig_pie = plot_nonstd_aa_pie(df)
-    pdf.add_plot(fig_pie, "7. Proporción de Aminoácidos No Estándar")
-
-    # Añadir gráficos de calidad estructural si las columnas existen
-    # Se usa un contador para los títulos de los capítulos para que sean secuenciales
-    chapter_num = 8
+    pdf.chapter_body((ooc.describe() if ooc is not None else profile.describe).T.to_string())
+
+    # Figuras del reporte (título, tarea). Se calculan y renderizan en paralelo
+    # (eda_executor) y salen de la caché compartida con el dashboard (misma clave sin
+    # filtro): solo se dibujan las que aún no se han renderizado para este dataset.
+    # Las tareas llevan los datos ya agregados del perfil o solo las columnas que usan
+    figures = [
+        ("Distribución de la Longitud de las Secuencias",
+         FigureTask("length_distribution", "plot_length_counts", args=profile.length_histogram.nonzero())),
+        ("Frecuencia de Estructuras Secundarias (Q3)",
+         FigureTask("q3_distribution", "plot_q3_counts", args=(profile.q3_counts(),))),
+        ("Proporción de Aminoácidos No Estándar",
+         FigureTask("nonstd_aa_pie", "plot_nonstd_counts", args=(profile.nonstd_counts(),))),
+    ]
+    # Gráficos de calidad estructural y de estructura/composición si las columnas existen
     if 'resolution' in df.columns:
-        fig_res = plot_resolution_distribution(df)
-        pdf.add_plot(fig_res, f"{chapter_num}. Distribución de Resoluciones")
-        chapter_num += 1
+        figures.append(("Distribución de Resoluciones",
+                        FigureTask("resolution_distribution", "plot_resolution_distribution", columns=["resolution"])))
     if 'R-factor' in df.columns:
-        fig_r = plot_rfactor_distribution(df)
-        pdf.add_plot(fig_r, f"{chapter_num}. Distribución del R-factor")
-        chapter_num += 1
+        figures.append(("Distribución del R-factor",
+                        FigureTask("rfactor_distribution", "plot_rfactor_distribution", columns=["R-factor"])))
     if 'Exptl.' in df.columns:
-        fig_exp = plot_experimental_methods(df)
-        pdf.add_plot(fig_exp, f"{chapter_num}. Métodos Experimentales")
-        chapter_num += 1
+        figures.append(("Métodos Experimentales",
+                        FigureTask("experimental_methods", "plot_method_counts", args=(profile.method_counts,))))
     if 'len' in df.columns and 'resolution' in df.columns:
-        fig_len_res = plot_length_vs_resolution(df)
-        pdf.add_plot(fig_len_res, f"{chapter_num}. Relación Longitud vs. Resolución")
+        figures.append(("Relación Longitud vs. Resolución",
+                        FigureTask("length_vs_resolution", "plot_length_vs_resolution", columns=["len", "resolution"])))
+
+    # Texto que acompaña a algunas figuras (tras la imagen)
+    notes = {}
+    if profile.has_q8:
+        consistency = profile.consistency(df)
+        figures.append(("Frecuencia de Estructuras Secundarias (Q8)",
+                        FigureTask("q8_distribution", "plot_q8_counts", args=(profile.q8_counts(),))))
+        figures.append(("Consistencia Q8 -> Q3",
+                        FigureTask("q8_q3_consistency", "plot_consistency_matrix",
+                                   args=(consistency.matrix(normalize=True),))))
+        flagged = consistency.flagged_chains(df, limit=20)
+        notes["q8_q3_consistency"] = (
+            f"Residuos de 'sst3' que siguen la reducción estándar de 'sst8': {consistency.agreement:.2%} "
+            f"de {consistency.compared:,}\n"
+            f"Cadenas con discrepancias: {int((consistency.mismatches > 0).sum()):,}\n"
+            f"Cadenas con longitudes distintas: {int(consistency.length_mismatch.sum()):,}"
+            + (f"\n\nCadenas inconsistentes (hasta 20):\n{flagged.to_string(index=False)}" if len(flagged) else "")
+        )
+    if profile.has_column("sst3"):
+        segments = profile.segments(df, "sst3")
+        figures.append(("Longitud de los Segmentos (Q3)",
+                        FigureTask("segment_lengths", "plot_segment_length_counts", args=(segments,))))
+        figures.append(("Segmentos de Estructura Secundaria por Cadena",
+                        FigureTask("segments_per_chain", "plot_segment_chain_counts", args=(segments,))))
+        notes["segment_lengths"] = segments.length_stats().round(2).to_string()
+    if profile.has_column("sst8"):
+        figures.append(("Longitud de los Segmentos (Q8)",
+                        FigureTask("q8_segment_lengths", "plot_segment_length_counts",
+                                   args=(profile.segments(df, "sst8"),))))
+    if profile.has_sequences:
+        composition = profile.composition(df)
+        figures.append(("Composición de Aminoácidos",
+                        FigureTask("aa_composition", "plot_composition_frequencies", args=(composition.frequencies(),))))
+        figures.append(("Composición de Aminoácidos por Longitud",
+                        FigureTask("composition_by_length", "plot_composition_table",
+                                   args=(composition.by_length_bucket(LENGTH_CATEGORIES),))))
+
+    results = render_figures(df, [task for _, task in figures], dataset_fingerprint(df))
+    suffix = " (muestra aleatoria)" if ooc is not None else ""
+    for chapter_num, ((title, _), result) in enumerate(zip(figures, results), start=5):
+        title += suffix
+        if result.ok:
+            pdf.add_image(result.image, f"{chapter_num}. {title}")
+        else:
+            # Un error en una figura no impide generar el resto del reporte
+            pdf.add_page()
+            pdf.chapter_title(f"{chapter_num}. {title}")
+            pdf.chapter_body(f"No se pudo generar la figura: {result.error}")
+        if result.name in notes:
+            pdf.chapter_body(notes[result.name])
 
     return bytes(pdf.output())
@@ -0,0 +1,214 @@
+"""
+Motor de conteo de residuos y estados de estructura secundaria.
+
+Los conteos de Q3, Q8 y aminoácidos se calculaban con
+``pd.Series(list("".join(df['sst3']))).value_counts()``, que crea un objeto ``str``
+por residuo en cada rerun del dashboard. Aquí cada columna se recorre una sola vez
+como buffer ``uint8`` (``packed.PackedSequences``):
+
+- Totales: ``np.bincount`` sobre los bytes (256 posiciones) y una tabla de búsqueda
+  que asigna cada byte a su símbolo del alfabeto; los caracteres inesperados se
+  conservan aparte en lugar de perderse.
+- Por cadena (opcional): matriz ``N x K`` de conteos con la misma tabla de búsqueda,
+  calculada por bloques.
+
+Los totales se memoizan por huella del dataset (``df.attrs['fingerprint']``), así
+que los reruns con el mismo dataset no vuelven a recorrer los residuos.
+
+Example:
+    >>> counts = count_residues(df)
+    >>> counts.q3
+    C    ...
+    H    ...
+    E    ...
+    >>> count_residues(df, columns=["sst3"], per_chain=True).matrix_frame("sst3").head()
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from packed import PackedSequences, packed_column
+
+
+# ============================================================
+# ALFABETOS
+# ============================================================
+
+Q3_ALPHABET = "HEC"
+Q8_ALPHABET = "HGIEBTSC"
+STANDARD_AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+NONSTANDARD_AMINO_ACIDS = "XUOBZJ"
+AMINO_ACID_ALPHABET = STANDARD_AMINO_ACIDS + NONSTANDARD_AMINO_ACIDS
+
+# Alfabeto de cada columna de secuencia (nombres en minúsculas)
+RESIDUE_ALPHABETS = {
+    "sst3": Q3_ALPHABET,
+    "sst8": Q8_ALPHABET,
+    "seq": AMINO_ACID_ALPHABET,
+}
+
+# Conteos por byte recientes, por (huella del dataset, columna) -> (filas, conteos)
+_COUNTS_CACHE: "OrderedDict[Tuple[str, str], Tuple[int, np.ndarray]]" = OrderedDict()
+_COUNTS_CACHE_SIZE = 16
+_LOCK = threading.Lock()
+
+
+def alphabet_lut(alphabet: str) -> np.ndarray:
+    """
+    Tabla de búsqueda byte -> posición en el alfabeto.
+
+    Args:
+        alphabet (str): Símbolos ASCII (ej. "HEC")
+
+    Returns:
+        np.ndarray: 256 posiciones int64; los bytes fuera del alfabeto valen ``len(alphabet)``
+    """
+    lut = np.full(256, len(alphabet), dtype=np.int64)
+    lut[np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)] = np.arange(len(alphabet))
+    return lut
+
+
+def symbol_counts(byte_counts: np.ndarray, alphabet: str) -> pd.Series:
+    """
+    Convierte un conteo por byte en una Serie símbolo -> conteo.
+
+    Los símbolos del alfabeto presentes aparecen primero (en su orden); los caracteres
+    fuera del alfabeto, después, cada uno con su conteo. La Serie se ordena de mayor a
+    menor (como ``value_counts``), con empates en el orden anterior.
+
+    Args:
+        byte_counts (np.ndarray): Conteo de cada valor de byte (256 posiciones)
+        alphabet (str): Alfabeto esperado de la columna
+
+    Returns:
+        pd.Series: Símbolo -> conteo (int64), solo símbolos presentes
+    """
+    lut = alphabet_lut(alphabet)
+    # Códigos del alfabeto en su orden y, detrás, el resto de bytes presentes
+    codes = np.concatenate([
+        np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8).astype(np.int64),
+        np.flatnonzero(lut == len(alphabet)),
+    ])
+    codes = codes[byte_counts[codes] > 0]
+    counts = pd.Series(byte_counts[codes], index=[chr(code) for code in codes], dtype="int64")
+    return counts.sort_values(ascending=False, kind="stable")
+
+
+def _column_alphabet(column: str) -> str:
+    return RESIDUE_ALPHABETS.get(column.lower(), AMINO_ACID_ALPHABET)
+
+
+# ============================================================
+# RESULTADO DEL CONTEO
+# ============================================================
+
+class ResidueCounts:
+    """
+    Conteos de residuos de un dataset.
+
+    Attributes:
+        byte_counts (Dict[str, np.ndarray]): Conteo por byte (256 posiciones) de cada columna
+        matrices (Dict[str, np.ndarray]): Matriz (n, k) por cadena de cada columna
+            (solo si se pidió ``per_chain``)
+        alphabets (Dict[str, str]): Alfabeto de cada columna
+    """
+
+    def __init__(self, byte_counts: Dict[str, np.ndarray], matrices: Dict[str, np.ndarray],
+                 alphabets: Dict[str, str]):
+        self.byte_counts = byte_counts
+        self.matrices = matrices
+        self.alphabets = alphabets
+
+    def totals(self, column: str) -> pd.Series:
+        """Frecuencia total de cada símbolo de ``column`` (Serie vacía si no se contó)."""
+        if column not in self.byte_counts:
+            return pd.Series(dtype="int64")
+        return symbol_counts(self.byte_counts[column], self.alphabets[column])
+
+    @property
+    def q3(self) -> pd.Series:
+        return self.totals("sst3")
+
+    @property
+    def q8(self) -> pd.Series:
+        return self.totals("sst8")
+
+    @property
+    def amino_acids(self) -> pd.Series:
+        return self.totals("seq")
+
+    def matrix(self, column: str) -> np.ndarray:
+        """Matriz (n, k) de conteos por cadena; requiere ``per_chain=True``."""
+        if column not in self.matrices:
+            raise KeyError(f"No hay conteos por cadena para '{column}' (usa per_chain=True)")
+        return self.matrices[column]
+
+    def matrix_frame(self, column: str, index=None) -> pd.DataFrame:
+        """Matriz por cadena como DataFrame (una columna por símbolo del alfabeto)."""
+        return pd.DataFrame(self.matrix(column), index=index, columns=list(self.alphabets[column]))
+
+
+# ============================================================
+# CONTEO
+# ============================================================
+
+def _cached_byte_counts(df: pd.DataFrame, column: str, packed: Optional[PackedSequences]) -> np.ndarray:
+    """Conteo por byte de una columna, memoizado por huella del dataset."""
+    fingerprint = df.attrs.get("fingerprint")
+    key = (fingerprint, column)
+    if fingerprint is not None:
+        with _LOCK:
+            cached = _COUNTS_CACHE.get(key)
+            # Los subconjuntos heredan attrs: la huella solo vale con el mismo número de filas
+            if cached is not None and cached[0] == len(df):
+                _COUNTS_CACHE.move_to_end(key)
+                return cached[1]
+    if packed is None:
+        packed = packed_column(df, column)
+    counts = packed.byte_counts()
+    if fingerprint is not None:
+        with _LOCK:
+            _COUNTS_CACHE[key] = (len(df), counts)
+            while len(_COUNTS_CACHE) > _COUNTS_CACHE_SIZE:
+                _COUNTS_CACHE.popitem(last=False)
+    return counts
+
+
+def count_residues(df: pd.DataFrame, columns: Optional[Iterable[str]] = None,
+                   per_chain: bool = False) -> ResidueCounts:
+    """
+    Cuenta Q3, Q8 y aminoácidos recorriendo cada columna una sola vez.
+
+    Args:
+        df (pd.DataFrame): Dataset (o subconjunto de filas)
+        columns (Iterable[str], opcional): Columnas a contar; por defecto las de
+            ``RESIDUE_ALPHABETS`` presentes en ``df`` (sin distinguir mayúsculas)
+        per_chain (bool): Calcular también la matriz N x K por cadena
+
+    Returns:
+        ResidueCounts: Totales (y matrices) indexados por el nombre de columna en minúsculas
+    """
+    available = {str(col).lower(): col for col in df.columns}
+    wanted = [c.lower() for c in columns] if columns is not None else list(RESIDUE_ALPHABETS)
+
+    byte_counts, matrices, alphabets = {}, {}, {}
+    for key in wanted:
+        column = available.get(key)
+        if column is None:
+            continue
+        alphabets[key] = _column_alphabet(key)
+        packed = packed_column(df, column) if per_chain else None
+        byte_counts[key] = _cached_byte_counts(df, column, packed)
+        if per_chain:
+            matrices[key] = packed.composition_matrix(alphabets[key])
+    return ResidueCounts(byte_counts, matrices, alphabets)
+
+
+def clear_counts_cache() -> None:
+    """Vacía la memoización de conteos."""
+    with _LOCK:
+        _COUNTS_CACHE.clear()
@@ -0,0 +1,407 @@
+"""
+Capa de resiliencia para llamadas a servicios externos (LLM, NCBI BLAST, RCSB PDB).
+
+Este módulo centraliza cómo el agente tolera fallos de sus dependencias remotas:
+- Reintentos clasificados: solo se reintentan errores transitorios (timeouts,
+  errores de conexión, HTTP 408/429/5xx) con backoff exponencial y jitter completo.
+- Hedging: para llamadas idempotentes, si la respuesta tarda más que el p95
+  observado del endpoint se lanza una petición duplicada y se usa la primera
+  que responda.
+- Circuit breakers por endpoint: tras varios fallos transitorios consecutivos el
+  endpoint se marca como caído y las llamadas fallan de inmediato hasta que pasa
+  el tiempo de enfriamiento.
+- Ejecutores propios: los endpoints lentos (BLAST) pueden tener su propio pool de
+  hilos acotado, para que los intentos que agotan su timeout (y siguen ocupando su
+  hilo) no dejen sin hilos a los demás endpoints.
+- Métricas: estado del breaker, reintentos, fallos y hedges por endpoint.
+
+Example:
+    >>> result = resilient_call("rcsb_pdb", requests.get, url, timeout=10)
+    >>> get_resilience_metrics()["rcsb_pdb"]["state"]
+    'closed'
+"""
+
+import random
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from config import RESILIENCE_CONFIG
+from logger import app_logger
+
+try:
+    from requests.exceptions import ChunkedEncodingError, ConnectionError as RequestsConnectionError, Timeout
+    _REQUESTS_TRANSIENT = (RequestsConnectionError, Timeout, ChunkedEncodingError)
+except ImportError:  # pragma: no cover - dependencia opcional
+    _REQUESTS_TRANSIENT = ()
+
+
+# Códigos HTTP que indican un fallo transitorio del proveedor
+TRANSIENT_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Errores de red o de tiempo agotado que pueden resolverse reintentando. Otros
+# OSError (archivo no encontrado, permisos, ...) son permanentes.
+TRANSIENT_ERRORS = (
+    TimeoutError, ConnectionError, socket.gaierror, socket.herror, FutureTimeoutError
+) + _REQUESTS_TRANSIENT
+
+# Estados del circuit breaker
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class EndpointBusyError(Exception):
+    """Se lanza cuando todos los hilos propios de un endpoint están ocupados."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        super().__init__(f"'{endpoint}' está atendiendo el máximo de llamadas simultáneas; inténtalo más tarde")
+
+
+class CircuitOpenError(Exception):
+    """Se lanza cuando el circuit breaker de un endpoint está abierto."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f"Circuit breaker abierto para '{endpoint}' (reintentar en {retry_in:.0f}s)")
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """Extrae el código HTTP de excepciones de requests, urllib, OpenAI/LiteLLM."""
+    for candidate in (
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+        getattr(error, "code", None),
+    ):
+        if isinstance(candidate, int):
+            return candidate
+    return None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Clasifica una excepción como transitoria (reintentable) o permanente.
+
+    Args:
+        error (BaseException): Excepción lanzada por la llamada
+
+    Returns:
+        bool: True si conviene reintentar la llamada
+    """
+    if isinstance(error, (CircuitOpenError, EndpointBusyError)):
+        return False
+    status = _status_code(error)
+    if status is not None:
+        return status in TRANSIENT_STATUS_CODES
+    if isinstance(error, TRANSIENT_ERRORS):
+        return True
+    # urllib.error.URLError envuelve el error de red original en ``reason``
+    reason = getattr(error, "reason", None)
+    return isinstance(reason, BaseException) and isinstance(reason, TRANSIENT_ERRORS)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker clásico de tres estados (cerrado, abierto, semiabierto).
+
+    Attributes:
+        failure_threshold (int): Fallos transitorios consecutivos para abrir el circuito
+        reset_timeout (float): Segundos que el circuito permanece abierto
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Estado actual, pasando a semiabierto si ya expiró el enfriamiento."""
+        with self._lock:
+            if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            return self._state
+
+    def before_call(self) -> None:
+        """
+        Verifica si se permite la llamada.
+
+        Raises:
+            CircuitOpenError: Si el circuito está abierto o ya hay una sonda en curso
+        """
+        state = self.state
+        with self._lock:
+            if state == STATE_OPEN:
+                retry_in = self.reset_timeout - (time.monotonic() - self._opened_at)
+                raise CircuitOpenError("", max(retry_in, 0.0))
+            if state == STATE_HALF_OPEN:
+                # Solo una llamada de prueba mientras el circuito está semiabierto
+                if self._probe_in_flight:
+                    raise CircuitOpenError("", 0.0)
+                self._probe_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Libera la sonda del estado semiabierto sin registrar resultado (la llamada no llegó a ejecutarse)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == STATE_HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResilientEndpoint:
+    """
+    Endpoint remoto con reintentos, hedging, circuit breaker y métricas propias.
+
+    Args:
+        name (str): Nombre del endpoint (ej. 'llm', 'ncbi_blast', 'rcsb_pdb')
+        max_attempts (int): Intentos totales por llamada (incluye el primero)
+        base_delay (float): Retardo base del backoff exponencial en segundos
+        max_delay (float): Retardo máximo entre intentos
+        failure_threshold (int): Fallos consecutivos para abrir el circuito
+        reset_timeout (float): Segundos de enfriamiento del circuito abierto
+        hedge (bool): Permitir peticiones duplicadas para llamadas idempotentes
+        hedge_min_samples (int): Latencias necesarias antes de calcular el p95
+        attempt_timeout (float, optional): Tiempo máximo de espera por intento
+        retry_on_timeout (bool): Reintentar los intentos que agotan ``attempt_timeout``
+            (su hilo sigue ocupado hasta que la llamada termina)
+        max_workers (int, optional): Hilos propios del endpoint; por defecto usa el pool
+            compartido. Con todos ocupados las llamadas fallan con ``EndpointBusyError``
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+        attempt_timeout: Optional[float] = None,
+        retry_on_timeout: bool = True,
+        max_workers: Optional[int] = None,
+    ):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.attempt_timeout = attempt_timeout
+        self.retry_on_timeout = retry_on_timeout
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_workers) if max_workers else None
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._latencies = deque(maxlen=200)
+        self._counters = {
+            "calls": 0, "successes": 0, "failures": 0, "retries": 0,
+            "short_circuits": 0, "busy_rejections": 0, "hedges": 0, "hedge_wins": 0,
+        }
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def p95_latency(self) -> Optional[float]:
+        """Latencia p95 de las llamadas exitosas recientes, o None si hay pocas muestras."""
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Estado del breaker, contadores y latencia p95 del endpoint."""
+        p95 = self.p95_latency()
+        with self._lock:
+            counters = dict(self._counters)
+        return {"state": self.breaker.state, "p95_latency_s": p95, **counters}
+
+    # ------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _submit(self, fn: Callable, args, kwargs):
+        """Envía la llamada al pool propio del endpoint (si tiene) o al compartido."""
+        if self._slots is None:
+            return _EXECUTOR.submit(fn, *args, **kwargs)
+        # Un hilo ocupado por un intento que agotó su timeout sigue contando hasta que termina
+        if not self._slots.acquire(blocking=False):
+            raise EndpointBusyError(self.name)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"resilience-{self.name}"
+                )
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run_attempt(self, fn: Callable, idempotent: bool, args, kwargs) -> Any:
+        """Ejecuta un intento, con hedging y/o timeout si corresponde."""
+        hedge_after = self.p95_latency() if (self.hedge and idempotent) else None
+        if hedge_after is None and self.attempt_timeout is None and self._slots is None:
+            return fn(*args, **kwargs)
+
+        primary = self._submit(fn, args, kwargs)
+        pending = {primary}
+        deadline = None if self.attempt_timeout is None else time.monotonic() + self.attempt_timeout
+
+        if hedge_after is not None:
+            done, _ = wait(pending, timeout=hedge_after)
+            if not done:
+                self._count("hedges")
+                app_logger.info(f"Hedging request to '{self.name}' after {hedge_after:.2f}s (p95)")
+                try:
+                    pending.add(self._submit(fn, args, kwargs))
+                except EndpointBusyError:
+                    pass
+
+        last_error = None
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                raise FutureTimeoutError(f"'{self.name}' no respondió en {self.attempt_timeout}s")
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result()
+                last_error = future.exception()
+        raise last_error
+
+    def call(self, fn: Callable, *args, idempotent: bool = False, **kwargs) -> Any:
+        """
+        Ejecuta ``fn(*args, **kwargs)`` aplicando la política de resiliencia.
+
+        Args:
+            fn (Callable): Función que realiza la llamada remota
+            idempotent (bool): Si la llamada puede duplicarse sin efectos (habilita hedging)
+
+        Returns:
+            Any: Resultado de ``fn``
+
+        Raises:
+            CircuitOpenError: Si el endpoint está marcado como caído
+            EndpointBusyError: Si todos los hilos propios del endpoint están ocupados
+            Exception: El último error si se agotan los reintentos o no es transitorio
+        """
+        self._count("calls")
+        for attempt in range(self.max_attempts):
+            try:
+                self.breaker.before_call()
+            except CircuitOpenError as open_error:
+                self._count("short_circuits")
+                raise CircuitOpenError(self.name, open_error.retry_in) from None
+
+            start = time.monotonic()
+            try:
+                result = self._run_attempt(fn, idempotent, args, kwargs)
+            except EndpointBusyError:
+                # La llamada no llegó a ejecutarse: no cuenta como fallo del servicio
+                self.breaker.release_probe()
+                self._count("busy_rejections")
+                raise
+            except Exception as error:
+                transient = is_transient_error(error)
+                if transient:
+                    self.breaker.record_failure()
+                else:
+                    # Errores permanentes (ej. 4xx) no indican que el servicio esté caído
+                    self.breaker.record_success()
+                last_attempt = attempt == self.max_attempts - 1
+                timed_out = isinstance(error, FutureTimeoutError) and not self.retry_on_timeout
+                if not transient or last_attempt or timed_out or self.breaker.state == STATE_OPEN:
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt)
+                self._count("retries")
+                app_logger.warning(
+                    f"Transient error on '{self.name}' (attempt {attempt + 1}/{self.max_attempts}): "
+                    f"{type(error).__name__}: {error}. Retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+                continue
+
+            with self._lock:
+                self._latencies.append(time.monotonic() - start)
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+
+# Pool compartido para hedging y timeouts por intento (endpoints sin ``max_workers``)
+_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="resilience")
+
+# Endpoints configurados (uno por dependencia externa)
+_ENDPOINTS: Dict[str, ResilientEndpoint] = {}
+_ENDPOINTS_LOCK = threading.Lock()
+
+
+def get_endpoint(name: str) -> ResilientEndpoint:
+    """Obtiene (o crea a partir de RESILIENCE_CONFIG) el endpoint con ese nombre."""
+    with _ENDPOINTS_LOCK:
+        if name not in _ENDPOINTS:
+            _ENDPOINTS[name] = ResilientEndpoint(name, **RESILIENCE_CONFIG.get(name, {}))
+        return _ENDPOINTS[name]
+
+
+def resilient_call(endpoint: str, fn: Callable, *args, idempotent: bool = False, **kwargs) -> Any:
+    """
+    Ejecuta una llamada remota a través del endpoint resiliente indicado.
+
+    Args:
+        endpoint (str): Nombre del endpoint en RESILIENCE_CONFIG
+        fn (Callable): Función que realiza la llamada
+        idempotent (bool): Habilita hedging si el endpoint lo permite
+        *args, **kwargs: Argumentos para ``fn``
+
+    Returns:
+        Any: Resultado de ``fn``
+    """
+    return get_endpoint(endpoint).call(fn, *args, idempotent=idempotent, **kwargs)
+
+
+def get_resilience_metrics() -> Dict[str, Dict[str, Any]]:
+    """
+    Métricas por endpoint: estado del breaker, llamadas, reintentos, fallos,
+    cortocircuitos, hedges y latencia p95.
+    """
+    for name in RESILIENCE_CONFIG:
+        get_endpoint(name)
+    with _ENDPOINTS_LOCK:
+        endpoints = list(_ENDPOINTS.values())
+    return {endpoint.name: endpoint.metrics() for endpoint in endpoints}
@@ -0,0 +1,219 @@
+"""
+Segmentos de estructura secundaria (hélices, hebras, coil) por codificación run-length.
+
+El EDA solo reportaba los conteos totales de H/E/C, y
+``utils.get_secondary_structure_info`` recorre los caracteres de una cadena en
+Python. Aquí toda la columna 'sst3' (o 'sst8') se segmenta a la vez sobre su buffer
+empaquetado (``packed.PackedSequences``):
+
+1. Cada byte se traduce a su estado con una tabla de búsqueda (``alphabet_lut``).
+2. Un segmento empieza donde el estado cambia (``np.diff`` sobre los estados) o
+   donde empieza una cadena (``offsets``).
+3. Longitudes, estado y cadena de cada segmento salen de las posiciones de inicio
+   (``np.diff`` y ``np.searchsorted``), sin bucles por cadena.
+
+Sobre los segmentos, los histogramas de longitudes por estado y los resúmenes por
+cadena (número de segmentos, longitud media y máxima) son ``np.bincount`` y
+``np.maximum.reduceat``. Los huecos de coil son los segmentos de coil internos
+(con un segmento de otro estado a cada lado en la misma cadena).
+
+Example:
+    >>> segments = find_segments(df, "sst3")
+    >>> segments.length_counts("H")
+    >>> segments.per_chain_summary().head()
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from packed import packed_column
+from residue_counts import Q3_ALPHABET, RESIDUE_ALPHABETS, alphabet_lut
+
+
+# Nombre de cada estado en gráficos y reportes
+STATE_NAMES = {
+    "H": "Hélice alfa",
+    "E": "Hebra beta",
+    "C": "Coil",
+    "G": "Hélice 3-10",
+    "I": "Hélice pi",
+    "B": "Puente beta",
+    "T": "Giro",
+    "S": "Curvatura",
+}
+
+# Estado de coil en Q3 y Q8 (los huecos son segmentos de coil entre elementos de estructura)
+COIL_STATE = "C"
+
+
+class StructureSegments:
+    """
+    Segmentos de estructura secundaria de una columna, en orden de cadena y posición.
+
+    Attributes:
+        chain (np.ndarray): Cadena (posición de fila) de cada segmento
+        start (np.ndarray): Posición del primer residuo dentro de su cadena
+        length (np.ndarray): Residuos del segmento
+        state (np.ndarray): Índice del estado en ``alphabet`` (``len(alphabet)`` para
+            caracteres fuera del alfabeto, que cortan segmentos pero no se reportan)
+        alphabet (str): Estados de la columna (ej. "HEC")
+        n_chains (int): Número de cadenas de la columna (incluidas las vacías)
+    """
+
+    def __init__(self, chain: np.ndarray, start: np.ndarray, length: np.ndarray, state: np.ndarray,
+                 alphabet: str, n_chains: int):
+        self.chain = chain
+        self.start = start
+        self.length = length
+        self.state = state
+        self.alphabet = alphabet
+        self.n_chains = n_chains
+
+    def __len__(self) -> int:
+        return len(self.length)
+
+    def _state_index(self, state: str) -> int:
+        if state not in self.alphabet:
+            raise KeyError(f"Estado '{state}' fuera del alfabeto '{self.alphabet}'")
+        return self.alphabet.index(state)
+
+    def subset(self, rows: np.ndarray) -> "StructureSegments":
+        """Segmentos de un subconjunto de cadenas (ej. ``LengthIndex.positions``), sin renumerarlas."""
+        selected = np.zeros(self.n_chains, dtype=bool)
+        selected[rows] = True
+        mask = selected[self.chain]
+        return StructureSegments(self.chain[mask], self.start[mask], self.length[mask], self.state[mask],
+                                 self.alphabet, self.n_chains)
+
+    # ---- Distribuciones de longitud ----
+
+    def lengths_of(self, state: str) -> np.ndarray:
+        """Longitudes de los segmentos de un estado."""
+        return self.length[self.state == self._state_index(state)]
+
+    def length_counts(self, state: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Histograma exacto de longitudes de segmento de un estado.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Longitudes presentes y número de segmentos de cada una
+        """
+        per_length = np.bincount(self.lengths_of(state))
+        present = np.flatnonzero(per_length)
+        return present, per_length[present]
+
+    def coil_gaps(self) -> np.ndarray:
+        """Longitudes de los segmentos de coil internos (entre dos elementos de estructura de la misma cadena)."""
+        if COIL_STATE not in self.alphabet or not len(self):
+            return np.empty(0, dtype=self.length.dtype)
+        same_chain_before = np.r_[False, self.chain[1:] == self.chain[:-1]]
+        same_chain_after = np.r_[self.chain[:-1] == self.chain[1:], False]
+        internal = (self.state == self._state_index(COIL_STATE)) & same_chain_before & same_chain_after
+        return self.length[internal]
+
+    def length_stats(self) -> pd.DataFrame:
+        """Segmentos, longitud media, mediana y máxima por estado (una fila por estado presente)."""
+        rows = {}
+        for symbol in self.alphabet:
+            lengths = self.lengths_of(symbol)
+            if len(lengths):
+                rows[STATE_NAMES.get(symbol, symbol)] = {
+                    "segmentos": len(lengths), "media": lengths.mean(),
+                    "mediana": float(np.median(lengths)), "máximo": int(lengths.max()),
+                }
+        gaps = self.coil_gaps()
+        if len(gaps):
+            rows["Hueco de coil"] = {
+                "segmentos": len(gaps), "media": gaps.mean(), "mediana": float(np.median(gaps)), "máximo": int(gaps.max())
+            }
+        return pd.DataFrame.from_dict(rows, orient="index")
+
+    # ---- Resúmenes por cadena ----
+
+    def per_chain_counts(self) -> np.ndarray:
+        """Matriz (n_chains, len(alphabet)) con el número de segmentos de cada estado por cadena."""
+        k = len(self.alphabet)
+        known = self.state < k
+        flat = self.chain[known].astype(np.int64) * k + self.state[known]
+        return np.bincount(flat, minlength=self.n_chains * k).reshape(self.n_chains, k)
+
+    def per_chain_summary(self, index=None) -> pd.DataFrame:
+        """
+        Número de segmentos, longitud media y máxima de cada estado por cadena.
+
+        Args:
+            index (opcional): Índice del DataFrame resultante (ej. ``df.index``)
+
+        Returns:
+            pd.DataFrame: Columnas ``<estado>_segmentos``, ``<estado>_long_media`` y
+            ``<estado>_long_max`` (0 si la cadena no tiene segmentos de ese estado)
+        """
+        columns: Dict[str, np.ndarray] = {}
+        counts = self.per_chain_counts()
+        for k, symbol in enumerate(self.alphabet):
+            mask = self.state == k
+            chains, lengths = self.chain[mask], self.length[mask]
+            totals = np.bincount(chains, weights=lengths, minlength=self.n_chains)
+            longest = np.zeros(self.n_chains, dtype=np.int64)
+            if len(chains):
+                # Los segmentos están ordenados por cadena: cada cadena es un bloque contiguo
+                first = np.flatnonzero(np.r_[True, chains[1:] != chains[:-1]])
+                longest[chains[first]] = np.maximum.reduceat(lengths, first)
+            columns[f"{symbol}_segmentos"] = counts[:, k]
+            columns[f"{symbol}_long_media"] = np.divide(
+                totals, counts[:, k], out=np.zeros(self.n_chains), where=counts[:, k] > 0
+            )
+            columns[f"{symbol}_long_max"] = longest
+        return pd.DataFrame(columns, index=index)
+
+
+# ============================================================
+# SEGMENTACIÓN
+# ============================================================
+
+def find_segments(df: pd.DataFrame, column: str = "sst3", alphabet: Optional[str] = None) -> StructureSegments:
+    """
+    Segmenta una columna de estructura secundaria completa.
+
+    Args:
+        df (pd.DataFrame): Dataset
+        column (str): Columna (sin distinguir mayúsculas), ej. 'sst3' o 'sst8'
+        alphabet (str, opcional): Estados; por defecto el de ``RESIDUE_ALPHABETS``
+
+    Returns:
+        StructureSegments: Segmentos de todas las cadenas
+
+    Raises:
+        KeyError: Si el dataset no tiene la columna
+    """
+    name = next((col for col in df.columns if str(col).lower() == column.lower()), None)
+    if name is None:
+        raise KeyError(f"El dataset no tiene columna '{column}'")
+    alphabet = alphabet or RESIDUE_ALPHABETS.get(column.lower(), Q3_ALPHABET)
+    packed = packed_column(df, name)
+
+    states = alphabet_lut(alphabet).astype(np.uint8)[packed.residues()]
+    chain_starts = (packed.offsets[:-1] - packed.offsets[0]).astype(np.int64)
+    lengths = packed.lengths()
+
+    # Inicio de segmento: cambio de estado o inicio de una cadena no vacía
+    boundary = np.empty(len(states), dtype=bool)
+    if len(states):
+        boundary[0] = True
+        np.not_equal(states[1:], states[:-1], out=boundary[1:])
+        boundary[chain_starts[lengths > 0]] = True
+    starts = np.flatnonzero(boundary)
+
+    chain = np.searchsorted(chain_starts, starts, side="right") - 1
+    # Cadenas vacías comparten inicio con la siguiente: searchsorted(right) elige la última, que es la no vacía
+    segment_length = np.diff(np.r_[starts, len(states)])
+    return StructureSegments(
+        chain=chain,
+        start=starts - chain_starts[chain],
+        length=segment_length,
+        state=states[starts],
+        alphabet=alphabet,
+        n_chains=len(lengths),
+    )
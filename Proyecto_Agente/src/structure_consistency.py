@@ -0,0 +1,202 @@
+"""
+Consistencia entre las estructuras secundarias Q8 ('sst8') y Q3 ('sst3').
+
+``validate_eda`` exige 'sst8', pero el EDA solo usaba 'sst3'. Aquí ambas columnas
+se comparan posición a posición sobre sus buffers empaquetados
+(``packed.PackedSequences``), sin bucles en Python:
+
+1. Se seleccionan las cadenas con 'sst8' y 'sst3' de igual longitud; sus residuos
+   quedan alineados en los dos buffers (máscara ``np.repeat`` por cadena).
+2. La matriz de confusión Q8 -> Q3 es un ``np.bincount`` de los pares de estados.
+3. La reducción estándar de DSSP (``fasta_reader.SST8_TO_SST3``: H/G/I -> H,
+   E/B -> E, resto -> C) se aplica con una tabla de búsqueda y se compara byte a
+   byte con 'sst3'; las posiciones discrepantes se asignan a su cadena con
+   ``np.searchsorted``.
+
+Las cadenas con longitudes distintas en 'sst8' y 'sst3' se marcan aparte.
+
+Example:
+    >>> consistency = StructureConsistency.from_frame(df)
+    >>> consistency.matrix()
+    >>> consistency.agreement, consistency.flagged_chains()[:10]
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from fasta_reader import SST8_TO_SST3
+from packed import packed_column
+from residue_counts import Q3_ALPHABET, Q8_ALPHABET, alphabet_lut
+
+
+# Etiqueta de los estados fuera del alfabeto en la matriz
+OTHER_STATE = "?"
+
+_REDUCTION_LUT = np.frombuffer(SST8_TO_SST3, dtype=np.uint8)
+
+# Residuos comparados por bloque (acota la memoria temporal)
+_BLOCK_RESIDUES = 4 * 1024 * 1024
+
+
+class StructureConsistency:
+    """
+    Comparación posición a posición de 'sst8' con 'sst3'.
+
+    Attributes:
+        confusion (np.ndarray): Matriz (9, 4) de residuos por estado Q8 (filas, más
+            'otros') y estado Q3 (columnas, más 'otros'), solo cadenas alineadas
+        mismatches (np.ndarray): Posiciones por cadena en las que 'sst3' no sigue la
+            reducción estándar de 'sst8'
+        length_mismatch (np.ndarray): Cadenas con 'sst8' y 'sst3' de distinta longitud
+        compared (int): Residuos comparados
+    """
+
+    def __init__(self, confusion: np.ndarray, mismatches: np.ndarray, length_mismatch: np.ndarray,
+                 compared: int):
+        self.confusion = confusion
+        self.mismatches = mismatches
+        self.length_mismatch = length_mismatch
+        self.compared = compared
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "StructureConsistency":
+        """
+        Compara las columnas 'sst8' y 'sst3' de un dataset (sin distinguir mayúsculas en los nombres).
+
+        Args:
+            df (pd.DataFrame): Dataset con 'sst8' y 'sst3'
+
+        Returns:
+            StructureConsistency: Matriz de confusión y cadenas inconsistentes
+
+        Raises:
+            KeyError: Si falta alguna de las dos columnas
+        """
+        columns = {str(col).lower(): col for col in df.columns}
+        missing = {"sst8", "sst3"} - columns.keys()
+        if missing:
+            raise KeyError(f"El dataset no tiene las columnas {sorted(missing)}")
+        sst8 = packed_column(df, columns["sst8"])
+        sst3 = packed_column(df, columns["sst3"])
+        lengths8, lengths3 = sst8.lengths(), sst3.lengths()
+        aligned = lengths8 == lengths3
+        length_mismatch = ~aligned & (sst8.is_valid() | sst3.is_valid())
+
+        # Residuos de las cadenas alineadas: misma posición en los dos buffers
+        residues8, residues3 = sst8.residues(), sst3.residues()
+        if not aligned.all():
+            residues8 = residues8[np.repeat(aligned, lengths8)]
+            residues3 = residues3[np.repeat(aligned, lengths3)]
+
+        # Por bloques: los índices de estado temporales no dependen del tamaño de la columna
+        lut8 = alphabet_lut(Q8_ALPHABET).astype(np.uint8)
+        lut3 = alphabet_lut(Q3_ALPHABET).astype(np.uint8)
+        width = len(Q3_ALPHABET) + 1
+        confusion = np.zeros((len(Q8_ALPHABET) + 1) * width, dtype=np.int64)
+        wrong = []
+        for start in range(0, len(residues8), _BLOCK_RESIDUES):
+            block8 = residues8[start:start + _BLOCK_RESIDUES]
+            block3 = residues3[start:start + _BLOCK_RESIDUES]
+            confusion += np.bincount(lut8[block8] * np.uint8(width) + lut3[block3], minlength=len(confusion))
+            # Posiciones que no siguen la reducción estándar
+            wrong.append(np.flatnonzero(_REDUCTION_LUT[block8] != block3) + start)
+        confusion = confusion.reshape(len(Q8_ALPHABET) + 1, width)
+        wrong = np.concatenate(wrong) if wrong else np.empty(0, dtype=np.int64)
+
+        # Cada posición discrepante se asigna a su cadena alineada
+        aligned_rows = np.flatnonzero(aligned)
+        chain_ends = np.cumsum(lengths8[aligned_rows])
+        mismatches = np.zeros(len(lengths8), dtype=np.int64)
+        if len(wrong):
+            owner = aligned_rows[np.searchsorted(chain_ends, wrong, side="right")]
+            mismatches += np.bincount(owner, minlength=len(lengths8))
+        return cls(confusion, mismatches, length_mismatch, len(residues8))
+
+    # ---- Resultados ----
+
+    def matrix(self, normalize: bool = False) -> pd.DataFrame:
+        """
+        Matriz de confusión Q8 (filas) -> Q3 (columnas).
+
+        Args:
+            normalize (bool): Porcentaje por fila (qué fracción de cada estado Q8 va a cada Q3)
+
+        Returns:
+            pd.DataFrame: Conteos o porcentajes; la fila/columna '?' solo aparece si tiene residuos
+        """
+        table = pd.DataFrame(
+            self.confusion,
+            index=list(Q8_ALPHABET) + [OTHER_STATE],
+            columns=list(Q3_ALPHABET) + [OTHER_STATE],
+        )
+        if not table.loc[OTHER_STATE].any():
+            table = table.drop(index=OTHER_STATE)
+        if not table[OTHER_STATE].any():
+            table = table.drop(columns=OTHER_STATE)
+        if normalize:
+            totals = table.sum(axis=1)
+            table = table.div(totals.where(totals > 0), axis=0).fillna(0.0) * 100.0
+        return table
+
+    def q8_counts(self) -> pd.Series:
+        """Residuos por estado Q8 de las cadenas alineadas, de mayor a menor."""
+        counts = self.matrix().sum(axis=1)
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+    @property
+    def agreement(self) -> float:
+        """Fracción de residuos comparados en los que 'sst3' sigue la reducción estándar de 'sst8'."""
+        return 1.0 - self.mismatches.sum() / self.compared if self.compared else 1.0
+
+    def flagged(self) -> np.ndarray:
+        """Máscara de cadenas inconsistentes (discrepancias o longitudes distintas)."""
+        return (self.mismatches > 0) | self.length_mismatch
+
+    def flagged_chains(self, df: Optional[pd.DataFrame] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Cadenas inconsistentes, de más a menos discrepancias.
+
+        Args:
+            df (pd.DataFrame, opcional): Dataset del que tomar 'pdb_id' y 'chain_code'
+            limit (int, opcional): Máximo de cadenas a devolver
+
+        Returns:
+            pd.DataFrame: Posición de la fila, identificadores (si hay ``df``),
+            discrepancias y si difieren las longitudes
+        """
+        rows = np.flatnonzero(self.flagged())
+        order = np.lexsort((~self.length_mismatch[rows], -self.mismatches[rows]))
+        rows = rows[order[:limit] if limit is not None else order]
+        table = pd.DataFrame({
+            "fila": rows,
+            "discrepancias": self.mismatches[rows],
+            "longitud_distinta": self.length_mismatch[rows],
+        })
+        if df is not None:
+            for key in ("pdb_id", "chain_code"):
+                column = next((col for col in df.columns if str(col).lower() == key), None)
+                if column is not None:
+                    table.insert(len(table.columns) - 2, key, df[column].to_numpy()[rows])
+        return table
+
+    def summary_text(self) -> str:
+        """Resumen de la distribución Q8 y de la consistencia Q8/Q3 para el contexto del agente."""
+        q8 = self.q8_counts()
+        total = q8.sum()
+        by_state = self.matrix(normalize=True)
+        lines = [
+            "Estructura Secundaria Q8 (residuos): "
+            + ", ".join(f"{state} {count:,} ({count / total:.1%})" for state, count in q8.items() if total),
+            f"Consistencia Q8 -> Q3 (reducción estándar H/G/I->H, E/B->E, resto->C): "
+            f"{self.agreement:.2%} de {self.compared:,} residuos; "
+            f"{int((self.mismatches > 0).sum()):,} cadenas con discrepancias y "
+            f"{int(self.length_mismatch.sum()):,} con longitudes distintas",
+            "  % de cada estado Q8 asignado a cada estado Q3: "
+            + "; ".join(
+                f"{state}: " + ", ".join(f"{q3} {pct:.1f}%" for q3, pct in row.items() if pct > 0)
+                for state, row in by_state.iterrows() if row.any()
+            ),
+        ]
+        return "\n".join(lines)
@@ -0,0 +1,172 @@
+"""
+Compactación de resultados de herramientas antes de reenviarlos al LLM.
+
+Los resultados de BLAST contra ``nr`` pueden ser enormes: cada alineamiento trae
+todos sus HSPs y títulos con decenas de deflines redundantes. Este módulo convierte
+los resultados estructurados de ``tools.py`` en texto compacto que respeta un
+presupuesto de tokens por herramienta (TOOL_RESULT_BUDGETS):
+- Ordena los hits por E-value y conserva solo el mejor HSP de cada uno.
+- Fusiona títulos redundantes (deflines repetidos y hits con la misma descripción).
+- Redondea cifras y trunca textos largos.
+- Añade hits mientras quepan en el presupuesto e indica cuántos se omitieron.
+
+Así el tamaño del prompt de la segunda llamada al LLM es predecible.
+"""
+
+import math
+import re
+from typing import Any, Dict, List
+
+from config import TOOL_RESULT_BUDGETS
+
+
+# Aproximación estándar de ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+MAX_TITLE_CHARS = 90
+MAX_AUTHORS = 3
+
+# Identificadores tipo 'gi|4504349|ref|NP_000509.1|' al inicio de un defline
+_ID_PREFIX_PATTERN = re.compile(r"^(?:[\w.]+\|)+\s*")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación rápida del número de tokens de un texto."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    text = (text or "").strip()
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+def _clean_title(title: str) -> Dict[str, Any]:
+    """
+    Reduce un título de BLAST a su primer defline sin identificadores.
+
+    Returns:
+        Dict[str, Any]: 'description' limpia y 'merged' (deflines adicionales fusionados)
+    """
+    deflines = [d for d in re.split(r"\s+>", title or "") if d.strip()]
+    first = _ID_PREFIX_PATTERN.sub("", deflines[0]) if deflines else ""
+    return {"description": first.strip(), "merged": max(len(deflines) - 1, 0)}
+
+
+def _round_evalue(evalue: float) -> str:
+    return "0" if not evalue else f"{evalue:.0e}"
+
+
+def compact_blast_result(result: Dict[str, Any], budget_tokens: int) -> str:
+    """
+    Compacta el resultado estructurado de ``tools.search_blast``.
+
+    Args:
+        result (Dict[str, Any]): Resultado con 'query', 'hits' y 'error'
+        budget_tokens (int): Presupuesto aproximado de tokens
+
+    Returns:
+        str: Texto compacto dentro del presupuesto
+    """
+    if result.get("error"):
+        return _truncate(result["error"], budget_tokens * CHARS_PER_TOKEN)
+    if not result.get("hits"):
+        return "No se encontraron alineaciones significativas para la secuencia proporcionada."
+
+    # Mejor HSP por hit y fusión de hits con la misma descripción
+    merged: Dict[str, Dict[str, Any]] = {}
+    for hit in result["hits"]:
+        if not hit.get("hsps"):
+            continue
+        best = min(hit["hsps"], key=lambda h: (h["evalue"], -h["score"]))
+        title = _clean_title(hit["title"])
+        key = title["description"].lower()
+        if key in merged:
+            merged[key]["merged"] += 1 + title["merged"]
+            if best["evalue"] < merged[key]["evalue"]:
+                merged[key].update(accession=hit.get("accession"), **_hsp_summary(best))
+            continue
+        merged[key] = {
+            "description": title["description"],
+            "accession": hit.get("accession"),
+            "merged": title["merged"],
+            **_hsp_summary(best),
+        }
+
+    ranked: List[Dict[str, Any]] = sorted(merged.values(), key=lambda h: (h["evalue"], -h["score"]))
+    header = f"BLAST (query {result.get('query', '')[:20]}…): {len(ranked)} hits únicos, ordenados por E-value\n"
+    lines = [header]
+    used = estimate_tokens(header)
+    for rank, hit in enumerate(ranked, start=1):
+        accession = f" [{hit['accession']}]" if hit.get("accession") else ""
+        extra = f" (+{hit['merged']} redundantes)" if hit["merged"] else ""
+        line = (
+            f"{rank}. {_truncate(hit['description'], MAX_TITLE_CHARS)}{accession}{extra} | "
+            f"E={_round_evalue(hit['evalue'])} | id={hit['identity_pct']:.0f}% "
+            f"({hit['identities']}/{hit['align_length']}) | score={hit['score']:.0f}\n"
+        )
+        cost = estimate_tokens(line)
+        if used + cost > budget_tokens and rank > 1:
+            lines.append(f"(+{len(ranked) - rank + 1} hits omitidos por límite de tokens)")
+            break
+        lines.append(line)
+        used += cost
+    return "".join(lines).rstrip()
+
+
+def _hsp_summary(hsp: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "evalue": hsp["evalue"],
+        "score": hsp["score"],
+        "identities": hsp["identities"],
+        "align_length": hsp["align_length"],
+        "identity_pct": hsp["identity_pct"],
+    }
+
+
+def compact_pdb_result(result: Dict[str, Any], budget_tokens: int) -> str:
+    """
+    Compacta el resultado estructurado de ``tools.fetch_pdb_metadata``.
+
+    Args:
+        result (Dict[str, Any]): Resultado con 'pdb_id', 'title', 'method', 'resolution', 'authors'
+        budget_tokens (int): Presupuesto aproximado de tokens
+
+    Returns:
+        str: Texto compacto dentro del presupuesto
+    """
+    max_chars = budget_tokens * CHARS_PER_TOKEN
+    if result.get("error"):
+        return _truncate(result["error"], max_chars)
+
+    authors = result.get("authors") or []
+    authors_text = ", ".join(authors[:MAX_AUTHORS]) + (" et al." if len(authors) > MAX_AUTHORS else "")
+    resolution = f"{result['resolution']:.2f} Å" if result.get("resolution") else "No disponible"
+    text = (
+        f"PDB {result['pdb_id']}: {_truncate(result.get('title'), MAX_TITLE_CHARS * 2)}\n"
+        f"- Método: {result.get('method')} | Resolución: {resolution}\n"
+        f"- Autores: {authors_text or 'No disponibles'}"
+    )
+    return _truncate(text, max_chars)
+
+
+_COMPACTORS = {
+    "run_blast_search": compact_blast_result,
+    "fetch_pdb_data": compact_pdb_result,
+}
+
+
+def compact_tool_result(function_name: str, result: Any) -> str:
+    """
+    Compacta el resultado de una herramienta según su presupuesto configurado.
+
+    Args:
+        function_name (str): Nombre de la herramienta invocada por el LLM
+        result (Any): Resultado estructurado (dict) o texto de la herramienta
+
+    Returns:
+        str: Contenido para el mensaje 'tool' reenviado al LLM
+    """
+    budget = TOOL_RESULT_BUDGETS.get(function_name, TOOL_RESULT_BUDGETS.get("default", 300))
+    compactor = _COMPACTORS.get(function_name)
+    if compactor is not None and isinstance(result, dict):
+        return compactor(result, budget)
+    return _truncate(str(result), budget * CHARS_PER_TOKEN)
@@ -5,53 +5,139 @@ Este módulo proporciona funciones para interactuar con bases de datos bioinform
 externas como NCBI BLAST y RCSB Protein Data Bank (PDB). Estas herramientas permiten
 al agente obtener información adicional sobre secuencias y estructuras de proteínas.
 
+Las llamadas remotas pasan por la capa de resiliencia (``resilience.py``): reintentos
+de errores transitorios, circuit breaker por servicio y hedging para PDB.
+
+Cada herramienta tiene una versión estructurada (``search_blast``,
+``fetch_pdb_metadata``) que devuelve un diccionario, usada por el agente para compactar
+el resultado antes de reenviarlo al LLM (``tool_compactor.py``), y una versión de
+texto (``run_blast_search``, ``fetch_pdb_data``) con el formato completo.
+
+Los metadatos de PDB se guardan en una caché en memoria con TTL, compartida con la
+precarga en segundo plano (``prefetch.py``); las consultas interactivas tienen
+prioridad sobre las de precarga.
+
 Author: Juan Felipe Cardona
 Date: 2024
 """
 
 import io
 import re
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
 import requests
-import re
 from Bio.Blast import NCBIWWW, NCBIXML
 
+from resilience import resilient_call, CircuitOpenError
+from config import PDB_CACHE_CONFIG
 
-def run_blast_search(sequence: str, top_n: int = 3) -> str:
+
+# ============================================================
+# Caché de metadatos PDB
+# ============================================================
+_PDB_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
+_PDB_INFLIGHT: Dict[str, threading.Event] = {}
+_PDB_CACHE_LOCK = threading.Lock()
+
+# Consultas interactivas en curso: la precarga espera a que no haya ninguna
+_INTERACTIVE_IDLE = threading.Condition()
+_interactive_requests = 0
+
+
+def _pdb_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Devuelve una copia de la entrada en caché si existe y no ha expirado."""
+    with _PDB_CACHE_LOCK:
+        entry = _PDB_CACHE.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > PDB_CACHE_CONFIG["ttl_seconds"]:
+            del _PDB_CACHE[key]
+            return None
+        _PDB_CACHE.move_to_end(key)
+        return dict(value)
+
+
+def _pdb_cache_put(key: str, value: Dict[str, Any]) -> None:
+    with _PDB_CACHE_LOCK:
+        _PDB_CACHE[key] = (time.monotonic(), dict(value))
+        _PDB_CACHE.move_to_end(key)
+        while len(_PDB_CACHE) > PDB_CACHE_CONFIG["max_entries"]:
+            _PDB_CACHE.popitem(last=False)
+
+
+def is_pdb_cached(pdb_id: str) -> bool:
+    """Indica si los metadatos de un PDB ID ya están en caché."""
+    return isinstance(pdb_id, str) and _pdb_cache_get(pdb_id.upper()) is not None
+
+
+def wait_for_interactive_idle(timeout: Optional[float] = None) -> bool:
     """
-    Realiza una búsqueda BLAST para una secuencia de proteína dada contra la base de datos nr de NCBI.
+    Bloquea hasta que no haya consultas PDB interactivas en curso.
 
-    Esta función permite encontrar secuencias similares en la base de datos no redundante
-    de NCBI, útil para identificar proteínas homólogas o relacionadas evolutivamente.
+    Usado por la precarga en segundo plano para ceder el paso al usuario.
+
+    Returns:
+        bool: False si se agotó el tiempo de espera
+    """
+    with _INTERACTIVE_IDLE:
+        return _INTERACTIVE_IDLE.wait_for(lambda: _interactive_requests == 0, timeout=timeout)
+
+
+def _mark_interactive(delta: int) -> None:
+    global _interactive_requests
+    with _INTERACTIVE_IDLE:
+        _interactive_requests += delta
+        if _interactive_requests == 0:
+            _INTERACTIVE_IDLE.notify_all()
+
+
+def _request_pdb_entry(url: str) -> "requests.Response":
+    """
+    GET a la API de RCSB; convierte 429/5xx en excepción para que se reintenten.
+
+    Un 404 se devuelve tal cual: es una respuesta válida (ID inexistente), no un fallo.
+    """
+    response = requests.get(url, timeout=10)
+    if response.status_code == 429 or response.status_code >= 500:
+        response.raise_for_status()
+    return response
+
+
+def search_blast(sequence: str, top_n: int = 3) -> Dict[str, Any]:
+    """
+    Realiza una búsqueda BLAST y devuelve los resultados de forma estructurada.
 
     Args:
         sequence (str): Secuencia de aminoácidos a buscar. Debe contener al menos 10 residuos.
         top_n (int, optional): Número de mejores resultados a retornar. Por defecto 3.
 
     Returns:
-        str: String formateado con los top N resultados BLAST incluyendo:
-             - Título de la secuencia encontrada
-             - E-value (significancia estadística)
-             - Score de alineamiento
-             - Porcentaje de identidad
-
-    Raises:
-        Exception: Si ocurre un error durante la búsqueda BLAST
-
-    Example:
-        >>> sequence = "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNL..."
-        >>> results = run_blast_search(sequence, top_n=5)
+        Dict[str, Any]: Diccionario con las claves:
+            - query (str): Primeros 50 AA de la secuencia consultada
+            - hits (List[Dict]): Un elemento por alineamiento con 'title', 'accession',
+              'length' y 'hsps' (cada HSP con 'evalue', 'score', 'bits',
+              'identities', 'align_length' e 'identity_pct')
+            - error (str | None): Mensaje de error, si la búsqueda no fue posible
     """
+    result = {"query": "", "hits": [], "error": None}
+
     # ============================================================
     # Validación de entrada
     # ============================================================
     if not sequence or not isinstance(sequence, str) or len(sequence) < 10:
-        return "Error: Se necesita una secuencia de proteína válida (mínimo 10 aminoácidos) para la búsqueda BLAST."
+        result["error"] = "Error: Se necesita una secuencia de proteína válida (mínimo 10 aminoácidos) para la búsqueda BLAST."
+        return result
 
     # Validación de seguridad estricta para evitar Inyección en APIs externas
     # Permitir letras (aminoácidos) y asterisco (codón de parada)
     if not re.match(r'^[A-Za-z\*]+$', sequence):
-        return "Error: La secuencia contiene caracteres inválidos. Solo se permiten letras (A-Z) y asteriscos (*)."
+        result["error"] = "Error: La secuencia contiene caracteres inválidos. Solo se permiten letras (A-Z) y asteriscos (*)."
+        return result
+
+    result["query"] = sequence[:50]
 
     try:
         # ============================================================
@@ -60,102 +146,190 @@ def run_blast_search(sequence: str, top_n: int = 3) -> str:
         # Nota: qblast realiza la búsqueda en los servidores de NCBI
         # blastp = búsqueda de proteína vs proteína
         # nr = base de datos no redundante
-        result_handle = NCBIWWW.qblast("blastp", "nr", sequence)
+        result_handle = resilient_call("ncbi_blast", NCBIWWW.qblast, "blastp", "nr", sequence)
         blast_records = NCBIXML.parse(result_handle)
 
-        # Buffer para construir la salida formateada
-        output = io.StringIO()
-        output.write(f"Resultados de BLAST para la secuencia (primeros 50 AA): {sequence[:50]}...\n\n")
-
         # ============================================================
-        # Procesar y formatear resultados
+        # Extraer los top N alineamientos
         # ============================================================
-        count = 0
         for blast_record in blast_records:
-            # Verificar si se encontraron alineamientos
-            if not blast_record.alignments:
-                return "No se encontraron alineaciones significativas para la secuencia proporcionada."
-
-            # Iterar sobre los alineamientos encontrados
             for alignment in blast_record.alignments:
-                if count >= top_n:
+                if len(result["hits"]) >= top_n:
                     break
 
-                # Escribir información del hit
-                output.write(f"> {alignment.title}\n")
-
                 # Procesar HSPs (High-scoring Segment Pairs)
-                for hsp in alignment.hsps:
-                    identity_pct = (hsp.identities / hsp.align_length) * 100
-                    output.write(
-                        f"  E-value: {hsp.expect:.2e} | "
-                        f"Score: {hsp.score} | "
-                        f"Identidades: {hsp.identities}/{hsp.align_length} ({identity_pct:.2f}%)\n"
-                    )
+                result["hits"].append({
+                    "title": alignment.title,
+                    "accession": getattr(alignment, "accession", None),
+                    "length": getattr(alignment, "length", None),
+                    "hsps": [
+                        {
+                            "evalue": hsp.expect,
+                            "score": hsp.score,
+                            "bits": getattr(hsp, "bits", None),
+                            "identities": hsp.identities,
+                            "align_length": hsp.align_length,
+                            "identity_pct": (hsp.identities / hsp.align_length) * 100,
+                        }
+                        for hsp in alignment.hsps
+                    ],
+                })
+
+            if len(result["hits"]) >= top_n:
+                break
 
-                count += 1
+    except CircuitOpenError as e:
+        result["error"] = (
+            "Error: El servicio NCBI BLAST no está disponible temporalmente "
+            f"(se reintentará en {e.retry_in:.0f}s)."
+        )
+    except Exception as e:
+        result["error"] = f"Error al realizar la búsqueda BLAST: {e}"
 
-            if count >= top_n:
-                break
+    return result
 
-        return output.getvalue()
 
-    except Exception as e:
-        return f"Error al realizar la búsqueda BLAST: {e}"
+def format_blast_result(result: Dict[str, Any]) -> str:
+    """
+    Formatea el resultado estructurado de ``search_blast`` como texto completo.
 
-def fetch_pdb_data(pdb_id: str) -> str:
+    Incluye todos los HSPs de cada alineamiento; para reenviar el resultado al LLM
+    se usa la versión compactada de ``tool_compactor``.
     """
-    Obtiene metadatos de una estructura cristalográfica desde la base de datos RCSB PDB.
+    if result.get("error"):
+        return result["error"]
+    if not result["hits"]:
+        return "No se encontraron alineaciones significativas para la secuencia proporcionada."
+
+    # Buffer para construir la salida formateada
+    output = io.StringIO()
+    output.write(f"Resultados de BLAST para la secuencia (primeros 50 AA): {result['query']}...\n\n")
+    for hit in result["hits"]:
+        # Escribir información del hit
+        output.write(f"> {hit['title']}\n")
+        for hsp in hit["hsps"]:
+            output.write(
+                f"  E-value: {hsp['evalue']:.2e} | "
+                f"Score: {hsp['score']} | "
+                f"Identidades: {hsp['identities']}/{hsp['align_length']} ({hsp['identity_pct']:.2f}%)\n"
+            )
+    return output.getvalue()
 
-    Consulta la API REST de RCSB para recuperar información detallada sobre
-    una estructura de proteína, incluyendo título, método experimental,
-    resolución y autores.
+
+def run_blast_search(sequence: str, top_n: int = 3) -> str:
+    """
+    Realiza una búsqueda BLAST para una secuencia de proteína dada contra la base de datos nr de NCBI.
+
+    Esta función permite encontrar secuencias similares en la base de datos no redundante
+    de NCBI, útil para identificar proteínas homólogas o relacionadas evolutivamente.
 
     Args:
-        pdb_id (str): Identificador de 4 caracteres del PDB (ej. '2HHB' para hemoglobina).
+        sequence (str): Secuencia de aminoácidos a buscar. Debe contener al menos 10 residuos.
+        top_n (int, optional): Número de mejores resultados a retornar. Por defecto 3.
 
     Returns:
-        str: Información formateada sobre la estructura que incluye:
-             - Título de la estructura
-             - Método experimental utilizado
-             - Resolución de la estructura (si aplica)
-             - Autores de la publicación
-
-    Raises:
-        requests.exceptions.RequestException: Si hay problemas de conexión con la API
+        str: String formateado con los top N resultados BLAST incluyendo:
+             - Título de la secuencia encontrada
+             - E-value (significancia estadística)
+             - Score de alineamiento
+             - Porcentaje de identidad
 
     Example:
-        >>> info = fetch_pdb_data("2HHB")
-        >>> print(info)
-        Resumen para PDB ID 2HHB:
-        - Título: DEOXY HUMAN HEMOGLOBIN
-        - Método Experimental: X-RAY DIFFRACTION
-        - Resolución: 1.74 Å
+        >>> sequence = "MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNL..."
+        >>> results = run_blast_search(sequence, top_n=5)
     """
+    return format_blast_result(search_blast(sequence, top_n))
+
+
+def fetch_pdb_metadata(pdb_id: str, background: bool = False) -> Dict[str, Any]:
+    """
+    Obtiene los metadatos de una entrada de RCSB PDB de forma estructurada.
+
+    Los resultados válidos (incluido "no encontrado") se guardan en caché. Si otra
+    consulta del mismo ID está en curso, se espera su resultado en lugar de repetir
+    la petición.
+
+    Args:
+        pdb_id (str): Identificador de 4 caracteres del PDB (ej. '2HHB' para hemoglobina).
+        background (bool): Consulta de precarga; espera a que no haya consultas
+                           interactivas en curso antes de acceder a la red.
+
+    Returns:
+        Dict[str, Any]: Diccionario con 'pdb_id', 'title', 'method', 'resolution'
+                        (float o None), 'authors' (lista) y 'error' (str o None)
+    """
+    result = {"pdb_id": pdb_id, "title": None, "method": None, "resolution": None, "authors": [], "error": None}
+
     # ============================================================
     # Validación de entrada
     # ============================================================
     if not pdb_id or not isinstance(pdb_id, str) or len(pdb_id) != 4:
-        return "Error: Se requiere un ID de PDB válido de 4 caracteres."
+        result["error"] = "Error: Se requiere un ID de PDB válido de 4 caracteres."
+        return result
 
     # Validación de seguridad estricta para evitar SSRF/Injection
     # PDB IDs son estrictamente 4 caracteres (1 número + 3 alfanuméricos)
     if not re.match(r'^[1-9][a-zA-Z0-9]{3}$', pdb_id):
-        return "Error: El ID de PDB contiene caracteres no válidos o no tiene el formato correcto."
-
+        result["error"] = "Error: El ID de PDB contiene caracteres no válidos o no tiene el formato correcto."
+        return result
+
+    key = pdb_id.upper()
+    if background:
+        # La precarga cede el paso: no accede a la red mientras haya consultas interactivas
+        cached = _pdb_cache_get(key)
+        if cached is not None:
+            return cached
+        wait_for_interactive_idle()
+    else:
+        _mark_interactive(1)
+    try:
+        while True:
+            cached = _pdb_cache_get(key)
+            if cached is not None:
+                cached["pdb_id"] = pdb_id
+                return cached
+            with _PDB_CACHE_LOCK:
+                inflight = _PDB_INFLIGHT.get(key)
+                if inflight is None:
+                    _PDB_INFLIGHT[key] = threading.Event()
+                    break
+            # Otra consulta del mismo ID está en curso: esperar su resultado
+            inflight.wait(timeout=30)
+            if _pdb_cache_get(key) is None:
+                # La otra consulta falló; intentarlo directamente
+                return _fetch_pdb_metadata_remote(pdb_id, result)
+
+        try:
+            result = _fetch_pdb_metadata_remote(pdb_id, result)
+            if result.get("error") is None or result.get("not_found"):
+                _pdb_cache_put(key, result)
+            return result
+        finally:
+            with _PDB_CACHE_LOCK:
+                _PDB_INFLIGHT.pop(key).set()
+    finally:
+        if not background:
+            _mark_interactive(-1)
+
+
+def _fetch_pdb_metadata_remote(pdb_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Consulta la API de RCSB y completa ``result`` (sin caché)."""
+    result = dict(result)
     # ============================================================
     # Consultar API de RCSB PDB
     # ============================================================
     url = f"https://data.rcsb.org/rest/v1/core/entry/{pdb_id}"
 
     try:
-        # Realizar petición GET a la API
+        # Realizar petición GET a la API (idempotente: admite reintentos y hedging)
         # Validación de seguridad: Timeout explícito para evitar bloqueos
-        response = requests.get(url, timeout=10)
+        response = resilient_call("rcsb_pdb", _request_pdb_entry, url, idempotent=True)
 
         # Verificar si el PDB ID existe
         if response.status_code == 404:
-            return f"Error: No se encontró ninguna entrada para el PDB ID '{pdb_id}'."
+            result["error"] = f"Error: No se encontró ninguna entrada para el PDB ID '{pdb_id}'."
+            result["not_found"] = True
+            return result
 
         # Lanzar excepción si hay otros errores HTTP
         response.raise_for_status()
@@ -166,38 +340,78 @@ def fetch_pdb_data(pdb_id: str) -> str:
         # ============================================================
         # Extraer información relevante
         # ============================================================
-        title = data.get('struct', {}).get('title', 'No disponible')
-        method = data.get('exptl', [{}])[0].get('method', 'No disponible')
-        resolution = data.get('rcsb_entry_info', {}).get('resolution_combined', [None])[0]
+        result["title"] = data.get('struct', {}).get('title', 'No disponible')
+        result["method"] = data.get('exptl', [{}])[0].get('method', 'No disponible')
+        result["resolution"] = data.get('rcsb_entry_info', {}).get('resolution_combined', [None])[0]
 
         # Extraer autores de la publicación asociada
-        authors = ", ".join([
+        result["authors"] = [
             author.get('name', '')
             for author in data.get('citation', [{}])[0].get('rcsb_authors', [])
             if author.get('name')
-        ])
+        ]
 
-        # ============================================================
-        # Formatear salida para el LLM
-        # ============================================================
-        output = (
-            f"Resumen para PDB ID {pdb_id}:\n"
-            f"- Título: {title}\n"
-            f"- Método Experimental: {method}\n"
+    except CircuitOpenError as e:
+        result["error"] = (
+            "Error: El servicio RCSB PDB no está disponible temporalmente "
+            f"(se reintentará en {e.retry_in:.0f}s)."
         )
+    except requests.exceptions.RequestException as e:
+        result["error"] = f"Error de red al contactar la API de PDB: {e}"
+    except Exception as e:
+        result["error"] = f"Ocurrió un error inesperado al procesar los datos de PDB: {e}"
 
-        # Añadir resolución si está disponible
-        if resolution:
-            output += f"- Resolución: {resolution:.2f} Å\n"
-        else:
-            output += "- Resolución: No disponible\n"
+    return result
 
-        # Añadir autores
-        output += f"- Autores de la Publicación: {authors if authors else 'No disponibles'}"
 
-        return output
+def format_pdb_result(result: Dict[str, Any]) -> str:
+    """Formatea el resultado estructurado de ``fetch_pdb_metadata`` como texto para el LLM."""
+    if result.get("error"):
+        return result["error"]
 
-    except requests.exceptions.RequestException as e:
-        return f"Error de red al contactar la API de PDB: {e}"
-    except Exception as e:
-        return f"Ocurrió un error inesperado al procesar los datos de PDB: {e}"
+    output = (
+        f"Resumen para PDB ID {result['pdb_id']}:\n"
+        f"- Título: {result['title']}\n"
+        f"- Método Experimental: {result['method']}\n"
+    )
+
+    # Añadir resolución si está disponible
+    if result["resolution"]:
+        output += f"- Resolución: {result['resolution']:.2f} Å\n"
+    else:
+        output += "- Resolución: No disponible\n"
+
+    # Añadir autores
+    authors = ", ".join(result["authors"])
+    output += f"- Autores de la Publicación: {authors if authors else 'No disponibles'}"
+
+    return output
+
+
+def fetch_pdb_data(pdb_id: str) -> str:
+    """
+    Obtiene metadatos de una estructura cristalográfica desde la base de datos RCSB PDB.
+
+    Consulta la API REST de RCSB para recuperar información detallada sobre
+    una estructura de proteína, incluyendo título, método experimental,
+    resolución y autores.
+
+    Args:
+        pdb_id (str): Identificador de 4 caracteres del PDB (ej. '2HHB' para hemoglobina).
+
+    Returns:
+        str: Información formateada sobre la estructura que incluye:
+             - Título de la estructura
+             - Método experimental utilizado
+             - Resolución de la estructura (si aplica)
+             - Autores de la publicación
+
+    Example:
+        >>> info = fetch_pdb_data("2HHB")
+        >>> print(info)
+        Resumen para PDB ID 2HHB:
+        - Título: DEOXY HUMAN HEMOGLOBIN
+        - Método Experimental: X-RAY DIFFRACTION
+        - Resolución: 1.74 Å
+    """
+    return format_pdb_result(fetch_pdb_metadata(pdb_id))
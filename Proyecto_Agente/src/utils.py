@@ -7,6 +7,8 @@ from typing import Optional, Dict, Any
 import re
 from pathlib import Path
 
+from dataset_profile import get_profile
+
 def validate_protein_sequence(sequence: str) -> Dict[str, Any]:
     """
     Valida una secuencia de proteína.
@@ -276,23 +278,26 @@ class DataFrameValidator:
         if df is None or df.empty:
             return {"error": "DataFrame is empty or None"}
         
+        # Nulos, tipos y longitudes salen del perfil compartido del dataset
+        profile = get_profile(df)
         report = {
             "shape": df.shape,
-            "null_counts": df.isnull().sum().to_dict(),
-            "null_percentages": (df.isnull().sum() / len(df) * 100).to_dict(),
-            "duplicate_rows": df.duplicated().sum(),
-            "memory_usage": df.memory_usage(deep=True).sum(),
-            "dtypes": df.dtypes.to_dict()
+            "null_counts": profile.null_counts.to_dict(),
+            "null_percentages": (profile.null_counts / len(df) * 100).to_dict(),
+            "duplicate_rows": profile.duplicate_rows(df),
+            "memory_usage": profile.memory_bytes(df),
+            "dtypes": profile.dtypes.to_dict()
         }
         
         # Análisis específico para columnas de proteínas
         if 'len' in df.columns:
+            length = profile.length
             report["length_stats"] = {
-                "min": df['len'].min(),
-                "max": df['len'].max(),
-                "mean": df['len'].mean(),
-                "median": df['len'].median(),
-                "std": df['len'].std()
+                "min": length["min"],
+                "max": length["max"],
+                "mean": length["mean"],
+                "median": length["median"],
+                "std": length["std"]
             }
         
         return report
\ No newline at end of file
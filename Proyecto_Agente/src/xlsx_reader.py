@@ -0,0 +1,209 @@
+"""
+Lector en streaming de hojas .xlsx sin construir objetos de celda.
+
+Un .xlsx es un ZIP con XML: las hojas (``xl/worksheets/sheetN.xml``) referencian
+una tabla de textos compartidos (``xl/sharedStrings.xml``). openpyxl, incluso en
+modo ``read_only`` (el que usa ``pd.read_excel``), crea un objeto por celda y puede
+recorrer la hoja completa solo para calcular sus dimensiones. Este módulo lee el
+XML de la hoja con expat por bloques y emite las filas como listas de valores
+Python, con memoria acotada por el tamaño del bloque.
+
+Conversión de celdas:
+- ``t="s"``: texto compartido; ``t="inlineStr"``/``t="str"``: texto en la celda
+- ``t="b"``: booleano; ``t="e"``: error de Excel (se lee como nulo)
+- numéricas: int o float; las que tienen un formato de fecha se convierten a datetime
+"""
+
+import posixpath
+import re
+import zipfile
+from typing import Dict, Iterator, List, Optional, Set
+from xml.etree import ElementTree
+from xml.parsers import expat
+
+from openpyxl.utils.datetime import from_excel
+
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Bytes de XML por bloque de lectura
+_READ_BLOCK = 1024 * 1024
+
+# Formatos numéricos predefinidos de fecha/hora (ECMA-376, 18.8.30)
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | set(range(45, 48)) | set(range(50, 59))
+_DATE_TOKENS = re.compile(r"[dmyhs]", re.IGNORECASE)
+
+_COLUMN_CACHE: Dict[str, int] = {}
+
+
+def _local(name: str) -> str:
+    """Nombre de etiqueta sin prefijo de espacio de nombres ('x:c' -> 'c')."""
+    return name.rpartition(":")[2]
+
+
+def _column_index(reference: str) -> int:
+    """Índice (base 0) de la columna de una referencia como 'AB12'."""
+    letters = reference.rstrip("0123456789")
+    index = _COLUMN_CACHE.get(letters)
+    if index is None:
+        index = 0
+        for char in letters:
+            index = index * 26 + (ord(char.upper()) - 64)
+        index -= 1
+        _COLUMN_CACHE[letters] = index
+    return index
+
+
+def sheet_paths(archive: zipfile.ZipFile) -> Dict[str, str]:
+    """
+    Rutas de las hojas dentro del ZIP, en el orden del libro.
+
+    Returns:
+        Dict[str, str]: Nombre de la hoja -> ruta del XML
+    """
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(f"{_PKG_REL_NS}Relationship")}
+
+    paths = {}
+    for sheet in workbook.iter(f"{_MAIN_NS}sheet"):
+        target = targets.get(sheet.get(f"{_REL_NS}id"), "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+        paths[sheet.get("name")] = path
+    return paths
+
+
+def shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    """Tabla de textos compartidos (vacía si el libro no tiene)."""
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as source:
+        for _, element in ElementTree.iterparse(source):
+            if element.tag == f"{_MAIN_NS}si":
+                strings.append("".join(t.text or "" for t in element.iter(f"{_MAIN_NS}t")))
+                element.clear()
+    return strings
+
+
+def date_styles(archive: zipfile.ZipFile) -> Set[int]:
+    """Índices de estilos de celda (cellXfs) con formato de fecha u hora."""
+    if "xl/styles.xml" not in archive.namelist():
+        return set()
+    styles = ElementTree.fromstring(archive.read("xl/styles.xml"))
+    custom_dates = {
+        int(fmt.get("numFmtId"))
+        for fmt in styles.iter(f"{_MAIN_NS}numFmt")
+        # Se ignoran los literales entre comillas y los colores/condiciones entre corchetes
+        if _DATE_TOKENS.search(re.sub(r'"[^"]*"|\[[^\]]*\]', "", fmt.get("formatCode", "")))
+    }
+    cell_xfs = styles.find(f"{_MAIN_NS}cellXfs")
+    if cell_xfs is None:
+        return set()
+    return {
+        index
+        for index, xf in enumerate(cell_xfs.iter(f"{_MAIN_NS}xf"))
+        if int(xf.get("numFmtId", 0)) in _BUILTIN_DATE_FORMATS | custom_dates
+    }
+
+
+class _SheetParser:
+    """Manejadores de expat que convierten el XML de una hoja en filas."""
+
+    def __init__(self, strings: List[str], dates: Set[int]):
+        self.strings = strings
+        self.dates = dates
+        self.rows: List[list] = []
+        self.row: Optional[list] = None
+        self.cell_type = None
+        self.cell_style = None
+        self.cell_column = 0
+        self.text: List[str] = []
+        self.capture = False
+
+    def start(self, name, attrs):
+        tag = _local(name)
+        if tag == "c":
+            self.cell_type = attrs.get("t", "n")
+            self.cell_style = attrs.get("s")
+            reference = attrs.get("r")
+            self.cell_column = _column_index(reference) if reference else len(self.row)
+            self.text = []
+        elif tag in ("v", "t") and self.row is not None:
+            self.capture = True
+        elif tag == "row":
+            self.row = []
+
+    def end(self, name):
+        tag = _local(name)
+        if tag in ("v", "t"):
+            self.capture = False
+        elif tag == "c":
+            value = self._convert("".join(self.text))
+            if value is not None:
+                row = self.row
+                if self.cell_column >= len(row):
+                    row.extend([None] * (self.cell_column - len(row) + 1))
+                row[self.cell_column] = value
+        elif tag == "row":
+            self.rows.append(self.row)
+            self.row = None
+
+    def characters(self, data):
+        if self.capture:
+            self.text.append(data)
+
+    def _convert(self, text: str):
+        cell_type = self.cell_type
+        if cell_type == "s":
+            return self.strings[int(text)] if text else None
+        if cell_type in ("str", "inlineStr"):
+            return text
+        if cell_type == "b":
+            return text == "1" if text else None
+        if cell_type == "e" or not text:
+            return None
+        try:
+            value = int(text)
+        except ValueError:
+            value = float(text)
+        if self.cell_style is not None and int(self.cell_style) in self.dates:
+            return from_excel(value)
+        return value
+
+
+def iter_rows(archive: zipfile.ZipFile, sheet: Optional[str] = None) -> Iterator[list]:
+    """
+    Itera las filas de una hoja como listas de valores.
+
+    Args:
+        archive (zipfile.ZipFile): Libro .xlsx abierto
+        sheet (str, optional): Nombre de la hoja (por defecto, la primera)
+
+    Yields:
+        list: Valores de la fila (las celdas vacías intermedias son None)
+    """
+    paths = sheet_paths(archive)
+    if not paths:
+        return
+    if sheet is not None and sheet not in paths:
+        raise ValueError(f"La hoja '{sheet}' no existe en el libro.")
+    path = paths[sheet] if sheet is not None else next(iter(paths.values()))
+
+    handler = _SheetParser(shared_strings(archive), date_styles(archive))
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = handler.start
+    parser.EndElementHandler = handler.end
+    parser.CharacterDataHandler = handler.characters
+    with archive.open(path) as source:
+        while True:
+            block = source.read(_READ_BLOCK)
+            parser.Parse(block, not block)
+            if handler.rows:
+                yield from handler.rows
+                handler.rows = []
+            if not block:
+                break
@@ -80,5 +80,41 @@ class TestProteinAnalysisAgent(unittest.TestCase):
         # Verificar que la respuesta contiene el mensaje de error esperado
         self.assertIn("Error al procesar la solicitud con el agente: Error de red simulado", response)
 
+    @patch.dict(os.environ, {"HUGGING_FACE_API_KEY": "test_key"})
+    @patch("src.agent.completion")
+    def test_chat_separates_reasoning(self, mock_completion):
+        """
+        Prueba que el razonamiento <think> se separa de la respuesta y no se reenvía en el historial.
+        """
+        mock_response = MagicMock()
+        mock_response.choices[0].message.tool_calls = None
+        mock_response.choices[0].message.content = "<think>Calculo la media...</think>La media es 250."
+        mock_response.choices[0].message.reasoning_content = None
+        mock_completion.return_value = mock_response
+
+        agent = ProteinAnalysisAgent()
+        history = [
+            {"role": "user", "content": "Hola"},
+            {"role": "assistant", "content": "<think>Saludo</think>¡Hola!", "reasoning": "Saludo"},
+        ]
+        response = agent.chat("Contexto", "¿Cuál es la media?", chat_history=history)
+
+        self.assertEqual(response, "La media es 250.")
+        self.assertEqual(agent.last_reasoning, "Calculo la media...")
+
+        messages = mock_completion.call_args.kwargs['messages']
+        self.assertEqual(messages[2], {"role": "assistant", "content": "¡Hola!"})
+        self.assertLessEqual(mock_completion.call_args.kwargs['max_tokens'], 4000)
+
+    def test_split_reasoning_truncated(self):
+        """
+        Prueba que un razonamiento sin cerrar (presupuesto agotado) no se filtra a la respuesta.
+        """
+        from src.reasoning import split_reasoning
+
+        self.assertEqual(split_reasoning("<think>Pensando sin terminar"), ("", "Pensando sin terminar"))
+        self.assertEqual(split_reasoning("Pensando</think>Respuesta"), ("Respuesta", "Pensando"))
+        self.assertEqual(split_reasoning("Respuesta", "Razonamiento"), ("Respuesta", "Razonamiento"))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.composition import COMPOSITION_COLUMNS, AminoAcidComposition
+from src.dataset_profile import LENGTH_CATEGORIES
+
+
+class TestComposition(unittest.TestCase):
+
+    def test_matrix_matches_str_count_and_buckets(self):
+        """
+        Prueba que la matriz coincide con str.count por cadena y que las categorías de longitud suman bien.
+        """
+        seqs = ["ACDXA", None, "W" * 150, "GGHU", "K" * 600]
+        composition = AminoAcidComposition.from_frame(pd.DataFrame({"seq": seqs}))
+
+        for row, seq in zip(composition.counts, seqs):
+            seq = seq or ""
+            expected = [seq.count(aa) for aa in COMPOSITION_COLUMNS[:-1]]
+            expected.append(len(seq) - sum(expected))
+            np.testing.assert_array_equal(row, expected)
+
+        self.assertAlmostEqual(composition.frequencies().sum(), 100.0)
+        self.assertEqual(composition.totals(np.array([0, 3]))["Otros"], 2)
+
+        table = composition.by_length_bucket(LENGTH_CATEGORIES)
+        self.assertEqual(table["cadenas"].to_dict(), {"Corta (<100)": 2, "Media (100-300)": 1, "Muy Larga (>500)": 1})
+        self.assertAlmostEqual(table.loc["Media (100-300)", "W"], 100.0)
+        self.assertIn("Composición de Aminoácidos", composition.summary_text(LENGTH_CATEGORIES))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.dataset_profile import derived_fingerprint, get_profile
+from src.length_index import LengthIndex
+
+
+class TestDatasetProfile(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        lengths = rng.integers(20, 700, 200)
+        self.df = pd.DataFrame({
+            "sst3": ["".join(rng.choice(list("HEC"), k)) for k in lengths],
+            "len": lengths,
+            "has_nonstd_aa": rng.random(200) < 0.3,
+            "Exptl.": rng.choice(["XRAY", "NMR"], 200),
+            "resolution": np.where(rng.random(200) < 0.1, np.nan, rng.uniform(1, 3, 200)),
+        })
+
+    def test_profile_matches_direct_computation(self):
+        """
+        Prueba que el perfil coincide con los cálculos directos de pandas y se memoiza.
+        """
+        df = self.df
+        profile = get_profile(df)
+
+        pd.testing.assert_frame_equal(profile.describe, df.select_dtypes("number").describe())
+        pd.testing.assert_series_equal(profile.null_counts, df.isna().sum())
+        self.assertEqual(profile.method_counts.to_dict(), df["Exptl."].value_counts().to_dict())
+        self.assertEqual(profile.nonstd_counts().to_dict(), df["has_nonstd_aa"].value_counts().to_dict())
+        self.assertAlmostEqual(profile.length["median"], df["len"].median())
+        expected = pd.cut(df["len"], bins=[0, 100, 300, 500, float("inf")]).value_counts(sort=False).tolist()
+        self.assertEqual(list(profile.length_categories().values()), expected)
+        self.assertIs(get_profile(df), profile)
+
+        # Un subconjunto con huella propia tiene su propio perfil
+        subset = df[df["len"] < 300]
+        subset.attrs["fingerprint"] = derived_fingerprint(df, "len<300")
+        self.assertEqual(get_profile(subset).rows, len(subset))
+        self.assertEqual(get_profile(df).rows, len(df))
+
+    def test_length_index_matches_mask(self):
+        """
+        Prueba que las consultas por rango del índice coinciden con filtrar el DataFrame.
+        """
+        df = self.df
+        index = LengthIndex.from_frame(df)
+        for low, high in [(20, 700), (150, 420), (333, 333), (800, 900), (0, 19)]:
+            subset = df[(df["len"] >= low) & (df["len"] <= high)]
+            summary = index.summary(low, high)
+
+            self.assertEqual(summary["rows"], len(subset))
+            self.assertEqual(sorted(index.positions(low, high)), list(np.flatnonzero(df["len"].between(low, high))))
+            self.assertEqual(index.nonstd_counts(low, high).to_dict(), subset["has_nonstd_aa"].value_counts().to_dict())
+            if len(subset):
+                self.assertAlmostEqual(summary["mean"], subset["len"].mean())
+                self.assertEqual((summary["min"], summary["max"]), (subset["len"].min(), subset["len"].max()))
+                expected = pd.Series(list("".join(subset["sst3"]))).value_counts()
+                self.assertEqual(summary["q3_counts"].to_dict(), expected.to_dict())
+                lengths, counts = index.length_counts(low, high)
+                self.assertEqual(dict(zip(lengths, counts)), subset["len"].value_counts().to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
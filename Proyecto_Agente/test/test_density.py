@@ -0,0 +1,33 @@
+import math
+import unittest
+
+import numpy as np
+
+from src.density import histogram_kde, scott_bandwidth
+
+
+class TestDensity(unittest.TestCase):
+
+    def test_matches_exact_kde_and_weights(self):
+        """
+        Prueba que la KDE por bins coincide con la KDE gaussiana exacta y que los pesos equivalen a repetir valores.
+        """
+        values = np.round(np.random.default_rng(0).normal(2.0, 0.4, 2000), 2)
+        counts, edges, grid, curve = histogram_kde(values, bins=30)
+        np.testing.assert_array_equal(counts, np.histogram(values, bins=30)[0])
+
+        bandwidth = scott_bandwidth(values)
+        exact = np.exp(-0.5 * ((grid[:, None] - values) / bandwidth) ** 2).sum(axis=1)
+        exact *= (edges[1] - edges[0]) / (bandwidth * math.sqrt(2 * math.pi))
+        self.assertLess(np.max(np.abs(curve - exact)) / exact.max(), 1e-3)
+
+        distinct, frequency = np.unique(values, return_counts=True)
+        weighted = histogram_kde(distinct, frequency, bins=30)
+        np.testing.assert_allclose(weighted[0], counts)
+        np.testing.assert_allclose(weighted[3], curve)
+
+        self.assertIsNone(histogram_kde(np.array([3.0, 3.0]))[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
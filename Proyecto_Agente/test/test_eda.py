@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import patch
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from matplotlib.collections import PathCollection, QuadMesh  # noqa: E402
+from matplotlib.colors import LogNorm  # noqa: E402
+
+from src import eda  # noqa: E402
+
+
+class TestLengthVsResolution(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        resolution = np.round(rng.uniform(1, 3, 60), 2)
+        resolution[:10] = np.nan
+        self.df = pd.DataFrame({"len": rng.integers(20, 500, 60), "resolution": resolution})
+        self.df.loc[10:14, "len"] = None
+
+    def tearDown(self):
+        plt.close("all")
+
+    def test_switches_to_density_above_threshold(self):
+        """
+        Prueba que con más pares válidos que ``scatter_max_points`` se dibuja un histograma 2D
+        (una sola QuadMesh con LogNorm) y que los pares con NaN no se cuentan.
+        """
+        valid = 60 - 15
+        with patch.dict(eda.VIZ_CONFIG, {"scatter_max_points": valid - 1}):
+            fig = eda.plot_length_vs_resolution(self.df)
+        meshes = [c for c in fig.axes[0].collections if isinstance(c, QuadMesh)]
+        self.assertEqual(len(meshes), 1)
+        self.assertIsInstance(meshes[0].norm, LogNorm)
+        self.assertEqual(int(meshes[0].get_array().sum()), valid)
+        self.assertFalse(any(isinstance(c, PathCollection) for c in fig.axes[0].collections))
+
+    def test_scatter_at_threshold(self):
+        """
+        Prueba que con ``scatter_max_points`` pares válidos o menos se dibuja el scatter sin los NaN.
+        """
+        valid = 60 - 15
+        with patch.dict(eda.VIZ_CONFIG, {"scatter_max_points": valid}):
+            fig = eda.plot_length_vs_resolution(self.df)
+        points = [c for c in fig.axes[0].collections if isinstance(c, PathCollection)]
+        self.assertEqual(len(points), 1)
+        self.assertEqual(len(points[0].get_offsets()), valid)
+        self.assertFalse(any(isinstance(c, QuadMesh) for c in fig.axes[0].collections))
+
+
+if __name__ == "__main__":
+    unittest.main()
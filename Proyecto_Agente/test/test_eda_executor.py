@@ -0,0 +1,63 @@
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from src import eda_executor
+from src.eda_executor import FigureTask, render_figures
+from src.figure_cache import clear_figure_cache
+
+
+class TestEdaExecutor(unittest.TestCase):
+
+    def setUp(self):
+        clear_figure_cache()
+
+    def test_ordered_results_isolated_errors_and_cache(self):
+        """
+        Prueba que los resultados respetan el orden de las tareas, que un error no afecta al resto y que se usa la caché.
+        """
+        df = pd.DataFrame({"len": [10, 20, 30], "resolution": [1.5, 2.0, 2.5]})
+        df.attrs["fingerprint"] = "executor-test"
+        tasks = [
+            FigureTask("resolution_distribution", "plot_resolution_distribution"),
+            FigureTask("missing", "plot_does_not_exist"),
+            FigureTask("q8_distribution", "plot_q8_counts", args=(pd.Series({"H": 3, "G": 2}),)),
+        ]
+
+        results = render_figures(df, tasks, parallel=False)
+        self.assertEqual([r.name for r in results], ["resolution_distribution", "missing", "q8_distribution"])
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertTrue(results[0].image.startswith(b"\x89PNG"))
+
+        again = render_figures(df, tasks, parallel=False)
+        self.assertEqual([r.cached for r in again], [True, False, True])
+        self.assertEqual(again[2].image, results[2].image)
+
+    def test_tasks_ship_only_their_data(self):
+        """
+        Prueba que cada tarea envía solo las filas y columnas que usa (o ninguna si trae sus
+        argumentos) y que datasets distintos comparten el pool sin reiniciarlo.
+        """
+        df = pd.DataFrame({"len": [10, 20, 30], "resolution": [1.5, 2.0, 2.5], "seq": ["A" * 10, "C" * 20, "D" * 30]})
+        task = FigureTask("length_vs_resolution", "plot_length_vs_resolution", rows=[2, 0], columns=["len", "resolution"])
+        frame = eda_executor._task_frame(df, task)
+        self.assertEqual(list(frame.columns), ["len", "resolution"])
+        self.assertEqual(list(frame.index), [0, 2])
+        self.assertIsNone(eda_executor._task_frame(df, FigureTask("q3", "plot_q3_counts", args=(pd.Series({"H": 1}),))))
+
+        second = pd.DataFrame({"len": [40, 50], "resolution": [1.0, 3.0]})
+        tasks = [FigureTask("resolution_distribution", "plot_resolution_distribution", columns=["resolution"]),
+                 FigureTask("q8_distribution", "plot_q8_counts", args=(pd.Series({"H": 3, "G": 2}),))]
+        try:
+            with patch.dict(eda_executor.EDA_EXECUTOR_CONFIG, {"max_workers": 1}):
+                first_results = render_figures(df, tasks, fingerprint="pool-a", parallel=True)
+                pool = eda_executor._POOL
+                second_results = render_figures(second, tasks, fingerprint="pool-b", parallel=True)
+            self.assertIs(eda_executor._POOL, pool)
+            self.assertTrue(all(r.ok for r in first_results + second_results))
+        finally:
+            eda_executor.shutdown_executor()
+
+if __name__ == "__main__":
+    unittest.main()
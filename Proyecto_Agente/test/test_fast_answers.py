@@ -0,0 +1,134 @@
+import unittest
+
+import pandas as pd
+
+from src import fast_answers
+from src.config import SUGGESTED_QUESTIONS
+from src.fast_answers import (
+    answer_intent, detect_intent, fast_path_answer, longest_sequences_table, precompute_dataset_stats
+)
+
+
+def make_dataset():
+    """Dataset pequeño con longitudes y estructuras conocidas."""
+    sst3 = ["HHHHEEC", "EEEEEEEEEE", "CCC", "HHHHHHHHHHHH", "HEC"]
+    return pd.DataFrame({
+        "pdb_id": ["1ABC", "2DEF", "3GHI", "4JKL", "5MNO"],
+        "chain_code": ["A", "B", "A", "C", "A"],
+        "seq": ["A" * len(s) for s in sst3],
+        "sst3": sst3,
+        "len": [len(s) for s in sst3],
+        "has_nonstd_aa": [False, True, False, False, True],
+    })
+
+
+class TestDetectIntent(unittest.TestCase):
+
+    def test_suggested_questions(self):
+        """
+        Prueba que cada pregunta sugerida se reconoce con su propia intención.
+        """
+        for intent, question in SUGGESTED_QUESTIONS.items():
+            self.assertEqual(detect_intent(question), intent)
+
+    def test_free_phrasing(self):
+        """
+        Prueba variantes de redacción (mayúsculas, sin tildes) de las intenciones.
+        """
+        self.assertEqual(detect_intent("Muéstrame las 3 CADENAS MAS LARGAS"), "longest_sequences")
+        self.assertEqual(detect_intent("¿Cuál es la distribución de longitud?"), "length_distribution")
+        self.assertEqual(detect_intent("¿Qué estructura secundaria es la predominante?"), "secondary_structure")
+        self.assertEqual(detect_intent("Haz un resumen del dataset"), "dataset_summary")
+
+    def test_questions_for_the_agent(self):
+        """
+        Prueba que las preguntas con herramientas externas o sin intención conocida van al agente.
+        """
+        self.assertIsNone(detect_intent("Busca en BLAST las secuencias más largas"))
+        self.assertIsNone(detect_intent("Información PDB de 1A3N"))
+        self.assertIsNone(detect_intent("¿Qué es una hélice alfa?"))
+        self.assertIsNone(detect_intent(""))
+
+
+class TestAnswers(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_dataset()
+        self.stats = precompute_dataset_stats(self.df)
+
+    def test_longest_table(self):
+        """
+        Prueba el orden de las secuencias más largas y sus porcentajes Q3 frente a ``str.count``.
+        """
+        longest = self.stats["longest"]
+        self.assertEqual(list(longest["pdb_id"]), ["4JKL", "2DEF", "1ABC", "3GHI", "5MNO"])
+        for idx, row in longest.iterrows():
+            sst3 = self.df.loc[idx, "sst3"]
+            for state in "HEC":
+                self.assertAlmostEqual(row[f"pct_{state}"], sst3.count(state) / len(sst3) * 100)
+
+    def test_longest_table_with_warm_cache(self):
+        """
+        Prueba los porcentajes Q3 de un dataset pequeño (todas sus filas entre las más largas)
+        cuando su columna empaquetada ya está memoizada en el orden original.
+        """
+        df = pd.DataFrame({
+            "pdb_id": ["1AAA", "2BBB", "3CCC"],
+            "sst3": ["CCC", "EEEE", "HH"],
+            "len": [3, 4, 2],
+            "has_nonstd_aa": [False, False, False],
+        })
+        df.attrs["fingerprint"] = "tres-cadenas"
+        fast_answers.count_residues(df, columns=["sst3"], per_chain=True)
+
+        longest = longest_sequences_table(df, 20)
+        self.assertEqual(list(longest["pdb_id"]), ["2BBB", "1AAA", "3CCC"])
+        for idx, row in longest.iterrows():
+            sst3 = df.loc[idx, "sst3"]
+            for state in "HEC":
+                self.assertAlmostEqual(row[f"pct_{state}"], sst3.count(state) / len(sst3) * 100)
+
+    def test_requested_top_n(self):
+        """
+        Prueba que el N sale de 'top N' o 'N más largas' y no de otros números de la pregunta.
+        """
+        def listed(question):
+            return sum(line[:2] in {f"{i}." for i in range(1, 10)} for line in
+                       answer_intent("longest_sequences", self.stats, question).splitlines())
+
+        self.assertEqual(listed("¿Cuáles son las 2 secuencias más largas?"), 2)
+        self.assertEqual(listed("Dame el top 3 de cadenas"), 3)
+        self.assertEqual(listed("Las 4 más largas"), 4)
+        # Sin N explícito se usa el valor por defecto (5)
+        self.assertEqual(listed("Cadenas más largas de más de 1 residuo"), 5)
+        self.assertEqual(listed("Proteínas más largas similares a 1ABC"), 5)
+
+    def test_summary_and_distribution(self):
+        """
+        Prueba el resumen, la distribución de longitudes y la estructura dominante.
+        """
+        summary = answer_intent("dataset_summary", self.stats)
+        self.assertIn("Secuencias: **5**", summary)
+        self.assertIn("**40.0%**", summary)
+
+        distribution = answer_intent("length_distribution", self.stats)
+        self.assertIn("Mediana: **7 AA**", distribution)
+        self.assertIn("Rango: 3-12 AA", distribution)
+
+        structure = answer_intent("secondary_structure", self.stats)
+        self.assertIn("más común:** Hélice α (H)", structure)
+        self.assertIn("17 residuos", structure)
+
+    def test_fast_path_answer(self):
+        """
+        Prueba que el fast path responde las intenciones conocidas y deja pasar el resto.
+        """
+        self.assertIsNotNone(fast_path_answer(SUGGESTED_QUESTIONS["dataset_summary"], self.stats))
+        self.assertIsNone(fast_path_answer("¿Qué es una hélice alfa?", self.stats))
+        self.assertIsNone(fast_path_answer(SUGGESTED_QUESTIONS["dataset_summary"], None))
+        with self.assertRaises(ValueError):
+            answer_intent("desconocida", self.stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
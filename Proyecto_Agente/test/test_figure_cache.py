@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import patch
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from src import figure_cache
+from src.figure_cache import cached_figure, clear_figure_cache, figure_cache_stats
+
+
+def draw_line(calls):
+    calls.append(1)
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, len(calls)])
+    return fig
+
+
+class TestFigureCache(unittest.TestCase):
+
+    def setUp(self):
+        clear_figure_cache()
+
+    def test_hits_params_and_byte_eviction(self):
+        """
+        Prueba que una figura sin cambios no se vuelve a dibujar y que la caché respeta el límite de bytes.
+        """
+        calls = []
+        first = cached_figure("length_distribution", "fp", lambda: draw_line(calls))
+        again = cached_figure("length_distribution", "fp", lambda: draw_line(calls))
+        self.assertEqual(first, again)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(first.startswith(b"\x89PNG"))
+
+        # Otro rango del filtro u otro dataset son figuras distintas
+        cached_figure("length_distribution", "fp", lambda: draw_line(calls), {"len": [10, 20]})
+        cached_figure("length_distribution", "otro", lambda: draw_line(calls))
+        self.assertEqual(len(calls), 3)
+
+        # Con espacio para dos figuras, la menos usada se expulsa
+        with patch.dict(figure_cache.FIGURE_CACHE_CONFIG, {"max_bytes": 2 * len(first) + len(first) // 2}):
+            cached_figure("length_distribution", "fp", lambda: draw_line(calls))
+            cached_figure("q3_distribution", "fp", lambda: draw_line(calls))
+        stats = figure_cache_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertLessEqual(stats["bytes"], 2 * len(first) + len(first) // 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.fast_answers import precompute_dataset_stats
+from src.incremental import DatasetAggregates, append_rows
+from src.io_utils import optimize_dtypes
+
+
+def make_chains(rng, n, with_resolution=True):
+    """Cadenas sintéticas con las columnas mínimas del EDA."""
+    lengths = rng.integers(5, 60, n)
+    df = pd.DataFrame({
+        "pdb_id": [f"{i % 9 + 1}ABC" for i in range(n)],
+        "seq": ["A" * k for k in lengths],
+        "sst3": ["".join(rng.choice(list("HEC"), k)) for k in lengths],
+        "sst8": ["".join(rng.choice(list("HGEC"), k)) for k in lengths],
+        "len": lengths,
+        "has_nonstd_aa": rng.random(n) < 0.2,
+    })
+    if with_resolution:
+        df["resolution"] = np.round(rng.uniform(1, 3, n), 2)
+    return df
+
+
+class TestIncrementalAppend(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+        self.df = optimize_dtypes(make_chains(self.rng, 300))
+        self.aggregates = DatasetAggregates.from_frame(self.df)
+
+    def test_append_matches_full_recomputation(self):
+        """
+        Prueba que los agregados actualizados solo con las filas nuevas coinciden con recalcular todo.
+        """
+        combined, _ = append_rows(self.df, make_chains(self.rng, 40), self.aggregates)
+        expected = precompute_dataset_stats(combined)
+        stats = self.aggregates.fast_stats(combined)
+
+        self.assertEqual(len(combined), 340)
+        self.assertEqual(len(self.df), 300)
+        for key, value in expected["length"].items():
+            self.assertAlmostEqual(stats["length"][key], value, places=9)
+        self.assertAlmostEqual(stats["nonstd_ratio"], expected["nonstd_ratio"])
+        pd.testing.assert_series_equal(stats["q3_counts"].sort_index(), expected["q3_counts"].sort_index())
+        pd.testing.assert_frame_equal(stats["longest"], expected["longest"])
+        pd.testing.assert_frame_equal(self.aggregates.describe(combined), combined.describe())
+
+    def test_affected_artifacts(self):
+        """
+        Prueba que las filas sin 'resolution' no se cuentan como datos nuevos de los gráficos que dependen de ella.
+        """
+        _, affected = append_rows(self.df, make_chains(self.rng, 5, with_resolution=False), self.aggregates)
+
+        self.assertIn("length_distribution", affected)
+        self.assertNotIn("resolution_distribution", affected)
+        self.assertNotIn("length_vs_resolution", affected)
+
+        with self.assertRaises(ValueError):
+            append_rows(self.df, pd.DataFrame({"columna_nueva": [1]}), self.aggregates)
+
+    def test_length_columns_derived_from_sequence(self):
+        """
+        Prueba que las filas con 'seq' pero sin 'len' ni 'has_nonstd_aa' reciben ambas columnas
+        y entran en los agregados de longitud.
+        """
+        new_rows = pd.DataFrame({"pdb_id": ["9XYZ", "9XYW"], "seq": ["ACDEF", "ACDXZZ"]})
+        combined, affected = append_rows(self.df, new_rows, self.aggregates)
+
+        self.assertEqual(combined["len"].tail(2).tolist(), [5, 6])
+        self.assertEqual(combined["has_nonstd_aa"].tail(2).tolist(), [False, True])
+        self.assertEqual(self.aggregates.fast_stats(combined)["length"]["max"], max(int(self.df["len"].max()), 6))
+        self.assertEqual(self.aggregates.fast_stats(combined)["nonstd_ratio"],
+                         precompute_dataset_stats(combined)["nonstd_ratio"])
+        self.assertIn("length_distribution", affected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+import io
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from src import io_utils
+from src.io_utils import read_any, read_many, optimize_dtypes
+
+
+CSV_CONTENT = (
+    "pdb_id;chain_code;seq;sst8;sst3;len;has_nonstd_aa;Exptl.;resolution\n"
+    "1A2Z;A;FPTIPHASLVG;CCTTTCCGG;CCCEEECCC;11;False;XRAY;1.5\n"
+    "1B3Y;B;GSHSMRYFFT;GGGGGGGGGG;HHHHHHHHHH;10;True;NMR;\n"
+    "1A2Z;B;FPTIPHASLV;CCTTTCCGGC;CCCEEECCCC;10;False;XRAY;2.1\n"
+)
+
+
+def make_file(content, name):
+    """Crea un objeto file-like con nombre, como los de Streamlit."""
+    data = content.encode() if isinstance(content, str) else content
+    file = io.BytesIO(data)
+    file.name = name
+    return file
+
+
+class TestReadAny(unittest.TestCase):
+
+    def test_csv_compact_dtypes(self):
+        """
+        Prueba que el CSV se lee con el delimitador detectado y tipos compactos.
+        """
+        df = read_any(make_file(CSV_CONTENT, "datos.csv"))
+
+        self.assertEqual(df.shape, (3, 9))
+        self.assertEqual(df["len"].dtype, "int32")
+        self.assertEqual(df["has_nonstd_aa"].dtype, bool)
+        self.assertIsInstance(df["chain_code"].dtype, pd.CategoricalDtype)
+        self.assertEqual(df["resolution"].dtype, "float32")
+        self.assertIn("ingest_report", df.attrs)
+
+    def test_chunks_are_reconciled(self):
+        """
+        Prueba que los bloques con categorías y nulos distintos se concatenan sin perder tipos.
+        """
+        original = io_utils.CSV_CHUNK_ROWS
+        io_utils.CSV_CHUNK_ROWS = 1
+        try:
+            with patch.dict(io_utils.CSV_READER_CONFIG, {"engine": "pandas"}):
+                df = read_any(make_file(CSV_CONTENT, "datos.csv"))
+        finally:
+            io_utils.CSV_CHUNK_ROWS = original
+
+        self.assertEqual(df.attrs["ingest_report"]["chunks"], 3)
+        self.assertIsInstance(df["pdb_id"].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(df["pdb_id"]), ["1A2Z", "1B3Y", "1A2Z"])
+        self.assertEqual(df["resolution"].isna().sum(), 1)
+
+    def test_arrow_reader_matches_pandas(self):
+        """
+        Prueba que el lector de Arrow produce el mismo DataFrame que pandas y que vuelve a pandas si falla.
+        """
+        with patch.dict(io_utils.CSV_READER_CONFIG, {"engine": "pandas"}):
+            expected = read_any(make_file(CSV_CONTENT, "datos.csv"))
+        df = read_any(make_file(CSV_CONTENT, "datos.csv"))
+        pd.testing.assert_frame_equal(df, expected)
+
+        # Por bloques de filas: mismos bloques, tipos y categorías que el lector de pandas
+        with patch.object(io_utils, "CSV_CHUNK_ROWS", 2):
+            with patch.dict(io_utils.CSV_READER_CONFIG, {"engine": "pandas"}):
+                expected = read_any(make_file(CSV_CONTENT, "datos.csv"))
+            df = read_any(make_file(CSV_CONTENT, "datos.csv"))
+        self.assertEqual(df.attrs["ingest_report"]["chunks"], 2)
+        pd.testing.assert_frame_equal(df, expected)
+
+        # Una fila con un campo de más: Arrow la rechaza y pandas produce el error habitual
+        with self.assertRaises(pd.errors.ParserError):
+            read_any(make_file("pdb_id,len\n1A2Z,11\n1B3Y,10,extra\n", "datos.csv"))
+
+    def test_security_checks(self):
+        """
+        Prueba que se mantienen las validaciones de extensión, tamaño y bytes nulos.
+        """
+        with self.assertRaises(ValueError):
+            read_any(make_file(CSV_CONTENT, "datos.exe"))
+        with self.assertRaises(ValueError):
+            read_any(make_file(b"a,b\n\x00\x01,2\n", "datos.csv"))
+
+    def test_optimize_dtypes_string_booleans(self):
+        """
+        Prueba que los booleanos leídos como texto se convierten a bool.
+        """
+        df = optimize_dtypes(pd.DataFrame({"has_nonstd_aa": ["True", "false", "TRUE"]}))
+        self.assertEqual(df["has_nonstd_aa"].tolist(), [True, False, True])
+
+    def test_excel_multiple_sheets(self):
+        """
+        Prueba la lectura en streaming de varias hojas .xlsx con tipos compactos y fechas.
+        """
+        import datetime
+        import openpyxl
+
+        workbook = openpyxl.Workbook()
+        for index, title in enumerate(["Lote1", "Lote2"]):
+            sheet = workbook.active if index == 0 else workbook.create_sheet()
+            sheet.title = title
+            sheet.append(["pdb_id", "len", "has_nonstd_aa", "deposited"])
+            sheet.append([f"1AB{index}", 10 + index, bool(index), datetime.datetime(2020, 1, index + 1)])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+
+        file = make_file(buffer.getvalue(), "datos.xlsx")
+        self.assertEqual(io_utils.list_excel_sheets(file), ["Lote1", "Lote2"])
+        df = read_any(file, sheets=["Lote1", "Lote2"])
+
+        self.assertEqual(df.shape, (2, 5))
+        self.assertEqual(list(df["sheet"]), ["Lote1", "Lote2"])
+        self.assertEqual(df["len"].dtype, "int32")
+        self.assertEqual(df["has_nonstd_aa"].tolist(), [False, True])
+        self.assertEqual(df["deposited"].iloc[1], pd.Timestamp(2020, 1, 2))
+
+    def test_compressed_fasta_derives_columns(self):
+        """
+        Prueba que un ss.txt de RCSB comprimido produce las columnas requeridas.
+        """
+        import gzip
+
+        fasta = (
+            ">101M:A:sequence\nMVLSEGEWQL\n>101M:A:secstr\n  HHHGGG E\n"
+            ">102L:B:sequence\nMNIFEX\n>102L:B:secstr\n EEB T\n"
+        )
+        df = read_any(make_file(gzip.compress(fasta.encode()), "ss.fasta.gz"))
+
+        self.assertEqual(list(df["pdb_id"]), ["101M", "102L"])
+        self.assertEqual(list(df["len"]), [10, 6])
+        self.assertEqual(list(df["has_nonstd_aa"]), [False, True])
+        self.assertEqual(list(df["sst8"]), ["CCHHHGGGCE", "CEEBCT"])
+        self.assertEqual(list(df["sst3"]), ["CCHHHHHHCE", "CEEECC"])
+
+    def test_read_many_reconciles_shards(self):
+        """
+        Prueba que varios fragmentos se combinan unificando columnas (sin distinguir mayúsculas) y tipos.
+        """
+        lines = CSV_CONTENT.splitlines()
+        second = "PDB_ID,Seq,LEN\n3C4D,MKV,3\n"
+        df = read_many([make_file("\n".join(lines[:3]) + "\n", "parte1.csv"), make_file(second, "parte2.csv")])
+
+        self.assertEqual(len(df), 3)
+        self.assertEqual(list(df["pdb_id"]), ["1A2Z", "1B3Y", "3C4D"])
+        self.assertEqual(list(df["len"]), [11, 10, 3])
+        self.assertEqual(df["len"].dtype, "int32")
+        self.assertEqual(str(df["has_nonstd_aa"].dtype), "boolean")
+        self.assertEqual(list(df["source_file"]), ["parte1.csv", "parte1.csv", "parte2.csv"])
+        self.assertEqual([t["rows"] for t in df.attrs["file_timings"]], [2, 1])
+
+
+class TestDatasetCache(unittest.TestCase):
+
+    def test_second_load_skips_parsing(self):
+        """
+        Prueba que un mismo contenido se lee una sola vez y conserva su huella.
+        """
+        import tempfile
+        from unittest.mock import MagicMock, patch
+        from src import dataset_cache
+
+        loader = MagicMock(side_effect=read_any)
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(dataset_cache.DATASET_CACHE_CONFIG, {"dir": tmp}):
+            dataset_cache._MEMORY_CACHE.clear()
+            first = dataset_cache.read_any_cached(make_file(CSV_CONTENT, "datos.csv"), loader=loader)
+            dataset_cache._MEMORY_CACHE.clear()
+            second = dataset_cache.read_any_cached(make_file(CSV_CONTENT, "copia.csv"), loader=loader)
+
+        self.assertEqual(loader.call_count, 1)
+        self.assertEqual(second.attrs["dataset_cache"], "disk")
+        self.assertEqual(first.attrs["fingerprint"], second.attrs["fingerprint"])
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_limits_checked_before_hashing(self):
+        """
+        Prueba que una carga que excede los límites se rechaza sin leer su contenido para el hash.
+        """
+        from unittest.mock import patch
+        from src import dataset_cache
+
+        big = make_file(CSV_CONTENT, "enorme.csv")
+        big.size = 10 ** 10
+        with patch.object(dataset_cache, "content_hash") as content_hash:
+            with self.assertRaises(ValueError):
+                dataset_cache.read_any_cached(big, loader=read_any)
+            with self.assertRaises(ValueError):
+                dataset_cache.read_many_cached([make_file(CSV_CONTENT, "a.csv"), big], loader=read_many)
+        content_hash.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
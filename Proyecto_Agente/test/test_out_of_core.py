@@ -0,0 +1,129 @@
+import gc
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src import out_of_core
+from src.fast_answers import precompute_dataset_stats
+
+
+class TestOutOfCore(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        lengths = rng.integers(5, 60, 300)
+        self.df = pd.DataFrame({
+            "pdb_id": [f"{i % 9 + 1}ABC" for i in range(300)],
+            "seq": ["A" * n for n in lengths],
+            "sst3": ["".join(rng.choice(list("HEC"), n)) for n in lengths],
+            "len": lengths,
+            "has_nonstd_aa": rng.random(300) < 0.2,
+            "resolution": np.round(rng.uniform(1, 3, 300), 2),
+        })
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp.name}/grande.csv"
+        self.df.to_csv(self.path, index=False)
+        self.config = patch.dict(out_of_core.OUT_OF_CORE_CONFIG, {
+            "block_bytes": 4096, "sample_rows": 50, "spill_dir": f"{self.tmp.name}/spill"
+        })
+        self.config.start()
+
+    def tearDown(self):
+        self.config.stop()
+        self.tmp.cleanup()
+
+    def test_aggregates_match_in_memory_stats(self):
+        """
+        Prueba que los agregados por bloques coinciden con el cálculo en memoria.
+        """
+        with open(self.path, "rb") as file:
+            dataset = out_of_core.build_out_of_core(file, "grande.csv", 0)
+        expected = precompute_dataset_stats(self.df)
+        stats = dataset.fast_stats()
+
+        self.assertGreater(dataset.blocks, 1)
+        self.assertEqual(dataset.rows, 300)
+        self.assertEqual(len(dataset.sample), 50)
+        for key, value in expected["length"].items():
+            self.assertAlmostEqual(stats["length"][key], value, places=6)
+        self.assertAlmostEqual(stats["nonstd_ratio"], expected["nonstd_ratio"])
+        pd.testing.assert_series_equal(stats["q3_counts"].sort_index(), expected["q3_counts"].sort_index())
+        self.assertEqual(list(stats["longest"]["len"]), list(expected["longest"]["len"]))
+        self.assertEqual(len(dataset.query(length_range=(10, 20))), int(self.df["len"].between(10, 20).sum()))
+
+        # Métricas exactas del filtro por longitud y nulos sobre todas las filas, no sobre la muestra
+        in_range = self.df[self.df["len"].between(10, 20)]
+        summary = dataset.length_range_summary(10, 20)
+        self.assertEqual(summary["rows"], len(in_range))
+        self.assertAlmostEqual(summary["mean"], in_range["len"].mean())
+        self.assertEqual((summary["min"], summary["max"]), (in_range["len"].min(), in_range["len"].max()))
+        self.assertEqual(summary["nonstd"], int(in_range["has_nonstd_aa"].sum()))
+        self.assertEqual(dataset.length_range_summary(100, 200)["rows"], 0)
+        pd.testing.assert_series_equal(dataset.null_count_series(), self.df.isna().sum())
+
+    def test_hard_size_limit(self):
+        """
+        Prueba que los archivos que superan el límite duro se rechazan antes de leerse.
+        """
+        with patch.dict(out_of_core.OUT_OF_CORE_CONFIG, {"max_file_bytes": 100}):
+            with self.assertRaises(ValueError):
+                out_of_core.open_out_of_core_path(self.path)
+
+    def test_eviction_keeps_spill_of_live_dataset(self):
+        """
+        Prueba que descartar un dataset de la memoización no borra el volcado que otra sesión
+        sigue usando, y que se borra cuando nadie lo referencia.
+        """
+        paths = [self.path]
+        for i in (1, 2):
+            paths.append(f"{self.tmp.name}/otro{i}.csv")
+            self.df.head(100 * i).to_csv(paths[-1], index=False)
+
+        first = out_of_core.open_out_of_core_path(paths[0])
+        spill = first.spill_path
+        for path in paths[1:]:
+            out_of_core.open_out_of_core_path(path)
+        self.assertTrue(os.path.exists(spill))
+        self.assertEqual(len(first.query(length_range=(10, 20))), int(self.df["len"].between(10, 20).sum()))
+
+        del first
+        gc.collect()
+        self.assertFalse(os.path.exists(spill))
+        out_of_core._OPEN_DATASETS.clear()
+
+    def test_concurrent_opens_build_once(self):
+        """
+        Prueba que dos aperturas simultáneas del mismo archivo hacen una sola pasada.
+        """
+        out_of_core._OPEN_DATASETS.clear()
+        build = out_of_core.build_out_of_core
+        calls = []
+
+        def slow_build(*args):
+            calls.append(1)
+            return build(*args)
+
+        results = []
+        with patch.object(out_of_core, "build_out_of_core", side_effect=slow_build):
+            threads = [
+                threading.Thread(target=lambda: results.append(out_of_core.open_out_of_core_path(self.path)))
+                for _ in range(3)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(len(os.listdir(f"{self.tmp.name}/spill")), 1)
+        out_of_core._OPEN_DATASETS.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
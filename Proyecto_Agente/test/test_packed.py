@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from src import packed
+from src.packed import PackedSequences
+
+
+class TestPackedSequences(unittest.TestCase):
+
+    def setUp(self):
+        self.values = ["HHEC", "", None, "CCCCCCC", "EEH"]
+
+    def test_accessors_match_python_strings(self):
+        """
+        Prueba longitudes, composición, cortes y vuelta a pandas en columnas Arrow y object.
+        """
+        for dtype in ("str", object):
+            column = PackedSequences.from_series(pd.Series(self.values, dtype=dtype))
+
+            self.assertEqual(len(column), 5)
+            self.assertEqual(column.lengths().tolist(), [4, 0, 0, 7, 3])
+            self.assertEqual(column.composition().to_dict(), {"C": 8, "H": 3, "E": 3})
+            self.assertEqual(column[3], "CCCCCCC")
+            self.assertIsNone(column[2])
+            self.assertEqual(column.chain_view(4).tobytes(), b"EEH")
+            self.assertEqual(column.slice(3, 5).to_series().tolist(), ["CCCCCCC", "EEH"])
+            self.assertEqual(column.take([4, 0]).to_series().tolist(), ["EEH", "HHEC"])
+            self.assertTrue(column.to_series().isna().tolist()[2])
+
+    def test_composition_matrix_by_blocks(self):
+        """
+        Prueba que la matriz de composición por cadena es igual al conteo directo, con bloques pequeños.
+        """
+        rng = np.random.default_rng(3)
+        strings = ["".join(rng.choice(list("HECX"), n)) for n in rng.integers(0, 40, 200)]
+        with patch.object(packed, "_MATRIX_BLOCK_RESIDUES", 64):
+            matrix = PackedSequences.from_strings(strings).composition_matrix("HEC")
+
+        expected = [[s.count(state) for state in "HEC"] for s in strings]
+        self.assertEqual(matrix.tolist(), expected)
+
+    def test_memo_distinguishes_reordered_rows(self):
+        """
+        Prueba que una reordenación de igual longitud (que hereda la huella) no reutiliza
+        la columna empaquetada del dataset original.
+        """
+        df = pd.DataFrame({"sst3": ["HHH", "EE", "C"]})
+        df.attrs["fingerprint"] = "reordenado"
+        packed.clear_packed_cache()
+        self.assertEqual(packed.packed_column(df, "sst3").to_series().tolist(), ["HHH", "EE", "C"])
+
+        reordered = df.loc[[2, 0, 1]]
+        self.assertEqual(reordered.attrs["fingerprint"], "reordenado")
+        self.assertEqual(packed.packed_column(reordered, "sst3").to_series().tolist(), ["C", "HHH", "EE"])
+        self.assertIs(packed.packed_column(df, "sst3"), packed.packed_column(df, "sst3"))
+
+
+if __name__ == "__main__":
+    unittest.main()
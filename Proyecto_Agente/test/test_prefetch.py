@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from src import tools
+from src.prefetch import PDBPrefetcher, select_prefetch_ids
+
+
+def make_dataset(ids):
+    df = pd.DataFrame({"pdb_id": ids})
+    df.attrs["fingerprint"] = "-".join(ids)
+    return df
+
+
+class TestInteractivePriority(unittest.TestCase):
+
+    def setUp(self):
+        tools._PDB_CACHE.clear()
+
+    def fake_remote(self, pdb_id, result):
+        self.fetched.append(pdb_id)
+        return {**result, "title": f"Entrada {pdb_id}"}
+
+    def test_background_waits_for_interactive(self):
+        """
+        Prueba que una consulta de precarga no accede a la red mientras hay una consulta interactiva
+        en curso, y que la interactiva no espera a la precarga.
+        """
+        self.fetched = []
+        with patch.object(tools, "_fetch_pdb_metadata_remote", side_effect=self.fake_remote):
+            tools._mark_interactive(1)
+            try:
+                background = threading.Thread(target=tools.fetch_pdb_metadata, args=("1ABC",), kwargs={"background": True})
+                background.start()
+                time.sleep(0.1)
+                self.assertEqual(self.fetched, [])
+
+                # Otra consulta interactiva se atiende de inmediato
+                self.assertEqual(tools.fetch_pdb_metadata("2DEF")["title"], "Entrada 2DEF")
+                self.assertTrue(background.is_alive())
+            finally:
+                tools._mark_interactive(-1)
+            background.join(timeout=5)
+
+        self.assertEqual(self.fetched, ["2DEF", "1ABC"])
+        self.assertTrue(tools.is_pdb_cached("1ABC"))
+
+
+class TestPDBPrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        tools._PDB_CACHE.clear()
+        self.release = threading.Event()
+        self.warmed = []
+        self.prefetcher = PDBPrefetcher(max_workers=1, max_ids=3, max_datasets=2)
+
+        def warm(pdb_id):
+            self.release.wait(5)
+            self.warmed.append(pdb_id)
+
+        self.prefetcher._warm = warm
+
+    def tearDown(self):
+        self.release.set()
+        self.prefetcher._executor.shutdown(wait=True)
+
+    def test_select_prefetch_ids(self):
+        """
+        Prueba la prioridad: IDs recientes del dataset primero y después los más frecuentes.
+        """
+        df = make_dataset(["1AAA", "2BBB", "2BBB", "3CCC", "bad"])
+        self.assertEqual(select_prefetch_ids(df, 3), ["2BBB", "1AAA", "3CCC"])
+        self.assertEqual(select_prefetch_ids(df, 2, recent_ids=["3ccc", "9ZZZ"]), ["3CCC", "2BBB"])
+
+    def test_reruns_and_other_datasets(self):
+        """
+        Prueba que un rerun no vuelve a programar nada y que otro dataset no cancela la precarga del primero.
+        """
+        first = make_dataset(["1AAA", "2BBB"])
+        second = make_dataset(["3CCC"])
+        self.assertEqual(self.prefetcher.start(first), 2)
+        self.assertEqual(self.prefetcher.start(first), 0)
+        self.assertEqual(self.prefetcher.start(second), 1)
+        self.assertEqual(self.prefetcher.start(first), 0)
+        self.assertEqual(self.prefetcher.status()["pending"], 3)
+
+        self.release.set()
+        self.prefetcher._executor.shutdown(wait=True)
+        self.assertEqual(sorted(self.warmed), ["1AAA", "2BBB", "3CCC"])
+
+    def test_least_recent_dataset_is_cancelled(self):
+        """
+        Prueba que al superar ``max_datasets`` solo se cancela la precarga del dataset menos reciente.
+        """
+        datasets = [make_dataset([f"{i}AAA", f"{i}BBB"]) for i in (1, 2, 3)]
+        for df in datasets:
+            self.prefetcher.start(df)
+        self.assertEqual(self.prefetcher.status()["datasets"], 2)
+
+        self.release.set()
+        self.prefetcher._executor.shutdown(wait=True)
+        # El primer trabajo ya estaba en ejecución; el resto del primer dataset se canceló
+        self.assertEqual(sorted(self.warmed), ["1AAA", "2AAA", "2BBB", "3AAA", "3BBB"])
+
+
+if __name__ == "__main__":
+    unittest.main()
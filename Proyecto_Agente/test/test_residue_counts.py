@@ -0,0 +1,38 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.residue_counts import count_residues
+
+
+class TestResidueCounts(unittest.TestCase):
+
+    def test_counts_match_value_counts(self):
+        """
+        Prueba que totales y matriz por cadena coinciden con el conteo carácter a carácter.
+        """
+        rng = np.random.default_rng(5)
+        lengths = rng.integers(0, 50, 120)
+        df = pd.DataFrame({
+            "seq": ["".join(rng.choice(list("ACDXW"), n)) for n in lengths],
+            "SST3": ["".join(rng.choice(list("HEC"), n)) for n in lengths],
+            "sst8": ["".join(rng.choice(list("HGEBC?"), n)) for n in lengths],
+        })
+        df.attrs["fingerprint"] = "residue-test"
+
+        counts = count_residues(df, per_chain=True)
+        for column, key in (("seq", "seq"), ("SST3", "sst3"), ("sst8", "sst8")):
+            expected = pd.Series(list("".join(df[column]))).value_counts()
+            self.assertEqual(counts.totals(key).to_dict(), expected.to_dict())
+        self.assertEqual(counts.q3.index[0], pd.Series(list("".join(df["SST3"]))).value_counts().index[0])
+        self.assertEqual(counts.q8["?"], "".join(df["sst8"]).count("?"))
+        self.assertEqual(counts.matrix_frame("sst3")["E"].tolist(), [s.count("E") for s in df["SST3"]])
+
+        # Un subconjunto hereda la huella pero no reutiliza los totales memoizados
+        subset = count_residues(df.iloc[:10], columns=["sst3"])
+        self.assertEqual(subset.q3.sum(), lengths[:10].sum())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import socket
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from unittest.mock import MagicMock
+from urllib.error import URLError
+
+from src.resilience import ResilientEndpoint, CircuitOpenError, EndpointBusyError, is_transient_error
+
+
+class HTTPError(Exception):
+    """Error HTTP simulado con código de estado."""
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class TestResilientEndpoint(unittest.TestCase):
+
+    def test_classification(self):
+        """
+        Prueba que solo los errores transitorios se consideran reintentables.
+        """
+        self.assertTrue(is_transient_error(TimeoutError()))
+        self.assertTrue(is_transient_error(ConnectionError()))
+        self.assertTrue(is_transient_error(HTTPError(503)))
+        self.assertTrue(is_transient_error(HTTPError(429)))
+        self.assertFalse(is_transient_error(HTTPError(404)))
+        self.assertFalse(is_transient_error(ValueError("entrada inválida")))
+        self.assertTrue(is_transient_error(socket.gaierror("sin DNS")))
+        self.assertTrue(is_transient_error(URLError(ConnectionRefusedError())))
+        self.assertFalse(is_transient_error(FileNotFoundError("config.toml")))
+        self.assertFalse(is_transient_error(PermissionError("sin permisos")))
+        self.assertFalse(is_transient_error(URLError("esquema desconocido")))
+
+    def test_retries_transient_errors(self):
+        """
+        Prueba que un error transitorio se reintenta y se cuenta en las métricas.
+        """
+        endpoint = ResilientEndpoint("test", max_attempts=3, base_delay=0.0)
+        fn = MagicMock(side_effect=[ConnectionError("caído"), "ok"])
+
+        self.assertEqual(endpoint.call(fn), "ok")
+        self.assertEqual(fn.call_count, 2)
+        self.assertEqual(endpoint.metrics()["retries"], 1)
+        self.assertEqual(endpoint.metrics()["state"], "closed")
+
+    def test_permanent_error_not_retried(self):
+        """
+        Prueba que un error permanente se propaga sin reintentos.
+        """
+        endpoint = ResilientEndpoint("test", max_attempts=3, base_delay=0.0)
+        fn = MagicMock(side_effect=HTTPError(400))
+
+        with self.assertRaises(HTTPError):
+            endpoint.call(fn)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_circuit_opens_and_fails_fast(self):
+        """
+        Prueba que el breaker se abre tras fallos consecutivos y rechaza llamadas sin ejecutarlas.
+        """
+        endpoint = ResilientEndpoint(
+            "test", max_attempts=1, base_delay=0.0, failure_threshold=2, reset_timeout=60.0
+        )
+        fn = MagicMock(side_effect=TimeoutError())
+        for _ in range(2):
+            with self.assertRaises(TimeoutError):
+                endpoint.call(fn)
+
+        with self.assertRaises(CircuitOpenError):
+            endpoint.call(fn)
+        self.assertEqual(fn.call_count, 2)
+        self.assertEqual(endpoint.metrics()["state"], "open")
+        self.assertEqual(endpoint.metrics()["short_circuits"], 1)
+
+    def test_hedging_after_p95(self):
+        """
+        Prueba que una llamada idempotente lenta se duplica tras el p95 y gana la más rápida.
+        """
+        endpoint = ResilientEndpoint("test", hedge=True, hedge_min_samples=5)
+        for _ in range(5):
+            endpoint.call(lambda: None, idempotent=True)
+
+        delays = iter([1.0, 0.0])
+
+        def slow_then_fast():
+            time.sleep(next(delays))
+            return "ok"
+
+        start = time.monotonic()
+        self.assertEqual(endpoint.call(slow_then_fast, idempotent=True), "ok")
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(endpoint.metrics()["hedges"], 1)
+        self.assertEqual(endpoint.metrics()["hedge_wins"], 1)
+
+    def test_own_executor_is_bounded(self):
+        """
+        Prueba que un intento que agota su timeout no se reintenta y que, mientras su hilo
+        sigue ocupado, el endpoint rechaza llamadas nuevas en lugar de encolarlas.
+        """
+        endpoint = ResilientEndpoint(
+            "test", max_attempts=2, base_delay=0.0, attempt_timeout=0.05, retry_on_timeout=False, max_workers=1
+        )
+        release = threading.Event()
+        calls = []
+
+        def stuck():
+            calls.append(1)
+            release.wait(5)
+            return "ok"
+
+        with self.assertRaises(FutureTimeoutError):
+            endpoint.call(stuck)
+        self.assertEqual(len(calls), 1)
+        with self.assertRaises(EndpointBusyError):
+            endpoint.call(stuck)
+        self.assertEqual(endpoint.metrics()["busy_rejections"], 1)
+
+        release.set()
+        time.sleep(0.1)
+        self.assertEqual(endpoint.call(stuck), "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import itertools
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.segments import find_segments
+
+
+class TestSegments(unittest.TestCase):
+
+    def test_segments_match_groupby_per_chain(self):
+        """
+        Prueba que la segmentación vectorizada coincide con itertools.groupby cadena por cadena.
+        """
+        sst3 = ["CCHHHHCCEEEC", None, "", "HHHH", "CEECHHXHC", "C"]
+        segments = find_segments(pd.DataFrame({"SST3": sst3}))
+
+        expected = []
+        for chain, structure in enumerate(sst3):
+            start = 0
+            for state, run in itertools.groupby(structure or ""):
+                length = len(list(run))
+                expected.append((chain, start, length, "HEC".find(state) if state in "HEC" else 3))
+                start += length
+        found = zip(segments.chain.tolist(), segments.start.tolist(), segments.length.tolist(), segments.state.tolist())
+        self.assertEqual(list(found), expected)
+
+        np.testing.assert_array_equal(segments.coil_gaps(), [2, 1])
+        summary = segments.per_chain_summary()
+        self.assertEqual(summary["H_segmentos"].tolist(), [1, 0, 0, 1, 2, 0])
+        self.assertEqual(summary["H_long_max"].tolist(), [4, 0, 0, 4, 2, 0])
+        self.assertEqual(segments.subset(np.array([4])).per_chain_counts().sum(), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
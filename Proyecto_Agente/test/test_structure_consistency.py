@@ -0,0 +1,37 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.structure_consistency import StructureConsistency
+
+
+class TestStructureConsistency(unittest.TestCase):
+
+    def test_matrix_and_flagged_chains(self):
+        """
+        Prueba la matriz Q8 -> Q3 y que se marcan las cadenas que no siguen la reducción estándar.
+        """
+        df = pd.DataFrame({
+            "pdb_id": ["1AAA", "1BBB", "1CCC", "1DDD"],
+            "sst8": ["HGIEBTSC", "HHTT", "EEC", None],
+            "sst3": ["HHHEECCC", "HEEC", "EE", None],
+        })
+        consistency = StructureConsistency.from_frame(df)
+
+        matrix = consistency.matrix()
+        self.assertEqual(matrix.to_numpy().sum(), 12)
+        self.assertEqual(matrix.loc["H", "H"], 2)
+        self.assertEqual(matrix.loc["H", "E"], 1)
+        self.assertEqual(matrix.loc["T", "E"], 1)
+        np.testing.assert_array_equal(consistency.mismatches, [0, 2, 0, 0])
+        np.testing.assert_array_equal(consistency.length_mismatch, [False, False, True, False])
+        self.assertAlmostEqual(consistency.agreement, 10 / 12)
+
+        flagged = consistency.flagged_chains(df)
+        self.assertEqual(flagged["pdb_id"].tolist(), ["1BBB", "1CCC"])
+        self.assertIn("Consistencia Q8 -> Q3", consistency.summary_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
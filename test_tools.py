@@ -1,11 +1,16 @@
 import sys
+from pathlib import Path
 from unittest.mock import MagicMock
 sys.modules['requests'] = MagicMock()
 sys.modules['Bio'] = MagicMock()
 sys.modules['Bio.Blast'] = MagicMock()
 
+# Los módulos de src se importan entre sí sin paquete (``from config import ...``)
+sys.path.insert(0, str(Path(__file__).resolve().parent / "Proyecto_Agente" / "src"))
+
 import unittest
 from Proyecto_Agente.src.tools import run_blast_search, fetch_pdb_data
+from Proyecto_Agente.src.tool_compactor import compact_tool_result, estimate_tokens
 
 class TestToolsValidation(unittest.TestCase):
     def test_fetch_pdb_data_validation(self):
@@ -28,5 +33,26 @@ class TestToolsValidation(unittest.TestCase):
         self.assertIn("caracteres inválidos", run_blast_search("ACDEFGHIK123"))
         self.assertIn("caracteres inválidos", run_blast_search("ACDEFGHIKL-MN"))
 
+class TestToolCompactor(unittest.TestCase):
+    def test_blast_result_respects_budget(self):
+        hsp = {"evalue": 1e-50, "score": 300, "identities": 140, "align_length": 147, "identity_pct": 95.2}
+        hits = [
+            {"title": "gi|1|ref|NP_1.1| hemoglobin beta [Homo sapiens] >gi|2| beta globin", "accession": "NP_1",
+             "hsps": [hsp, dict(hsp, evalue=1e-3, score=30)]},
+            {"title": "ref|XP_9.1| Hemoglobin beta [Homo sapiens]", "accession": "XP_9", "hsps": [dict(hsp, evalue=1e-40)]},
+        ] + [
+            {"title": f"ref|Z{i}| protein {i} " + "x" * 300, "accession": f"Z{i}", "hsps": [dict(hsp, evalue=1e-10 * i)]}
+            for i in range(1, 50)
+        ]
+        compact = compact_tool_result("run_blast_search", {"query": "MKTAYIAKQR", "hits": hits, "error": None})
+
+        # Títulos redundantes fusionados, mejor HSP primero y resultado acotado
+        self.assertIn("1. hemoglobin beta [Homo sapiens] [NP_1] (+2 redundantes)", compact)
+        self.assertIn("hits omitidos", compact)
+        self.assertLessEqual(estimate_tokens(compact), 420)
+
+    def test_errors_pass_through(self):
+        self.assertIn("Error", compact_tool_result("fetch_pdb_data", {"pdb_id": "0HHB", "error": "Error: ID"}))
+
 if __name__ == '__main__':
     unittest.main()